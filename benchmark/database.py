@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2017, German Aerospace Center (DLR)
+#
+# This file is part of the development version of the pando library.
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Authors:
+# - 2017, Fabian Greif (DLR RY-AVS)
+
+"""
+Generator for synthetic packet databases used by the benchmarks.
+
+The generated model is deterministic for a given set of arguments and
+contains enumerations, calibrations, telemetry packets with repeaters,
+events, telecommands and a complete mapping section.
+"""
+
+import os
+import sys
+import copy
+import random
+import datetime
+
+rootpath = os.path.join(os.path.dirname(os.path.realpath(__file__)), "..")
+sys.path.append(rootpath)
+
+import pando.model
+import pando.builder.xml
+
+UNITS = ["", "V", "A", "degC", "m/s", "rad", "s", "W"]
+
+TYPES = [
+    (pando.model.ParameterType.UNSIGNED_INTEGER, 8),
+    (pando.model.ParameterType.UNSIGNED_INTEGER, 16),
+    (pando.model.ParameterType.UNSIGNED_INTEGER, 32),
+    (pando.model.ParameterType.SIGNED_INTEGER, 16),
+    (pando.model.ParameterType.SIGNED_INTEGER, 32),
+    (pando.model.ParameterType.REAL, 32),
+    (pando.model.ParameterType.REAL, 64),
+]
+
+
+def _parameter(model, uid, rng, enumerations, calibrations):
+    kind = rng.random()
+    if kind < 0.15 and enumerations:
+        enumeration = rng.choice(enumerations)
+        parameter = pando.model.Parameter(name="Parameter %s" % uid, uid=uid,
+                                          description="Enumeration parameter %s" % uid,
+                                          parameter_type=pando.model.EnumerationType(enumeration.width,
+                                                                                     enumeration.uid))
+    elif kind < 0.20:
+        parameter = pando.model.Parameter(name="Parameter %s" % uid, uid=uid,
+                                          description="Timestamp %s" % uid,
+                                          parameter_type=pando.model.ParameterType(
+                                              pando.model.ParameterType.ABSOLUTE_TIME, 48))
+    else:
+        identifier, width = rng.choice(TYPES)
+        parameter = pando.model.Parameter(name="Parameter %s" % uid, uid=uid,
+                                          description="Measurement %s" % uid,
+                                          parameter_type=pando.model.ParameterType(identifier, width))
+        parameter.unit = rng.choice(UNITS)
+        if identifier == pando.model.ParameterType.UNSIGNED_INTEGER and width == 16 \
+                and calibrations and rng.random() < 0.3:
+            parameter.calibration = rng.choice(calibrations)
+
+    parameter.short_name = "S%s" % uid
+    model.parameters[uid] = parameter
+    return parameter
+
+
+def _instance(parameter):
+    """ Packets contain copies of the parameter definitions. """
+    return copy.deepcopy(parameter)
+
+
+def generate(telemetries=1000,
+             telecommands=250,
+             events=100,
+             parameters_per_packet=10,
+             applications=16,
+             seed=0):
+    """
+    Create a synthetic model.
+    """
+    rng = random.Random(seed)
+    model = pando.model.Model()
+
+    enumerations = []
+    for index in range(20):
+        enumeration = pando.model.Enumeration(name="Enumeration %i" % index,
+                                              uid="E%i" % index,
+                                              width=8,
+                                              description="Enumeration %i" % index)
+        for value in range(8):
+            enumeration.append_entry(pando.model.EnumerationEntry(name="E%i_V%i" % (index, value),
+                                                                  value=value,
+                                                                  description=""))
+        model.enumerations[enumeration.uid] = enumeration
+        enumerations.append(enumeration)
+
+    calibrations = []
+    for index in range(10):
+        calibration = pando.model.Interpolation(pando.model.Calibration.INTERPOLATION_TELEMETRY,
+                                                name="Calibration %i" % index,
+                                                uid="C%i" % index,
+                                                description="")
+        calibration.output_type = pando.model.Interpolation.REAL
+        calibration.input_type = pando.model.Interpolation.UNSIGNED_INTEGER
+        for point in range(5):
+            calibration.append_point(pando.model.Interpolation.Point(point * 1000.0, point * 1.5 + index))
+        model.calibrations[calibration.uid] = calibration
+        calibrations.append(calibration)
+
+    sid_parameter = pando.model.Parameter(name="SID", uid="SID", description="Structure identifier",
+                                          parameter_type=pando.model.ParameterType(
+                                              pando.model.ParameterType.UNSIGNED_INTEGER, 16))
+    model.parameters[sid_parameter.uid] = sid_parameter
+
+    report_id = pando.model.Parameter(name="Report ID", uid="s5_report_id", description="",
+                                      parameter_type=pando.model.ParameterType(
+                                          pando.model.ParameterType.UNSIGNED_INTEGER, 16))
+    model.parameters[report_id.uid] = report_id
+
+    counter = [0]
+
+    def new_parameter():
+        counter[0] += 1
+        return _parameter(model, "P%i" % counter[0], rng, enumerations, calibrations)
+
+    def new_repeater(members):
+        counter[0] += 1
+        uid = "G%i" % counter[0]
+        repeater = pando.model.Repeater(name="Repeater %s" % uid, uid=uid, description="",
+                                        parameter_type=pando.model.ParameterType(
+                                            pando.model.ParameterType.UNSIGNED_INTEGER, 8))
+        for member in members:
+            repeater.append_parameter(_instance(member))
+        model.parameters[uid] = repeater
+        return repeater
+
+    def fill(packet, count):
+        parameters = [new_parameter() for _ in range(count)]
+        if count >= 6 and rng.random() < 0.2:
+            # Last parameters are repeated
+            repeater = new_repeater(parameters[-3:])
+            parameters = parameters[:-3] + [repeater]
+        for parameter in parameters:
+            packet.append_parameter(_instance(parameter))
+        packet.update_depth()
+
+    for index in range(telemetries):
+        packet = pando.model.Telemetry(name="Housekeeping %i" % index,
+                                       uid="TM%i" % index,
+                                       description="Synthetic housekeeping packet %i." % index)
+        packet.short_name = packet.name
+        packet.service_type = 3
+        packet.service_subtype = 25
+        packet.append_parameter(_instance(sid_parameter))
+        fill(packet, parameters_per_packet)
+        packet.identification_parameter.append(
+            pando.model.TelemetryIdentificationParameter(packet.parameters[0], str(index)))
+        packet.packet_generation = pando.model.PeriodicPacketGeneration(
+            interval=datetime.timedelta(seconds=1 + index % 10))
+        model.append_telemetry_packet(packet)
+
+    severities = [pando.model.Event.PROGRESS, pando.model.Event.LOW_SEVERITY,
+                  pando.model.Event.MEDIUM_SEVERITY, pando.model.Event.HIGH_SEVERITY]
+    for index in range(events):
+        event = pando.model.Event(name="Event %i" % index, uid="EV%i" % index,
+                                  description="Synthetic event %i." % index)
+        event.short_name = event.name
+        event.report_id = index
+        event.severity = severities[index % len(severities)]
+        event.service_type = 5
+        event.service_subtype = event.severity
+        event.packet_generation = pando.model.EventPacketGeneration()
+        for _ in range(rng.randint(0, 4)):
+            parameter = _instance(new_parameter())
+            event.append_parameter(parameter)
+            event.append_event_parameter(parameter)
+        event.parameters.insert(0, report_id)
+        event.update_depth()
+        event.update_event_parameter_depth()
+        event.identification_parameter.append(
+            pando.model.TelemetryIdentificationParameter(report_id, str(index)))
+        model.append_telemetry_packet(event)
+
+    for index in range(telecommands):
+        packet = pando.model.Telecommand(name="Command %i" % index,
+                                         uid="TC%i" % index,
+                                         description="Synthetic telecommand %i." % index)
+        packet.short_name = packet.name
+        packet.service_type = 8
+        packet.service_subtype = 1
+        for _ in range(rng.randint(1, 4)):
+            identifier, width = rng.choice(TYPES[:5])
+            counter[0] += 1
+            parameter = pando.model.Parameter(name="Argument %i" % counter[0], uid="A%i" % counter[0],
+                                              description="",
+                                              parameter_type=pando.model.ParameterType(identifier, width))
+            model.parameters[parameter.uid] = parameter
+            packet.append_parameter(_instance(parameter))
+        packet.update_depth()
+        model.append_telecommand_packet(packet)
+
+    _add_mapping(model, applications)
+    return model
+
+
+def _add_mapping(model, applications):
+    subsystem = model.get_or_add_subsystem(1, "synthetic")
+    subsystem.description = "Synthetic subsystem"
+
+    for index, enumeration in enumerate(model.enumerations.values()):
+        subsystem.telemetry_enumerations[enumeration.uid] = \
+            pando.model.EnumerationMapping("TE%04i" % index, enumeration, subsystem)
+    for index, calibration in enumerate(model.calibrations.values()):
+        subsystem.telemetry_calibrations[calibration.uid] = \
+            pando.model.CalibrationMapping("TC%04i" % index, calibration, subsystem)
+
+    apps = []
+    for index in range(applications):
+        application = pando.model.ApplicationMapping(name="Application %i" % index,
+                                                     apid=0x100 + index,
+                                                     description="")
+        subsystem.applications[application.apid] = application
+        apps.append(application)
+
+    sid = 0
+    for index, packet in enumerate(model.telemetries.values()):
+        sid += 1
+        if packet.packet_type == pando.model.Packet.EVENT:
+            mapping = pando.model.EventMapping("EV%06i" % sid, packet)
+        else:
+            mapping = pando.model.TelemetryMapping("TM%06i" % sid, packet)
+        mapping.packet_generation = packet.packet_generation
+        for position, parameter in enumerate(packet.get_parameters_as_flattened_list()):
+            mapping.append_parameter(pando.model.ParameterMapping("%s_%03i" % (mapping.sid, position),
+                                                                  model.parameters[parameter.uid]))
+        apps[index % len(apps)].append_telemetry(mapping)
+
+    parameters = set()
+    for index, packet in enumerate(model.telecommands.values()):
+        sid += 1
+        apps[index % len(apps)].append_telecommand(pando.model.TelecommandMapping("TC%06i" % sid, packet))
+        for parameter in packet.get_parameters_as_flattened_list():
+            parameters.add(parameter.uid)
+    for index, uid in enumerate(sorted(parameters)):
+        subsystem.telecommand_parameters[uid] = pando.model.ParameterMapping("TP%06i" % index,
+                                                                             model.parameters[uid])
+
+    model.references.add_subsystem(subsystem)
+
+
+def write(filename, split=False, **kwargs):
+    """
+    Generate a model and write it as XML file.
+    """
+    model = generate(**kwargs)
+    pando.builder.xml.XmlBuilder(model, split=split).generate(filename)
+    return model
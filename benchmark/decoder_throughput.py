@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2017, German Aerospace Center (DLR)
+#
+# This file is part of the development version of the pando library.
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Authors:
+# - 2017, Fabian Greif (DLR RY-AVS)
+
+
+"""
+Measure the decoding throughput for housekeeping packets.
+
+Packets of a synthetic database are filled with random data and decoded
+completely (interpreted and with generated decoder functions), with a
+decoder restricted to a few parameters and through lazy views which only
+decode the accessed parameters. Only
+packets without repeaters are used, so that random data always forms a
+valid packet.
+"""
+
+import time
+import shutil
+import random
+import argparse
+import tempfile
+
+import database
+
+import pando.decoder.codegen
+import pando.decoder.layout
+import pando.decoder.packet
+import pando.decoder.view
+
+
+def best_of(repeat, function):
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        durations.append(time.perf_counter() - start)
+    return min(durations)
+
+
+def main():
+    arg = argparse.ArgumentParser(description='Benchmark the packet decoder')
+    arg.add_argument('--telemetries', type=int, default=50)
+    arg.add_argument('--parameters', type=int, default=200,
+                     help='Number of parameters per packet.')
+    arg.add_argument('--selected', type=int, default=5,
+                     help='Number of parameters decoded by the projection.')
+    arg.add_argument('--packets', type=int, default=20000,
+                     help='Number of decoded packets per run.')
+    arg.add_argument('--repeat', type=int, default=3,
+                     help='Number of runs, the fastest run is reported.')
+    args = arg.parse_args()
+
+    model = database.generate(telemetries=args.telemetries, telecommands=0, events=0,
+                              parameters_per_packet=args.parameters, applications=1)
+    rng = random.Random(0)
+
+    directory = tempfile.mkdtemp()
+    try:
+        generated = pando.decoder.codegen.load_model(model, directory).DECODERS
+    finally:
+        shutil.rmtree(directory)
+
+    packets = []
+    for packet in model.telemetries.values():
+        layout = pando.decoder.layout.Layout.from_packet(packet)
+        if layout.size is None:
+            continue
+        fields = rng.sample(layout.fields, args.selected)
+        packets.append((pando.decoder.packet.PacketDecoder(packet),
+                        pando.decoder.packet.PacketDecoder(packet, uids=[f.uid for f in fields]),
+                        pando.decoder.view.ViewType(layout),
+                        [f.name for f in fields],
+                        generated[packet.uid],
+                        bytes(rng.getrandbits(8) for _ in range(layout.size // 8))))
+
+    stream = [packets[i % len(packets)] for i in range(args.packets)]
+    print("Packets: %i definitions, %i parameters each, %i decoded per run"
+          % (len(packets), args.parameters, len(stream)))
+
+    def full():
+        for decoder, _, _, _, _, buffer in stream:
+            decoder.decode(buffer)
+
+    def generated_full():
+        for _, _, _, _, function, buffer in stream:
+            function(buffer)
+
+    def projection():
+        for _, decoder, _, _, _, buffer in stream:
+            decoder.decode(buffer)
+
+    def views():
+        for _, _, view_type, _, _, buffer in stream:
+            view_type(buffer)
+
+    def view_access():
+        for _, _, view_type, names, _, buffer in stream:
+            view = view_type(buffer)
+            for name in names:
+                view[name]
+
+    for name, function in [("Full", full),
+                           ("Full (generated)", generated_full),
+                           ("Projection (%i)" % args.selected, projection),
+                           ("View creation", views),
+                           ("View access (%i)" % args.selected, view_access)]:
+        duration = best_of(args.repeat, function)
+        print("%-24s %10.3f s %10.0f packets/s" % (name, duration, len(stream) / duration))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2017, German Aerospace Center (DLR)
+#
+# This file is part of the development version of the pando library.
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Authors:
+# - 2017, Fabian Greif (DLR RY-AVS)
+
+
+"""
+Measure the throughput of the service 5 event decoder.
+
+A stream of random event packets of a synthetic database is created,
+including a share of housekeeping packets and of events with unknown
+report ids, and processed into an event log.
+"""
+
+import time
+import struct
+import random
+import argparse
+
+import database
+
+import pando.decoder.event
+import pando.decoder.record
+
+
+def create_packet(apid, service, subtype, seconds, data):
+    # Primary header, PUS data field header with CUC4.2 time
+    return struct.pack(">HHHBBBIH", 0x0800 | apid, 0xc000, 9 + len(data) - 1,
+                       0x10, service, subtype, seconds, 0) + data
+
+
+def main():
+    arg = argparse.ArgumentParser(description='Benchmark the event decoder')
+    arg.add_argument('--events', type=int, default=1000,
+                     help='Number of event definitions.')
+    arg.add_argument('--packets', type=int, default=100000,
+                     help='Number of packets in the stream.')
+    arg.add_argument('--repeat', type=int, default=3,
+                     help='Number of runs, the fastest run is reported.')
+    args = arg.parse_args()
+
+    model = database.generate(telemetries=10, telecommands=0, events=args.events,
+                              parameters_per_packet=4, applications=8)
+    decoder = pando.decoder.event.EventDecoder.from_model(model)
+
+    encoders = []
+    for event_type in decoder.types:
+        records = pando.decoder.record.load([event_type.event]).RECORDS
+        encoders.append((event_type, records[event_type.event.uid],
+                         pando.decoder.record.RecordEncoder(event_type.event)))
+
+    rng = random.Random(0)
+    packets = []
+    for index in range(args.packets):
+        event_type, record_class, encoder = rng.choice(encoders)
+        values = [rng.getrandbits(f.width) if f.members is None else ()
+                  for f in event_type.layout.fields]
+        values[0] = event_type.event.report_id
+        if index % 10 == 0:
+            # Unknown report id
+            values[0] = 0xffff
+        elif index % 10 == 1:
+            # Housekeeping packet
+            packets.append(create_packet(event_type.apid, 3, 25, index, b"\x00" * 16))
+            continue
+        data = encoder.encode(record_class._make(values))
+        packets.append(create_packet(event_type.apid, 5, event_type.event.severity, index, data))
+    stream = b"".join(packets)
+
+    durations = []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        log = decoder.process(stream)
+        durations.append(time.perf_counter() - start)
+    duration = min(durations)
+
+    print("Stream: %i packets, %.1f MB, %i event definitions"
+          % (len(packets), len(stream) / 1e6, len(decoder.types)))
+    print("%-24s %10.3f s %10.0f packets/s" % ("Event decoder", duration, len(packets) / duration))
+    print("%-24s %10i" % ("Logged events", len(log)))
+    print("%-24s %10i" % ("Unknown events", (log.to_numpy()["event"] == pando.decoder.event.UNKNOWN).sum()))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2017, German Aerospace Center (DLR)
+#
+# This file is part of the development version of the pando library.
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Authors:
+# - 2017, Fabian Greif (DLR RY-AVS)
+
+
+"""
+Measure the vectorized header parsing and the sequence gap detection
+on a stream of random telemetry packets.
+"""
+
+import os
+import sys
+import time
+import struct
+import random
+import argparse
+
+rootpath = os.path.join(os.path.dirname(os.path.realpath(__file__)), "..")
+sys.path.append(rootpath)
+
+import pando.decoder.ccsds
+
+
+def create_stream(packets, apids, loss, seed=0):
+    rng = random.Random(seed)
+    counters = [0] * apids
+    parts = []
+    for index in range(packets):
+        apid = rng.randrange(apids)
+        counters[apid] = (counters[apid] + 1 + (rng.random() < loss)) % (1 << 14)
+        data = b"\x00" * rng.randrange(2, 64)
+        parts.append(struct.pack(">HHHBBBIH", 0x0800 | apid, 0xc000 | counters[apid],
+                                 9 + len(data) - 1, 0x10, 3, 25, index, 0) + data)
+    return b"".join(parts)
+
+
+def measure(function, repeat):
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        durations.append(time.perf_counter() - start)
+    return min(durations), result
+
+
+def main():
+    arg = argparse.ArgumentParser(description='Benchmark the header parser')
+    arg.add_argument('--packets', type=int, default=200000,
+                     help='Number of packets in the stream.')
+    arg.add_argument('--apids', type=int, default=32,
+                     help='Number of APIDs.')
+    arg.add_argument('--repeat', type=int, default=3,
+                     help='Number of runs, the fastest run is reported.')
+    args = arg.parse_args()
+
+    stream = create_stream(args.packets, args.apids, loss=0.001)
+    print("Stream: %i packets, %.1f MB" % (args.packets, len(stream) / 1e6))
+
+    duration, offsets = measure(lambda: pando.decoder.ccsds.get_offsets(stream), args.repeat)
+    print("%-24s %10.1f ms" % ("Packet offsets", duration * 1e3))
+    duration, headers = measure(lambda: pando.decoder.ccsds.parse_headers(stream, offsets), args.repeat)
+    print("%-24s %10.1f ms" % ("Header fields", duration * 1e3))
+    duration, statistics = measure(lambda: pando.decoder.ccsds.get_sequence_statistics(
+        headers["apid"], headers["sequence_count"]), args.repeat)
+    print("%-24s %10.1f ms" % ("Sequence statistics", duration * 1e3))
+    print("%-24s %10i" % ("Missing packets", statistics["missing"].sum()))
+
+
+if __name__ == '__main__':
+    main()
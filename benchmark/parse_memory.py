@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2017, German Aerospace Center (DLR)
+#
+# This file is part of the development version of the pando library.
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Authors:
+# - 2017, Fabian Greif (DLR RY-AVS)
+
+"""
+Compare the memory usage of the default and the lean parse mode.
+
+Every mode is measured in a separate process. tracemalloc only sees the
+allocations of the Python objects, the memory of the lxml tree is only
+visible in the peak RSS of the process.
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import resource
+import argparse
+import tempfile
+import subprocess
+import tracemalloc
+
+import database
+
+import pando
+
+
+def measure(filename, lean):
+    tracemalloc.start()
+    start = time.perf_counter()
+    model = pando.parser.Parser().parse(filename, lean=lean)
+    duration = time.perf_counter() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "lean": lean,
+        "time": duration,
+        "tracemalloc_peak": peak,
+        "tracemalloc_model": current,
+        # kB on Linux
+        "max_rss": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024,
+        "packets": len(model.telemetries) + len(model.telecommands),
+    }
+
+
+def main():
+    arg = argparse.ArgumentParser(description='Benchmark the memory usage of the XML parser')
+    arg.add_argument('--telemetries', type=int, default=5000)
+    arg.add_argument('--telecommands', type=int, default=1000)
+    arg.add_argument('--split', action='store_true', default=False,
+                     help='Write the database as several files connected by XInclude.')
+    arg.add_argument('--measure', nargs=2, metavar=('FILE', 'MODE'), help=argparse.SUPPRESS)
+    args = arg.parse_args()
+
+    if args.measure:
+        print(json.dumps(measure(args.measure[0], args.measure[1] == "lean")))
+        return
+
+    directory = tempfile.mkdtemp()
+    try:
+        filename = os.path.join(directory, "database.xml")
+        database.write(filename, split=args.split,
+                       telemetries=args.telemetries,
+                       telecommands=args.telecommands)
+
+        size = sum(os.path.getsize(os.path.join(directory, f)) for f in os.listdir(directory))
+        print("Database: %i packets, %.1f MB XML" % (args.telemetries + args.telecommands, size / 1e6))
+        print("%-8s %10s %18s %18s %14s" % ("mode", "time [s]", "tracemalloc [MB]", "model [MB]", "max RSS [MB]"))
+        for mode in ["default", "lean"]:
+            output = subprocess.check_output([sys.executable, os.path.realpath(__file__),
+                                              "--measure", filename, mode])
+            result = json.loads(output.decode("utf-8"))
+            print("%-8s %10.2f %18.1f %18.1f %14.1f" % (mode, result["time"],
+                                                         result["tracemalloc_peak"] / 1e6,
+                                                         result["tracemalloc_model"] / 1e6,
+                                                         result["max_rss"] / 1e6))
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2017, German Aerospace Center (DLR)
+#
+# This file is part of the development version of the pando library.
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Authors:
+# - 2017, Fabian Greif (DLR RY-AVS)
+
+"""
+Measure the parse throughput for a large packet database.
+
+The time for reading and validating the XML file is measured separately,
+the remaining time is spent building the model from the XML tree.
+"""
+
+import os
+import time
+import shutil
+import argparse
+import tempfile
+
+import database
+
+import pando
+
+
+def best_of(repeat, function):
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        durations.append(time.perf_counter() - start)
+    return min(durations), result
+
+
+def main():
+    arg = argparse.ArgumentParser(description='Benchmark the parse throughput of the XML parser')
+    arg.add_argument('--telemetries', type=int, default=20000)
+    arg.add_argument('--telecommands', type=int, default=5000)
+    arg.add_argument('--events', type=int, default=1000)
+    arg.add_argument('--repeat', type=int, default=3,
+                     help='Number of runs, the fastest run is reported.')
+    args = arg.parse_args()
+
+    directory = tempfile.mkdtemp()
+    try:
+        filename = os.path.join(directory, "database.xml")
+        database.write(filename,
+                       telemetries=args.telemetries,
+                       telecommands=args.telecommands,
+                       events=args.events)
+        packets = args.telemetries + args.telecommands + args.events
+
+        print("Database: %i packets, %.1f MB XML" % (packets, os.path.getsize(filename) / 1e6))
+
+        xml, _ = best_of(args.repeat,
+                         lambda: pando.parser.Parser._validate_and_parse_xml(filename, None))
+        total, model = best_of(args.repeat,
+                               lambda: pando.parser.Parser().parse(filename))
+        assert len(model.telemetries) + len(model.telecommands) == packets
+
+        print("%-24s %10.2f s" % ("XML and schema", xml))
+        print("%-24s %10.2f s" % ("Model", total - xml))
+        print("%-24s %10.2f s" % ("Total", total))
+        print("%-24s %10.0f packets/s" % ("Throughput", packets / total))
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2017, German Aerospace Center (DLR)
+#
+# This file is part of the development version of the pando library.
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Authors:
+# - 2017, Fabian Greif (DLR RY-AVS)
+
+"""
+Measure the runtime of the ambiguity checks of the ModelValidator.
+
+The checks are run for databases with an increasing number of telemetry
+mappings. All packets use the same service type and subtype and are only
+distinguished by their identification parameter, which is the worst case
+for the checks. The runtime has to grow linearly with the number of
+mappings, the benchmark fails if doubling the number of mappings
+increases the runtime by more than the given factor.
+"""
+
+import sys
+import time
+import argparse
+
+import database
+
+import pando.model.validator
+
+CHECKS = [
+    "get_ambiguous_telemetry_packets",
+    "get_ambiguous_telemetry_service_identifier",
+    "get_ambiguous_packet_mappings",
+]
+
+
+def best_of(repeat, function):
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        durations.append(time.perf_counter() - start)
+    return min(durations)
+
+
+def main():
+    arg = argparse.ArgumentParser(description='Benchmark the ambiguity checks of the model validator')
+    arg.add_argument('--telemetries', type=int, default=10000,
+                     help='Number of telemetry mappings of the largest database.')
+    arg.add_argument('--applications', type=int, default=1)
+    arg.add_argument('--repeat', type=int, default=3,
+                     help='Number of runs, the fastest run is reported.')
+    arg.add_argument('--max-ratio', type=float, default=3.0,
+                     help='Allowed runtime increase when doubling the number of mappings.')
+    args = arg.parse_args()
+
+    sizes = [args.telemetries // 4, args.telemetries // 2, args.telemetries]
+    results = {}
+    for size in sizes:
+        model = database.generate(telemetries=size, telecommands=0, events=0,
+                                  parameters_per_packet=2,
+                                  applications=args.applications)
+        validator = pando.model.validator.ModelValidator(model)
+        for check in CHECKS:
+            function = getattr(validator, check)
+            assert len(function()) == 0
+            results[(check, size)] = best_of(args.repeat, function)
+
+    print("%-44s" % "TM mappings" + "".join("%10i" % size for size in sizes))
+    failed = False
+    for check in CHECKS:
+        print("%-44s" % check + "".join("%9.3fs" % results[(check, size)] for size in sizes))
+
+        ratio = results[(check, sizes[2])] / max(results[(check, sizes[1])], 1e-9)
+        if ratio > args.max_ratio:
+            print("  -> runtime increased by factor %.1f when doubling the number of mappings" % ratio)
+            failed = True
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -15,4 +15,4 @@
 from .builder import BuilderException
 from .builder import Builder
 
-__all__ = ['builder', 'mib', 'assistant', 'latex', 'report', 'svg']
+__all__ = ['builder', 'mib', 'assistant', 'latex', 'report', 'sqlite', 'svg', 'xml']
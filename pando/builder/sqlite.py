@@ -0,0 +1,595 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2017, German Aerospace Center (DLR)
+#
+# This file is part of the development version of the pando library.
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Authors:
+# - 2017, Fabian Greif (DLR RY-AVS)
+
+"""
+Export of the model into an indexed SQLite database.
+
+The database allows ad-hoc queries over the packet description, e.g. to
+find all parameters of a given type and unit within an application. The
+content can be loaded again with pando.parser.sqlite.SqliteParser.
+"""
+
+import os
+import sqlite3
+
+from . import builder
+
+import pando.model
+import pando.parser
+
+# Version of the table layout below. Increment when changing the schema.
+SCHEMA_VERSION = "1"
+
+SCHEMA = """
+CREATE TABLE info (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+
+CREATE TABLE enumerations (
+    uid TEXT PRIMARY KEY,
+    name TEXT,
+    width INTEGER,
+    description TEXT,
+    short_name TEXT
+);
+
+CREATE TABLE enumeration_entries (
+    enumeration_uid TEXT,
+    position INTEGER,
+    name TEXT,
+    value TEXT,
+    description TEXT,
+    short_name TEXT,
+    PRIMARY KEY (enumeration_uid, position)
+);
+
+CREATE TABLE calibrations (
+    uid TEXT PRIMARY KEY,
+    type INTEGER,
+    name TEXT,
+    description TEXT,
+    unit TEXT,
+    input_type INTEGER,
+    output_type INTEGER,
+    extrapolate INTEGER,
+    a0 REAL,
+    a1 REAL,
+    a2 REAL,
+    a3 REAL,
+    a4 REAL
+);
+
+CREATE TABLE calibration_points (
+    calibration_uid TEXT,
+    position INTEGER,
+    x REAL,
+    y REAL,
+    PRIMARY KEY (calibration_uid, position)
+);
+
+CREATE TABLE parameters (
+    uid TEXT PRIMARY KEY,
+    kind TEXT,
+    name TEXT,
+    description TEXT,
+    short_name TEXT,
+    type INTEGER,
+    width INTEGER,
+    enumeration_uid TEXT,
+    byte_order INTEGER,
+    unit TEXT,
+    calibration_uid TEXT,
+    value TEXT,
+    value_type INTEGER,
+    range_min TEXT,
+    range_max TEXT
+);
+CREATE INDEX parameters_type ON parameters (type, width);
+CREATE INDEX parameters_unit ON parameters (unit);
+CREATE INDEX parameters_enumeration ON parameters (enumeration_uid);
+CREATE INDEX parameters_calibration ON parameters (calibration_uid);
+
+CREATE TABLE parameter_members (
+    collection_uid TEXT,
+    position INTEGER,
+    parameter_uid TEXT,
+    PRIMARY KEY (collection_uid, position)
+);
+
+CREATE TABLE limits (
+    parameter_uid TEXT PRIMARY KEY,
+    input INTEGER,
+    value_type INTEGER,
+    samples INTEGER
+);
+
+CREATE TABLE limit_checks (
+    parameter_uid TEXT,
+    position INTEGER,
+    limit_type INTEGER,
+    lower_limit,
+    upper_limit,
+    description TEXT,
+    validity_parameter_sid TEXT,
+    validity_parameter_value TEXT,
+    PRIMARY KEY (parameter_uid, position)
+);
+
+CREATE TABLE packets (
+    uid TEXT PRIMARY KEY,
+    packet_type INTEGER,
+    name TEXT,
+    description TEXT,
+    short_name TEXT,
+    service_type INTEGER,
+    service_subtype INTEGER,
+    critical INTEGER,
+    verification_acceptance INTEGER,
+    verification_start INTEGER,
+    verification_progress INTEGER,
+    verification_completion INTEGER,
+    report_id INTEGER,
+    severity INTEGER,
+    generation_event INTEGER,
+    generation_periodic INTEGER,
+    generation_response INTEGER,
+    generation_interval REAL
+);
+CREATE INDEX packets_service ON packets (service_type, service_subtype);
+
+CREATE TABLE packet_classes (
+    packet_uid TEXT,
+    position INTEGER,
+    class TEXT,
+    PRIMARY KEY (packet_uid, position)
+);
+CREATE INDEX packet_classes_class ON packet_classes (class);
+
+CREATE TABLE packet_designators (
+    packet_uid TEXT,
+    position INTEGER,
+    name TEXT,
+    value TEXT,
+    PRIMARY KEY (packet_uid, position)
+);
+
+CREATE TABLE packet_additional (
+    packet_uid TEXT,
+    position INTEGER,
+    heading TEXT,
+    text TEXT,
+    PRIMARY KEY (packet_uid, position)
+);
+
+CREATE TABLE packet_identification (
+    packet_uid TEXT,
+    position INTEGER,
+    parameter_uid TEXT,
+    value TEXT,
+    PRIMARY KEY (packet_uid, position)
+);
+
+CREATE TABLE relevant_telemetry (
+    telecommand_uid TEXT,
+    position INTEGER,
+    telemetry_uid TEXT,
+    PRIMARY KEY (telecommand_uid, position)
+);
+
+-- Flattened parameter tree of all packets. 'parent' is the position of
+-- the enclosing repeater or list within the same packet. 'bit_offset' is
+-- only available up to the first parameter with a variable position.
+CREATE TABLE packet_parameters (
+    packet_uid TEXT,
+    position INTEGER,
+    parent INTEGER,
+    depth INTEGER,
+    parameter_uid TEXT,
+    bit_offset INTEGER,
+    value TEXT,
+    value_type INTEGER,
+    range_min TEXT,
+    range_max TEXT,
+    PRIMARY KEY (packet_uid, position)
+);
+CREATE INDEX packet_parameters_parameter ON packet_parameters (parameter_uid);
+
+CREATE TABLE subsystems (
+    id INTEGER PRIMARY KEY,
+    name TEXT,
+    description TEXT
+);
+
+CREATE TABLE applications (
+    apid INTEGER,
+    subsystem_id INTEGER,
+    name TEXT,
+    description TEXT,
+    name_prefix TEXT,
+    name_suffix TEXT,
+    PRIMARY KEY (subsystem_id, apid)
+);
+
+CREATE TABLE enumeration_mappings (
+    subsystem_id INTEGER,
+    direction TEXT,
+    sid TEXT,
+    enumeration_uid TEXT
+);
+CREATE INDEX enumeration_mappings_uid ON enumeration_mappings (enumeration_uid);
+
+CREATE TABLE calibration_mappings (
+    subsystem_id INTEGER,
+    direction TEXT,
+    sid TEXT,
+    calibration_uid TEXT
+);
+CREATE INDEX calibration_mappings_uid ON calibration_mappings (calibration_uid);
+
+CREATE TABLE telecommand_parameter_mappings (
+    subsystem_id INTEGER,
+    sid TEXT,
+    parameter_uid TEXT
+);
+CREATE INDEX telecommand_parameter_mappings_uid ON telecommand_parameter_mappings (parameter_uid);
+
+CREATE TABLE packet_mappings (
+    id INTEGER PRIMARY KEY,
+    subsystem_id INTEGER,
+    apid INTEGER,
+    sid TEXT,
+    packet_uid TEXT,
+    packet_type INTEGER,
+    generation_event INTEGER,
+    generation_periodic INTEGER,
+    generation_response INTEGER,
+    generation_interval REAL
+);
+CREATE INDEX packet_mappings_apid ON packet_mappings (apid);
+CREATE INDEX packet_mappings_packet ON packet_mappings (packet_uid);
+CREATE INDEX packet_mappings_sid ON packet_mappings (sid);
+
+CREATE TABLE packet_mapping_classes (
+    mapping_id INTEGER,
+    position INTEGER,
+    class TEXT,
+    PRIMARY KEY (mapping_id, position)
+);
+
+CREATE TABLE parameter_mappings (
+    mapping_id INTEGER,
+    position INTEGER,
+    sid TEXT,
+    parameter_uid TEXT,
+    PRIMARY KEY (mapping_id, position)
+);
+CREATE INDEX parameter_mappings_parameter ON parameter_mappings (parameter_uid);
+
+-- Convenience view: every parameter of every mapped packet together with
+-- the APID it is sent from.
+CREATE VIEW mapped_packet_parameters AS
+    SELECT m.apid, m.sid AS packet_sid, m.packet_uid, m.packet_type,
+           pp.position, pp.bit_offset, p.*
+    FROM packet_mappings AS m
+    JOIN packet_parameters AS pp ON pp.packet_uid = m.packet_uid
+    JOIN parameters AS p ON p.uid = pp.parameter_uid;
+"""
+
+
+class SqliteBuilder(builder.Builder):
+    """
+    Write the complete model into a SQLite database file.
+
+    All rows are collected first and then written with executemany()
+    in a single transaction.
+    """
+
+    def __init__(self, model):
+        builder.Builder.__init__(self, model)
+        self.tables = {}
+
+    def generate(self, filename):
+        self.tables = {}
+
+        self._add_enumerations()
+        self._add_calibrations()
+        self._add_parameters()
+        self._add_packets()
+        self._add_mappings()
+
+        directory = os.path.dirname(filename)
+        if directory and not os.path.isdir(directory):
+            os.makedirs(directory)
+        if os.path.exists(filename):
+            os.remove(filename)
+
+        connection = sqlite3.connect(filename)
+        try:
+            connection.executescript(SCHEMA)
+            with connection:
+                connection.executemany("INSERT INTO info VALUES (?, ?)", [
+                    ("schema_version", SCHEMA_VERSION),
+                    ("data_structure_version", pando.parser.Parser.DATA_STRUCTURE_VERSION),
+                ])
+                for table, rows in self.tables.items():
+                    if len(rows) == 0:
+                        continue
+                    placeholders = ", ".join("?" * len(rows[0]))
+                    connection.executemany("INSERT INTO %s VALUES (%s)" % (table, placeholders),
+                                           rows)
+        finally:
+            connection.close()
+
+        builder.LOGGER.info("Generate '%s'", filename)
+
+    def _rows(self, table):
+        return self.tables.setdefault(table, [])
+
+    def _add_enumerations(self):
+        enumerations = self._rows("enumerations")
+        entries = self._rows("enumeration_entries")
+        for enumeration in self.model.enumerations.values():
+            enumerations.append((enumeration.uid,
+                                 enumeration.name,
+                                 enumeration.width,
+                                 enumeration.description,
+                                 enumeration.short_name))
+            for position, entry in enumerate(enumeration.entries):
+                entries.append((enumeration.uid,
+                                position,
+                                entry.name,
+                                entry.value,
+                                entry.description,
+                                entry.short_name))
+
+    def _add_calibrations(self):
+        calibrations = self._rows("calibrations")
+        points = self._rows("calibration_points")
+        for calibration in self.model.calibrations.values():
+            row = [calibration.uid,
+                   calibration.type,
+                   calibration.name,
+                   calibration.description,
+                   calibration.unit]
+            if calibration.type == pando.model.Calibration.POLYNOM:
+                row += [None, None, None,
+                        calibration.a0, calibration.a1, calibration.a2,
+                        calibration.a3, calibration.a4]
+            else:
+                row += [calibration.input_type,
+                        calibration.output_type,
+                        calibration.extrapolate,
+                        None, None, None, None, None]
+                for position, point in enumerate(calibration.points):
+                    points.append((calibration.uid, position, point.x, point.y))
+            calibrations.append(tuple(row))
+
+    @staticmethod
+    def _value_columns(parameter):
+        value_range = getattr(parameter, "value_range", None)
+        if value_range is None:
+            range_min, range_max = None, None
+        else:
+            range_min, range_max = value_range.min, value_range.max
+        return (getattr(parameter, "value", None),
+                getattr(parameter, "value_type", None),
+                range_min,
+                range_max)
+
+    def _add_parameters(self):
+        parameters = self._rows("parameters")
+        members = self._rows("parameter_members")
+        limits = self._rows("limits")
+        checks = self._rows("limit_checks")
+        for parameter in self.model.parameters.values():
+            if not parameter.is_parameter:
+                parameters.append((parameter.uid, "list", parameter.name,
+                                   parameter.description, None, None, None,
+                                   None, None, None, None, None, None, None, None))
+            else:
+                kind = "repeater" if parameter.is_collection else "parameter"
+                calibration = parameter.calibration
+                parameters.append((parameter.uid,
+                                   kind,
+                                   parameter.name,
+                                   parameter.description,
+                                   parameter.short_name,
+                                   parameter.type.identifier,
+                                   parameter.type.width,
+                                   getattr(parameter.type, "enumeration", None),
+                                   parameter.byte_order,
+                                   parameter.unit,
+                                   None if calibration is None else calibration.uid)
+                                  + self._value_columns(parameter))
+
+                if parameter.limits is not None:
+                    limits.append((parameter.uid,
+                                   parameter.limits.input,
+                                   parameter.limits.value_type,
+                                   parameter.limits.samples))
+                    for position, check in enumerate(parameter.limits.checks):
+                        checks.append((parameter.uid,
+                                       position,
+                                       check.limit_type,
+                                       check.lower_limit,
+                                       check.upper_limit,
+                                       check.description,
+                                       check.validity_parameter_sid,
+                                       check.validity_parameter_value))
+
+            if parameter.is_collection:
+                for position, member in enumerate(parameter.parameters):
+                    members.append((parameter.uid, position, member.uid))
+
+    @staticmethod
+    def _generation_columns(packet_generation):
+        if packet_generation is None:
+            return (None, None, None, None)
+        return (packet_generation.event,
+                packet_generation.periodic,
+                packet_generation.response,
+                packet_generation.periodic_interval.total_seconds())
+
+    def _add_packets(self):
+        packets = self._rows("packets")
+        for packet in self.model.telemetries.values():
+            is_event = (packet.packet_type == pando.model.Packet.EVENT)
+            packets.append(self._packet_columns(packet)
+                           + (None, None, None, None, None,
+                              packet.report_id if is_event else None,
+                              packet.severity if is_event else None)
+                           + self._generation_columns(packet.packet_generation))
+
+            identification = self._rows("packet_identification")
+            for position, p in enumerate(packet.identification_parameter):
+                identification.append((packet.uid, position, p.parameter.uid, p.value))
+
+        for packet in self.model.telecommands.values():
+            verification = packet.verification
+            packets.append(self._packet_columns(packet)
+                           + (packet.critical,
+                              verification.acceptance,
+                              verification.start,
+                              verification.progress,
+                              verification.completion,
+                              None, None)
+                           + self._generation_columns(None))
+
+            relevant = self._rows("relevant_telemetry")
+            for position, telemetry in enumerate(packet.relevant_telemetry):
+                relevant.append((packet.uid, position, telemetry.uid))
+
+    def _packet_columns(self, packet):
+        for position, packet_class in enumerate(packet.packet_class or []):
+            self._rows("packet_classes").append((packet.uid, position, packet_class))
+        for position, designator in enumerate(packet.designators):
+            self._rows("packet_designators").append((packet.uid, position,
+                                                     designator["name"],
+                                                     designator["value"]))
+        for position, (heading, text) in enumerate(packet.additional):
+            self._rows("packet_additional").append((packet.uid, position, heading, text))
+
+        self._add_packet_parameters(packet)
+
+        return (packet.uid,
+                packet.packet_type,
+                packet.name,
+                packet.description,
+                packet.short_name,
+                packet.service_type,
+                packet.service_subtype)
+
+    def _add_packet_parameters(self, packet):
+        """
+        Store the parameter tree of a packet in pre-order.
+
+        The bit offset is calculated as long as all preceding parameters
+        have a static width. After the first repeater or parameter with
+        variable length the offset is unknown and stored as NULL.
+        """
+        rows = self._rows("packet_parameters")
+        state = {"position": 0, "offset": 0}
+
+        def handle(parameter, parent, depth):
+            position = state["position"]
+            state["position"] += 1
+
+            offset = state["offset"]
+            if parameter.is_parameter:
+                width = parameter.type.width
+                if offset is not None:
+                    if parameter.is_collection or width == 0:
+                        state["offset"] = None
+                    else:
+                        state["offset"] = offset + width
+            else:
+                # Lists don't occupy space themselves
+                offset = None
+
+            rows.append((packet.uid, position, parent, depth, parameter.uid, offset)
+                        + self._value_columns(parameter))
+
+            if parameter.is_collection:
+                for member in parameter.parameters:
+                    handle(member, position, depth + 1)
+
+        for parameter in packet.parameters:
+            handle(parameter, None, 0)
+
+    def _add_mappings(self):
+        subsystems = self._rows("subsystems")
+        applications = self._rows("applications")
+        packet_mappings = self._rows("packet_mappings")
+        mapping_classes = self._rows("packet_mapping_classes")
+        parameter_mappings = self._rows("parameter_mappings")
+
+        mapping_id = 0
+        for subsystem in self.model.subsystems.values():
+            subsystems.append((subsystem.identifier,
+                               subsystem.name,
+                               getattr(subsystem, "description", "")))
+
+            for direction, mappings in [("TM", subsystem.telemetry_enumerations),
+                                        ("TC", subsystem.telecommand_enumerations)]:
+                for m in mappings.values():
+                    self._rows("enumeration_mappings").append((subsystem.identifier, direction,
+                                                               m.sid, m.enumeration.uid))
+
+            for direction, mappings in [("TM", subsystem.telemetry_calibrations),
+                                        ("TC", subsystem.telecommand_calibrations)]:
+                for m in mappings.values():
+                    self._rows("calibration_mappings").append((subsystem.identifier, direction,
+                                                               m.sid, m.calibration.uid))
+
+            for m in subsystem.telecommand_parameters.values():
+                self._rows("telecommand_parameter_mappings").append((subsystem.identifier,
+                                                                     m.sid, m.parameter.uid))
+
+            for application in subsystem.applications.values():
+                applications.append((application.apid,
+                                     subsystem.identifier,
+                                     application.name,
+                                     application.description,
+                                     application.name_prefix,
+                                     application.name_suffix))
+
+                for mapping in application.get_telemetries():
+                    mapping_id += 1
+                    packet_mappings.append((mapping_id,
+                                            subsystem.identifier,
+                                            application.apid,
+                                            mapping.sid,
+                                            mapping.telemetry.uid,
+                                            mapping.packet_type)
+                                           + self._generation_columns(mapping.packet_generation))
+                    for position, packet_class in enumerate(mapping.packet_class or []):
+                        mapping_classes.append((mapping_id, position, packet_class))
+                    for position, parameter_mapping in enumerate(mapping.parameters):
+                        parameter_mappings.append((mapping_id,
+                                                   position,
+                                                   parameter_mapping.sid,
+                                                   parameter_mapping.parameter.uid))
+
+                for mapping in application.get_telecommands():
+                    mapping_id += 1
+                    packet_mappings.append((mapping_id,
+                                            subsystem.identifier,
+                                            application.apid,
+                                            mapping.sid,
+                                            mapping.telecommand.uid,
+                                            mapping.packet_type)
+                                           + self._generation_columns(None))
+                    for position, packet_class in enumerate(mapping.packet_class or []):
+                        mapping_classes.append((mapping_id, position, packet_class))
@@ -0,0 +1,591 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2017, German Aerospace Center (DLR)
+#
+# This file is part of the development version of the pando library.
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Authors:
+# - 2017, Fabian Greif (DLR RY-AVS)
+
+"""
+Serialize a model back into the pando XML format.
+
+The output is written incrementally with lxml.etree.xmlfile(). Only the
+element of the object currently being written is kept in memory.
+
+Derived packets and enumerations are written in their resolved form.
+All parameters are defined in the global parameter section and packets
+refer to them through 'parameterRef' elements.
+"""
+
+import os
+import contextlib
+import collections
+
+import isodate
+import lxml.etree
+
+from . import builder
+
+import pando.model
+import pando.parser
+
+XINCLUDE_NAMESPACE = "http://www.w3.org/2001/XInclude"
+XSD_NAMESPACE = "http://www.w3.org/2001/XMLSchema-instance"
+
+
+class XmlBuilder(builder.Builder):
+    """
+    Write the model as pando XML file.
+
+    With 'split' enabled the root file only contains the mapping and
+    XInclude references to the service files. The model does not retain
+    the original grouping into services, therefore the enumerations,
+    calibrations and parameters are written to a common service file and
+    the packets are grouped by their PUS service type.
+    """
+
+    SEVERITY = {
+        pando.model.Event.PROGRESS: "progress",
+        pando.model.Event.LOW_SEVERITY: "low",
+        pando.model.Event.MEDIUM_SEVERITY: "medium",
+        pando.model.Event.HIGH_SEVERITY: "high",
+    }
+
+    INTERPOLATION_TYPE = {
+        pando.model.Interpolation.UNSIGNED_INTEGER: "Unsigned Integer",
+        pando.model.Interpolation.SIGNED_INTEGER: "Signed Integer",
+        pando.model.Interpolation.REAL: "Float",
+    }
+
+    # Heading of Packet.additional -> XML tag
+    ADDITIONAL = collections.OrderedDict([
+        ('Purpose', 'purpose'),
+        ('Note', 'note'),
+        ('Effects', 'effects'),
+        ('Recommendation', 'recommendation'),
+        ('See Also', 'seeAlso'),
+    ])
+
+    # Maximum length of the short name allowed by the schema. Derived
+    # packets inherit the short name of their base packet, which defaults
+    # to the name of the base and may be longer.
+    SHORT_NAME_LENGTH = {
+        "entry": 14,
+        "parameter": 16,
+        "enumerationParameter": 16,
+        "repeater": 16,
+        "event": 12,
+        "telemetry": 12,
+        "telecommand": 24,
+    }
+
+    def __init__(self, model, split=False):
+        builder.Builder.__init__(self, model)
+        self.split = split
+
+    def generate(self, filename):
+        directory = os.path.dirname(filename)
+        if directory and not os.path.isdir(directory):
+            os.makedirs(directory)
+
+        if self.split:
+            includes = []
+
+            common = "common.xml"
+            with self._open_service(os.path.join(directory, common), "common") as xf:
+                self._write_definitions(xf, level=1)
+            includes.append(common)
+
+            for service_type, packets in sorted(self._group_packets().items()):
+                service_file = "service_%i.xml" % service_type
+                with self._open_service(os.path.join(directory, service_file),
+                                        "service %i" % service_type) as xf:
+                    self._write_packets(xf, packets, level=1)
+                includes.append(service_file)
+
+            with open(filename, "wb") as output, lxml.etree.xmlfile(output, encoding="UTF-8") as xf:
+                xf.write_declaration()
+                with xf.element("pando", self._root_attributes(), nsmap=self._nsmap()):
+                    for include in includes:
+                        xf.write("\n  ")
+                        with xf.element("{%s}include" % XINCLUDE_NAMESPACE, href=include):
+                            pass
+                    self._write_mappings(xf, level=1)
+                    xf.write("\n")
+        else:
+            with open(filename, "wb") as output, lxml.etree.xmlfile(output, encoding="UTF-8") as xf:
+                xf.write_declaration()
+                with xf.element("pando", self._root_attributes(), nsmap=self._nsmap()):
+                    xf.write("\n  ")
+                    with xf.element("service"):
+                        self._write_definitions(xf, level=2)
+                        packets = list(self.model.telemetries.values()) \
+                            + list(self.model.telecommands.values())
+                        self._write_packets(xf, packets, level=2)
+                        xf.write("\n  ")
+                    self._write_mappings(xf, level=1)
+                    xf.write("\n")
+
+        builder.LOGGER.info("Generate '%s'", filename)
+
+    def generate_calibrations(self, filename, calibrations):
+        """
+        Write a list of calibrations into a separate file.
+
+        The file uses 'calibrations' as root element and can be included
+        into a service through XInclude.
+        """
+        with open(filename, "wb") as output, lxml.etree.xmlfile(output, encoding="UTF-8") as xf:
+            xf.write_declaration()
+            attributes = {"{%s}noNamespaceSchemaLocation" % XSD_NAMESPACE:
+                          "http://www.dlr.de/schema/pando/calibration.xsd"}
+            with xf.element("calibrations", attributes, nsmap=self._nsmap()):
+                for calibration in calibrations:
+                    self._write_element(xf, self._calibration(calibration), 1)
+                xf.write("\n")
+
+        builder.LOGGER.info("Generate '%s'", filename)
+
+    @staticmethod
+    def _nsmap():
+        return {"xi": XINCLUDE_NAMESPACE, "xsd": XSD_NAMESPACE}
+
+    @staticmethod
+    def _root_attributes():
+        return collections.OrderedDict([
+            ("version", pando.parser.Parser.DATA_STRUCTURE_VERSION),
+            ("{%s}noNamespaceSchemaLocation" % XSD_NAMESPACE, "http://www.dlr.de/schema/pando/pando.xsd"),
+        ])
+
+    @contextlib.contextmanager
+    def _open_service(self, filename, name):
+        """
+        Open a service file and yield the incremental writer for its content.
+        """
+        with open(filename, "wb") as output, lxml.etree.xmlfile(output, encoding="UTF-8") as xf:
+            xf.write_declaration()
+            with xf.element("service", name=name):
+                yield xf
+                xf.write("\n")
+        builder.LOGGER.info("Generate '%s'", filename)
+
+    def _group_packets(self):
+        """
+        Group all packets by their service type.
+        """
+        services = collections.defaultdict(list)
+        for packet in self.model.telemetries.values():
+            services[packet.service_type].append(packet)
+        for packet in self.model.telecommands.values():
+            services[packet.service_type].append(packet)
+        return services
+
+    @staticmethod
+    def _write_element(xf, element, level):
+        lxml.etree.indent(element, space="  ", level=level)
+        xf.write("\n" + "  " * level)
+        xf.write(element)
+
+    @staticmethod
+    def _sub(parent, tag, text=None, **attributes):
+        element = lxml.etree.SubElement(parent, tag, collections.OrderedDict(attributes))
+        if text is not None:
+            element.text = text
+        return element
+
+    def _short_name(self, element, entry):
+        """
+        Write the short name if it differs from the name. Short names
+        which are too long for the schema were not part of the source
+        file and are omitted.
+        """
+        short_name = entry.short_name
+        if short_name and short_name != entry.name and \
+                len(short_name) <= self.SHORT_NAME_LENGTH[element.tag]:
+            self._sub(element, "shortName", short_name)
+
+    def _sub_text(self, parent, tag, text):
+        """ Add a sub element only for non empty text. """
+        if text:
+            self._sub(parent, tag, text)
+
+    @staticmethod
+    def _element(tag, **attributes):
+        return lxml.etree.Element(tag, collections.OrderedDict(attributes))
+
+    # ------------------------------------------------------------------------
+    def _write_definitions(self, xf, level):
+        if len(self.model.enumerations) > 0:
+            xf.write("\n" + "  " * level)
+            with xf.element("enumerations"):
+                for enumeration in self.model.enumerations.values():
+                    self._write_element(xf, self._enumeration(enumeration), level + 1)
+                xf.write("\n" + "  " * level)
+
+        if len(self.model.calibrations) > 0:
+            xf.write("\n" + "  " * level)
+            with xf.element("calibrations"):
+                for calibration in self.model.calibrations.values():
+                    self._write_element(xf, self._calibration(calibration), level + 1)
+                xf.write("\n" + "  " * level)
+
+        if len(self.model.parameters) > 0:
+            xf.write("\n" + "  " * level)
+            with xf.element("parameters"):
+                written = set()
+                for parameter in self.model.parameters.values():
+                    self._write_parameter_definition(xf, parameter, written, level + 1)
+                xf.write("\n" + "  " * level)
+
+    def _enumeration(self, enumeration):
+        element = self._element("enumeration",
+                                name=enumeration.name,
+                                uid=enumeration.uid,
+                                width=str(enumeration.width))
+        self._sub_text(element, "description", enumeration.description)
+        for entry in enumeration.entries:
+            node = self._sub(element, "entry", name=entry.name, value=str(entry.value))
+            self._short_name(node, entry)
+            self._sub_text(node, "description", entry.description)
+        return element
+
+    def _calibration(self, calibration):
+        if calibration.type == pando.model.Calibration.POLYNOM:
+            element = self._element("telemetryPolynomInterpolation",
+                                    name=calibration.name,
+                                    uid=calibration.uid)
+            if calibration.unit:
+                element.set("unit", calibration.unit)
+            for coefficient in ["a0", "a1", "a2", "a3", "a4"]:
+                element.set(coefficient, repr(float(getattr(calibration, coefficient))))
+            self._sub_text(element, "description", calibration.description)
+            return element
+
+        if calibration.type == pando.model.Calibration.INTERPOLATION_TELEMETRY:
+            element = self._element("telemetryLinearInterpolation",
+                                    name=calibration.name,
+                                    uid=calibration.uid,
+                                    outputType=self.INTERPOLATION_TYPE[calibration.output_type])
+        else:
+            element = self._element("telecommandLinearInterpolation",
+                                    name=calibration.name,
+                                    uid=calibration.uid,
+                                    inputType=self.INTERPOLATION_TYPE[calibration.input_type])
+        if calibration.unit:
+            element.set("unit", calibration.unit)
+        element.set("extrapolate", "true" if calibration.extrapolate else "false")
+
+        self._sub_text(element, "description", calibration.description)
+        for point in calibration.points:
+            self._sub(element, "point", x=repr(float(point.x)), y=repr(float(point.y)))
+        return element
+
+    def _write_parameter_definition(self, xf, parameter, written, level):
+        """
+        Write a parameter definition.
+
+        Members of repeaters and lists are written before the collection
+        itself, because the parser requires a definition before any
+        reference to a parameter.
+        """
+        if parameter.uid in written:
+            return
+        written.add(parameter.uid)
+
+        if parameter.is_collection:
+            for member in parameter.parameters:
+                definition = self.model.parameters.get(member.uid, member)
+                self._write_parameter_definition(xf, definition, written, level)
+
+        self._write_element(xf, self._parameter(parameter), level)
+
+    @staticmethod
+    def type_to_string(parameter_type):
+        """
+        Convert a parameter type into the value of the XML 'type' attribute.
+
+        Returns a tuple of (type, width). The width is only used for
+        string types and is None otherwise.
+        """
+        identifier = parameter_type.identifier
+        width = parameter_type.width
+        if identifier == pando.model.ParameterType.UNSIGNED_INTEGER:
+            return "uint%i" % width, None
+        elif identifier == pando.model.ParameterType.SIGNED_INTEGER:
+            return "int%i" % width, None
+        elif identifier == pando.model.ParameterType.REAL:
+            return "float%i" % width, None
+        elif identifier == pando.model.ParameterType.BOOLEAN:
+            return "boolean", None
+        elif identifier == pando.model.ParameterType.OCTET_STRING:
+            return "octet", str(width // 8) if width else None
+        elif identifier == pando.model.ParameterType.ASCII_STRING:
+            return "ascii", str(width // 8) if width else None
+        elif identifier in [pando.model.ParameterType.ABSOLUTE_TIME,
+                            pando.model.ParameterType.RELATIVE_TIME]:
+            base = "Absolute" if identifier == pando.model.ParameterType.ABSOLUTE_TIME else "Relative"
+            fine = "" if width == 32 else ".%i" % (width // 8 - 4)
+            return "%s Time CUC4%s" % (base, fine), None
+        else:
+            raise builder.BuilderException("Type '%s' can not be converted for XML output"
+                                           % parameter_type)
+
+    def _parameter(self, parameter):
+        if not parameter.is_parameter:
+            element = self._element("list", name=parameter.name, uid=parameter.uid)
+            self._sub_text(element, "description", parameter.description)
+            for member in parameter.parameters:
+                self._sub(element, "parameterRef", uid=member.uid)
+            return element
+
+        if parameter.type.identifier == pando.model.ParameterType.ENUMERATION:
+            element = self._element("enumerationParameter",
+                                    name=parameter.name,
+                                    uid=parameter.uid,
+                                    enumeration=parameter.type.enumeration)
+        else:
+            type_name, width = self.type_to_string(parameter.type)
+            tag = "repeater" if parameter.is_collection else "parameter"
+            element = self._element(tag, name=parameter.name, uid=parameter.uid, type=type_name)
+            if width is not None:
+                element.set("width", width)
+            if not parameter.is_collection and parameter.unit:
+                element.set("unit", parameter.unit)
+
+        self._short_name(element, parameter)
+        self._sub_text(element, "description", parameter.description)
+        if parameter.byte_order == pando.model.ByteOrder.LITTLE_ENDIAN:
+            self._sub(element, "byteOrder", "little-endian")
+        self._value(element, parameter)
+
+        if parameter.is_collection:
+            for member in parameter.parameters:
+                self._sub(element, "parameterRef", uid=member.uid)
+        elif element.tag == "parameter":
+            if parameter.calibration is not None:
+                calibration = self._sub(element, "calibration")
+                self._sub(calibration, "calibrationRef", uid=parameter.calibration.uid)
+            if parameter.limits is not None:
+                self._limits(element, parameter.limits)
+        return element
+
+    def _value(self, element, parameter):
+        if parameter.value_type == pando.model.Parameter.FIXED:
+            self._sub(element, "fixed", value=str(parameter.value))
+        elif parameter.value_type == pando.model.Parameter.DEFAULT:
+            self._sub(element, "default", value=str(parameter.value))
+        elif parameter.value_type == pando.model.Parameter.RANGE:
+            node = self._sub(element, "range",
+                             min=str(parameter.value_range.min),
+                             max=str(parameter.value_range.max))
+            if parameter.value is not None:
+                node.set("default", str(parameter.value))
+
+    def _limits(self, element, limits):
+        node = self._sub(element, "limits",
+                         input="calibrated" if limits.input == pando.model.Limits.INPUT_CALIBRATED else "raw",
+                         samples=str(limits.samples))
+        for check in limits.checks:
+            tag = "warning" if check.limit_type == pando.model.Check.SOFT_LIMIT else "error"
+            check_node = self._sub(node, tag, lower=str(check.lower_limit), upper=str(check.upper_limit))
+            self._sub_text(check_node, "description", check.description)
+            if check.validity_parameter_sid is not None:
+                self._sub(check_node, "validIfEqual",
+                          sid=check.validity_parameter_sid,
+                          value=str(check.validity_parameter_value))
+
+    # ------------------------------------------------------------------------
+    def _write_packets(self, xf, packets, level):
+        sections = [
+            ("events", [p for p in packets if p.packet_type == pando.model.Packet.EVENT], self._event),
+            ("telemetries", [p for p in packets if p.packet_type == pando.model.Packet.TELEMETRY], self._telemetry),
+            ("telecommands", [p for p in packets if p.packet_type == pando.model.Packet.TELECOMMAND], self._telecommand),
+        ]
+        for tag, section_packets, function in sections:
+            if len(section_packets) == 0:
+                continue
+            xf.write("\n" + "  " * level)
+            with xf.element(tag):
+                for packet in section_packets:
+                    self._write_element(xf, function(packet), level + 1)
+                xf.write("\n" + "  " * level)
+
+    def _packet_common(self, element, packet):
+        if packet.packet_class:
+            self._packet_classes(element, packet.packet_class)
+        self._sub_text(element, "description", packet.description)
+        self._short_name(element, packet)
+
+    def _packet_base(self, tag, packet):
+        element = self._element(tag, name=packet.name, uid=packet.uid)
+        self._packet_common(element, packet)
+        if packet.designators:
+            designators = self._sub(element, "designators")
+            for designator in packet.designators:
+                self._sub(designators, "designator", name=designator["name"], value=designator["value"])
+        self._sub(element, "serviceType", str(packet.service_type))
+        self._sub(element, "serviceSubtype", str(packet.service_subtype))
+        return element
+
+    def _packet_classes(self, element, packet_classes):
+        classes = self._sub(element, "packetClasses")
+        for packet_class in packet_classes:
+            self._sub(classes, "class", packet_class)
+
+    def _parameter_references(self, element, parameters):
+        node = self._sub(element, "parameters")
+        for parameter in parameters:
+            self._sub(node, "parameterRef", uid=parameter.uid)
+
+    def _additional(self, element, packet):
+        for heading, text in packet.additional:
+            tag = self.ADDITIONAL.get(heading)
+            if tag is None:
+                raise builder.BuilderException("Unknown additional field '%s' in packet '%s'"
+                                               % (heading, packet.uid))
+            self._sub(element, tag, text)
+
+    def _packet_generation(self, element, packet_generation):
+        node = self._sub(element, "generation")
+        if packet_generation.periodic:
+            self._sub(node, "periodic",
+                      interval=isodate.duration_isoformat(packet_generation.periodic_interval))
+        elif packet_generation.event:
+            self._sub(node, "event")
+        if packet_generation.response:
+            self._sub(node, "response")
+
+    def _event(self, packet):
+        element = self._element("event", name=packet.name, uid=packet.uid)
+        self._packet_common(element, packet)
+        self._sub(element, "reportId", str(packet.report_id))
+        self._sub(element, "severity", self.SEVERITY[packet.severity])
+        self._parameter_references(element, packet.get_event_parameters())
+        self._additional(element, packet)
+        return element
+
+    def _telemetry(self, packet):
+        element = self._packet_base("telemetry", packet)
+        if packet.packet_generation is not None:
+            self._packet_generation(element, packet.packet_generation)
+        self._parameter_references(element, packet.get_parameters())
+        if packet.identification_parameter:
+            node = self._sub(element, "packetIdentification")
+            for identification in packet.identification_parameter:
+                self._sub(node, "identificationParameter",
+                          uid=identification.parameter.uid,
+                          value=str(identification.value))
+        self._additional(element, packet)
+        return element
+
+    def _telecommand(self, packet):
+        element = self._packet_base("telecommand", packet)
+
+        verification = self._sub(element, "verification")
+        for stage in ["acceptance", "start", "progress", "completion"]:
+            self._sub(verification, stage, "true" if getattr(packet.verification, stage) else "false")
+
+        self._parameter_references(element, packet.get_parameters())
+
+        # Values which differ from the parameter definition
+        values = None
+        for parameter in packet.get_parameters_as_flattened_list():
+            definition = self.model.parameters.get(parameter.uid)
+            if parameter.value_type == pando.model.Parameter.NONE or definition is None:
+                continue
+            if definition.value == parameter.value and definition.value_type == parameter.value_type:
+                continue
+            if values is None:
+                values = self._sub(element, "parameterValues")
+            node = self._sub(values, "parameterValue", uid=parameter.uid)
+            self._value(node, parameter)
+
+        self._sub(element, "critical", "Yes" if packet.critical else "No")
+
+        if packet.relevant_telemetry:
+            node = self._sub(element, "relevantTelemetry")
+            for telemetry in packet.relevant_telemetry:
+                self._sub(node, "telemetryRef", uid=telemetry.uid)
+
+        self._additional(element, packet)
+        return element
+
+    # ------------------------------------------------------------------------
+    def _write_mappings(self, xf, level):
+        for subsystem in self.model.subsystems.values():
+            xf.write("\n" + "  " * level)
+            with xf.element("mapping", collections.OrderedDict([("name", subsystem.name),
+                                                                ("subsystem", str(subsystem.identifier))])):
+                header = self._element("header")
+                self._sub_text(header, "description", getattr(subsystem, "description", ""))
+                self._mapping_group(header, "enumerations", "enumerationMapping",
+                                    subsystem.telemetry_enumerations,
+                                    subsystem.telecommand_enumerations,
+                                    lambda m: m.enumeration.uid)
+                self._mapping_group(header, "calibrations", "calibrationMapping",
+                                    subsystem.telemetry_calibrations,
+                                    subsystem.telecommand_calibrations,
+                                    lambda m: m.calibration.uid)
+                if subsystem.telecommand_parameters:
+                    node = self._sub(header, "telecommandParameters")
+                    for m in subsystem.telecommand_parameters.values():
+                        self._sub(node, "parameterMapping", sid=m.sid, uid=m.parameter.uid)
+                for child in header:
+                    self._write_element(xf, child, level + 1)
+
+                for application in subsystem.applications.values():
+                    self._write_element(xf, self._application(application), level + 1)
+                xf.write("\n" + "  " * level)
+
+    def _mapping_group(self, parent, tag, mapping_tag, telemetry, telecommand, get_uid):
+        if not telemetry and not telecommand:
+            return
+        node = self._sub(parent, tag)
+        for direction, mappings in [("telemetry", telemetry), ("telecommand", telecommand)]:
+            if mappings:
+                direction_node = self._sub(node, direction)
+                for m in mappings.values():
+                    self._sub(direction_node, mapping_tag, sid=m.sid, uid=get_uid(m))
+
+    def _application(self, application):
+        element = self._element("application", name=application.name, apid="0x%X" % application.apid)
+        if application.name_prefix:
+            element.set("namePrefix", application.name_prefix)
+        if application.name_suffix:
+            element.set("nameSuffix", application.name_suffix)
+        self._sub_text(element, "description", application.description)
+
+        events = [m for m in application.get_telemetries() if m.packet_type == pando.model.Packet.EVENT]
+        telemetries = [m for m in application.get_telemetries() if m.packet_type != pando.model.Packet.EVENT]
+
+        for tag, child_tag, mappings in [("events", "event", events),
+                                         ("telemetries", "telemetry", telemetries)]:
+            if len(mappings) == 0:
+                continue
+            node = self._sub(element, tag)
+            for mapping in mappings:
+                child = self._sub(node, child_tag, uid=mapping.telemetry.uid, sid=mapping.sid)
+                generation = mapping.packet_generation
+                default = mapping.telemetry.packet_generation
+                if generation is not None and (default is None or generation != default):
+                    self._packet_generation(child, generation)
+                if mapping.packet_class and mapping.packet_class != mapping.telemetry.packet_class:
+                    self._packet_classes(child, mapping.packet_class)
+                for parameter_mapping in mapping.parameters:
+                    self._sub(child, "parameterMapping",
+                              sid=parameter_mapping.sid,
+                              uid=parameter_mapping.parameter.uid)
+
+        if application.get_telecommands():
+            node = self._sub(element, "telecommands")
+            for mapping in application.get_telecommands():
+                child = self._sub(node, "telecommandMappingRef", uid=mapping.telecommand.uid, sid=mapping.sid)
+                if mapping.packet_class and mapping.packet_class != mapping.telecommand.packet_class:
+                    self._packet_classes(child, mapping.packet_class)
+        return element
@@ -0,0 +1,24 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2017, German Aerospace Center (DLR)
+#
+# This file is part of the development version of the pando library.
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Authors:
+# - 2017, Fabian Greif (DLR RY-AVS)
+
+"""
+Decoding of packet data at runtime.
+
+Converts the raw content of telemetry packets into values based on the
+packet definitions of a model. The decoders work on whole arrays of
+packets where possible and therefore require NumPy, which is not needed
+by the rest of pando. The package is not imported by `pando` itself.
+"""
+
+from .common import DecoderException
@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2017, German Aerospace Center (DLR)
+#
+# This file is part of the development version of the pando library.
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Authors:
+# - 2017, Fabian Greif (DLR RY-AVS)
+
+"""
+CCSDS space packet and PUS telemetry headers.
+
+The primary header has a fixed size of 6 bytes:
+
+    version (3 bit), type (1), secondary header flag (1), APID (11)
+    sequence flags (2), sequence count (14)
+    packet length (16) - number of bytes of the packet data field minus one
+
+The PUS telemetry data field header follows the primary header. Its
+optional fields depend on the mission and are described by a
+TelemetryHeader object.
+
+The headers of a whole stream of packets can be extracted into NumPy
+arrays with parse_headers(). Sequence count gaps and duplicates are
+detected per APID on these arrays with get_sequence_statistics().
+"""
+
+import struct
+
+import numpy
+
+from .common import DecoderException
+from .cuc import CucDecoder, combine
+
+PRIMARY_HEADER_LENGTH = 6
+
+# APID of idle packets
+IDLE_APID = 0x7ff
+
+# Type and secondary header flag bits of the packet identification. A
+# telemetry packet with a data field header has only the flag set.
+TYPE_MASK = 0x1800
+TELEMETRY_WITH_SECONDARY_HEADER = 0x0800
+
+# Sequence counts are 14 bit values
+SEQUENCE_COUNT_MODULO = 1 << 14
+
+_primary_header = struct.Struct(">HHH").unpack_from
+_packet_length = struct.Struct(">H").unpack_from
+
+
+class TelemetryHeader:
+    """
+    Layout of the PUS telemetry data field header.
+
+        spare (1 bit), PUS version (3), spare (4)
+        service type (8)
+        service subtype (8)
+        packet subcounter / message type counter (optional)
+        destination id (optional)
+        time (CUC)
+        spare (optional)
+
+    Keyword arguments:
+    counter     -- Length of the packet subcounter in bytes (0 if unused)
+    destination -- Length of the destination id in bytes (0 if unused)
+    time_format -- Number of coarse and fine octets of the CUC time
+    spare       -- Number of spare bytes after the time
+    """
+
+    def __init__(self, counter=0, destination=0, time_format=(4, 2), spare=0):
+        self.service_type_offset = PRIMARY_HEADER_LENGTH + 1
+        self.service_subtype_offset = PRIMARY_HEADER_LENGTH + 2
+        self.time_offset = PRIMARY_HEADER_LENGTH + 3 + counter + destination
+        self.time_format = time_format
+
+        # Start of the application data (the parameters) in bytes
+        self.length = self.time_offset + sum(time_format) + spare
+
+    def read_time(self, data, offset=0):
+        """
+        Read the time of a single packet as seconds.
+        """
+        coarse, fine = self.time_format
+        position = offset + self.time_offset
+        value = int.from_bytes(data[position:position + coarse + fine], "big")
+        if fine == 0:
+            return float(value)
+        bits = 8 * fine
+        return (value >> bits) + (value & ((1 << bits) - 1)) / (1 << bits)
+
+
+def read_primary_header(data, offset=0):
+    """
+    Read the primary header of a packet.
+
+    Returns a tuple of (APID, sequence count, total packet length in bytes).
+    """
+    try:
+        identification, sequence, length = _primary_header(data, offset)
+    except struct.error:
+        raise DecoderException("Packet too short for the primary header")
+    return identification & 0x7ff, sequence & 0x3fff, length + 1 + PRIMARY_HEADER_LENGTH
+
+
+def iterate_packets(buffer, offset=0):
+    """
+    Split a buffer of consecutive packets.
+
+    Yields the start offset and the total length of each packet.
+    """
+    data = memoryview(buffer)
+    end = len(data)
+    while offset < end:
+        _, _, length = read_primary_header(data, offset)
+        if offset + length > end:
+            raise DecoderException("Incomplete packet at offset %i (%i of %i bytes)"
+                                   % (offset, end - offset, length))
+        yield offset, length
+        offset += length
+
+
+def get_offsets(buffer, offset=0):
+    """
+    Get the start offsets of all packets of a buffer of consecutive
+    packets.
+
+    Only the packet length fields are read. Finding the packet
+    boundaries is inherently sequential, all other header fields are
+    extracted vectorized by parse_headers().
+
+    Returns an int64 array.
+    """
+    data = memoryview(buffer)
+    end = len(data)
+    offsets = []
+    append = offsets.append
+    while offset < end:
+        if offset + PRIMARY_HEADER_LENGTH > end:
+            raise DecoderException("Incomplete packet at offset %i" % offset)
+        append(offset)
+        offset += _packet_length(data, offset + 4)[0] + 1 + PRIMARY_HEADER_LENGTH
+    if offset > end:
+        raise DecoderException("Incomplete packet at offset %i (%i of %i bytes)"
+                               % (offsets[-1], end - offsets[-1], offset - offsets[-1]))
+    return numpy.array(offsets, dtype=numpy.int64)
+
+
+def parse_headers(buffer, offsets=None, header=None):
+    """
+    Extract the headers of a buffer of packets into NumPy arrays.
+
+    Keyword arguments:
+    offsets -- Start offsets of the packets in bytes. Defaults to the
+               offsets found by get_offsets().
+    header  -- TelemetryHeader describing the data field header
+
+    Returns a dictionary of arrays with one entry per packet:
+    offset, length (total length in bytes), version, type,
+    secondary_header, apid, sequence_flags, sequence_count,
+    service_type, service_subtype and time (seconds). The data field
+    header fields are only read for telemetry packets and are zero for
+    telecommands, idle packets, packets without a secondary header and
+    packets too short for it.
+    """
+    header = header or TelemetryHeader()
+    data = numpy.frombuffer(buffer, dtype=numpy.uint8)
+    if offsets is None:
+        offsets = get_offsets(buffer)
+    offsets = numpy.asarray(offsets, dtype=numpy.int64)
+    if len(offsets) > 0 and (offsets.min() < 0 or offsets.max() + PRIMARY_HEADER_LENGTH > len(data)):
+        raise DecoderException("Packet offsets outside of the buffer of %i bytes" % len(data))
+
+    # (N, header length) matrix of the header octets. Indices behind the
+    # end of the buffer are clipped, the affected rows are masked below.
+    columns = numpy.arange(header.length, dtype=numpy.int64)
+    octets = data[numpy.minimum(offsets[:, None] + columns, len(data) - 1)]
+
+    identification = (octets[:, 0].astype(numpy.uint16) << 8) | octets[:, 1]
+    sequence = (octets[:, 2].astype(numpy.uint16) << 8) | octets[:, 3]
+    length = ((octets[:, 4].astype(numpy.int64) << 8) | octets[:, 5]) + 1 + PRIMARY_HEADER_LENGTH
+    if len(offsets) > 0 and (offsets + length).max() > len(data):
+        raise DecoderException("Incomplete packet in buffer of %i bytes" % len(data))
+
+    secondary_header = ((identification >> 11) & 1).astype(bool)
+    apid = identification & 0x7ff
+    valid = (((identification & TYPE_MASK) == TELEMETRY_WITH_SECONDARY_HEADER) & (apid != IDLE_APID)
+             & (length >= header.length))
+
+    coarse, fine = header.time_format
+    time = octets[:, header.time_offset:header.time_offset + coarse + fine]
+    decoder = CucDecoder(coarse, fine)
+    time = decoder.seconds(combine(time[:, :coarse]), combine(time[:, coarse:]))
+
+    return {
+        "offset": offsets,
+        "length": length,
+        "version": (identification >> 13).astype(numpy.uint8),
+        "type": ((identification >> 12) & 1).astype(numpy.uint8),
+        "secondary_header": secondary_header,
+        "apid": apid,
+        "sequence_flags": (sequence >> 14).astype(numpy.uint8),
+        "sequence_count": sequence & 0x3fff,
+        "service_type": numpy.where(valid, octets[:, header.service_type_offset], 0).astype(numpy.uint8),
+        "service_subtype": numpy.where(valid, octets[:, header.service_subtype_offset], 0).astype(numpy.uint8),
+        "time": numpy.where(valid, time, 0.0),
+    }
+
+
+def get_sequence_deltas(apid, sequence_count):
+    """
+    Difference of the sequence count of every packet to the previous
+    packet of the same APID, modulo 2^14.
+
+    A delta of 1 is the regular case, 0 is a duplicate, larger values
+    mean that packets are missing (or were received out of order if the
+    delta exceeds half the counter range). The first packet of an APID
+    has a delta of -1.
+    """
+    apid = numpy.asarray(apid)
+    sequence_count = numpy.asarray(sequence_count, dtype=numpy.int64)
+
+    # Group the packets by APID while keeping the order within a group
+    order = numpy.argsort(apid, kind="stable")
+    apid = apid[order]
+    sequence_count = sequence_count[order]
+
+    deltas = numpy.full(len(order), -1, dtype=numpy.int64)
+    if len(order) > 1:
+        same = apid[1:] == apid[:-1]
+        delta = numpy.diff(sequence_count) % SEQUENCE_COUNT_MODULO
+        deltas[1:] = numpy.where(same, delta, -1)
+
+    result = numpy.empty_like(deltas)
+    result[order] = deltas
+    return result
+
+
+def get_sequence_statistics(apid, sequence_count):
+    """
+    Count sequence gaps and duplicates per APID.
+
+    Returns a dictionary of arrays with one entry per APID: apid,
+    packets, gaps (number of interruptions), missing (number of missing
+    packets), duplicates and reordered (steps backwards in the sequence).
+    """
+    apid = numpy.asarray(apid)
+    deltas = get_sequence_deltas(apid, sequence_count)
+    apids, group = numpy.unique(apid, return_inverse=True)
+
+    gap = (deltas > 1) & (deltas < SEQUENCE_COUNT_MODULO // 2)
+    reordered = deltas >= SEQUENCE_COUNT_MODULO // 2
+    count = lambda weights: numpy.bincount(group, weights=weights, minlength=len(apids)).astype(numpy.int64)
+    return {
+        "apid": apids,
+        "packets": count(None),
+        "gaps": count(gap),
+        "missing": count(numpy.where(gap, deltas - 1, 0)),
+        "duplicates": count(deltas == 0),
+        "reordered": count(reordered),
+    }
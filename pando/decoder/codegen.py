@@ -0,0 +1,434 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2017, German Aerospace Center (DLR)
+#
+# This file is part of the development version of the pando library.
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Authors:
+# - 2017, Fabian Greif (DLR RY-AVS)
+
+"""
+Generation of Python decoder functions for telemetry packets.
+
+For every packet a function with the fields of the layout unrolled into
+straight-line code is generated. Consecutive byte aligned fields are read
+with a single struct format, bit fields are extracted from a common
+integer with constant shifts and masks. Repeaters become loops.
+
+The generated module is written to a cache directory. The file name
+contains a hash of the packet layouts, so later processes import the
+existing module (and its bytecode) instead of generating it again.
+
+The functions return the same values as the PacketDecoder. Packets which
+can not be expressed in byte aligned segments are not generated, use
+the PacketDecoder for them.
+"""
+
+import os
+import json
+import hashlib
+import tempfile
+import importlib.util
+
+from .common import DecoderException
+from .layout import Layout
+from . import cuc
+from . import field
+
+import pando.model
+
+# Has to be changed whenever the generated code changes
+VERSION = 1
+
+DEFAULT_CACHE_DIRECTORY = os.path.join(os.path.expanduser("~"), ".cache", "pando")
+
+_INTEGER_TYPES = (
+    pando.model.ParameterType.BOOLEAN,
+    pando.model.ParameterType.ENUMERATION,
+    pando.model.ParameterType.UNSIGNED_INTEGER,
+    pando.model.ParameterType.SIGNED_INTEGER,
+)
+
+_STRING_TYPES = (
+    pando.model.ParameterType.OCTET_STRING,
+    pando.model.ParameterType.ASCII_STRING,
+)
+
+# Types which can be extracted from a big endian integer. The byte order
+# of times is ignored, CUC times are always big endian.
+_BIT_FIELD_TYPES = _INTEGER_TYPES + (
+    pando.model.ParameterType.ABSOLUTE_TIME,
+    pando.model.ParameterType.RELATIVE_TIME,
+)
+
+
+def _describe(layout):
+    """
+    Reduce a layout to the information used by the generated code.
+    """
+    description = []
+    for f in layout.fields:
+        entry = [f.name, f.parameter.type.identifier, f.width, f.parameter.byte_order]
+        if f.members is not None:
+            entry.append(_describe(f.members))
+        description.append(entry)
+    return description
+
+
+def get_digest(packets):
+    """
+    Hash of the layouts of the packets. Changes of parameters which do not
+    affect the decoding (e.g. descriptions) keep the hash.
+    """
+    content = {"version": VERSION,
+               "packets": [[packet.uid, _describe(Layout.from_packet(packet))] for packet in packets]}
+    serialized = json.dumps(content, separators=(",", ":"))
+    return hashlib.sha1(serialized.encode("utf-8")).hexdigest()
+
+
+def _check_alignment(layout):
+    for segment in layout.segments:
+        if segment.size % 8 != 0:
+            raise DecoderException("Segment of %i bits is not byte aligned" % segment.size)
+        if segment.repeater is not None:
+            _check_alignment(segment.repeater.members)
+
+
+def _position(offset):
+    return "b + %i" % offset if offset > 0 else "b"
+
+
+class _Writer:
+
+    def __init__(self):
+        self.lines = []
+        self.level = 0
+
+    def line(self, text=""):
+        self.lines.append(("    " * self.level + text) if text else "")
+
+    def indent(self):
+        self.level += 1
+
+    def dedent(self):
+        self.level -= 1
+
+
+class _FunctionGenerator:
+    """
+    Generates the decoder function of one packet.
+    """
+
+    def __init__(self, module, writer):
+        self.module = module
+        self.writer = writer
+        self.counter = 0
+
+    def _variable(self, prefix="v"):
+        self.counter += 1
+        return "%s%i" % (prefix, self.counter)
+
+    def generate(self, name, layout):
+        _check_alignment(layout)
+
+        w = self.writer
+        w.line("def %s(data, offset=0):" % name)
+        w.indent()
+        w.line("data = memoryview(data)")
+        w.line("b = offset")
+        w.line("try:")
+        w.indent()
+        start = len(w.lines)
+        result = self._layout(layout)
+        if len(w.lines) == start:
+            # Packet without parameters
+            w.line("pass")
+        w.dedent()
+        w.line("except struct.error:")
+        w.line("    _too_short(data)")
+        w.line("if b > len(data):")
+        w.line("    _too_short(data)")
+        w.line("return %s" % result)
+        w.dedent()
+        w.line()
+        w.line()
+
+    def _layout(self, layout):
+        """
+        Emit the code for all segments of a layout. Advances 'b' to the
+        end of the layout.
+
+        Returns the expression creating the result dictionary.
+        """
+        variables = {}
+        for segment in layout.segments:
+            self._segment(segment, variables)
+            if segment.size > 0:
+                self.writer.line("b += %i" % (segment.size // 8))
+
+            repeater = segment.repeater
+            if repeater is not None:
+                variables[repeater.name] = self._repeater(repeater, variables[repeater.name])
+
+        return "{%s}" % ", ".join("%r: %s" % (f.name, variables[f.name]) for f in layout.fields)
+
+    def _repeater(self, repeater, count):
+        w = self.writer
+        entries = self._variable("e")
+        w.line("%s = []" % entries)
+        w.line("for _ in range(%s):" % count)
+        w.indent()
+        result = self._layout(repeater.members)
+        w.line("%s.append(%s)" % (entries, result))
+        w.dedent()
+        return entries
+
+    def _segment(self, segment, variables):
+        fields = segment.fields
+        i = 0
+        while i < len(fields):
+            f = fields[i]
+            fmt = field.get_struct_format(f.parameter)
+            identifier = f.parameter.type.identifier
+
+            if fmt is not None and f.offset % 8 == 0:
+                # Run of aligned fields with the same byte order
+                run = [f]
+                while i + len(run) < len(fields):
+                    following = fields[i + len(run)]
+                    following_fmt = field.get_struct_format(following.parameter)
+                    if following_fmt is None or following_fmt[0] != fmt[0]:
+                        break
+                    run.append(following)
+                    fmt += following_fmt[1:]
+                self._struct(run, fmt, variables)
+                i += len(run)
+            elif identifier in _STRING_TYPES:
+                self._string(f, variables)
+                i += 1
+            elif f.parameter.byte_order == pando.model.ByteOrder.LITTLE_ENDIAN and \
+                    identifier in _INTEGER_TYPES:
+                self._little_endian(f, variables)
+                i += 1
+            elif identifier in _BIT_FIELD_TYPES:
+                # Fields sharing bytes are read as a single integer
+                chunk = [f]
+                end = f.offset + f.width
+                while end % 8 != 0 and i + len(chunk) < len(fields):
+                    following = fields[i + len(chunk)]
+                    if following.parameter.type.identifier not in _BIT_FIELD_TYPES or \
+                            following.parameter.byte_order != pando.model.ByteOrder.BIG_ENDIAN:
+                        break
+                    chunk.append(following)
+                    end += following.width
+                if end % 8 != 0:
+                    raise DecoderException("Field '%s' is not byte aligned" % chunk[-1].name)
+                self._bit_fields(chunk, variables)
+                i += len(chunk)
+            else:
+                raise DecoderException("Field '%s' can not be generated (%s, %i bit at offset %i)"
+                                       % (f.name, f.parameter.type, f.width, f.offset))
+
+    def _struct(self, run, fmt, variables):
+        names = [self._variable() for _ in run]
+        targets = ", ".join(names) if len(names) > 1 else names[0] + ","
+        self.writer.line("%s = %s(data, %s)" % (targets, self.module.struct(fmt), _position(run[0].offset // 8)))
+        for f, name in zip(run, names):
+            variables[f.name] = name
+
+    def _string(self, f, variables):
+        if f.offset % 8 != 0:
+            raise DecoderException("Field '%s' is not byte aligned" % f.name)
+        first = f.offset // 8
+        value = "data[%s:b + %i]" % (_position(first), first + f.width // 8)
+        if f.parameter.type.identifier == pando.model.ParameterType.ASCII_STRING:
+            value = "LazyAscii(%s)" % value
+        name = self._variable()
+        self.writer.line("%s = %s" % (name, value))
+        variables[f.name] = name
+
+    def _little_endian(self, f, variables):
+        if f.offset % 8 != 0 or f.width % 8 != 0:
+            raise DecoderException("Little endian field '%s' is not byte aligned" % f.name)
+        first = f.offset // 8
+        signed = f.parameter.type.identifier == pando.model.ParameterType.SIGNED_INTEGER
+        value = "int.from_bytes(data[%s:b + %i], 'little'%s)" % (_position(first), first + f.width // 8,
+                                                                      ", signed=True" if signed else "")
+        if f.parameter.type.identifier == pando.model.ParameterType.BOOLEAN:
+            value = "%s != 0" % value
+        name = self._variable()
+        self.writer.line("%s = %s" % (name, value))
+        variables[f.name] = name
+
+    def _bit_fields(self, chunk, variables):
+        w = self.writer
+        first = chunk[0].offset // 8
+        end = chunk[-1].offset + chunk[-1].width
+
+        source = self._variable("c" if len(chunk) > 1 else "v")
+        w.line("%s = int.from_bytes(data[%s:b + %i], 'big')" % (source, _position(first), end // 8))
+
+        for f in chunk:
+            shift = end - f.offset - f.width
+            value = source
+            if shift > 0:
+                value = "(%s >> %i)" % (value, shift)
+            if f.offset > first * 8:
+                value = "%s & 0x%x" % (value, (1 << f.width) - 1)
+
+            identifier = f.parameter.type.identifier
+            if identifier == pando.model.ParameterType.BOOLEAN:
+                value = "(%s) != 0" % value
+            elif identifier == pando.model.ParameterType.SIGNED_INTEGER:
+                sign = 1 << (f.width - 1)
+                value = "((%s) ^ 0x%x) - 0x%x" % (value, sign, sign)
+            elif identifier in (pando.model.ParameterType.ABSOLUTE_TIME,
+                                pando.model.ParameterType.RELATIVE_TIME):
+                _, fine = cuc.get_format(f.parameter.type)
+                raw = self._variable("t")
+                w.line("%s = %s" % (raw, value))
+                if fine == 0:
+                    value = "float(%s)" % raw
+                else:
+                    bits = 8 * fine
+                    value = "(%s >> %i) + (%s & 0x%x) * %r" % (raw, bits, raw, (1 << bits) - 1, 1.0 / (1 << bits))
+
+            if value == source:
+                name = source
+            else:
+                name = self._variable()
+                w.line("%s = %s" % (name, value))
+            variables[f.name] = name
+
+
+class _ModuleGenerator:
+
+    def __init__(self):
+        self.structs = {}
+
+    def struct(self, fmt):
+        name = self.structs.get(fmt)
+        if name is None:
+            name = "_unpack%i" % len(self.structs)
+            self.structs[fmt] = name
+        return name
+
+    def generate(self, packets, digest):
+        body = _Writer()
+        decoders = []
+        skipped = []
+        for index, packet in enumerate(packets):
+            name = "decode_%i" % index
+            writer = _Writer()
+            try:
+                _FunctionGenerator(self, writer).generate(name, Layout.from_packet(packet))
+            except DecoderException as e:
+                skipped.append((packet.uid, str(e)))
+                continue
+            body.lines.extend(writer.lines)
+            decoders.append((packet.uid, name))
+
+        w = _Writer()
+        w.line('"""')
+        w.line("Generated by pando.decoder.codegen, do not edit.")
+        w.line('"""')
+        w.line()
+        w.line("import struct")
+        w.line()
+        w.line("from pando.decoder.common import DecoderException")
+        w.line("from pando.decoder.string import LazyAscii")
+        w.line()
+        w.line("DIGEST = %r" % digest)
+        w.line()
+        for fmt, name in self.structs.items():
+            w.line("%s = struct.Struct(%r).unpack_from" % (name, fmt))
+        w.line()
+        w.line()
+        w.line("def _too_short(data):")
+        w.line("    raise DecoderException(\"Packet too short (%i bytes)\" % len(data))")
+        w.line()
+        w.line()
+        w.lines.extend(body.lines)
+        w.line("DECODERS = {")
+        for uid, name in decoders:
+            w.line("    %r: %s," % (uid, name))
+        w.line("}")
+        w.line()
+        w.line("# Packets which have to be decoded with the PacketDecoder")
+        w.line("SKIPPED = {")
+        for uid, reason in skipped:
+            w.line("    %r: %r," % (uid, reason))
+        w.line("}")
+        return "\n".join(w.lines) + "\n"
+
+
+def generate_source(packets, digest=None):
+    """
+    Generate the source code of a decoder module for the given packets.
+    """
+    packets = list(packets)
+    if digest is None:
+        digest = get_digest(packets)
+    return _ModuleGenerator().generate(packets, digest)
+
+
+def _import(name, filename):
+    spec = importlib.util.spec_from_file_location(name, filename)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def load(packets, cache_directory=None):
+    """
+    Get the generated decoder module for a list of packets.
+
+    The module is generated only if no module for the same packet
+    layouts exists in the cache directory.
+
+    Returns the module. `module.DECODERS` maps the packet uids to the
+    decoder functions `decode(data, offset=0)`.
+    """
+    packets = list(packets)
+    if cache_directory is None:
+        cache_directory = DEFAULT_CACHE_DIRECTORY
+
+    digest = get_digest(packets)
+    name = "pando_decoder_%s" % digest
+    filename = os.path.join(cache_directory, name + ".py")
+
+    if not os.path.exists(filename):
+        os.makedirs(cache_directory, exist_ok=True)
+        source = generate_source(packets, digest)
+        # Check the source before it is stored, a broken module in the
+        # cache would fail every later load
+        try:
+            compile(source, filename, "exec")
+        except SyntaxError as e:
+            raise DecoderException("Generated decoder module is invalid: %s" % e)
+
+        # Write to a temporary file first, other processes may try to
+        # import the module at the same time.
+        handle, temporary = tempfile.mkstemp(suffix=".tmp", dir=cache_directory)
+        try:
+            with os.fdopen(handle, "w") as file:
+                file.write(source)
+            os.replace(temporary, filename)
+        finally:
+            if os.path.exists(temporary):
+                os.unlink(temporary)
+
+    return _import(name, filename)
+
+
+def load_model(model, cache_directory=None):
+    """
+    Get the generated decoders for all telemetry packets and events of a
+    model.
+    """
+    return load(model.telemetries.values(), cache_directory)
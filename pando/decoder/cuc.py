@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2017, German Aerospace Center (DLR)
+#
+# This file is part of the development version of the pando library.
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Authors:
+# - 2017, Fabian Greif (DLR RY-AVS)
+
+"""
+Vectorized decoding of CCSDS Unsegmented Time Codes (CUC).
+
+A CUC value consists of a number of coarse time octets (whole seconds)
+followed by a number of fine time octets (binary fractions of a second).
+The model uses CUC4 (32 bit) and CUC4.2 (48 bit) for absolute and
+relative times.
+
+All functions work on NumPy arrays of coarse and fine values, no
+datetime object is created for single values. The conversion ignores
+leap seconds, the coarse time is treated as the number of SI seconds
+since the epoch without any correction.
+"""
+
+import datetime
+
+import numpy
+
+from .common import DecoderException
+
+import pando.model
+
+# Epoch of the CCSDS recommended time code (TAI)
+CCSDS_EPOCH = numpy.datetime64("1958-01-01T00:00:00", "ns")
+UNIX_EPOCH = numpy.datetime64("1970-01-01T00:00:00", "ns")
+
+# Parameter width in bits -> (coarse octets, fine octets)
+FORMATS = {
+    32: (4, 0),
+    48: (4, 2),
+}
+
+NANOSECONDS = 10**9
+
+
+def get_format(parameter_type):
+    """
+    Get the number of coarse and fine octets of a time parameter type.
+    """
+    if parameter_type.identifier not in (pando.model.ParameterType.ABSOLUTE_TIME,
+                                         pando.model.ParameterType.RELATIVE_TIME):
+        raise DecoderException("Parameter type '%s' is not a CUC time" % parameter_type)
+    try:
+        return FORMATS[parameter_type.width]
+    except KeyError:
+        raise DecoderException("Unsupported CUC time width of %i bits" % parameter_type.width)
+
+
+def to_datetime64(epoch):
+    """
+    Convert an epoch given as string, datetime or datetime64 into a
+    datetime64 value with nanosecond resolution.
+    """
+    if isinstance(epoch, datetime.datetime) and epoch.tzinfo is not None:
+        epoch = epoch.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    try:
+        return numpy.datetime64(epoch, "ns")
+    except ValueError as e:
+        raise DecoderException("Invalid epoch '%s': %s" % (epoch, e))
+
+
+def combine(octets):
+    """
+    Combine the columns of a (N, k) array of big endian octets into one
+    unsigned integer per row.
+    """
+    octets = numpy.asarray(octets, dtype=numpy.uint8)
+    value = numpy.zeros(octets.shape[0], dtype=numpy.uint64)
+    for column in range(octets.shape[1]):
+        value <<= numpy.uint64(8)
+        value |= octets[:, column]
+    return value
+
+
+class CucDecoder:
+    """
+    Decoder for the values of one CUC format.
+
+    Absolute times are converted relative to the configured epoch.
+    Relative times are durations and are not affected by the epoch.
+    """
+
+    def __init__(self, coarse=4, fine=0, epoch=CCSDS_EPOCH, relative=False):
+        if not 1 <= coarse <= 4 or not 0 <= fine <= 3:
+            raise DecoderException("Unsupported CUC format %i.%i" % (coarse, fine))
+
+        self.coarse = coarse
+        self.fine = fine
+        self.epoch = to_datetime64(epoch)
+        self.relative = relative
+
+        # Length of an encoded value in bytes
+        self.width = coarse + fine
+
+    @classmethod
+    def from_parameter_type(cls, parameter_type, epoch=CCSDS_EPOCH):
+        coarse, fine = get_format(parameter_type)
+        return cls(coarse, fine, epoch,
+                   relative=(parameter_type.identifier == pando.model.ParameterType.RELATIVE_TIME))
+
+    def from_octets(self, octets):
+        """
+        Split a (N, width) array of encoded values into the coarse and
+        fine time fields.
+
+        Returns a tuple of two uint64 arrays.
+        """
+        octets = numpy.asarray(octets, dtype=numpy.uint8)
+        if octets.ndim != 2 or octets.shape[1] != self.width:
+            raise DecoderException("Expected an array of shape (N, %i), got %s"
+                                   % (self.width, octets.shape))
+        return combine(octets[:, :self.coarse]), combine(octets[:, self.coarse:])
+
+    def from_buffer(self, buffer, offset=0, stride=None, count=None):
+        """
+        Read the coarse and fine fields of values stored at regular
+        intervals inside a buffer, e.g. the same field of a list of
+        packets with identical length.
+
+        Keyword arguments:
+        offset -- Position of the first value in bytes
+        stride -- Distance between two values in bytes. Defaults to the
+                  width of the value.
+        count  -- Number of values. Defaults to as many as fit into the
+                  buffer.
+        """
+        data = numpy.frombuffer(buffer, dtype=numpy.uint8)
+        if stride is None:
+            stride = self.width
+        if count is None:
+            count = max(0, (len(data) - offset - self.width) // stride + 1)
+
+        if count > 0 and (offset < 0 or offset + (count - 1) * stride + self.width > len(data)):
+            raise DecoderException("Buffer of %i bytes is too short for %i values"
+                                   % (len(data), count))
+
+        octets = numpy.lib.stride_tricks.as_strided(data[offset:], shape=(count, self.width),
+                                                    strides=(stride, 1), writeable=False)
+        return self.from_octets(octets)
+
+    def seconds(self, coarse, fine=0):
+        """
+        Seconds since the epoch (or duration for relative times) as
+        float64 values.
+
+        A float64 value has a resolution of roughly 0.5 microseconds for
+        times around the year 2020 relative to the CCSDS epoch. Use
+        timedelta64() or datetime64() if the full resolution of the fine
+        time is required.
+        """
+        seconds = numpy.asarray(coarse, dtype=numpy.float64)
+        if self.fine > 0:
+            seconds = seconds + numpy.asarray(fine, dtype=numpy.float64) / float(1 << (8 * self.fine))
+        return seconds
+
+    def posix_seconds(self, coarse, fine=0):
+        """
+        Seconds since the Unix epoch as float64 values.
+        """
+        if self.relative:
+            raise DecoderException("Relative times have no epoch")
+        offset = (self.epoch - UNIX_EPOCH) / numpy.timedelta64(1, "s")
+        return self.seconds(coarse, fine) + offset
+
+    def timedelta64(self, coarse, fine=0):
+        """
+        Duration since the epoch as timedelta64[ns] values.
+
+        The fine time is rounded to the nearest nanosecond.
+        """
+        nanoseconds = numpy.asarray(coarse, dtype=numpy.int64) * NANOSECONDS
+        if self.fine > 0:
+            bits = 8 * self.fine
+            # Integer arithmetic, the product fits easily into 64 bits
+            fraction = numpy.asarray(fine, dtype=numpy.int64) * NANOSECONDS
+            nanoseconds = nanoseconds + ((fraction + (1 << (bits - 1))) >> bits)
+        return nanoseconds.astype("timedelta64[ns]")
+
+    def datetime64(self, coarse, fine=0):
+        """
+        Absolute times as datetime64[ns] values.
+        """
+        if self.relative:
+            raise DecoderException("Relative times have no epoch")
+        return self.epoch + self.timedelta64(coarse, fine)
+
+    def decode(self, coarse, fine=0):
+        """
+        Convert to datetime64[ns] values for absolute times and to
+        timedelta64[ns] values for relative times.
+        """
+        if self.relative:
+            return self.timedelta64(coarse, fine)
+        return self.datetime64(coarse, fine)
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2017, German Aerospace Center (DLR)
+#
+# This file is part of the development version of the pando library.
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Authors:
+# - 2017, Fabian Greif (DLR RY-AVS)
+
+"""
+Categorical decoding of enumeration parameters.
+
+Every enumeration is compiled once into a CodeTable. Decoding an array
+of raw values yields an array of integer codes which index into the
+category table of the enumeration. The table is shared by all decoded
+columns, no string is created per value.
+"""
+
+import numpy
+
+from .common import DecoderException
+
+# Code of raw values without a matching enumeration entry
+UNKNOWN = -1
+
+# Enumerations with values up to this limit use a dense lookup array
+DENSE_LIMIT = 1 << 16
+
+
+def get_value(entry):
+    """
+    Integer value of an enumeration entry. The parser stores the values
+    as strings.
+    """
+    try:
+        return int(entry.value, 0) if isinstance(entry.value, str) else int(entry.value)
+    except ValueError:
+        raise DecoderException("Enumeration entry '%s' has no integer value ('%s')"
+                               % (entry.name, entry.value))
+
+
+class Categorical:
+    """
+    Decoded enumeration column.
+
+    The codes index into the categories of the code table, raw values
+    without an entry have the code UNKNOWN.
+    """
+
+    def __init__(self, codes, table):
+        self.codes = codes
+        self.table = table
+
+    @property
+    def categories(self):
+        return self.table.categories
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __getitem__(self, index):
+        code = self.codes[index]
+        if code == UNKNOWN:
+            return None
+        return self.table.categories[code]
+
+    @property
+    def unknown(self):
+        """
+        Boolean mask of the values without an enumeration entry.
+        """
+        return self.codes == UNKNOWN
+
+    def names(self):
+        """
+        Materialize the entry names as an object array. Unknown values
+        are returned as None.
+        """
+        return self.table.names[self.codes]
+
+
+class CodeTable:
+    """
+    Compiled lookup table of one enumeration.
+
+    Uses a dense array indexed by the raw value if the values are small
+    enough, otherwise a sorted array of the values which is searched
+    with a binary search. Scalar lookups use a dictionary.
+
+    The codes are the indices of the entries in the enumeration. If
+    several entries share a value the first entry is used.
+    """
+
+    def __init__(self, enumeration, dense_limit=DENSE_LIMIT):
+        self.uid = enumeration.uid
+
+        self.categories = tuple(entry.name for entry in enumeration.entries)
+        self.values = numpy.array([get_value(entry) for entry in enumeration.entries],
+                                  dtype=numpy.int64)
+
+        # Names indexed by code, the last element is selected by UNKNOWN
+        self.names = numpy.array(self.categories + (None,), dtype=object)
+
+        self._mapping = {}
+        for code, value in enumerate(self.values.tolist()):
+            self._mapping.setdefault(value, code)
+
+        self.dense = (len(self.values) == 0 or
+                      (self.values.min() >= 0 and self.values.max() < dense_limit))
+        if self.dense:
+            size = int(self.values.max()) + 1 if len(self.values) > 0 else 0
+            # One additional element for all values out of range
+            self._lookup = numpy.full(size + 1, UNKNOWN, dtype=numpy.int32)
+            for value, code in self._mapping.items():
+                self._lookup[value] = code
+        else:
+            values = numpy.array(sorted(self._mapping), dtype=numpy.int64)
+            self._sorted_values = values
+            self._sorted_codes = numpy.array([self._mapping[v] for v in values.tolist()],
+                                             dtype=numpy.int32)
+
+    def __len__(self):
+        return len(self.categories)
+
+    def code(self, value):
+        """
+        Code of a single raw value.
+        """
+        return self._mapping.get(int(value), UNKNOWN)
+
+    def name(self, value):
+        """
+        Name of the entry for a single raw value or None.
+        """
+        code = self._mapping.get(int(value), UNKNOWN)
+        return None if code == UNKNOWN else self.categories[code]
+
+    def encode(self, raw):
+        """
+        Convert an array of raw values into an int32 array of codes.
+        """
+        raw = numpy.asarray(raw)
+        unsigned = raw.dtype.kind == 'u'
+        if self.dense:
+            # Values out of range select the last element (UNKNOWN)
+            size = len(self._lookup) - 1
+            outside = (raw >= size) if unsigned else ((raw < 0) | (raw >= size))
+            index = numpy.where(outside, size, raw).astype(numpy.intp)
+            return self._lookup[index]
+
+        values = self._sorted_values
+        if len(values) == 0:
+            return numpy.full(raw.shape, UNKNOWN, dtype=numpy.int32)
+        # Unsigned values above the int64 range would wrap around to
+        # negative values
+        outside = (raw > numpy.iinfo(numpy.int64).max) if unsigned else False
+        raw = raw.astype(numpy.int64)
+        position = numpy.searchsorted(values, raw)
+        position = numpy.minimum(position, len(values) - 1)
+        match = (values[position] == raw) & ~outside
+        return numpy.where(match, self._sorted_codes[position], UNKNOWN).astype(numpy.int32)
+
+    def decode(self, raw):
+        """
+        Decode an array of raw values into a Categorical column.
+        """
+        return Categorical(self.encode(raw), self)
+
+
+class CodeTables:
+    """
+    Code tables of the enumerations of a model.
+
+    Every table is compiled once on first use and then shared by all
+    parameters referencing the enumeration.
+    """
+
+    def __init__(self, model, dense_limit=DENSE_LIMIT):
+        self.model = model
+        self.dense_limit = dense_limit
+        self._tables = {}
+
+    def get(self, uid):
+        table = self._tables.get(uid)
+        if table is None:
+            try:
+                enumeration = self.model.enumerations[uid]
+            except KeyError:
+                raise DecoderException("Enumeration '%s' not found" % uid)
+            table = CodeTable(enumeration, self.dense_limit)
+            self._tables[uid] = table
+        return table
+
+    def get_by_parameter(self, parameter):
+        """
+        Code table for an enumeration parameter.
+        """
+        enumeration = getattr(parameter.type, "enumeration", None)
+        if enumeration is None:
+            raise DecoderException("Parameter '%s' is no enumeration" % parameter.uid)
+        return self.get(enumeration)
+
+    def decode(self, parameter, raw):
+        return self.get_by_parameter(parameter).decode(raw)
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2017, German Aerospace Center (DLR)
+#
+# This file is part of the development version of the pando library.
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Authors:
+# - 2017, Fabian Greif (DLR RY-AVS)
+
+"""
+Decoding of service 5 (event reporting) packets.
+
+Events are identified by the APID, the subtype (which equals the
+severity) and the report id. The report id is the first parameter of
+every event, so it is found at a fixed offset behind the packet headers
+and the event definition is selected with a single dictionary lookup.
+
+Decoded events are stored in an EventLog. The log keeps one typed
+column per header field and the raw event parameters. The parameters
+are only decoded when requested.
+"""
+
+import array
+
+import numpy
+
+from .common import DecoderException
+from .ccsds import TelemetryHeader, PRIMARY_HEADER_LENGTH, IDLE_APID, TYPE_MASK, \
+    TELEMETRY_WITH_SECONDARY_HEADER, _primary_header
+from .layout import Layout
+from .view import ViewType
+
+import pando.model
+import pando.parser.packet
+
+EVENT_SERVICE = 5
+
+REPORT_ID_UID = pando.parser.packet.PacketParser.EVENT_REPORT_ID_PARAMETER_UID
+
+# Event code of packets without a matching event definition
+UNKNOWN = -1
+
+
+class EventType:
+    """
+    Event definition registered for an APID.
+    """
+
+    def __init__(self, code, apid, event):
+        self.code = code
+        self.apid = apid
+        self.event = event
+        self.layout = Layout.from_packet(event)
+        self.views = ViewType(self.layout)
+
+    @property
+    def key(self):
+        return self.apid, self.event.severity, self.event.report_id
+
+
+class EventLog:
+    """
+    Columnar log of decoded events.
+
+    The columns are stored in typed arrays. The `event` column contains
+    the index of the EventType in `types` or UNKNOWN.
+    """
+
+    COLUMNS = (
+        ("time", "d"),
+        ("apid", "H"),
+        ("severity", "B"),
+        ("report_id", "I"),
+        ("event", "i"),
+        ("offset", "Q"),
+        ("length", "I"),
+    )
+
+    def __init__(self, types):
+        self.types = types
+        for name, code in self.COLUMNS:
+            setattr(self, name, array.array(code))
+        # Concatenated parameters of all events
+        self.data = bytearray()
+
+    def __len__(self):
+        return len(self.time)
+
+    def append(self, time, apid, severity, report_id, event, parameters):
+        self.time.append(time)
+        self.apid.append(apid)
+        self.severity.append(severity)
+        self.report_id.append(report_id)
+        self.event.append(event)
+        self.offset.append(len(self.data))
+        self.length.append(len(parameters))
+        self.data += parameters
+
+    def get_type(self, index):
+        """
+        EventType of an entry or None for unknown events.
+        """
+        code = self.event[index]
+        return None if code == UNKNOWN else self.types[code]
+
+    def get_parameters(self, index):
+        """
+        Lazy view of the parameters of an entry (including the report
+        id). Returns None for unknown events.
+        """
+        event_type = self.get_type(index)
+        if event_type is None:
+            return None
+        offset = self.offset[index]
+        return event_type.views(bytes(self.data[offset:offset + self.length[index]]))
+
+    def to_numpy(self):
+        """
+        Get the columns as NumPy arrays. The arrays share the memory of
+        the log and are invalidated when the log is extended.
+        """
+        return {name: numpy.frombuffer(getattr(self, name), dtype=getattr(self, name).typecode)
+                for name, _ in self.COLUMNS}
+
+
+class EventDecoder:
+    """
+    Dispatches event packets to their definitions.
+
+    Keyword arguments:
+    header -- TelemetryHeader with the layout of the packet headers
+    """
+
+    def __init__(self, header=None):
+        self.header = header or TelemetryHeader()
+        self.types = []
+        self._index = {}
+        # APID -> reader for the report id
+        self._report_id = {}
+        self._default_report_id = None
+
+    @classmethod
+    def from_model(cls, model, header=None):
+        """
+        Register the events mapped to the applications of a model.
+        """
+        decoder = cls(header)
+        for subsystem in model.subsystems.values():
+            for application in subsystem.applications.values():
+                for mapping in application.get_telemetries():
+                    if mapping.packet_type == pando.model.Packet.EVENT:
+                        decoder.add(application.apid, mapping.telemetry)
+        return decoder
+
+    def add(self, apid, event):
+        event_type = EventType(len(self.types), apid, event)
+        if event_type.key in self._index:
+            raise DecoderException("Event '%s' has the same APID, severity and report id as '%s' (%s)"
+                                   % (event.uid, self._index[event_type.key].event.uid, event_type.key))
+
+        fields = event_type.layout.fields
+        if len(fields) == 0 or fields[0].uid != REPORT_ID_UID:
+            raise DecoderException("Event '%s' does not start with the report id" % event.uid)
+
+        report_id = fields[0]
+        existing = self._report_id.get(apid)
+        if existing is not None and existing.width != report_id.width:
+            raise DecoderException("Event '%s' has a report id of %i bits, other events of APID %i "
+                                   "use %i bits" % (event.uid, report_id.width, apid, existing.width))
+        self._report_id[apid] = report_id
+        if self._default_report_id is None:
+            self._default_report_id = report_id
+
+        self._index[event_type.key] = event_type
+        self.types.append(event_type)
+        return event_type
+
+    def get(self, apid, severity, report_id):
+        return self._index.get((apid, severity, report_id))
+
+    def create_log(self):
+        return EventLog(self.types)
+
+    def process(self, buffer, log=None):
+        """
+        Decode all event packets of a buffer of consecutive packets.
+        Packets of other services, telecommands and idle packets are
+        ignored. Event packets too short for the report id are logged as
+        UNKNOWN with a report id of zero.
+
+        Returns the EventLog.
+        """
+        if log is None:
+            log = self.create_log()
+
+        data = memoryview(buffer)
+        if data.format != "B":
+            data = data.cast("B")
+
+        header = self.header
+        service_offset = header.service_type_offset
+        subtype_offset = header.service_subtype_offset
+        parameter_offset = header.length
+        read_time = header.read_time
+        index = self._index
+        readers = self._report_id
+        default = self._default_report_id
+        append = log.append
+
+        offset = 0
+        end = len(data)
+        while offset < end:
+            if offset + PRIMARY_HEADER_LENGTH > end:
+                raise DecoderException("Incomplete packet at offset %i" % offset)
+            identification, _, length = _primary_header(data, offset)
+            length += PRIMARY_HEADER_LENGTH + 1
+            if offset + length > end:
+                raise DecoderException("Incomplete packet at offset %i (%i of %i bytes)"
+                                       % (offset, end - offset, length))
+
+            apid = identification & 0x7ff
+            if (identification & TYPE_MASK) == TELEMETRY_WITH_SECONDARY_HEADER and apid != IDLE_APID \
+                    and length >= parameter_offset and data[offset + service_offset] == EVENT_SERVICE:
+                severity = data[offset + subtype_offset]
+
+                parameters = data[offset + parameter_offset:offset + length]
+                reader = readers.get(apid, default)
+                if reader is None or reader.width > len(parameters) << 3:
+                    report_id = 0
+                    event_type = None
+                else:
+                    report_id = reader.read(parameters, 0)
+                    event_type = index.get((apid, severity, report_id))
+                append(read_time(data, offset), apid, severity, report_id,
+                       UNKNOWN if event_type is None else event_type.code,
+                       parameters)
+            offset += length
+        return log
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2017, German Aerospace Center (DLR)
+#
+# This file is part of the development version of the pando library.
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Authors:
+# - 2017, Fabian Greif (DLR RY-AVS)
+
+"""
+Readers for single parameter values.
+
+A reader is a function `read(data, position)` which gets the value of a
+parameter at the given bit position of a memoryview. The reader is
+selected once per parameter based on the type, width and byte order.
+
+Values are returned as:
+- bool for booleans,
+- int for integers and enumerations (raw value),
+- float for reals and times (seconds of the CUC time code),
+- memoryview for octet strings and LazyAscii for ASCII strings.
+"""
+
+import struct
+
+from .common import DecoderException
+from . import cuc
+from . import string
+
+import pando.model
+
+_STRUCT_FORMATS = {
+    (pando.model.ParameterType.UNSIGNED_INTEGER, 8): "B",
+    (pando.model.ParameterType.UNSIGNED_INTEGER, 16): "H",
+    (pando.model.ParameterType.UNSIGNED_INTEGER, 32): "I",
+    (pando.model.ParameterType.UNSIGNED_INTEGER, 64): "Q",
+    (pando.model.ParameterType.SIGNED_INTEGER, 8): "b",
+    (pando.model.ParameterType.SIGNED_INTEGER, 16): "h",
+    (pando.model.ParameterType.SIGNED_INTEGER, 32): "i",
+    (pando.model.ParameterType.SIGNED_INTEGER, 64): "q",
+    (pando.model.ParameterType.REAL, 32): "f",
+    (pando.model.ParameterType.REAL, 64): "d",
+}
+
+
+def get_struct_format(parameter):
+    """
+    Get the struct format (including the byte order) of a parameter or
+    None if the value can not be read with the struct module.
+    """
+    identifier = parameter.type.identifier
+    if identifier == pando.model.ParameterType.ENUMERATION:
+        identifier = pando.model.ParameterType.UNSIGNED_INTEGER
+
+    code = _STRUCT_FORMATS.get((identifier, parameter.type.width))
+    if code is None:
+        return None
+    return ("<" if parameter.byte_order == pando.model.ByteOrder.LITTLE_ENDIAN else ">") + code
+
+
+def read_bits(data, position, width):
+    """
+    Read an unsigned big endian value of arbitrary width and alignment.
+    """
+    first = position >> 3
+    last = (position + width + 7) >> 3
+    if last > len(data):
+        raise DecoderException("Packet too short, expected at least %i bytes, got %i"
+                               % (last, len(data)))
+    value = int.from_bytes(data[first:last], "big")
+    return (value >> ((last << 3) - position - width)) & ((1 << width) - 1)
+
+
+def _unaligned(position):
+    raise DecoderException("Field at bit position %i is not byte aligned" % position)
+
+
+def _struct_reader(fmt, width):
+    unpack_from = struct.Struct(fmt).unpack_from
+
+    def read(data, position):
+        if position & 7:
+            if fmt[0] == "<" or fmt[1] in "fd":
+                _unaligned(position)
+            value = read_bits(data, position, width)
+            if fmt[1].islower() and value >> (width - 1):
+                value -= 1 << width
+            return value
+        try:
+            return unpack_from(data, position >> 3)[0]
+        except struct.error:
+            raise DecoderException("Packet too short, expected at least %i bytes, got %i"
+                                   % ((position + width) >> 3, len(data)))
+    return read
+
+
+def _integer_reader(width, signed, little_endian):
+    if little_endian:
+        if width % 8 != 0:
+            raise DecoderException("Little endian values must have a multiple of 8 bits, got %i" % width)
+
+        def read(data, position):
+            if position & 7:
+                _unaligned(position)
+            first = position >> 3
+            if first + (width >> 3) > len(data):
+                raise DecoderException("Packet too short, expected at least %i bytes, got %i"
+                                       % (first + (width >> 3), len(data)))
+            return int.from_bytes(data[first:first + (width >> 3)], "little", signed=signed)
+        return read
+
+    if signed:
+        sign = 1 << (width - 1)
+
+        def read(data, position):
+            value = read_bits(data, position, width)
+            return value - (sign << 1) if value & sign else value
+        return read
+
+    def read(data, position):
+        return read_bits(data, position, width)
+    return read
+
+
+def _time_reader(parameter_type):
+    coarse, fine = cuc.get_format(parameter_type)
+    fine_bits = 8 * fine
+    width = parameter_type.width
+    scale = 1.0 / (1 << fine_bits)
+
+    def read(data, position):
+        value = read_bits(data, position, width)
+        return (value >> fine_bits) + (value & ((1 << fine_bits) - 1)) * scale
+    return read
+
+
+def _string_reader(parameter_type):
+    decode = string.StringDecoder.from_parameter_type(parameter_type).decode
+
+    def read(data, position):
+        if position & 7:
+            _unaligned(position)
+        return decode(data, position >> 3)
+    return read
+
+
+def get_reader(parameter):
+    """
+    Create the reader function for a parameter.
+    """
+    parameter_type = parameter.type
+    identifier = parameter_type.identifier
+    width = parameter_type.width
+    if width <= 0:
+        raise DecoderException("Parameter '%s' has no fixed width" % parameter.uid)
+
+    fmt = get_struct_format(parameter)
+    if fmt is not None:
+        return _struct_reader(fmt, width)
+
+    little_endian = (parameter.byte_order == pando.model.ByteOrder.LITTLE_ENDIAN)
+    if identifier == pando.model.ParameterType.BOOLEAN:
+        read_value = _integer_reader(width, False, little_endian)
+        return lambda data, position: read_value(data, position) != 0
+    elif identifier in (pando.model.ParameterType.UNSIGNED_INTEGER,
+                        pando.model.ParameterType.ENUMERATION):
+        return _integer_reader(width, False, little_endian)
+    elif identifier == pando.model.ParameterType.SIGNED_INTEGER:
+        return _integer_reader(width, True, little_endian)
+    elif identifier in (pando.model.ParameterType.ABSOLUTE_TIME,
+                        pando.model.ParameterType.RELATIVE_TIME):
+        return _time_reader(parameter_type)
+    elif identifier in (pando.model.ParameterType.OCTET_STRING,
+                        pando.model.ParameterType.ASCII_STRING):
+        return _string_reader(parameter_type)
+
+    raise DecoderException("Parameter '%s' has an unsupported type (%s, %i bit)"
+                           % (parameter.uid, parameter_type, width))
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2017, German Aerospace Center (DLR)
+#
+# This file is part of the development version of the pando library.
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Authors:
+# - 2017, Fabian Greif (DLR RY-AVS)
+
+"""
+Static bit layout of the parameters of a packet.
+
+The parameters of a packet are split into segments. A segment contains
+the parameters up to and including the counter of the next repeater.
+All fields of a segment have a fixed bit offset relative to the start of
+the segment. Only the position of the following segment depends on the
+content of the packet (the number of repetitions).
+
+Lists are flattened into their enclosing layout, repeaters get a layout
+of their own for the repeated members.
+"""
+
+from .common import DecoderException
+from . import field
+
+import pando.model
+
+
+class Field:
+    """
+    Parameter with a fixed width and a static position inside a segment.
+    """
+
+    def __init__(self, parameter, name, index, segment, offset):
+        self.parameter = parameter
+        self.uid = parameter.uid
+        # Name unique within the enclosing layout
+        self.name = name
+        # Position in the flattened parameter list of the packet
+        self.index = index
+        self.segment = segment
+        # Bit offset relative to the start of the segment
+        self.offset = offset
+        self.width = parameter.type.width
+        self.read = field.get_reader(parameter)
+
+        # Layout of the repeated parameters if the field is the counter
+        # of a repeater, None otherwise.
+        self.members = None
+
+    @property
+    def is_repeater(self):
+        return self.members is not None
+
+    def __repr__(self):
+        return self.name
+
+
+class Segment:
+
+    def __init__(self):
+        self.fields = []
+        # Size of the fields in bits
+        self.size = 0
+        # Counter of the repeater ending the segment or None
+        self.repeater = None
+
+
+class Layout:
+    """
+    Layout of a list of parameters.
+
+    Keyword arguments:
+    index -- Position of the first parameter in the flattened parameter
+             list of the packet.
+    """
+
+    def __init__(self, parameters, index=0):
+        self.fields = []
+        self.segments = [Segment()]
+        self.index = index
+
+        names = set()
+        self._index = index
+        self._append(parameters, names)
+        # Number of entries in the flattened parameter list
+        self.count = self._index - index
+        del self._index
+
+        # Size in bits if the layout does not contain repeaters
+        self.size = self.segments[0].size if len(self.segments) == 1 else None
+
+    @classmethod
+    def from_packet(cls, packet):
+        return cls(packet.parameters)
+
+    def _unique_name(self, uid, names):
+        name = uid
+        suffix = 1
+        while name in names:
+            suffix += 1
+            name = "%s_%i" % (uid, suffix)
+        names.add(name)
+        return name
+
+    def _append(self, parameters, names):
+        for parameter in parameters:
+            if not parameter.is_parameter:
+                # List, the members are added in place
+                self._append(parameter.parameters, names)
+                continue
+
+            segment = self.segments[-1]
+            f = Field(parameter, self._unique_name(parameter.uid, names), self._index,
+                      len(self.segments) - 1, segment.size)
+            self._index += 1
+
+            segment.fields.append(f)
+            segment.size += f.width
+            self.fields.append(f)
+
+            if isinstance(parameter, pando.model.Repeater):
+                f.members = Layout(parameter.parameters, self._index)
+                self._index += f.members.count
+
+                segment.repeater = f
+                self.segments.append(Segment())
+
+    def get_flattened_fields(self):
+        """
+        All fields including the members of repeaters in the order of the
+        flattened parameter list.
+        """
+        fields = []
+        for f in self.fields:
+            fields.append(f)
+            if f.members is not None:
+                fields.extend(f.members.get_flattened_fields())
+        return fields
+
+    def get_static_fields(self):
+        """
+        Fields with a position which does not depend on the content of
+        the packet, i.e. the fields of the first segment.
+        """
+        return self.segments[0].fields
+
+    def skip(self, data, position, count=1):
+        """
+        Get the position after `count` consecutive instances of the
+        layout.
+        """
+        if self.size is not None:
+            return position + count * self.size
+
+        for _ in range(count):
+            for segment in self.segments:
+                repeater = segment.repeater
+                if repeater is None:
+                    position += segment.size
+                else:
+                    repetitions = repeater.read(data, position + repeater.offset)
+                    position = repeater.members.skip(data, position + segment.size, repetitions)
+        return position
+
+
+def check_length(data, position):
+    """
+    Check that the fields up to the given bit position are inside the
+    buffer.
+    """
+    if position > len(data) << 3:
+        raise DecoderException("Packet too short, expected at least %i bytes, got %i"
+                               % ((position + 7) >> 3, len(data)))
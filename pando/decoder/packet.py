@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2017, German Aerospace Center (DLR)
+#
+# This file is part of the development version of the pando library.
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Authors:
+# - 2017, Fabian Greif (DLR RY-AVS)
+
+"""
+Decoding of the parameters of a packet.
+
+A decoder can be restricted to a selection of parameters (projection).
+Parameters with a static position are read directly. Repeaters are only
+processed if they contain a selected parameter or are located in front
+of one. Repeaters with members of a fixed size are skipped without
+reading the members.
+"""
+
+from .common import DecoderException
+from .layout import Layout, check_length
+
+
+class _Step:
+    """
+    Processing of one segment of a layout.
+    """
+
+    def __init__(self, segment, fields, members, skip):
+        self.segment = segment
+        # Selected fields of the segment
+        self.fields = fields
+        # _Plan for the selected members of the repeater or None
+        self.members = members
+        # Position after the repeater is required
+        self.skip = skip
+
+
+class _Plan:
+    """
+    Steps to decode the selected fields of a layout.
+
+    If `complete` is set all segments are processed, which is required to
+    find the end of a repeated layout. Otherwise processing stops after
+    the last segment with a selected field.
+    """
+
+    def __init__(self, layout, selected, complete):
+        self.steps = []
+
+        last = -1
+        for index, segment in enumerate(layout.segments):
+            if self._contains(segment, selected):
+                last = index
+        if complete:
+            last = len(layout.segments) - 1
+
+        for index, segment in enumerate(layout.segments[:last + 1]):
+            fields = [f for f in segment.fields if f in selected]
+            members = None
+            repeater = segment.repeater
+            if repeater is not None and self._contains_members(repeater, selected):
+                members = _Plan(repeater.members, selected, True)
+            skip = repeater is not None and members is None and index < last
+            self.steps.append(_Step(segment, fields, members, skip))
+
+    @classmethod
+    def _contains(cls, segment, selected):
+        for f in segment.fields:
+            if f in selected or (f.members is not None and cls._contains_members(f, selected)):
+                return True
+        return False
+
+    @staticmethod
+    def _contains_members(repeater, selected):
+        for f in repeater.members.get_flattened_fields():
+            if f in selected:
+                return True
+        return False
+
+    def run(self, data, position, values):
+        """
+        Decode the selected fields into the values dictionary.
+
+        Returns the position after the processed segments.
+        """
+        for step in self.steps:
+            segment = step.segment
+            for f in step.fields:
+                values[f.name] = f.read(data, position + f.offset)
+
+            repeater = segment.repeater
+            if step.members is not None:
+                count = repeater.read(data, position + repeater.offset)
+                position += segment.size
+
+                entries = []
+                run = step.members.run
+                for _ in range(count):
+                    entry = {}
+                    position = run(data, position, entry)
+                    entries.append(entry)
+                values[repeater.name] = entries
+            elif step.skip:
+                count = repeater.read(data, position + repeater.offset)
+                position = repeater.members.skip(data, position + segment.size, count)
+            else:
+                position += segment.size
+        return position
+
+
+def resolve_selection(layout, uids=(), sids=(), mapping=None):
+    """
+    Get the set of fields selected by parameter uids or by the SIDs of the
+    parameter mappings of a telemetry mapping.
+
+    Selecting a repeater selects all of its members.
+    """
+    fields = layout.get_flattened_fields()
+
+    selected = set()
+    for uid in uids:
+        matches = [f for f in fields if f.uid == uid]
+        if len(matches) == 0:
+            raise DecoderException("Parameter '%s' not found" % uid)
+        selected.update(matches)
+
+    if len(sids) > 0:
+        if mapping is None:
+            raise DecoderException("Selection by SID requires a telemetry mapping")
+
+        # The parameter mappings follow the flattened parameter list
+        positions = {}
+        for position, parameter_mapping in enumerate(mapping.parameters):
+            positions.setdefault(parameter_mapping.sid, position)
+
+        by_index = {f.index: f for f in fields}
+        for sid in sids:
+            try:
+                position = positions[sid]
+                f = by_index[position]
+            except KeyError:
+                raise DecoderException("Parameter SID '%s' not found in '%s'" % (sid, mapping.sid))
+
+            expected = mapping.parameters[position].parameter.uid
+            if f.uid != expected:
+                raise DecoderException("Parameter SID '%s' of '%s' maps to '%s', but the packet has '%s' "
+                                       "at this position" % (sid, mapping.sid, expected, f.uid))
+            selected.add(f)
+
+    for f in list(selected):
+        if f.members is not None:
+            selected.update(f.members.get_flattened_fields())
+    return selected
+
+
+class PacketDecoder:
+    """
+    Decoder for the parameters of a packet.
+
+    Returns a dictionary with the values of the parameters, keys are the
+    field names of the layout (the parameter uid, with a suffix for
+    parameters appearing several times). Repeaters are returned as list
+    of dictionaries.
+
+    Keyword arguments:
+    uids    -- Only decode the parameters with the given uids
+    sids    -- Only decode the parameters with the given SIDs of the
+               parameter mappings of `mapping`
+    mapping -- TelemetryMapping of the packet
+
+    All parameters are decoded if neither uids nor sids are given.
+    """
+
+    def __init__(self, packet, uids=None, sids=None, mapping=None):
+        self.packet = packet
+        self.layout = Layout.from_packet(packet)
+
+        if uids is None and sids is None:
+            self.selected = set(self.layout.get_flattened_fields())
+            self.complete = True
+        else:
+            self.selected = resolve_selection(self.layout, uids or (), sids or (), mapping)
+            self.complete = False
+
+        self._plan = _Plan(self.layout, self.selected, self.complete)
+
+    def decode(self, buffer, offset=0):
+        """
+        Decode the parameters of a packet.
+
+        Keyword arguments:
+        offset -- Start of the parameters in the buffer in bytes (the
+                  length of the packet headers)
+        """
+        data = memoryview(buffer)
+        if data.format != "B":
+            data = data.cast("B")
+
+        values = {}
+        position = self._plan.run(data, offset << 3, values)
+        if self.complete:
+            check_length(data, position)
+        return values
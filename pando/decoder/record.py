@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2017, German Aerospace Center (DLR)
+#
+# This file is part of the development version of the pando library.
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Authors:
+# - 2017, Fabian Greif (DLR RY-AVS)
+
+"""
+Typed record classes for packets.
+
+For every telemetry and telecommand packet a NamedTuple class is
+generated. The fields follow the layout of the packet, repeaters are
+tuples of records of a class generated for the repeater members.
+
+The classes are generated as Python source code. The source can be
+written to a file (see the 'records' command) to use the classes for
+static type checking, or executed at runtime with load().
+
+The RecordDecoder creates records from packet data, the RecordEncoder
+creates packet data from records.
+"""
+
+import types
+import struct
+import typing
+import keyword
+
+from .common import DecoderException
+from .layout import Layout
+from . import cuc
+from . import string
+
+import pando.model
+
+UID = "uid"
+SHORT_NAME = "short_name"
+
+_ANNOTATIONS = {
+    pando.model.ParameterType.BOOLEAN: "bool",
+    pando.model.ParameterType.ENUMERATION: "int",
+    pando.model.ParameterType.UNSIGNED_INTEGER: "int",
+    pando.model.ParameterType.SIGNED_INTEGER: "int",
+    pando.model.ParameterType.REAL: "float",
+    pando.model.ParameterType.OCTET_STRING: "bytes",
+    pando.model.ParameterType.ASCII_STRING: "str",
+    pando.model.ParameterType.ABSOLUTE_TIME: "float",
+    pando.model.ParameterType.RELATIVE_TIME: "float",
+}
+
+
+def to_identifier(name):
+    """
+    Convert a name into a valid Python identifier which may be used as
+    field name of a NamedTuple (no leading underscore).
+    """
+    identifier = "".join(c if c.isalnum() or c == "_" else "_" for c in name).lstrip("_")
+    if identifier == "" or identifier[0].isdigit():
+        identifier = "p" + identifier
+    if keyword.iskeyword(identifier):
+        identifier += "_"
+    return identifier
+
+
+def to_class_name(name):
+    identifier = to_identifier(name)
+    return identifier[0].upper() + identifier[1:]
+
+
+def _get_parameters(parameters):
+    """
+    Parameters in the same order as the fields of a Layout, the members
+    of lists are added in place.
+    """
+    for parameter in parameters:
+        if parameter.is_parameter:
+            yield parameter
+        else:
+            yield from _get_parameters(parameter.parameters)
+
+
+def _get_field_names(parameters, naming):
+    names = []
+    used = set()
+    for parameter in parameters:
+        name = parameter.uid
+        if naming == SHORT_NAME and parameter.short_name:
+            name = parameter.short_name
+        name = to_identifier(name)
+
+        unique = name
+        suffix = 1
+        while unique in used:
+            suffix += 1
+            unique = "%s_%i" % (name, suffix)
+        used.add(unique)
+        names.append(unique)
+    return names
+
+
+class _Generator:
+
+    def __init__(self, naming):
+        if naming not in (UID, SHORT_NAME):
+            raise DecoderException("Unknown naming '%s'" % naming)
+        self.naming = naming
+        self.lines = []
+        self.classes = set()
+
+    def _class_name(self, name):
+        unique = name
+        suffix = 1
+        while unique in self.classes:
+            suffix += 1
+            unique = "%s_%i" % (name, suffix)
+        self.classes.add(unique)
+        return unique
+
+    def add_packet(self, packet):
+        name = packet.uid
+        if self.naming == SHORT_NAME and packet.short_name:
+            name = packet.short_name
+        return self._add_class(to_class_name(name), packet.parameters, packet.name)
+
+    def _add_class(self, class_name, parameters, description):
+        class_name = self._class_name(class_name)
+        parameters = list(_get_parameters(parameters))
+
+        annotations = []
+        for parameter, name in zip(parameters, _get_field_names(parameters, self.naming)):
+            if isinstance(parameter, pando.model.Repeater):
+                member_class = self._add_class("%s_%s" % (class_name, name), parameter.parameters,
+                                               "Repeated parameters of '%s'" % parameter.name)
+                annotations.append((name, "typing.Tuple[%s, ...]" % member_class))
+            else:
+                annotations.append((name, _ANNOTATIONS[parameter.type.identifier]))
+
+        self.lines.append("")
+        self.lines.append("")
+        self.lines.append("class %s(typing.NamedTuple):" % class_name)
+        self.lines.append("    %s" % repr(description))
+        for name, annotation in annotations:
+            self.lines.append("    %s: %s" % (name, annotation))
+        return class_name
+
+
+def generate_source(packets, naming=UID):
+    """
+    Generate the source code of a module with the record classes for the
+    given packets.
+
+    Keyword arguments:
+    naming -- Use the parameter uids (UID) or short names (SHORT_NAME) as
+              field names. Parameters without a short name use the uid.
+    """
+    generator = _Generator(naming)
+    records = []
+    for packet in packets:
+        records.append((packet.uid, generator.add_packet(packet)))
+
+    lines = ['"""',
+             "Record classes for packets. Generated by pando.decoder.record, do not edit.",
+             '"""',
+             "",
+             "import typing"]
+    lines.extend(generator.lines)
+    lines.append("")
+    lines.append("")
+    lines.append("# Packet uid -> record class")
+    lines.append("RECORDS = {")
+    for uid, class_name in records:
+        lines.append("    %r: %s," % (uid, class_name))
+    lines.append("}")
+    return "\n".join(lines) + "\n"
+
+
+def load(packets, naming=UID, name="pando_records"):
+    """
+    Generate the record classes and execute them in a new module.
+
+    Returns the module, `module.RECORDS` maps the packet uids to the
+    record classes.
+    """
+    source = generate_source(packets, naming)
+    module = types.ModuleType(name)
+    exec(compile(source, "<%s>" % name, "exec"), module.__dict__)
+    return module
+
+
+def _check(record_class, layout):
+    if len(record_class._fields) != len(layout.fields):
+        raise DecoderException("Record class '%s' does not match the packet layout (%i != %i fields)"
+                               % (record_class.__name__, len(record_class._fields), len(layout.fields)))
+
+
+def _member_classes(record_class, layout):
+    """
+    Get the record class for the members of every repeater of a layout.
+    """
+    hints = typing.get_type_hints(record_class)
+
+    classes = {}
+    for f, name in zip(layout.fields, record_class._fields):
+        if f.members is not None:
+            arguments = typing.get_args(hints.get(name))
+            member_class = arguments[0] if len(arguments) > 0 else None
+            if not hasattr(member_class, "_fields"):
+                raise DecoderException("Field '%s' of '%s' has no record class for the repeated parameters"
+                                       % (name, record_class.__name__))
+            _check(member_class, f.members)
+            classes[f.name] = (member_class, _member_classes(member_class, f.members))
+    return classes
+
+
+class RecordDecoder:
+    """
+    Decodes packet data into records.
+
+    The values have the same types as for the PacketDecoder, except for
+    ASCII strings which are returned as str.
+    """
+
+    def __init__(self, packet, record_class):
+        self.layout = Layout.from_packet(packet)
+        _check(record_class, self.layout)
+        self.record_class = record_class
+        self._classes = _member_classes(record_class, self.layout)
+
+    def _decode(self, layout, record_class, classes, data, position):
+        values = []
+        for segment in layout.segments:
+            for f in segment.fields:
+                value = f.read(data, position + f.offset)
+                if isinstance(value, string.LazyAscii):
+                    value = value.value
+                values.append(value)
+            position += segment.size
+
+            repeater = segment.repeater
+            if repeater is not None:
+                member_class, member_classes = classes[repeater.name]
+                entries = []
+                for _ in range(values[-1]):
+                    entry, position = self._decode(repeater.members, member_class, member_classes,
+                                                   data, position)
+                    entries.append(entry)
+                values[-1] = tuple(entries)
+        return record_class._make(values), position
+
+    def decode(self, buffer, offset=0):
+        data = memoryview(buffer)
+        if data.format != "B":
+            data = data.cast("B")
+        record, position = self._decode(self.layout, self.record_class, self._classes, data, offset << 3)
+        if position > len(data) << 3:
+            raise DecoderException("Packet too short, expected at least %i bytes, got %i"
+                                   % ((position + 7) >> 3, len(data)))
+        return record
+
+
+def _get_writer(parameter):
+    """
+    Create a function converting a value into the raw bits of a field.
+    """
+    parameter_type = parameter.type
+    identifier = parameter_type.identifier
+    width = parameter_type.width
+    mask = (1 << width) - 1
+
+    if identifier == pando.model.ParameterType.REAL:
+        fmt = {32: ">f", 64: ">d"}.get(width)
+        if fmt is None:
+            raise DecoderException("Parameter '%s' has an unsupported width of %i bits" % (parameter.uid, width))
+        pack = struct.Struct(fmt).pack
+        raw = lambda value: int.from_bytes(pack(value), "big")
+    elif identifier in (pando.model.ParameterType.ABSOLUTE_TIME,
+                        pando.model.ParameterType.RELATIVE_TIME):
+        _, fine = cuc.get_format(parameter_type)
+        scale = 1 << (8 * fine)
+        # CUC times are always big endian
+        return lambda value: int(round(value * scale)) & mask
+    elif identifier in (pando.model.ParameterType.OCTET_STRING,
+                        pando.model.ParameterType.ASCII_STRING):
+        length = width // 8
+
+        def raw(value):
+            if isinstance(value, str):
+                value = value.encode("ascii")
+            value = bytes(value)
+            if len(value) > length:
+                raise DecoderException("Value of '%s' is longer than %i bytes" % (parameter.uid, length))
+            return int.from_bytes(value.ljust(length, b"\x00"), "big")
+        return raw
+    else:
+        raw = lambda value: int(value) & mask
+
+    if parameter.byte_order == pando.model.ByteOrder.LITTLE_ENDIAN:
+        if width % 8 != 0:
+            raise DecoderException("Little endian values must have a multiple of 8 bits, got %i" % width)
+        big_endian = raw
+        raw = lambda value: int.from_bytes(big_endian(value).to_bytes(width // 8, "big"), "little")
+    return raw
+
+
+class RecordEncoder:
+    """
+    Encodes records into packet data.
+
+    The counters of repeaters are set from the number of entries of the
+    repeater field. The values of boolean, integer and time fields are
+    truncated to the width of the field.
+    """
+
+    def __init__(self, packet, record_class=None):
+        self.layout = Layout.from_packet(packet)
+        if record_class is not None:
+            _check(record_class, self.layout)
+        self.record_class = record_class
+        self._writers = {}
+        for f in self.layout.get_flattened_fields():
+            self._writers[f] = _get_writer(f.parameter)
+
+    def _encode(self, layout, record, value, bits):
+        if len(record) != len(layout.fields):
+            raise DecoderException("Expected %i values, got %i" % (len(layout.fields), len(record)))
+
+        for f, entry in zip(layout.fields, record):
+            if f.members is not None:
+                if len(entry) >> f.width:
+                    raise DecoderException("Too many entries for repeater '%s' (%i)" % (f.name, len(entry)))
+                value = (value << f.width) | len(entry)
+                bits += f.width
+                for member in entry:
+                    value, bits = self._encode(f.members, member, value, bits)
+            else:
+                value = (value << f.width) | self._writers[f](entry)
+                bits += f.width
+        return value, bits
+
+    def encode(self, record):
+        """
+        Returns the encoded parameters as bytes. The last byte is padded
+        with zero bits.
+        """
+        value, bits = self._encode(self.layout, record, 0, 0)
+        padding = -bits % 8
+        return (value << padding).to_bytes((bits + padding) // 8, "big")
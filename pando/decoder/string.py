@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2017, German Aerospace Center (DLR)
+#
+# This file is part of the development version of the pando library.
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Authors:
+# - 2017, Fabian Greif (DLR RY-AVS)
+
+"""
+Zero-copy decoding of octet and ASCII string parameters.
+
+String parameters have a fixed width. Single values are returned as
+memoryview slices of the packet buffer, arrays of values as NumPy views
+with a fixed-width bytes type ('S<n>'). The packet data is never copied,
+the views keep the buffer alive.
+"""
+
+import numpy
+
+from .common import DecoderException
+
+import pando.model
+
+# Characters removed from the end of ASCII strings
+PADDING = b"\x00 "
+
+
+class LazyAscii:
+    """
+    ASCII string which is decoded on first access.
+
+    Holds a memoryview of the encoded string. The text is decoded and the
+    padding removed only when the value is requested.
+    """
+
+    __slots__ = ('raw', 'padding', '_value')
+
+    def __init__(self, raw, padding=PADDING):
+        self.raw = raw
+        self.padding = padding
+        self._value = None
+
+    @property
+    def value(self):
+        if self._value is None:
+            self._value = bytes(self.raw).rstrip(self.padding).decode("ascii", errors="replace")
+        return self._value
+
+    def __str__(self):
+        return self.value
+
+    def __repr__(self):
+        return "LazyAscii(%r)" % self.value
+
+    def __eq__(self, other):
+        if isinstance(other, LazyAscii):
+            return self.value == other.value
+        return self.value == other
+
+    def __hash__(self):
+        return hash(self.value)
+
+
+class StringDecoder:
+    """
+    Decoder for octet and ASCII string fields of a fixed width.
+
+    Keyword arguments:
+    width   -- Width of the field in bytes
+    ascii   -- Return LazyAscii objects instead of plain memoryviews
+    padding -- Characters stripped from ASCII strings
+    """
+
+    def __init__(self, width, ascii=False, padding=PADDING):
+        if width <= 0:
+            raise DecoderException("Invalid string width of %i bytes" % width)
+
+        self.width = width
+        self.ascii = ascii
+        self.padding = padding
+        self.dtype = numpy.dtype("S%i" % width)
+
+    @classmethod
+    def from_parameter_type(cls, parameter_type, padding=PADDING):
+        identifier = parameter_type.identifier
+        if identifier not in (pando.model.ParameterType.OCTET_STRING,
+                              pando.model.ParameterType.ASCII_STRING):
+            raise DecoderException("Parameter type '%s' is not a string" % parameter_type)
+        if parameter_type.width % 8 != 0:
+            raise DecoderException("String width of %i bits is not a multiple of 8" % parameter_type.width)
+
+        return cls(parameter_type.width // 8,
+                   ascii=(identifier == pando.model.ParameterType.ASCII_STRING),
+                   padding=padding)
+
+    def _check(self, length, offset, stride, count):
+        if count > 0 and (offset < 0 or offset + (count - 1) * stride + self.width > length):
+            raise DecoderException("Buffer of %i bytes is too short for %i strings of %i bytes at offset %i"
+                                   % (length, count, self.width, offset))
+
+    def decode(self, buffer, offset=0):
+        """
+        Get a single value.
+
+        Returns a memoryview slice of the buffer for octet strings and a
+        LazyAscii object for ASCII strings.
+        """
+        view = memoryview(buffer)
+        self._check(view.nbytes, offset, 0, 1)
+        if view.ndim != 1 or view.itemsize != 1:
+            view = view.cast("B")
+
+        raw = view[offset:offset + self.width]
+        if self.ascii:
+            return LazyAscii(raw, self.padding)
+        return raw
+
+    def _count(self, length, offset, stride):
+        return max(0, (length - offset - self.width) // stride + 1)
+
+    def batch(self, buffer, offset=0, stride=None, count=None):
+        """
+        Get the values stored at regular intervals inside a buffer as a
+        read-only array of type 'S<width>'.
+
+        NumPy removes trailing zero bytes when single elements of such an
+        array are accessed. Use matrix() for binary data where trailing
+        zero bytes are significant.
+
+        Keyword arguments:
+        offset -- Position of the first value in bytes
+        stride -- Distance between two values in bytes. Defaults to the
+                  width of the field.
+        count  -- Number of values. Defaults to as many as fit into the
+                  buffer.
+        """
+        length = memoryview(buffer).nbytes
+        if stride is None:
+            stride = self.width
+        if count is None:
+            count = self._count(length, offset, stride)
+        self._check(length, offset, stride, count)
+
+        array = numpy.ndarray(shape=(count,), dtype=self.dtype, buffer=buffer,
+                              offset=offset if count > 0 else 0, strides=(stride,))
+        array.flags.writeable = False
+        return array
+
+    def matrix(self, buffer, offset=0, stride=None, count=None):
+        """
+        Same as batch(), but returns a (count, width) array of uint8 values.
+        """
+        length = memoryview(buffer).nbytes
+        if stride is None:
+            stride = self.width
+        if count is None:
+            count = self._count(length, offset, stride)
+        self._check(length, offset, stride, count)
+
+        array = numpy.ndarray(shape=(count, self.width), dtype=numpy.uint8, buffer=buffer,
+                              offset=offset if count > 0 else 0, strides=(stride, 1))
+        array.flags.writeable = False
+        return array
+
+    def strip(self, array):
+        """
+        Decode an array returned by batch() into an array of Python
+        strings without padding. Creates a copy of the data.
+        """
+        return numpy.char.decode(numpy.char.rstrip(array, self.padding), "ascii", errors="replace")
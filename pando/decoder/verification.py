@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2017, German Aerospace Center (DLR)
+#
+# This file is part of the development version of the pando library.
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Authors:
+# - 2017, Fabian Greif (DLR RY-AVS)
+
+
+"""
+Tracking of the service 1 (telecommand verification) reports.
+
+Sent telecommands are registered together with the packet id and the
+sequence count of their TC packet. Service 1 reports refer to these two
+values, so every report is matched to its command with a single
+dictionary lookup. `Telecommand.verification` defines which reports are
+expected for a command. A command is closed when its last expected
+report arrives, when a failure is reported or when no report arrives
+within the timeout.
+
+Timeouts are kept in a timer wheel. Scheduling, rescheduling and
+cancelling a timeout is O(1), advancing the wheel only visits the slots
+of the elapsed time.
+"""
+
+from .ccsds import TelemetryHeader
+
+VERIFICATION_SERVICE = 1
+
+# Execution stages in the order of their reports
+ACCEPTANCE = 0
+START = 1
+PROGRESS = 2
+COMPLETION = 3
+
+STAGES = ("acceptance", "start", "progress", "completion")
+
+# State of a command
+PENDING = "pending"
+COMPLETED = "completed"
+FAILED = "failed"
+TIMEOUT = "timeout"
+
+# Service 1 subtype -> (stage, success)
+SUBTYPES = {
+    1: (ACCEPTANCE, True),
+    2: (ACCEPTANCE, False),
+    3: (START, True),
+    4: (START, False),
+    5: (PROGRESS, True),
+    6: (PROGRESS, False),
+    7: (COMPLETION, True),
+    8: (COMPLETION, False),
+    # Failed routing verification
+    10: (ACCEPTANCE, False),
+}
+
+
+def get_expected_stages(telecommand):
+    """
+    Stages for which reports are generated for a telecommand.
+    """
+    verification = telecommand.verification
+    return tuple(stage for stage, name in enumerate(STAGES) if getattr(verification, name))
+
+
+def get_key(packet_id, sequence_control):
+    """
+    Key of a command, built from the APID and the sequence count. The
+    version, type and flag bits are ignored.
+    """
+    return ((packet_id & 0x7ff) << 14) | (sequence_control & 0x3fff)
+
+
+def read_report(data, offset=0, header=None):
+    """
+    Read a service 1 report from a packet.
+
+    Returns a tuple of (subtype, packet id, sequence control) or None if
+    the packet is not a service 1 report.
+    """
+    header = header or TelemetryHeader()
+    if len(data) - offset < header.length + 4 or data[offset + header.service_type_offset] != VERIFICATION_SERVICE:
+        return None
+    position = offset + header.length
+    return (data[offset + header.service_subtype_offset],
+            (data[position] << 8) | data[position + 1],
+            (data[position + 2] << 8) | data[position + 3])
+
+
+class TimerWheel:
+    """
+    Hashed timer wheel.
+
+    The time is split into ticks of `resolution` seconds, every tick is
+    mapped to one of `size` slots. Timeouts further away than one
+    revolution (`resolution * size`) are supported, but are visited once
+    per revolution.
+    """
+
+    def __init__(self, resolution=1.0, size=256):
+        self.resolution = resolution
+        self.size = size
+        self._slots = [{} for _ in range(size)]
+        # Key -> slot
+        self._index = {}
+        self._tick = None
+
+    def __len__(self):
+        return len(self._index)
+
+    def __contains__(self, key):
+        return key in self._index
+
+    def schedule(self, key, deadline, item):
+        """
+        Schedule an item or move an already scheduled item to a new
+        deadline.
+        """
+        self.cancel(key)
+        tick = int(deadline // self.resolution)
+        if self._tick is not None and tick < self._tick:
+            # Already expired, picked up with the next advance
+            tick = self._tick
+        slot = self._slots[tick % self.size]
+        slot[key] = (deadline, item)
+        self._index[key] = slot
+
+    def cancel(self, key):
+        slot = self._index.pop(key, None)
+        if slot is not None:
+            del slot[key]
+
+    def advance(self, now):
+        """
+        Remove all items with a deadline up to `now`.
+
+        Returns a list of the expired items ordered by their deadline.
+        """
+        tick = int(now // self.resolution)
+        if self._tick is None:
+            # First call, visit every slot once
+            first = tick - self.size + 1
+        else:
+            # The slot of the last tick is visited again, it may contain
+            # items expiring later within the tick
+            first = self._tick
+        last = min(tick, first + self.size - 1)
+        expired = []
+        for t in range(first, last + 1):
+            slot = self._slots[t % self.size]
+            keys = [key for key, (deadline, _) in slot.items() if deadline <= now]
+            for key in keys:
+                expired.append(slot.pop(key))
+                del self._index[key]
+        self._tick = max(tick, first)
+
+        expired.sort(key=lambda entry: entry[0])
+        return [item for _, item in expired]
+
+
+class Command:
+    """
+    Sent telecommand and the verification reports received for it.
+    """
+
+    __slots__ = ('telecommand', 'key', 'time', 'stages', 'stage', 'state', 'reports')
+
+    def __init__(self, telecommand, key, time, stages):
+        self.telecommand = telecommand
+        self.key = key
+        self.time = time
+        self.stages = stages
+        # Last successfully reported stage
+        self.stage = None
+        self.state = PENDING
+        # List of (time, subtype)
+        self.reports = []
+
+    @property
+    def is_open(self):
+        return self.state == PENDING
+
+    def __repr__(self):
+        uid = None if self.telecommand is None else self.telecommand.uid
+        stage = None if self.stage is None else STAGES[self.stage]
+        return "<Command %s %s %s>" % (uid, self.state, stage)
+
+
+class VerificationTracker:
+    """
+    Follows the verification of sent telecommands.
+
+    Closed commands are passed to the callback and removed from the
+    tracker.
+
+    Keyword arguments:
+    timeout    -- Time in seconds to wait for the next expected report
+    callback   -- Function called with every closed command
+    resolution -- Resolution of the timeouts in seconds
+    """
+
+    def __init__(self, timeout=60.0, callback=None, resolution=1.0):
+        self.timeout = timeout
+        self.callback = callback
+        # Command key -> Command
+        self.commands = {}
+        # Reports which do not belong to an open command
+        self.unmatched = 0
+        # One revolution of the wheel covers the timeout, so pending
+        # commands are never visited before they expire
+        self._wheel = TimerWheel(resolution, max(1, int(timeout // resolution) + 2))
+
+    def __len__(self):
+        return len(self.commands)
+
+    def get(self, packet_id, sequence_control):
+        return self.commands.get(get_key(packet_id, sequence_control))
+
+    def sent(self, telecommand, packet_id, sequence_control, time):
+        """
+        Register a sent telecommand.
+
+        An open command with the same key (sequence count wrapped around)
+        is closed with a timeout.
+        """
+        key = get_key(packet_id, sequence_control)
+        previous = self.commands.get(key)
+        if previous is not None:
+            self._close(previous, TIMEOUT)
+
+        command = Command(telecommand, key, time, get_expected_stages(telecommand))
+        if len(command.stages) == 0:
+            # Nothing to wait for
+            command.state = COMPLETED
+            self._notify(command)
+        else:
+            self.commands[key] = command
+            self._wheel.schedule(key, time + self.timeout, command)
+        return command
+
+    def report(self, subtype, packet_id, sequence_control, time):
+        """
+        Process a service 1 report.
+
+        Returns the command of the report or None if the report does not
+        belong to an open command.
+        """
+        command = self.commands.get(get_key(packet_id, sequence_control))
+        if command is None:
+            self.unmatched += 1
+            return None
+        command.reports.append((time, subtype))
+
+        stage, success = SUBTYPES.get(subtype, (None, False))
+        if not success:
+            self._close(command, FAILED)
+        else:
+            if command.stage is None or stage > command.stage:
+                command.stage = stage
+            if stage >= command.stages[-1]:
+                self._close(command, COMPLETED)
+            else:
+                self._wheel.schedule(command.key, time + self.timeout, command)
+        return command
+
+    def advance(self, now):
+        """
+        Close all commands whose next report is overdue at `now`.
+
+        Returns the list of the timed out commands.
+        """
+        expired = self._wheel.advance(now)
+        for command in expired:
+            del self.commands[command.key]
+            command.state = TIMEOUT
+            self._notify(command)
+        return expired
+
+    def _close(self, command, state):
+        del self.commands[command.key]
+        self._wheel.cancel(command.key)
+        command.state = state
+        self._notify(command)
+
+    def _notify(self, command):
+        if self.callback is not None:
+            self.callback(command)
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2017, German Aerospace Center (DLR)
+#
+# This file is part of the development version of the pando library.
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Authors:
+# - 2017, Fabian Greif (DLR RY-AVS)
+
+"""
+Lazy views of packets.
+
+A view wraps the raw buffer of a packet and decodes a parameter only
+when it is accessed. Creating a view only stores a reference to the
+buffer, so large numbers of packets can be listed without decoding them.
+
+Example:
+
+    views = ViewType(packet)
+    view = views(buffer, offset=16)
+    view["P9"], view.P9
+"""
+
+from .layout import Layout
+
+# Marks a slot which has not been decoded yet
+_MISSING = object()
+
+
+class ViewType:
+    """
+    Creates the views for one layout.
+
+    All information derived from the layout (slot numbers, positions)
+    is calculated once here and shared by the views.
+    """
+
+    def __init__(self, layout):
+        if not isinstance(layout, Layout):
+            layout = Layout.from_packet(layout)
+
+        self.layout = layout
+        self.fields = layout.fields
+        self.slots = {f.name: index for index, f in enumerate(layout.fields)}
+        self.names = tuple(self.slots)
+
+        self._members = {}
+        for f in layout.fields:
+            if f.members is not None:
+                self._members[f.name] = ViewType(f.members)
+
+    def __call__(self, buffer, offset=0):
+        """
+        Create a view for a packet.
+
+        Keyword arguments:
+        offset -- Start of the parameters in the buffer in bytes
+        """
+        return PacketView(self, buffer, offset << 3)
+
+    def _get_segment_position(self, view, segment):
+        positions = view._segments
+        if positions is None:
+            positions = view._segments = [view._position]
+
+        # Walk the repeaters in front of the segment, starting from the
+        # last known position
+        segments = self.layout.segments
+        data = view._data
+        while len(positions) <= segment:
+            start = positions[-1]
+            previous = segments[len(positions) - 1]
+            repeater = previous.repeater
+            count = repeater.read(data, start + repeater.offset)
+            positions.append(repeater.members.skip(data, start + previous.size, count))
+        return positions[segment]
+
+    def read(self, view, index):
+        f = self.fields[index]
+        position = self._get_segment_position(view, f.segment) + f.offset
+        data = view._data
+        if f.members is None:
+            return f.read(data, position)
+
+        # Repeater, create a view for every repetition
+        members = f.members
+        member_type = self._members[f.name]
+        count = f.read(data, position)
+        position += f.width
+
+        entries = []
+        if members.size is not None:
+            size = members.size
+            for i in range(count):
+                entries.append(PacketView(member_type, data, position + i * size))
+        else:
+            for _ in range(count):
+                entries.append(PacketView(member_type, data, position))
+                position = members.skip(data, position)
+        return tuple(entries)
+
+
+class PacketView:
+    """
+    Lazily decoded packet.
+
+    Parameters are available by their field name as key (`view["P9"]`)
+    or as attribute (`view.P9`) if the name is a valid identifier and
+    does not collide with a method. Repeaters return a tuple of views of
+    their members. Decoded values are cached in a slot array.
+    """
+
+    __slots__ = ('_type', '_data', '_position', '_values', '_segments')
+
+    def __init__(self, view_type, data, position):
+        self._type = view_type
+        self._data = data
+        # Bit position of the first parameter
+        self._position = position
+        # The slot array and the segment positions are created on first
+        # access to keep the creation cheap
+        self._values = None
+        self._segments = None
+
+    def __getitem__(self, name):
+        index = self._type.slots[name]
+        values = self._values
+        if values is None:
+            values = self._values = [_MISSING] * len(self._type.fields)
+
+        value = values[index]
+        if value is _MISSING:
+            value = values[index] = self._type.read(self, index)
+        return value
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError("'%s' has no parameter '%s'" % (self.__class__.__name__, name))
+
+    def __contains__(self, name):
+        return name in self._type.slots
+
+    def __iter__(self):
+        return iter(self._type.names)
+
+    def __len__(self):
+        return len(self._type.names)
+
+    def keys(self):
+        return self._type.names
+
+    def is_decoded(self, name):
+        """
+        Check whether a parameter has already been decoded.
+        """
+        return self._values is not None and self._values[self._type.slots[name]] is not _MISSING
+
+    def to_dict(self):
+        """
+        Decode all parameters. Returns the same structure as the
+        PacketDecoder.
+        """
+        values = {}
+        for name in self._type.names:
+            value = self[name]
+            if isinstance(value, tuple):
+                value = [entry.to_dict() for entry in value]
+            values[name] = value
+        return values
+
+    def __repr__(self):
+        return "<PacketView %s>" % ", ".join(self._type.names)
@@ -29,21 +29,39 @@ def main():
     parser_calibration = subparsers.add_parser('calibration_csv')
     parser_calibration.set_defaults(function=pando.scripts.calibration_csv.main)
 
+    parser_calibration_simplify = subparsers.add_parser('calibration_simplify')
+    parser_calibration_simplify.set_defaults(function=pando.scripts.calibration_simplify.main)
+
+    parser_diff = subparsers.add_parser('diff')
+    parser_diff.set_defaults(function=pando.scripts.diff.main)
+
+    parser_impact = subparsers.add_parser('impact')
+    parser_impact.set_defaults(function=pando.scripts.impact.main)
+
     parser_indent = subparsers.add_parser('indent')
     parser_indent.set_defaults(function=pando.scripts.indent.main)
 
     parser_latex = subparsers.add_parser('latex')
     parser_latex.set_defaults(function=pando.scripts.latex.main)
 
+    parser_records = subparsers.add_parser('records')
+    parser_records.set_defaults(function=pando.scripts.records.main)
+
     parser_structure = subparsers.add_parser('structure')
     parser_structure.set_defaults(function=pando.scripts.structure.main)
 
+    parser_sqlite = subparsers.add_parser('sqlite')
+    parser_sqlite.set_defaults(function=pando.scripts.sqlite.main)
+
     parser_svg = subparsers.add_parser('svg')
     parser_svg.set_defaults(function=pando.scripts.svg.main)
 
     parser_verify = subparsers.add_parser('verify')
     parser_verify.set_defaults(function=pando.scripts.verify.main)
 
+    parser_xml = subparsers.add_parser('xml')
+    parser_xml.set_defaults(function=pando.scripts.xml.main)
+
     args, remaining_args = arg.parse_known_args()
 
     if "function" not in args:
@@ -0,0 +1,485 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2017, German Aerospace Center (DLR)
+#
+# This file is part of the development version of the pando library.
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Authors:
+# - 2017, Fabian Greif (DLR RY-AVS)
+
+"""
+Semantic comparison of two models.
+
+Every model object is reduced to a set of fields and a structural hash.
+The hash of an object includes the hashes of the objects it refers to
+(e.g. the members of a repeater or the calibration of a parameter), so a
+change propagates upwards to every packet and mapping using the object.
+The hashes are calculated once per object and are stable between runs.
+"""
+
+import json
+import hashlib
+import collections
+
+import pando.model
+
+
+class Reference:
+    """
+    Reference from one model object to another.
+
+    Two references are only equal if the referenced objects have the same
+    uid and the same structural hash.
+    """
+    __slots__ = ("uid", "digest")
+
+    def __init__(self, uid, digest):
+        self.uid = uid
+        self.digest = digest
+
+    def __eq__(self, other):
+        return (isinstance(other, Reference)
+                and self.uid == other.uid
+                and self.digest == other.digest)
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash((self.uid, self.digest))
+
+    def to_json(self):
+        return {"uid": self.uid, "hash": self.digest}
+
+    def __repr__(self):
+        return str(self.uid)
+
+
+def _canonical(value):
+    """
+    Convert a field value into a JSON compatible structure.
+    """
+    if isinstance(value, Reference):
+        return value.to_json()
+    elif isinstance(value, (list, tuple)):
+        return [_canonical(v) for v in value]
+    elif isinstance(value, dict):
+        return {str(k): _canonical(v) for k, v in value.items()}
+    elif value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    else:
+        return str(value)
+
+
+class Fingerprint:
+    """
+    Calculates the fields and structural hashes of the objects of a model.
+
+    Results are cached per object, therefore every object is only
+    visited once even if it is referenced from many places.
+    """
+
+    def __init__(self):
+        # id(object) -> (object, fields, digest). The object is kept to
+        # make sure the id is not reused while the cache is alive.
+        self._cache = {}
+
+    def fields(self, obj):
+        return self._get(obj)[1]
+
+    def digest(self, obj):
+        return self._get(obj)[2]
+
+    def reference(self, obj):
+        if obj is None:
+            return None
+        return Reference(obj.uid, self.digest(obj))
+
+    def _get(self, obj):
+        key = id(obj)
+        entry = self._cache.get(key)
+        if entry is None:
+            fields = self._fields(obj)
+            serialized = json.dumps(_canonical(fields), sort_keys=True, separators=(",", ":"))
+            digest = hashlib.sha1(("%s:%s" % (type(obj).__name__, serialized)).encode("utf-8")).hexdigest()
+            entry = (obj, fields, digest)
+            self._cache[key] = entry
+        return entry
+
+    def _fields(self, obj):
+        if isinstance(obj, pando.model.Packet):
+            return self._packet_fields(obj)
+        elif isinstance(obj, (pando.model.Parameter, pando.model.List)):
+            return self._parameter_fields(obj)
+        elif isinstance(obj, pando.model.Enumeration):
+            return self._enumeration_fields(obj)
+        elif isinstance(obj, pando.model.Calibration):
+            return self._calibration_fields(obj)
+        else:
+            raise pando.model.ModelException("Can not calculate fingerprint for '%s'" % obj)
+
+    def _references(self, objects):
+        return [self.reference(obj) for obj in objects]
+
+    @staticmethod
+    def _enumeration_fields(enumeration):
+        return collections.OrderedDict([
+            ("name", enumeration.name),
+            ("width", enumeration.width),
+            ("description", enumeration.description),
+            ("entries", [[entry.name, entry.value, entry.short_name, entry.description]
+                         for entry in enumeration.entries]),
+        ])
+
+    @staticmethod
+    def _calibration_fields(calibration):
+        fields = collections.OrderedDict([
+            ("name", calibration.name),
+            ("type", calibration.type),
+            ("description", calibration.description),
+            ("unit", calibration.unit),
+        ])
+        if calibration.type == pando.model.Calibration.POLYNOM:
+            for coefficient in ["a0", "a1", "a2", "a3", "a4"]:
+                fields[coefficient] = getattr(calibration, coefficient)
+        else:
+            fields["input_type"] = calibration.input_type
+            fields["output_type"] = calibration.output_type
+            fields["extrapolate"] = calibration.extrapolate
+            fields["points"] = [[point.x, point.y] for point in calibration.points]
+        return fields
+
+    def _parameter_fields(self, parameter):
+        fields = collections.OrderedDict([
+            ("name", parameter.name),
+            ("description", parameter.description),
+        ])
+        if parameter.is_parameter:
+            fields["short_name"] = parameter.short_name
+            fields["type"] = str(parameter.type)
+            fields["width"] = parameter.type.width
+            if parameter.type.identifier == pando.model.ParameterType.ENUMERATION:
+                fields["enumeration"] = parameter.type.enumeration
+            fields["byte_order"] = parameter.byte_order
+            fields["unit"] = parameter.unit
+            fields["value_type"] = parameter.value_type
+            fields["value"] = parameter.value
+            if parameter.value_range is not None:
+                fields["range"] = [parameter.value_range.min, parameter.value_range.max]
+            fields["calibration"] = self.reference(parameter.calibration)
+            if parameter.limits is not None:
+                limits = parameter.limits
+                fields["limits"] = collections.OrderedDict([
+                    ("input", limits.input),
+                    ("samples", limits.samples),
+                    ("checks", [[check.limit_type, check.lower_limit, check.upper_limit,
+                                 check.description, check.validity_parameter_sid,
+                                 check.validity_parameter_value] for check in limits.checks]),
+                ])
+        if parameter.is_collection:
+            fields["parameters"] = self._references(parameter.parameters)
+        return fields
+
+    def _packet_fields(self, packet):
+        fields = collections.OrderedDict([
+            ("name", packet.name),
+            ("short_name", packet.short_name),
+            ("description", packet.description),
+            ("packet_type", packet.packet_type),
+            ("service_type", packet.service_type),
+            ("service_subtype", packet.service_subtype),
+            ("packet_class", packet.packet_class),
+            ("designators", [[d["name"], d["value"]] for d in packet.designators]),
+            ("additional", [list(a) for a in packet.additional]),
+            ("parameters", self._references(packet.get_parameters())),
+        ])
+        if packet.packet_type == pando.model.Packet.TELECOMMAND:
+            fields["verification"] = [packet.verification.acceptance,
+                                      packet.verification.start,
+                                      packet.verification.progress,
+                                      packet.verification.completion]
+            fields["critical"] = packet.critical
+            fields["relevant_telemetry"] = [tm.uid for tm in packet.relevant_telemetry]
+        else:
+            fields["packet_generation"] = _packet_generation(packet.packet_generation)
+            fields["identification"] = [[i.parameter.uid, i.value] for i in packet.identification_parameter]
+            if packet.packet_type == pando.model.Packet.EVENT:
+                fields["report_id"] = packet.report_id
+                fields["severity"] = packet.severity
+        return fields
+
+
+def _packet_generation(generation):
+    if generation is None:
+        return None
+    return repr(generation)
+
+
+class Change:
+    """
+    Difference of a single object between two models.
+
+    'fields' contains (field name, old value, new value) tuples for
+    changed objects.
+    """
+    ADDED = "added"
+    REMOVED = "removed"
+    CHANGED = "changed"
+    RENAMED = "renamed"
+
+    def __init__(self, category, kind, key, old_key=None, fields=None):
+        self.category = category
+        self.kind = kind
+        self.key = key
+        self.old_key = old_key
+        self.fields = fields or []
+
+    def to_json(self):
+        result = collections.OrderedDict([
+            ("category", self.category),
+            ("change", self.kind),
+            ("key", self.key),
+        ])
+        if self.old_key is not None:
+            result["old_key"] = self.old_key
+        if self.fields:
+            result["fields"] = [collections.OrderedDict([("field", name),
+                                                         ("old", _canonical(old)),
+                                                         ("new", _canonical(new))])
+                                for name, old, new in self.fields]
+        return result
+
+    def __repr__(self):
+        return "<Change: %s %s '%s'>" % (self.kind, self.category, self.key)
+
+
+class ModelDiff:
+    """
+    Compare two models.
+
+    Objects are matched by their key (uid, subsystem identifier or
+    SID). For objects with the same key the structural hashes are compared
+    first and only objects with different hashes are compared field by
+    field. Objects which have been removed and added with the same hash
+    are reported as renamed, as long as the hash is unique.
+    """
+
+    CATEGORIES = [
+        "enumerations",
+        "calibrations",
+        "parameters",
+        "telemetries",
+        "telecommands",
+        "subsystems",
+        "applications",
+        "packet_mappings",
+    ]
+
+    def __init__(self, old, new):
+        self.old = old
+        self.new = new
+
+        self._fingerprints = (Fingerprint(), Fingerprint())
+
+    def compare(self):
+        """
+        Returns a list of Change() objects.
+        """
+        changes = []
+        for category in self.CATEGORIES:
+            old = self._objects(self.old, category, self._fingerprints[0])
+            new = self._objects(self.new, category, self._fingerprints[1])
+            changes.extend(self._compare_category(category, old, new))
+        return changes
+
+    @staticmethod
+    def _compare_category(category, old, new):
+        changes = []
+        removed = []
+        added = []
+        for key, (old_fields, old_digest) in old.items():
+            entry = new.get(key)
+            if entry is None:
+                removed.append(key)
+                continue
+
+            new_fields, new_digest = entry
+            if old_digest == new_digest:
+                continue
+
+            fields = []
+            for name in list(old_fields.keys()) + [n for n in new_fields.keys() if n not in old_fields]:
+                old_value = old_fields.get(name)
+                new_value = new_fields.get(name)
+                if old_value != new_value:
+                    fields.append((name, old_value, new_value))
+            changes.append(Change(category, Change.CHANGED, key, fields=fields))
+
+        for key in new.keys():
+            if key not in old:
+                added.append(key)
+
+        # Detect renamed objects by their hash
+        removed_by_digest = collections.Counter(old[key][1] for key in removed)
+        added_by_digest = collections.Counter(new[key][1] for key in added)
+        renamed = {}
+        for key in removed:
+            digest = old[key][1]
+            if removed_by_digest[digest] == 1 and added_by_digest[digest] == 1:
+                renamed[digest] = key
+
+        for key in removed:
+            if old[key][1] not in renamed:
+                changes.append(Change(category, Change.REMOVED, key))
+        for key in added:
+            digest = new[key][1]
+            if digest in renamed:
+                changes.append(Change(category, Change.RENAMED, key, old_key=renamed[digest]))
+            else:
+                changes.append(Change(category, Change.ADDED, key))
+        return changes
+
+    def _objects(self, model, category, fingerprint):
+        """
+        Collect the objects of a category.
+
+        Returns an ordered dictionary with key -> (fields, hash).
+        """
+        objects = collections.OrderedDict()
+        if category in ["enumerations", "calibrations", "parameters", "telemetries", "telecommands"]:
+            for uid, obj in getattr(model, category).items():
+                objects[uid] = (fingerprint.fields(obj), fingerprint.digest(obj))
+        elif category == "subsystems":
+            for subsystem in model.subsystems.values():
+                fields = collections.OrderedDict([
+                    ("name", subsystem.name),
+                    ("description", getattr(subsystem, "description", None)),
+                    ("telemetry_enumerations", self._mapping_list(subsystem.telemetry_enumerations,
+                                                                  "enumeration", fingerprint)),
+                    ("telecommand_enumerations", self._mapping_list(subsystem.telecommand_enumerations,
+                                                                    "enumeration", fingerprint)),
+                    ("telemetry_calibrations", self._mapping_list(subsystem.telemetry_calibrations,
+                                                                  "calibration", fingerprint)),
+                    ("telecommand_calibrations", self._mapping_list(subsystem.telecommand_calibrations,
+                                                                    "calibration", fingerprint)),
+                    ("telecommand_parameters", self._mapping_list(subsystem.telecommand_parameters,
+                                                                  "parameter", fingerprint)),
+                ])
+                objects[str(subsystem.identifier)] = (fields, self._digest(fields))
+        elif category == "applications":
+            for subsystem in model.subsystems.values():
+                for application in subsystem.applications.values():
+                    fields = collections.OrderedDict([
+                        ("name", application.name),
+                        ("description", application.description),
+                        ("name_prefix", application.name_prefix),
+                        ("name_suffix", application.name_suffix),
+                    ])
+                    key = "%s/0x%03X" % (subsystem.identifier, application.apid)
+                    objects[key] = (fields, self._digest(fields))
+        elif category == "packet_mappings":
+            for subsystem in model.subsystems.values():
+                for application in subsystem.applications.values():
+                    for mapping in application.get_telemetries():
+                        fields = collections.OrderedDict([
+                            ("packet", fingerprint.reference(mapping.telemetry)),
+                            ("packet_type", mapping.packet_type),
+                            ("packet_class", mapping.packet_class),
+                            ("packet_generation", _packet_generation(mapping.packet_generation)),
+                            ("parameters", [[p.sid, fingerprint.reference(p.parameter)]
+                                            for p in mapping.parameters]),
+                        ])
+                        key = "%s/0x%03X/%s" % (subsystem.identifier, application.apid, mapping.sid)
+                        objects[key] = (fields, self._digest(fields))
+                    for mapping in application.get_telecommands():
+                        fields = collections.OrderedDict([
+                            ("packet", fingerprint.reference(mapping.telecommand)),
+                            ("packet_type", mapping.packet_type),
+                            ("packet_class", mapping.packet_class),
+                        ])
+                        key = "%s/0x%03X/%s" % (subsystem.identifier, application.apid, mapping.sid)
+                        objects[key] = (fields, self._digest(fields))
+        return objects
+
+    @staticmethod
+    def _mapping_list(mappings, attribute, fingerprint):
+        return [[sid, fingerprint.reference(getattr(mapping, attribute))]
+                for sid, mapping in sorted(mappings.items())]
+
+    @staticmethod
+    def _digest(fields):
+        serialized = json.dumps(_canonical(fields), sort_keys=True, separators=(",", ":"))
+        return hashlib.sha1(serialized.encode("utf-8")).hexdigest()
+
+
+def to_json(changes):
+    """
+    Convert a list of changes into a JSON compatible structure.
+    """
+    summary = collections.OrderedDict()
+    for category in ModelDiff.CATEGORIES:
+        counter = collections.Counter(c.kind for c in changes if c.category == category)
+        if counter:
+            summary[category] = collections.OrderedDict(sorted(counter.items()))
+
+    return collections.OrderedDict([
+        ("summary", summary),
+        ("changes", [change.to_json() for change in changes]),
+    ])
+
+
+def _format_value(value):
+    if isinstance(value, list):
+        return "[%s]" % ", ".join(_format_value(v) for v in value)
+    elif isinstance(value, str):
+        return repr(value)
+    else:
+        return str(value)
+
+
+def _format_field(name, old, new):
+    """
+    Format a field change. Lists of the same length are reported
+    per element.
+    """
+    if isinstance(old, list) and isinstance(new, list) and len(old) == len(new):
+        lines = []
+        for index, (o, n) in enumerate(zip(old, new)):
+            if o != n:
+                lines.extend(_format_field("%s[%i]" % (name, index), o, n))
+        return lines
+    elif isinstance(old, Reference) and isinstance(new, Reference) and old.uid == new.uid:
+        return ["%s: '%s' modified" % (name, old.uid)]
+    else:
+        return ["%s: %s -> %s" % (name, _format_value(old), _format_value(new))]
+
+
+def to_text(changes):
+    """
+    Create a human readable report of a list of changes.
+    """
+    lines = []
+    for category in ModelDiff.CATEGORIES:
+        category_changes = [c for c in changes if c.category == category]
+        if len(category_changes) == 0:
+            continue
+
+        lines.append("%s:" % category.replace("_", " ").capitalize())
+        for change in category_changes:
+            if change.kind == Change.ADDED:
+                lines.append("  + %s" % change.key)
+            elif change.kind == Change.REMOVED:
+                lines.append("  - %s" % change.key)
+            elif change.kind == Change.RENAMED:
+                lines.append("  ~ %s -> %s" % (change.old_key, change.key))
+            else:
+                lines.append("  * %s" % change.key)
+                for name, old, new in change.fields:
+                    for line in _format_field(name, old, new):
+                        lines.append("      %s" % line)
+    return "\n".join(lines)
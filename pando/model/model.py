@@ -21,6 +21,7 @@ documentation from the internal representation.
 """
 
 import datetime
+import itertools
 import collections
 
 
@@ -28,6 +29,59 @@ class ModelException(Exception):
     pass
 
 
+Source = collections.namedtuple("Source", ["filename", "line"])
+Source.__doc__ = """
+Location of the definition of an object in the source files.
+
+filename -- File containing the element, for included files the included file
+line     -- Line number of the element
+"""
+
+
+class LazyText:
+    """
+    Text which is converted on first access.
+
+    Used by the parser to defer removing the indentation from
+    documentation texts until they are actually needed.
+    """
+    __slots__ = ("raw", "convert")
+
+    def __init__(self, raw, convert):
+        self.raw = raw
+        self.convert = convert
+
+    def resolve(self):
+        return self.convert(self.raw)
+
+
+class TextAttribute:
+    """
+    Descriptor for text attributes which may hold a LazyText value.
+
+    The value is resolved on first access and the result replaces the
+    lazy value.
+    """
+
+    def __init__(self, name):
+        self.name = "_" + name
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        try:
+            value = instance.__dict__[self.name]
+        except KeyError:
+            raise AttributeError(self.name[1:])
+        if value.__class__ is LazyText:
+            value = value.resolve()
+            instance.__dict__[self.name] = value
+        return value
+
+    def __set__(self, instance, value):
+        instance.__dict__[self.name] = value
+
+
 class Model:
 
     def __init__(self):
@@ -47,6 +101,10 @@ class Model:
         # id -> Subsystem
         self.subsystems = {}
 
+        # Reverse lookup of the references between the model objects.
+        # Updated while packets and mappings are added.
+        self.references = ReferenceIndex()
+
     def get_packets_by_packet_class(self, packet_class):
         packets = []
         for subsystem in self.subsystems.values():
@@ -55,9 +113,11 @@ class Model:
 
     def append_telemetry_packet(self, packet):
         self.telemetries[packet.uid] = packet
+        self.references.add_packet(packet)
 
     def append_telecommand_packet(self, packet):
         self.telecommands[packet.uid] = packet
+        self.references.add_packet(packet)
 
     def get_or_add_subsystem(self, subsystemId, name):
         try:
@@ -75,6 +135,180 @@ class Model:
         return self.subsystems
 
 
+MappingReference = collections.namedtuple("MappingReference",
+                                          ["kind", "subsystem", "apid", "packet_sid", "sid"])
+MappingReference.__doc__ = """
+Location of a mapping entry for an object.
+
+kind       -- Type of the mapping, e.g. 'telemetry' or 'telecommand_parameter'
+subsystem  -- Subsystem identifier
+apid       -- APID of the application or None for subsystem wide mappings
+packet_sid -- SID of the packet mapping containing the entry or None
+sid        -- SID of the entry itself
+"""
+
+Impact = collections.namedtuple("Impact", ["parameters", "packets", "mappings"])
+
+
+class ReferenceIndex:
+    """
+    Reverse index from an object uid to the objects using it.
+
+    Covers the use of parameters in packets, repeaters, lists and mappings,
+    the derivation of packets and the use of enumerations and calibrations
+    in parameters.
+    """
+
+    def __init__(self):
+        self._parameters = set()
+        self._packets = set()
+
+        # parameter uid -> {packet uid}
+        self._packet_users = collections.defaultdict(set)
+        # parameter uid -> {repeater/list uid}
+        self._collection_users = collections.defaultdict(set)
+        # packet uid -> {derived packet uid}
+        self._derived_packets = collections.defaultdict(set)
+        # enumeration uid -> {parameter uid}
+        self._enumeration_users = collections.defaultdict(set)
+        # calibration uid -> {parameter uid}
+        self._calibration_users = collections.defaultdict(set)
+        # uid -> [MappingReference]
+        self._mappings = collections.defaultdict(list)
+
+    def add_parameter(self, parameter):
+        """
+        Add a parameter and all its members.
+        """
+        self._parameters.add(parameter.uid)
+        if parameter.is_parameter:
+            if parameter.type.identifier == ParameterType.ENUMERATION:
+                self._enumeration_users[parameter.type.enumeration].add(parameter.uid)
+            if parameter.calibration is not None:
+                self._calibration_users[parameter.calibration.uid].add(parameter.uid)
+
+        if parameter.is_collection:
+            for member in parameter.parameters:
+                self._collection_users[member.uid].add(parameter.uid)
+                self.add_parameter(member)
+
+    def add_packet(self, packet):
+        self._packets.add(packet.uid)
+
+        def handle_collection(collection):
+            for parameter in collection.parameters:
+                self._packet_users[parameter.uid].add(packet.uid)
+                if parameter.is_collection:
+                    handle_collection(parameter)
+
+        handle_collection(packet)
+        for parameter in packet.parameters:
+            self.add_parameter(parameter)
+
+    def add_derived_packet(self, base_uid, uid):
+        self._derived_packets[base_uid].add(uid)
+
+    def add_subsystem(self, subsystem):
+        """
+        Add all mappings of a subsystem.
+        """
+        identifier = subsystem.identifier
+        for kind, mappings, attribute in [
+                ("telemetry_enumeration", subsystem.telemetry_enumerations, "enumeration"),
+                ("telecommand_enumeration", subsystem.telecommand_enumerations, "enumeration"),
+                ("telemetry_calibration", subsystem.telemetry_calibrations, "calibration"),
+                ("telecommand_calibration", subsystem.telecommand_calibrations, "calibration"),
+                ("telecommand_parameter", subsystem.telecommand_parameters, "parameter")]:
+            for mapping in mappings.values():
+                uid = getattr(mapping, attribute).uid
+                self._mappings[uid].append(MappingReference(kind, identifier, None, None, mapping.sid))
+
+        for application in subsystem.applications.values():
+            apid = application.apid
+            for mapping in application.get_telemetries():
+                kind = "event" if mapping.packet_type == Packet.EVENT else "telemetry"
+                self._mappings[mapping.telemetry.uid].append(
+                    MappingReference(kind, identifier, apid, mapping.sid, mapping.sid))
+                for parameter in mapping.parameters:
+                    self._mappings[parameter.parameter.uid].append(
+                        MappingReference("telemetry_parameter", identifier, apid, mapping.sid, parameter.sid))
+
+            for mapping in application.get_telecommands():
+                self._mappings[mapping.telecommand.uid].append(
+                    MappingReference("telecommand", identifier, apid, mapping.sid, mapping.sid))
+
+    def get_packets(self, uid):
+        """
+        Packets containing the parameter, either directly or as member of
+        a repeater or list.
+        """
+        return sorted(self._packet_users.get(uid, ()))
+
+    def get_collections(self, uid):
+        """
+        Repeaters and lists which directly contain the parameter.
+        """
+        return sorted(self._collection_users.get(uid, ()))
+
+    def get_derived_packets(self, uid):
+        """
+        Packets directly derived from the given packet.
+        """
+        return sorted(self._derived_packets.get(uid, ()))
+
+    def get_enumeration_parameters(self, uid):
+        return sorted(self._enumeration_users.get(uid, ()))
+
+    def get_calibration_parameters(self, uid):
+        return sorted(self._calibration_users.get(uid, ()))
+
+    def get_mappings(self, uid):
+        """
+        Returns a list of MappingReference() objects.
+        """
+        return list(self._mappings.get(uid, ()))
+
+    def get_impact(self, uid):
+        """
+        Collect everything affected by a change of the given parameter,
+        enumeration, calibration or packet.
+
+        Parameters are followed upwards through all repeaters and lists
+        containing them and packets through all packets derived from them.
+        """
+        queue = []
+        queue.extend(self._enumeration_users.get(uid, ()))
+        queue.extend(self._calibration_users.get(uid, ()))
+        if uid in self._parameters:
+            queue.append(uid)
+
+        parameters = set()
+        while queue:
+            parameter = queue.pop()
+            if parameter not in parameters:
+                parameters.add(parameter)
+                queue.extend(self._collection_users.get(parameter, ()))
+
+        queue = [uid] if uid in self._packets else []
+        for parameter in parameters:
+            queue.extend(self._packet_users.get(parameter, ()))
+
+        packets = set()
+        while queue:
+            packet = queue.pop()
+            if packet not in packets:
+                packets.add(packet)
+                queue.extend(self._derived_packets.get(packet, ()))
+
+        mappings = []
+        for key in itertools.chain([uid], sorted(parameters - {uid}), sorted(packets - {uid})):
+            mappings.extend(self._mappings.get(key, ()))
+
+        return Impact(parameters=sorted(parameters),
+                      packets=sorted(packets),
+                      mappings=mappings)
+
+
 class ParameterType:
 
     BOOLEAN = 1
@@ -139,6 +373,8 @@ class ByteOrder:
 
 class Parameter:
 
+    description = TextAttribute("description")
+
     NONE = 0
     DEFAULT = 1
     FIXED = 2
@@ -149,6 +385,9 @@ class Parameter:
         self.uid = uid
         self.description = description
 
+        # Location of the definition (Source) or None
+        self.source = None
+
         # see ParameterCollection
         self.is_collection = False
         self.is_parameter = True
@@ -218,6 +457,9 @@ class ParameterCollection:
 
 
 class List(ParameterCollection):
+
+    description = TextAttribute("description")
+
     def __init__(self, name, uid, description):
         ParameterCollection.__init__(self)
 
@@ -227,6 +469,9 @@ class List(ParameterCollection):
         self.uid = uid
         self.description = description
 
+        # Location of the definition (Source) or None
+        self.source = None
+
 
 class Repeater(Parameter, ParameterCollection):
 
@@ -304,11 +549,16 @@ class Packet:
     TELEMETRY = 1
     EVENT = 2
 
+    description = TextAttribute("description")
+
     def __init__(self, name, uid, description, packet_type):
         self.name = name
         self.uid = uid
         self.description = description
 
+        # Location of the definition (Source) or None
+        self.source = None
+
         # Name limited to 12 characters
         self.short_name = ""
 
@@ -319,7 +569,7 @@ class Packet:
         self.designators = []
 
         # [('heading', 'text'), (..., ...), ...]
-        self.additional = []
+        self._additional = []
 
         self.parameters = []
 
@@ -332,6 +582,17 @@ class Packet:
 
         self.ancillary_data = None
 
+    @property
+    def additional(self):
+        for entry in self._additional:
+            if entry[1].__class__ is LazyText:
+                entry[1] = entry[1].resolve()
+        return self._additional
+
+    @additional.setter
+    def additional(self, additional):
+        self._additional = additional
+
     def append_parameter(self, parameter):
         self.parameters.append(parameter)
 
@@ -502,10 +763,15 @@ class Event(Telemetry):
 
 class Enumeration:
 
+    description = TextAttribute("description")
+
     def __init__(self, name, uid, width, description):
         self.name = name
         self.uid = uid
         self.description = description
+
+        # Location of the definition (Source) or None
+        self.source = None
         self.width = width
 
         self.short_name = None
@@ -525,6 +791,8 @@ class Enumeration:
 
 class Calibration:
 
+    description = TextAttribute("description")
+
     INTERPOLATION_TELECOMMAND = 0
     INTERPOLATION_TELEMETRY = 1
     POLYNOM = 2
@@ -535,6 +803,9 @@ class Calibration:
         self.uid = uid
         self.description = description
 
+        # Location of the definition (Source) or None
+        self.source = None
+
         self.unit = ""
 
 
@@ -587,6 +858,8 @@ class Polynom(Calibration):
 
 class EnumerationEntry:
 
+    description = TextAttribute("description")
+
     def __init__(self, name, value, description):
         self.name = name
         self.value = value
@@ -613,6 +886,8 @@ class Limits:
 
 class Check:
 
+    description = TextAttribute("description")
+
     SOFT_LIMIT = 0
     HARD_LIMIT = 1
 
@@ -630,6 +905,8 @@ class Check:
 
 class Subsystem:
 
+    description = TextAttribute("description")
+
     def __init__(self, identifier, name):
         self.identifier = identifier
         self.name = name
@@ -657,11 +934,16 @@ class Subsystem:
 
 class ApplicationMapping:
 
+    description = TextAttribute("description")
+
     def __init__(self, name, apid, description):
         self.name = name
         self.apid = apid
         self.description = description
 
+        # Location of the definition (Source) or None
+        self.source = None
+
         self.name_prefix = ""
         self.name_suffix = ""
 
@@ -706,6 +988,7 @@ class EnumerationMapping:
         self.sid = sid
         self.enumeration = enumeration
         self.subsystem = subsystem
+        self.source = None
 
 
 class CalibrationMapping:
@@ -713,6 +996,7 @@ class CalibrationMapping:
         self.sid = sid
         self.calibration = calibration
         self.subsystem = subsystem
+        self.source = None
 
 
 class TelemetryMapping:
@@ -720,6 +1004,7 @@ class TelemetryMapping:
     def __init__(self, sid, telemetry, packet_type=Packet.TELEMETRY):
         self.sid = sid
         self.telemetry = telemetry
+        self.source = None
 
         self.packet_type = packet_type
         self.packet_class = None
@@ -743,6 +1028,7 @@ class ParameterMapping:
     def __init__(self, sid, parameter):
         self.sid = sid
         self.parameter = parameter
+        self.source = None
 
 
 class TelecommandMapping:
@@ -754,6 +1040,7 @@ class TelecommandMapping:
     def __init__(self, sid, telecommand):
         self.sid = sid
         self.telecommand = telecommand
+        self.source = None
 
         self.packet_type = Packet.TELECOMMAND
         self.packet_class = None
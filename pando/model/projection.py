@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2017, German Aerospace Center (DLR)
+#
+# This file is part of the development version of the pando library.
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Authors:
+# - 2017, Fabian Greif (DLR RY-AVS)
+
+"""
+Projections of a model onto the subset of fields needed for a task.
+
+The runtime projection keeps everything required to decode and encode
+packets (layout, types, values, calibrations, limits and mappings) and
+drops the documentation. The result uses the same values the parser
+produces for a file without documentation elements: descriptions are
+empty, short names are equal to the names and the additional packet
+fields and designators are removed.
+"""
+
+import copy
+
+import pando.model
+
+
+# XML elements containing documentation only. Removed from the XML tree
+# before parsing when the runtime profile is selected.
+DOCUMENTATION_TAGS = [
+    "description",
+    "shortName",
+    "designators",
+    "purpose",
+    "effects",
+    "recommendation",
+    "note",
+    "seeAlso",
+]
+
+
+def runtime_projection(model, inplace=False):
+    """
+    Remove all documentation fields from a model.
+
+    Keyword arguments:
+    model -- Model to project
+    inplace -- Modify the given model instead of working on a copy.
+
+    Returns the projected model.
+    """
+    if not inplace:
+        model = copy.deepcopy(model)
+
+    visited = set()
+
+    def strip_parameter(parameter):
+        if id(parameter) in visited:
+            return
+        visited.add(id(parameter))
+
+        parameter.description = ""
+        if parameter.is_parameter:
+            parameter.short_name = parameter.name
+            if parameter.limits is not None:
+                for check in parameter.limits.checks:
+                    check.description = ""
+        if parameter.is_collection:
+            for member in parameter.parameters:
+                strip_parameter(member)
+
+    for enumeration in model.enumerations.values():
+        enumeration.description = ""
+        enumeration.short_name = enumeration.name
+        for entry in enumeration.entries:
+            entry.description = ""
+            entry.short_name = entry.name
+
+    for calibration in model.calibrations.values():
+        calibration.description = ""
+
+    for parameter in model.parameters.values():
+        strip_parameter(parameter)
+
+    for packet in list(model.telemetries.values()) + list(model.telecommands.values()):
+        packet.description = ""
+        packet.short_name = packet.name
+        packet.additional = []
+        packet.designators = []
+        for parameter in packet.parameters:
+            strip_parameter(parameter)
+        if packet.packet_type == pando.model.Packet.EVENT:
+            for parameter in packet.event_parameters:
+                strip_parameter(parameter)
+
+    for subsystem in model.subsystems.values():
+        subsystem.description = ""
+        for application in subsystem.applications.values():
+            application.description = ""
+
+    return model
+
+
+def prune_unmapped(model):
+    """
+    Remove all objects which are not reachable from a packet mapping.
+
+    Keeps the mapped packets, the telemetry packets referenced by them,
+    the parameters they contain and the enumerations and calibrations used
+    by these parameters. Applications without packet mappings, subsystem
+    wide mappings for removed objects and subsystems without applications
+    are removed as well. The model is
+    modified in place and returned.
+    """
+    packets = set()
+    for subsystem in model.subsystems.values():
+        for apid, application in list(subsystem.applications.items()):
+            if len(application.get_telemetries()) == 0 and len(application.get_telecommands()) == 0:
+                del subsystem.applications[apid]
+                continue
+            for mapping in application.get_telemetries():
+                packets.add(mapping.telemetry.uid)
+            for mapping in application.get_telecommands():
+                packets.add(mapping.telecommand.uid)
+                for telemetry in mapping.telecommand.relevant_telemetry:
+                    packets.add(telemetry.uid)
+
+    parameters = set()
+    enumerations = set()
+    calibrations = set()
+    visited = set()
+
+    def visit(parameter):
+        if id(parameter) in visited:
+            return
+        visited.add(id(parameter))
+        parameters.add(parameter.uid)
+
+        if parameter.is_parameter:
+            if parameter.type.identifier == pando.model.ParameterType.ENUMERATION:
+                enumerations.add(parameter.type.enumeration)
+            if parameter.calibration is not None:
+                calibrations.add(parameter.calibration.uid)
+        if parameter.is_collection:
+            for member in parameter.parameters:
+                visit(member)
+
+        # Packets contain copies, the global definition is kept as well
+        definition = model.parameters.get(parameter.uid)
+        if definition is not None:
+            visit(definition)
+
+    telemetries = {uid: p for uid, p in model.telemetries.items() if uid in packets}
+    telecommands = {uid: p for uid, p in model.telecommands.items() if uid in packets}
+    for packet in list(telemetries.values()) + list(telecommands.values()):
+        for parameter in packet.parameters:
+            visit(parameter)
+
+    old_references = model.references
+
+    model.telemetries = telemetries
+    model.telecommands = telecommands
+    model.parameters = {uid: p for uid, p in model.parameters.items() if uid in parameters}
+    model.enumerations = {uid: e for uid, e in model.enumerations.items() if uid in enumerations}
+    model.calibrations = {uid: c for uid, c in model.calibrations.items() if uid in calibrations}
+
+    for identifier, subsystem in list(model.subsystems.items()):
+        if len(subsystem.applications) == 0:
+            del model.subsystems[identifier]
+            continue
+
+        for mappings, keep in [(subsystem.telemetry_enumerations, enumerations),
+                               (subsystem.telecommand_enumerations, enumerations),
+                               (subsystem.telemetry_calibrations, calibrations),
+                               (subsystem.telecommand_calibrations, calibrations),
+                               (subsystem.telecommand_parameters, parameters)]:
+            for uid in list(mappings.keys()):
+                if uid not in keep:
+                    del mappings[uid]
+
+    references = pando.model.ReferenceIndex()
+    for parameter in model.parameters.values():
+        references.add_parameter(parameter)
+    for packet in list(model.telemetries.values()) + list(model.telecommands.values()):
+        references.add_packet(packet)
+        for derived in old_references.get_derived_packets(packet.uid):
+            if derived in packets:
+                references.add_derived_packet(packet.uid, derived)
+    for subsystem in model.subsystems.values():
+        references.add_subsystem(subsystem)
+    model.references = references
+
+    return model
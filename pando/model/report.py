@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2017, German Aerospace Center (DLR)
+#
+# This file is part of the development version of the pando library.
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Authors:
+# - 2017, Fabian Greif (DLR RY-AVS)
+
+"""
+Verification report for a model.
+
+Runs the checks of the ModelValidator and collects their results as
+findings with the involved uids, SIDs and APIDs and the source location
+of the offending elements. The runtime of every check is recorded. The
+report can be written as JSON or as SARIF 2.1.0 log.
+"""
+
+import time
+import collections
+
+import pando.model
+import pando.model.validator
+
+
+class Finding:
+    """
+    Single error reported by a check.
+    """
+
+    def __init__(self, check, message, uids=(), sids=(), apids=(), sources=()):
+        self.check = check
+        self.message = message
+        self.uids = list(uids)
+        self.sids = list(sids)
+        self.apids = list(apids)
+        # List of pando.model.Source, objects without location are skipped
+        self.sources = [s for s in sources if s is not None]
+
+    def to_json(self):
+        return collections.OrderedDict([
+            ("check", self.check.identifier),
+            ("category", self.check.category),
+            ("message", self.message),
+            ("uids", self.uids),
+            ("sids", self.sids),
+            ("apids", self.apids),
+            ("locations", [collections.OrderedDict([("file", s.filename), ("line", s.line)])
+                           for s in self.sources]),
+        ])
+
+
+class Check:
+    """
+    Check of the model, creates a list of findings from a ModelValidator.
+    """
+
+    def __init__(self, identifier, category, description, function):
+        self.identifier = identifier
+        self.category = category
+        self.description = description
+        self.function = function
+
+    def run(self, validator):
+        return list(self.function(self, validator))
+
+
+def _unmapped_telecommand_parameters(check, validator):
+    for p in validator.get_unmapped_telecommand_parameters():
+        yield Finding(check, "Parameter '%s' not found in mapping" % (p.uid),
+                      uids=[p.uid], sources=[p.source])
+
+
+def _unreferenced_telecommand_parameters(check, validator):
+    for p in validator.get_mapped_but_unreferenced_telecommand_parameter():
+        yield Finding(check, "Parameter '%s' found in mapping but not in any TC packet" % (p.uid),
+                      uids=[p.uid], sources=[p.source])
+
+
+def _unmapped_telemetry_parameters(check, validator):
+    for packet, unresolved, additional, application in validator.get_unmapped_telemetry_parameters():
+        for parameter in unresolved:
+            yield Finding(check, "Packet '%s': parameter '%s' (position %i) not found in mapping"
+                          % (packet.uid, parameter[0], parameter[1]),
+                          uids=[packet.uid, parameter[0]], apids=[application.apid],
+                          sources=[packet.source])
+        for parameter in additional:
+            yield Finding(check, "Packet '%s': unexpected parameter '%s' (position %i) found in mapping"
+                          % (packet.uid, parameter[0], parameter[1]),
+                          uids=[packet.uid, parameter[0]], apids=[application.apid],
+                          sources=[packet.source])
+
+
+def _unmapped(check, result, kind, attribute):
+    """
+    Findings for the result of get_unmapped_enumerations() and
+    get_unmapped_calibrations().
+    """
+    atm, utm, atc, utc = result
+    for unresolved, subsystem in utm:
+        yield Finding(check, "No telemetry %s mapping found for uid '%s' in subsystem '%s'"
+                      % (kind, unresolved.uid, subsystem.name),
+                      uids=[unresolved.uid], sources=[unresolved.source])
+    for unresolved, subsystem in utc:
+        yield Finding(check, "No telecommand %s mapping found for uid '%s' in subsystem '%s'"
+                      % (kind, unresolved.uid, subsystem.name),
+                      uids=[unresolved.uid], sources=[unresolved.source])
+    for additional in atm:
+        uid = getattr(additional, attribute).uid
+        yield Finding(check, "Telemetry %s mapping '%s' for uid '%s' not used!" % (kind, additional.sid, uid),
+                      uids=[uid], sids=[additional.sid], sources=[additional.source])
+    for additional in atc:
+        uid = getattr(additional, attribute).uid
+        yield Finding(check, "Telecommand %s mapping '%s' for uid '%s' not used!" % (kind, additional.sid, uid),
+                      uids=[uid], sids=[additional.sid], sources=[additional.source])
+
+
+def _unmapped_enumerations(check, validator):
+    return _unmapped(check, validator.get_unmapped_enumerations(), "enumeration", "enumeration")
+
+
+def _unmapped_calibrations(check, validator):
+    return _unmapped(check, validator.get_unmapped_calibrations(), "calibration", "calibration")
+
+
+def _ambiguous_telemetry_packets(check, validator):
+    for first, second in validator.get_ambiguous_telemetry_packets():
+        yield Finding(check, "TM packet '%s' and '%s' are ambiguous" % (first.uid, second.uid),
+                      uids=[first.uid, second.uid], sources=[first.source, second.source])
+
+
+def _ambiguous_packet_mappings(check, validator):
+    for sid, first, second in validator.get_ambiguous_packet_mappings():
+        yield Finding(check, "packet SID '%s' is used for '%s' and '%s'" % (sid, first.uid, second.uid),
+                      uids=[first.uid, second.uid], sids=[sid],
+                      sources=[first.source, second.source])
+
+
+def _ambiguous_parameter_sids(check, validator):
+    for packet_sid, sid in validator.get_ambiguous_telemetry_parameters_within_mapping():
+        yield Finding(check, "Parameter SID '%s' is used multiple times in telemetry packet '%s'" % (sid, packet_sid),
+                      sids=[packet_sid, sid])
+
+
+def _ambiguous_service_identifiers(check, validator):
+    for t in validator.get_ambiguous_telemetry_service_identifier():
+        mapping = t["mapping"]
+        yield Finding(check, "Telemetry packet SID '%s' (%d, %d) is ambiguous within "
+                             "APID %d (0x%03X). Either use a different combination of "
+                             "service and sub-service type or add an identification "
+                             "parameter." %
+                      (mapping.sid, mapping.telemetry.service_type, mapping.telemetry.service_subtype,
+                       t["apid"], t["apid"]),
+                      uids=[mapping.telemetry.uid], sids=[mapping.sid], apids=[t["apid"]],
+                      sources=[mapping.source])
+
+
+def _unaligned_packets(check, validator):
+    for packet in validator.get_packets_with_unaligned_length():
+        length = packet.get_accumulated_parameter_length()
+        bits_per_byte = 8
+
+        missing = bits_per_byte - (length % bits_per_byte)
+
+        yield Finding(check, "Length of packet uid '{}' is not byte aligned "
+                             "(total length {} bit -> add {} bit)"
+                             .format(packet.uid, length, missing),
+                      uids=[packet.uid], sources=[packet.source])
+
+
+def _non_unique_enumeration_values(check, validator):
+    for enumeration in validator.get_enumeration_with_non_unqiue_values():
+        yield Finding(check, "Enumeration '{}' ({}) has non unique entries!"
+                             .format(enumeration.name, enumeration.uid),
+                      uids=[enumeration.uid], sources=[enumeration.source])
+
+
+CHECKS = [
+    Check("unmapped-telecommand-parameters", "mapping",
+          "Telecommand parameters without a subsystem parameter mapping",
+          _unmapped_telecommand_parameters),
+    Check("unreferenced-telecommand-parameters", "mapping",
+          "Telecommand parameter mappings not used by any mapped telecommand",
+          _unreferenced_telecommand_parameters),
+    Check("unmapped-telemetry-parameters", "mapping",
+          "Telemetry parameter mappings not matching the packet structure",
+          _unmapped_telemetry_parameters),
+    Check("unmapped-enumerations", "enumeration",
+          "Missing or unused enumeration mappings",
+          _unmapped_enumerations),
+    Check("unmapped-calibrations", "calibration",
+          "Missing or unused calibration mappings",
+          _unmapped_calibrations),
+    Check("ambiguous-telemetry-packets", "ambiguity",
+          "Telemetry packets not distinguishable by APID, service and identification parameters",
+          _ambiguous_telemetry_packets),
+    Check("ambiguous-packet-mappings", "ambiguity",
+          "SIDs used for several packets or parameters",
+          _ambiguous_packet_mappings),
+    Check("ambiguous-parameter-sids", "ambiguity",
+          "Parameter SIDs used several times within a telemetry mapping",
+          _ambiguous_parameter_sids),
+    Check("ambiguous-service-identifiers", "ambiguity",
+          "Telemetry mappings with the same service type, subtype and identification within an APID",
+          _ambiguous_service_identifiers),
+    Check("unaligned-packets", "structure",
+          "Packets with a length which is not byte aligned",
+          _unaligned_packets),
+    Check("non-unique-enumeration-values", "structure",
+          "Enumerations with several entries for the same value",
+          _non_unique_enumeration_values),
+]
+
+
+# Used for files which could not be parsed
+PARSE_ERROR = Check("parse-error", "parser", "Invalid packet description file", None)
+
+
+class Report:
+    """
+    Results of all checks for a model.
+    """
+
+    def __init__(self, filename=None):
+        self.filename = filename
+        self.findings = []
+        # check identifier -> runtime in seconds
+        self.runtimes = collections.OrderedDict()
+
+    @property
+    def success(self):
+        return len(self.findings) == 0
+
+    def get_messages(self):
+        return [finding.message for finding in self.findings]
+
+    def add_parse_error(self, error):
+        self.findings.append(Finding(PARSE_ERROR, str(error)))
+
+
+def verify(model, filename=None, checks=None, validator=None):
+    """
+    Run all checks on a model.
+
+    Keyword arguments:
+    model -- Model to verify
+    filename -- Name of the verified file, stored in the report
+    checks -- List of checks to run, defaults to all checks
+    validator -- Validator for the model, e.g. an IncrementalValidator
+                 which is kept while the model is edited. A new
+                 ModelValidator is used if not set.
+
+    Returns a Report.
+    """
+    report = Report(filename)
+    if validator is None:
+        validator = pando.model.validator.ModelValidator(model)
+    for check in (CHECKS if checks is None else checks):
+        start = time.perf_counter()
+        report.findings.extend(check.run(validator))
+        report.runtimes[check.identifier] = time.perf_counter() - start
+    return report
+
+
+def to_json(reports):
+    """
+    Convert a list of reports into a JSON compatible structure.
+    """
+    databases = []
+    for report in reports:
+        counter = collections.Counter(f.check.identifier for f in report.findings)
+        databases.append(collections.OrderedDict([
+            ("file", report.filename),
+            ("success", report.success),
+            ("checks", [collections.OrderedDict([
+                ("id", check.identifier),
+                ("category", check.category),
+                ("findings", counter[check.identifier]),
+                ("runtime", report.runtimes[check.identifier]),
+            ]) for check in CHECKS if check.identifier in report.runtimes]),
+            ("findings", [finding.to_json() for finding in report.findings]),
+        ]))
+
+    return collections.OrderedDict([
+        ("success", all(report.success for report in reports)),
+        ("databases", databases),
+    ])
+
+
+def _sarif_location(source):
+    return {
+        "physicalLocation": collections.OrderedDict([
+            ("artifactLocation", {"uri": source.filename}),
+            ("region", {"startLine": source.line}),
+        ])
+    }
+
+
+def to_sarif(reports):
+    """
+    Convert a list of reports into a SARIF 2.1.0 log.
+
+    Every report is a separate run. The check runtimes are stored in the
+    properties of the invocation.
+    """
+    rules = [collections.OrderedDict([
+        ("id", check.identifier),
+        ("shortDescription", {"text": check.description}),
+        ("properties", {"category": check.category}),
+    ]) for check in CHECKS + [PARSE_ERROR]]
+
+    runs = []
+    for report in reports:
+        results = []
+        for finding in report.findings:
+            result = collections.OrderedDict([
+                ("ruleId", finding.check.identifier),
+                ("level", "error"),
+                ("message", {"text": finding.message}),
+            ])
+            if finding.sources:
+                result["locations"] = [_sarif_location(s) for s in finding.sources]
+            result["properties"] = collections.OrderedDict([
+                ("category", finding.check.category),
+                ("uids", finding.uids),
+                ("sids", finding.sids),
+                ("apids", finding.apids),
+            ])
+            results.append(result)
+
+        invocation = collections.OrderedDict([
+            ("executionSuccessful", True),
+            ("properties", collections.OrderedDict([
+                ("file", report.filename),
+                ("runtimes", report.runtimes),
+            ])),
+        ])
+
+        runs.append(collections.OrderedDict([
+            ("tool", {"driver": collections.OrderedDict([
+                ("name", "pando"),
+                ("rules", rules),
+            ])}),
+            ("invocations", [invocation]),
+            ("results", results),
+        ]))
+
+    return collections.OrderedDict([
+        ("$schema", "https://json.schemastore.org/sarif-2.1.0.json"),
+        ("version", "2.1.0"),
+        ("runs", runs),
+    ])
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2017, German Aerospace Center (DLR)
+#
+# This file is part of the development version of the pando library.
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Authors:
+# - 2017, Fabian Greif (DLR RY-AVS)
+
+"""
+Simplification of linear interpolation calibrations.
+
+Points are removed with the Douglas-Peucker algorithm. The error of a
+removed point is the vertical distance (in the unit of the output value)
+to the simplified curve at the same input value.
+
+Both curves are piecewise linear, and the simplified curve only has
+breakpoints that are also breakpoints of the original. The largest
+difference between the curves is therefore found at one of the original
+points. Within the range of the points the simplified curve never
+deviates more than the given error from the original curve. When the
+calibration extrapolates, the first and last segment are kept, so
+extrapolated values are unchanged as well.
+"""
+
+import copy
+
+import pando.model
+
+
+class Simplification:
+    """
+    Result of the simplification of a single calibration.
+    """
+
+    def __init__(self, original, simplified, error):
+        self.original = original
+        self.simplified = simplified
+        # Largest deviation of the simplified curve from the original points
+        self.error = error
+
+    @property
+    def reduction(self):
+        """
+        Number of removed points.
+        """
+        return len(self.original.points) - len(self.simplified.points)
+
+
+def _deviation(points, first, last):
+    """
+    Find the point between first and last with the largest vertical
+    distance to the straight line connecting both.
+
+    Returns a tuple of (distance, index).
+    """
+    x0, y0 = points[first].x, points[first].y
+    x1, y1 = points[last].x, points[last].y
+    if x1 == x0:
+        # Vertical step, all points in between are required
+        return float("inf"), first + 1
+
+    slope = (y1 - y0) / (x1 - x0)
+    distance, index = -1.0, first + 1
+    for i in range(first + 1, last):
+        point = points[i]
+        d = abs(y0 + (point.x - x0) * slope - point.y)
+        if d > distance:
+            distance, index = d, i
+    return distance, index
+
+
+def simplify_points(points, max_error, keep=()):
+    """
+    Reduce a list of Interpolation.Point objects.
+
+    The points have to be sorted by their x value. The first and the last
+    point are always kept.
+
+    Keyword arguments:
+    max_error -- Maximum absolute error of the y values
+    keep -- Indices of additional points which must not be removed
+
+    Returns the sorted list of the indices of the remaining points.
+    """
+    count = len(points)
+    if count <= 2:
+        return list(range(count))
+
+    kept = {0, count - 1}
+    kept.update(keep)
+
+    # Split at the fixed points first, then process each section
+    # separately. Uses an explicit stack instead of recursion to support
+    # curves with many points.
+    fixed = sorted(kept)
+    stack = list(zip(fixed[:-1], fixed[1:]))
+    while stack:
+        first, last = stack.pop()
+        if last - first < 2:
+            continue
+
+        distance, index = _deviation(points, first, last)
+        if distance > max_error:
+            kept.add(index)
+            stack.append((first, index))
+            stack.append((index, last))
+
+    return sorted(kept)
+
+
+def get_error(points, indices):
+    """
+    Largest vertical distance of the points to the curve through the
+    points with the given indices.
+    """
+    error = 0.0
+    for first, last in zip(indices[:-1], indices[1:]):
+        if last - first > 1:
+            error = max(error, _deviation(points, first, last)[0])
+    return error
+
+
+def simplify_interpolation(calibration, max_error):
+    """
+    Simplify a linear interpolation calibration.
+
+    The calibration itself is not changed, the simplified curve is
+    a copy with a reduced list of points.
+
+    Returns a Simplification.
+    """
+    points = sorted(calibration.points, key=lambda point: point.x)
+
+    keep = ()
+    if calibration.extrapolate and len(points) >= 3:
+        # Keep the outer segments, which are used for the extrapolation
+        keep = (1, len(points) - 2)
+
+    indices = simplify_points(points, max_error, keep)
+
+    simplified = copy.copy(calibration)
+    simplified.points = [pando.model.Interpolation.Point(points[i].x, points[i].y) for i in indices]
+
+    return Simplification(calibration, simplified, get_error(points, indices))
+
+
+def simplify_model(model, max_error, uids=None):
+    """
+    Simplify the linear interpolation calibrations of a model.
+
+    Keyword arguments:
+    max_error -- Maximum absolute error of the output values
+    uids -- Only simplify the calibrations with the given uids. All
+            interpolation calibrations are used if not set.
+
+    Returns a list of Simplification objects.
+    """
+    results = []
+    for calibration in model.calibrations.values():
+        if not isinstance(calibration, pando.model.Interpolation):
+            continue
+        if uids is not None and calibration.uid not in uids:
+            continue
+        results.append(simplify_interpolation(calibration, max_error))
+    return results
@@ -17,6 +17,7 @@ Validation of the internal structure of the model.
 """
 
 import itertools
+import collections
 
 import pando.model
 
@@ -25,6 +26,16 @@ class ModelValidator:
     def __init__(self, model):
         self.model = model
 
+    def _get_applications(self):
+        """
+        Iterate over all applications of the model.
+
+        Yields tuples of (subsystem, application).
+        """
+        for subsystem in self.model.subsystems.values():
+            for application in subsystem.applications.values():
+                yield subsystem, application
+
     def get_unmapped_telecommand_parameters(self):
         """
         Find the UID of all telecommand_mapping parameters that are referenced through
@@ -34,18 +45,25 @@ class ModelValidator:
         Returns a list of Parameter() objects.
         """
         unmapped_parameters = []
+        uids = set()
         for subsystem in self.model.subsystems.values():
-            for application in subsystem.applications.values():
-                for telecommand_mapping in application.get_telecommands():
-                    for parameter in telecommand_mapping.telecommand.get_parameters_as_flattened_list():
-                        if parameter.uid not in subsystem.telecommand_parameters:
-                            # Only add the parameter if it is not already
-                            # in the list
-                            for unmapped_parameter in unmapped_parameters:
-                                if unmapped_parameter.uid == parameter.uid:
-                                    break
-                            else:
-                                unmapped_parameters.append(parameter)
+            for parameter in self._get_unmapped_telecommand_parameters(subsystem):
+                # Only add the parameter if it is not already in the list
+                if parameter.uid not in uids:
+                    uids.add(parameter.uid)
+                    unmapped_parameters.append(parameter)
+        return unmapped_parameters
+
+    def _get_unmapped_telecommand_parameters(self, subsystem):
+        unmapped_parameters = []
+        uids = set()
+        for application in subsystem.applications.values():
+            for telecommand_mapping in application.get_telecommands():
+                for parameter in telecommand_mapping.telecommand.get_parameters_as_flattened_list():
+                    if parameter.uid not in subsystem.telecommand_parameters and \
+                            parameter.uid not in uids:
+                        uids.add(parameter.uid)
+                        unmapped_parameters.append(parameter)
         return unmapped_parameters
 
     def get_packets_with_unaligned_length(self):
@@ -55,13 +73,14 @@ class ModelValidator:
         unaligend_packets = []
         for packet in itertools.chain(self.model.telecommands.values(),
                                       self.model.telemetries.values()):
-            length = packet.get_accumulated_parameter_length()
-            if length is not None and length % 8 != 0:
+            if self._is_unaligned(packet):
                 unaligend_packets.append(packet)
-            # print(packet.uid)
 
         return unaligend_packets
 
+    def _is_unaligned(self, packet):
+        length = packet.get_accumulated_parameter_length()
+        return length is not None and length % 8 != 0
 
     def get_mapped_but_unreferenced_telecommand_parameter(self):
         """
@@ -72,40 +91,44 @@ class ModelValidator:
         """
         unreferenced_parameters = []
         for subsystem in self.model.subsystems.values():
-            # Store the list of all parameter_mappings in the subsystem.
-            # With the function get_unmapped_telecommand_parameters() it is
-            # checked that this is complete.
-            parameter_mappings = subsystem.telecommand_parameters.copy()
+            unreferenced_parameters.extend(self._get_unreferenced_telecommand_parameters(subsystem))
+        return unreferenced_parameters
 
-            # Remove all parameter_mappings which are used in any TC packet
-            # of this subsystem
-            for application in subsystem.applications.values():
-                for telecommand_mapping in application.get_telecommands():
-                    for parameter in telecommand_mapping.telecommand.get_parameters_as_flattened_list():
-                        if parameter.uid in parameter_mappings:
-                            del parameter_mappings[parameter.uid]
+    def _get_unreferenced_telecommand_parameters(self, subsystem):
+        # Store the list of all parameter_mappings in the subsystem.
+        # With the function get_unmapped_telecommand_parameters() it is
+        # checked that this is complete.
+        parameter_mappings = subsystem.telecommand_parameters.copy()
 
-            # Add all parameter_mappings which are still left to the list of
-            # unreferenced_parameters parameter_mappings
-            for parameter_mapping in parameter_mappings.values():
-                unreferenced_parameters.append(parameter_mapping.parameter)
+        # Remove all parameter_mappings which are used in any TC packet
+        # of this subsystem
+        for application in subsystem.applications.values():
+            for telecommand_mapping in application.get_telecommands():
+                for parameter in telecommand_mapping.telecommand.get_parameters_as_flattened_list():
+                    if parameter.uid in parameter_mappings:
+                        del parameter_mappings[parameter.uid]
 
-        return unreferenced_parameters
+        # All parameter_mappings which are still left are unreferenced
+        return [parameter_mapping.parameter for parameter_mapping in parameter_mappings.values()]
 
     def get_unmapped_telemetry_parameters(self):
         """
         Returns a list of tuples of (Telemetry(), [uid], [uid], Application())
         """
         unmapped = []
-        for subsystem in self.model.subsystems.values():
-            for application in subsystem.applications.values():
-                for telemetry_mapping in application.get_telemetries():
-                    telemetry = telemetry_mapping.telemetry
-                    # Check that all parameters are available
-                    unresolved, additional = self.get_unmapped_parameters(telemetry,
-                                                                          telemetry_mapping)
-                    if len(unresolved) > 0 or len(additional) > 0:
-                        unmapped.append((telemetry, unresolved, additional, application))
+        for subsystem, application in self._get_applications():
+            unmapped.extend(self._get_unmapped_telemetry_parameters(subsystem, application))
+        return unmapped
+
+    def _get_unmapped_telemetry_parameters(self, subsystem, application):
+        unmapped = []
+        for telemetry_mapping in application.get_telemetries():
+            telemetry = telemetry_mapping.telemetry
+            # Check that all parameters are available
+            unresolved, additional = self.get_unmapped_parameters(telemetry,
+                                                                  telemetry_mapping)
+            if len(unresolved) > 0 or len(additional) > 0:
+                unmapped.append((telemetry, unresolved, additional, application))
         return unmapped
 
     @staticmethod
@@ -179,35 +202,21 @@ class ModelValidator:
         additional_tc = []
 
         for subsystem in self.model.subsystems.values():
-            telemetry_enumerations, telecommand_enumerations = \
-                self._get_used_enumerations(subsystem)
-
-            unresolved_tms_subsystem = telemetry_enumerations.copy()
-            unresolved_tcs_subsystem = telecommand_enumerations.copy()
-
-            for m in subsystem.telemetry_enumerations.values():
-                uid = m.enumeration.uid
-                if uid not in telemetry_enumerations:
-                    additional_tm.append(m)
-
-                if uid in unresolved_tms_subsystem:
-                    unresolved_tms_subsystem.pop(uid)
-
-            for m in subsystem.telecommand_enumerations.values():
-                uid = m.enumeration.uid
-                if uid not in telecommand_enumerations:
-                    additional_tc.append(m)
-
-                if uid in unresolved_tcs_subsystem:
-                    unresolved_tcs_subsystem.pop(uid)
-
-            for unresolved_tm_subsystem in unresolved_tms_subsystem.values():
-                unresolved_tm.append((unresolved_tm_subsystem, subsystem))
-            for unresolved_tc_subsystem in unresolved_tcs_subsystem.values():
-                unresolved_tc.append((unresolved_tc_subsystem, subsystem))
+            atm, utm, atc, utc = self._get_unmapped_enumerations(subsystem)
+            additional_tm.extend(atm)
+            unresolved_tm.extend(utm)
+            additional_tc.extend(atc)
+            unresolved_tc.extend(utc)
 
         return (additional_tm, unresolved_tm, additional_tc, unresolved_tc)
 
+    def _get_unmapped_enumerations(self, subsystem):
+        telemetry_enumerations, telecommand_enumerations = \
+            self._get_used_enumerations(subsystem)
+        return self._get_unmapped(subsystem, "enumeration",
+                                  telemetry_enumerations, subsystem.telemetry_enumerations,
+                                  telecommand_enumerations, subsystem.telecommand_enumerations)
+
     def get_unmapped_calibrations(self):
         unresolved_tm = []
         unresolved_tc = []
@@ -215,34 +224,47 @@ class ModelValidator:
         additional_tc = []
 
         for subsystem in self.model.subsystems.values():
-            telemetry_calibrations, telecommand_calibrations = \
-                self._get_used_calibrations(subsystem)
-
-            unresolved_tms_subsystem = telemetry_calibrations.copy()
-            unresolved_tcs_subsystem = telecommand_calibrations.copy()
+            atm, utm, atc, utc = self._get_unmapped_calibrations(subsystem)
+            additional_tm.extend(atm)
+            unresolved_tm.extend(utm)
+            additional_tc.extend(atc)
+            unresolved_tc.extend(utc)
 
-            for m in subsystem.telemetry_calibrations.values():
-                uid = m.calibration.uid
-                if uid not in telemetry_calibrations:
-                    additional_tm.append(m)
-
-                if uid in unresolved_tms_subsystem:
-                    unresolved_tms_subsystem.pop(uid)
-
-            for m in subsystem.telecommand_calibrations.values():
-                uid = m.calibration.uid
-                if uid not in telecommand_calibrations:
-                    additional_tc.append(m)
+        return (additional_tm, unresolved_tm, additional_tc, unresolved_tc)
 
-                if uid in unresolved_tcs_subsystem:
-                    unresolved_tcs_subsystem.pop(uid)
+    def _get_unmapped_calibrations(self, subsystem):
+        telemetry_calibrations, telecommand_calibrations = \
+            self._get_used_calibrations(subsystem)
+        return self._get_unmapped(subsystem, "calibration",
+                                  telemetry_calibrations, subsystem.telemetry_calibrations,
+                                  telecommand_calibrations, subsystem.telecommand_calibrations)
 
-            for unresolved_tm_subsystem in unresolved_tms_subsystem.values():
-                unresolved_tm.append((unresolved_tm_subsystem, subsystem))
-            for unresolved_tc_subsystem in unresolved_tcs_subsystem.values():
-                unresolved_tc.append((unresolved_tc_subsystem, subsystem))
+    @staticmethod
+    def _get_unmapped(subsystem, attribute,
+                      telemetry_used, telemetry_mappings,
+                      telecommand_used, telecommand_mappings):
+        """
+        Compare the used enumerations or calibrations of a subsystem with
+        the mappings.
 
-        return (additional_tm, unresolved_tm, additional_tc, unresolved_tc)
+        Returns a tuple of (additional_tm, unresolved_tm, additional_tc, unresolved_tc).
+        """
+        result = []
+        for used, mappings in ((telemetry_used, telemetry_mappings),
+                               (telecommand_used, telecommand_mappings)):
+            unresolved_subsystem = used.copy()
+            additional = []
+            for m in mappings.values():
+                uid = getattr(m, attribute).uid
+                if uid not in used:
+                    additional.append(m)
+
+                if uid in unresolved_subsystem:
+                    unresolved_subsystem.pop(uid)
+
+            result.append(additional)
+            result.append([(unresolved, subsystem) for unresolved in unresolved_subsystem.values()])
+        return tuple(result)
 
     def get_unused_parameters(self):
         """
@@ -296,6 +318,17 @@ class ModelValidator:
         telemetries.sort()
         return telemetries
 
+    @staticmethod
+    def _get_identification(telemetry):
+        """
+        Get the uids and the values of the identification parameters.
+
+        Returns a tuple of (uids, values).
+        """
+        identification = telemetry.identification_parameter
+        return (tuple(p.parameter.uid for p in identification),
+                tuple(p.value for p in identification))
+
     def get_ambiguous_telemetry_packets(self):
         """
         Get all ambiguous telemetry packets.
@@ -304,34 +337,71 @@ class ModelValidator:
         APID, service type, service sub-type and the up to two additional
         identification fields.
 
+        Packets with different identification parameters are always
+        ambiguous. Packets with the same identification parameters are
+        ambiguous if the values are equal. Packets without identification
+        parameters are reported by get_ambiguous_telemetry_service_identifier().
+
+        The packets are bucketed by APID, service and identification, so
+        that only the packets which are actually ambiguous are compared.
+
         Returns a list of ambiguous tuples of telemetry packets.
         """
+        # apid -> [(subsystem, application)]
+        apids = collections.OrderedDict()
+        for subsystem, application in self._get_applications():
+            apids.setdefault(application.apid, []).append((subsystem, application))
+
+        # (subsystem identifier, apid) -> list of ambiguous tuples
+        results = {}
+        for applications in apids.values():
+            results.update(self._get_ambiguous_telemetry_packets(applications))
+
         ambiguous = []
-        # tuple -> list of tm packets
-        tm = {}
-        for subsystem in self.model.subsystems.values():
-            for application in subsystem.applications.values():
-                for telemetry_mapping in application.get_telemetries():
-                    telemetry = telemetry_mapping.telemetry
-                    identifier = (application.apid, telemetry.service_type, telemetry.service_subtype)
-
-                    others = tm.get(identifier, [])
-                    for other in others:
-                        if len(other.identification_parameter) == \
-                           len(telemetry.identification_parameter):
-                            for i1, i2 in zip(other.identification_parameter,
-                                              telemetry.identification_parameter):
-                                if i1.parameter.uid != i2.parameter.uid or i1.value == i2.value:
-                                    break
-                            else:
-                                # Both lists are different
-                                continue
+        for subsystem, application in self._get_applications():
+            ambiguous.extend(results[(subsystem.identifier, application.apid)])
+        return ambiguous
+
+    def _get_ambiguous_telemetry_packets(self, applications):
+        """
+        Find the ambiguous packets of all applications with the same APID.
 
+        Returns a dictionary with the list of ambiguous tuples for every
+        application, indexed by (subsystem identifier, apid). The tuples
+        are assigned to the application of the second packet.
+        """
+        results = {}
+        # (service type, service subtype)
+        #   -> identification uids -> ([(index, tm packet)], values -> [(index, tm packet)])
+        services = {}
+        index = 0
+        for subsystem, application in applications:
+            ambiguous = []
+            for telemetry_mapping in application.get_telemetries():
+                telemetry = telemetry_mapping.telemetry
+                identifier = (telemetry.service_type, telemetry.service_subtype)
+                uids, values = self._get_identification(telemetry)
+
+                layouts = services.setdefault(identifier, {})
+                others = []
+                for other_uids, (packets, by_value) in layouts.items():
+                    if other_uids != uids:
+                        others.extend(packets)
+                    elif len(uids) > 0:
+                        others.extend(by_value.get(values, ()))
+
+                if len(others) > 0:
+                    # Report in the order in which the packets were found
+                    others.sort(key=lambda other: other[0])
+                    for _, other in others:
                         ambiguous.append((other, telemetry))
 
-                    others.append(telemetry)
-                    tm[identifier] = others
-        return ambiguous
+                packets, by_value = layouts.setdefault(uids, ([], {}))
+                packets.append((index, telemetry))
+                by_value.setdefault(values, []).append((index, telemetry))
+                index += 1
+            results[(subsystem.identifier, application.apid)] = ambiguous
+        return results
 
     def get_ambiguous_packet_mappings(self):
         """
@@ -340,30 +410,29 @@ class ModelValidator:
         packets = {}
         ambiguous = []
 
-        for subsystem in self.model.subsystems.values():
-            for application in subsystem.applications.values():
-                for mapping in application.get_telemetries():
-                    p = packets.get(mapping.sid)
-                    if p is not None:
-                        ambiguous.append((mapping.sid, p, mapping.telemetry))
-                    else:
-                        packets[mapping.sid] = mapping.telemetry
-
-                    for parameter_mapping in mapping.parameters:
-                        p = packets.get(parameter_mapping.sid)
-                        if p is not None:
-                            if p.uid != parameter_mapping.parameter.uid:
-                                ambiguous.append((parameter_mapping.sid, p,
-                                                  parameter_mapping.parameter))
-                        else:
-                            packets[parameter_mapping.sid] = parameter_mapping.parameter
-
-                for mapping in application.get_telecommands():
-                    p = packets.get(mapping.sid)
+        for subsystem, application in self._get_applications():
+            for mapping in application.get_telemetries():
+                p = packets.get(mapping.sid)
+                if p is not None:
+                    ambiguous.append((mapping.sid, p, mapping.telemetry))
+                else:
+                    packets[mapping.sid] = mapping.telemetry
+
+                for parameter_mapping in mapping.parameters:
+                    p = packets.get(parameter_mapping.sid)
                     if p is not None:
-                        ambiguous.append((mapping.sid, p, mapping.telecommand))
+                        if p.uid != parameter_mapping.parameter.uid:
+                            ambiguous.append((parameter_mapping.sid, p,
+                                              parameter_mapping.parameter))
                     else:
-                        packets[mapping.sid] = mapping.telecommand
+                        packets[parameter_mapping.sid] = parameter_mapping.parameter
+
+            for mapping in application.get_telecommands():
+                p = packets.get(mapping.sid)
+                if p is not None:
+                    ambiguous.append((mapping.sid, p, mapping.telecommand))
+                else:
+                    packets[mapping.sid] = mapping.telecommand
 
         return ambiguous
 
@@ -376,19 +445,22 @@ class ModelValidator:
         the same packet.
         """
         ambiguous = []
+        for subsystem, application in self._get_applications():
+            ambiguous.extend(self._get_ambiguous_telemetry_parameters_within_mapping(subsystem,
+                                                                                     application))
+        return ambiguous
 
-        for subsystem in self.model.subsystems.values():
-            for application in subsystem.applications.values():
-                for mapping in application.get_telemetries():
-                    parameters = {}
-
-                    for parameter_mapping in mapping.parameters:
-                        sid = parameter_mapping.sid
-                        if sid in parameters:
-                            ambiguous.append((mapping.sid, sid))
-                        else:
-                            parameters[sid] = parameter_mapping
+    def _get_ambiguous_telemetry_parameters_within_mapping(self, subsystem, application):
+        ambiguous = []
+        for mapping in application.get_telemetries():
+            parameters = {}
 
+            for parameter_mapping in mapping.parameters:
+                sid = parameter_mapping.sid
+                if sid in parameters:
+                    ambiguous.append((mapping.sid, sid))
+                else:
+                    parameters[sid] = parameter_mapping
         return ambiguous
 
     def get_ambiguous_telemetry_service_identifier(self):
@@ -398,33 +470,39 @@ class ModelValidator:
         identification tag.
         """
         ambiguous = []
+        for subsystem, application in self._get_applications():
+            ambiguous.extend(self._get_ambiguous_telemetry_service_identifier(subsystem,
+                                                                              application))
+        return ambiguous
 
-        for subsystem in self.model.subsystems.values():
-            for application in subsystem.applications.values():
-                ids = {}
-                for mapping in application.get_telemetries():
-                    identification = {
-                        "__service_type": mapping.telemetry.service_type,
-                        "__service_subtype": mapping.telemetry.service_subtype,
-                    }
-
-                    for p in mapping.telemetry.identification_parameter:
-                        identification[p.parameter.uid] = p.value
-
-                    entry = {
-                        "apid": application.apid,
-                        "mapping": mapping,
-                        "identification": identification,
-                    }
-
-                    key = hash(frozenset(identification.items()))
-                    t = ids.get(key, None)
-                    if t is None:
-                        ids[key] = entry
-                    else:
-                        if not t in ambiguous:
-                            ambiguous.append(t)
-                        ambiguous.append(entry)
+    def _get_ambiguous_telemetry_service_identifier(self, subsystem, application):
+        ambiguous = []
+        # identification -> list of entries
+        ids = {}
+        for mapping in application.get_telemetries():
+            identification = {
+                "__service_type": mapping.telemetry.service_type,
+                "__service_subtype": mapping.telemetry.service_subtype,
+            }
+
+            for p in mapping.telemetry.identification_parameter:
+                identification[p.parameter.uid] = p.value
+
+            entry = {
+                "apid": application.apid,
+                "mapping": mapping,
+                "identification": identification,
+            }
+
+            key = frozenset(identification.items())
+            others = ids.get(key)
+            if others is None:
+                ids[key] = [entry]
+            else:
+                if len(others) == 1:
+                    ambiguous.append(others[0])
+                ambiguous.append(entry)
+                others.append(entry)
 
         return ambiguous
 
@@ -435,13 +513,186 @@ class ModelValidator:
         Returns:
             List of enumerations with non unique values.
         """
-        enumerations = []
-        for enumeration in self.model.enumerations.values():
-            values = {}
-            for entry in enumeration.entries:
-                if entry.value in values:
-                    enumerations.append(enumeration)
-                    break
-                else:
-                    values[entry.value] = entry
-        return enumerations
+        return [enumeration for enumeration in self.model.enumerations.values()
+                if self._has_non_unique_values(enumeration)]
+
+    def _has_non_unique_values(self, enumeration):
+        values = set()
+        for entry in enumeration.entries:
+            if entry.value in values:
+                return True
+            values.add(entry.value)
+        return False
+
+
+class IncrementalValidator(ModelValidator):
+    """
+    Validator which keeps the results of the checks between calls.
+
+    The checks are split into independent parts (per packet, enumeration,
+    application, subsystem or APID bucket). Every part records the objects
+    it depends on. After the model has been changed, update() has to be
+    called with the changed objects; only the parts depending on them are
+    recomputed with the next call of a check. The results are always
+    equal to those of a ModelValidator for the current model.
+    """
+
+    def __init__(self, model):
+        ModelValidator.__init__(self, model)
+
+        # (check, unit) -> result
+        self._results = {}
+        # dependency -> set of (check, unit)
+        self._dependents = collections.defaultdict(set)
+
+        # Number of computed parts, used to check the efficiency
+        self.computed = 0
+
+    def update(self, packets=(), enumerations=(), calibrations=(),
+               applications=(), subsystems=()):
+        """
+        Mark parts of the model as changed.
+
+        Changed, added and removed objects have to be reported.
+
+        Keyword arguments:
+        packets -- Uids of telemetry and telecommand packets
+        enumerations -- Uids of enumerations
+        calibrations -- Uids of calibrations
+        applications -- APIDs of application mappings, includes the
+                        telemetry and telecommand mappings
+        subsystems -- Identifiers of subsystems, includes the enumeration,
+                      calibration and telecommand parameter mappings
+        """
+        dependencies = [("packet", uid) for uid in packets]
+        dependencies += [("enumeration", uid) for uid in enumerations]
+        dependencies += [("calibration", uid) for uid in calibrations]
+        dependencies += [("application", apid) for apid in applications]
+        dependencies += [("subsystem", identifier) for identifier in subsystems]
+
+        if len(applications) > 0 or len(subsystems) > 0:
+            # Added applications are not known to their subsystem yet
+            for subsystem, application in self._get_applications():
+                if application.apid in applications:
+                    dependencies.append(("subsystem", subsystem.identifier))
+            dependencies.append(("mappings",))
+
+        for dependency in dependencies:
+            for key in self._dependents.pop(dependency, ()):
+                self._results.pop(key, None)
+
+    def _cached(self, key, function, dependencies):
+        """
+        Get a result from the cache or compute and store it.
+
+        The dependencies are only evaluated if the result is computed.
+        """
+        try:
+            return self._results[key]
+        except KeyError:
+            pass
+
+        result = function()
+        self.computed += 1
+        self._results[key] = result
+        for dependency in dependencies():
+            self._dependents[dependency].add(key)
+        return result
+
+    @staticmethod
+    def _application_dependencies(subsystem, application):
+        yield ("subsystem", subsystem.identifier)
+        yield ("application", application.apid)
+        for mapping in application.get_telemetries():
+            yield ("packet", mapping.telemetry.uid)
+        for mapping in application.get_telecommands():
+            yield ("packet", mapping.telecommand.uid)
+
+    def _subsystem_dependencies(self, subsystem):
+        yield ("subsystem", subsystem.identifier)
+        for application in subsystem.applications.values():
+            yield from self._application_dependencies(subsystem, application)
+
+    def _enumeration_dependencies(self, subsystem):
+        yield from self._subsystem_dependencies(subsystem)
+        for uid in itertools.chain(*self._get_used_enumerations(subsystem)):
+            yield ("enumeration", uid)
+        for mapping in itertools.chain(subsystem.telemetry_enumerations.values(),
+                                       subsystem.telecommand_enumerations.values()):
+            yield ("enumeration", mapping.enumeration.uid)
+
+    def _calibration_dependencies(self, subsystem):
+        yield from self._subsystem_dependencies(subsystem)
+        for uid in itertools.chain(*self._get_used_calibrations(subsystem)):
+            yield ("calibration", uid)
+        for mapping in itertools.chain(subsystem.telemetry_calibrations.values(),
+                                       subsystem.telecommand_calibrations.values()):
+            yield ("calibration", mapping.calibration.uid)
+
+    def _get_unmapped_telecommand_parameters(self, subsystem):
+        return self._cached(("unmapped-telecommand-parameters", subsystem.identifier),
+                            lambda: ModelValidator._get_unmapped_telecommand_parameters(self, subsystem),
+                            lambda: self._subsystem_dependencies(subsystem))
+
+    def _is_unaligned(self, packet):
+        return self._cached(("unaligned", packet.packet_type, packet.uid),
+                            lambda: ModelValidator._is_unaligned(self, packet),
+                            lambda: [("packet", packet.uid)])
+
+    def _get_unreferenced_telecommand_parameters(self, subsystem):
+        return self._cached(("unreferenced-telecommand-parameters", subsystem.identifier),
+                            lambda: ModelValidator._get_unreferenced_telecommand_parameters(self, subsystem),
+                            lambda: self._subsystem_dependencies(subsystem))
+
+    def _get_unmapped_telemetry_parameters(self, subsystem, application):
+        return self._cached(("unmapped-telemetry-parameters", subsystem.identifier, application.apid),
+                            lambda: ModelValidator._get_unmapped_telemetry_parameters(self, subsystem,
+                                                                                      application),
+                            lambda: self._application_dependencies(subsystem, application))
+
+    def _get_unmapped_enumerations(self, subsystem):
+        return self._cached(("unmapped-enumerations", subsystem.identifier),
+                            lambda: ModelValidator._get_unmapped_enumerations(self, subsystem),
+                            lambda: self._enumeration_dependencies(subsystem))
+
+    def _get_unmapped_calibrations(self, subsystem):
+        return self._cached(("unmapped-calibrations", subsystem.identifier),
+                            lambda: ModelValidator._get_unmapped_calibrations(self, subsystem),
+                            lambda: self._calibration_dependencies(subsystem))
+
+    def _get_ambiguous_telemetry_packets(self, applications):
+        def dependencies():
+            for subsystem, application in applications:
+                yield from self._application_dependencies(subsystem, application)
+
+        # The subsystems are part of the key, an application added to
+        # another subsystem with the same APID creates a new bucket.
+        key = ("ambiguous-telemetry-packets", applications[0][1].apid,
+               tuple(subsystem.identifier for subsystem, _ in applications))
+        return self._cached(key,
+                            lambda: ModelValidator._get_ambiguous_telemetry_packets(self, applications),
+                            dependencies)
+
+    def get_ambiguous_packet_mappings(self):
+        # SIDs have to be unique over all applications
+        return list(self._cached(("ambiguous-packet-mappings",),
+                                 lambda: ModelValidator.get_ambiguous_packet_mappings(self),
+                                 lambda: [("mappings",)]))
+
+    def _get_ambiguous_telemetry_parameters_within_mapping(self, subsystem, application):
+        return self._cached(("ambiguous-parameter-sids", subsystem.identifier, application.apid),
+                            lambda: ModelValidator._get_ambiguous_telemetry_parameters_within_mapping(
+                                self, subsystem, application),
+                            lambda: [("subsystem", subsystem.identifier),
+                                     ("application", application.apid)])
+
+    def _get_ambiguous_telemetry_service_identifier(self, subsystem, application):
+        return self._cached(("ambiguous-service-identifiers", subsystem.identifier, application.apid),
+                            lambda: ModelValidator._get_ambiguous_telemetry_service_identifier(
+                                self, subsystem, application),
+                            lambda: self._application_dependencies(subsystem, application))
+
+    def _has_non_unique_values(self, enumeration):
+        return self._cached(("non-unique-enumeration-values", enumeration.uid),
+                            lambda: ModelValidator._has_non_unique_values(self, enumeration),
+                            lambda: [("enumeration", enumeration.uid)])
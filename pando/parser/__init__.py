@@ -12,5 +12,6 @@
 # Authors:
 # - 2016-2017, Fabian Greif (DLR RY-AVS)
 
-from .parser import Parser
+from .parser import Parser, FragmentCache, load_schema
 from .common import ParserException
+from .sqlite import SqliteParser
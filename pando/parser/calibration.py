@@ -50,7 +50,8 @@ class CalibrationParser:
 
         c.extrapolate = self._to_boolean(node.attrib.get("extrapolate", "true"))
         c.output_type = self._to_interpolation_type(node.attrib.get("outputType"))
-        c.unit = node.attrib.get("unit", "")
+        c.unit = pando.parser.common.intern(node.attrib.get("unit", ""))
+        c.source = pando.parser.common.parse_source(node)
 
         for point_node in node.iterfind("point"):
             c.append_point(self._parse_calibration_interpolation_point(point_node))
@@ -66,7 +67,8 @@ class CalibrationParser:
 
         c.extrapolate = self._to_boolean(node.attrib.get("extrapolate", "true"))
         c.input_type = self._to_interpolation_type(node.attrib.get("inputType"))
-        c.unit = node.attrib.get("unit", "")
+        c.unit = pando.parser.common.intern(node.attrib.get("unit", ""))
+        c.source = pando.parser.common.parse_source(node)
 
         for point_node in node.iterfind("point"):
             c.append_point(self._parse_calibration_interpolation_point(point_node))
@@ -80,7 +82,8 @@ class CalibrationParser:
                                 uid=node.attrib.get("uid"),
                                 description=description)
 
-        c.unit = node.attrib.get("unit", "")
+        c.unit = pando.parser.common.intern(node.attrib.get("unit", ""))
+        c.source = pando.parser.common.parse_source(node)
 
         c.a0 = float(node.attrib.get("a0", "0"))
         c.a1 = float(node.attrib.get("a1", "0"))
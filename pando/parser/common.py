@@ -13,6 +13,9 @@
 # - 2016-2017, Fabian Greif (DLR RY-AVS)
 
 import re
+import sys
+import urllib.parse
+import urllib.request
 import lxml
 import isodate
 
@@ -23,9 +26,26 @@ class ParserException(Exception):
     pass
 
 
-def parse_text(node, tag, default_value=None):
+def intern(text):
+    """
+    Intern strings which are repeated many times within a model.
+
+    Used for uids, units and packet classes. Every access to an lxml
+    attribute creates a new string object, interning lets all users
+    share a single instance.
+    """
+    if text is None:
+        return None
+    return sys.intern(text)
+
+
+# Leading whitespace of a line
+_INDENTATION = re.compile(r'\s*')
+
+
+def dedent(text):
     """
-    Removes indentation from text tags.
+    Removes indentation from a text.
 
     If the first line does not contain an indentation the next line is also
     checked. This helps e.g. for the following case:
@@ -33,43 +53,131 @@ def parse_text(node, tag, default_value=None):
         <description>This is some
           text which is indented only after
           the second line.</description>
+    """
+    if '\n' not in text:
+        return text.strip()
+
+    to_strip = None
+    second_line_test = False
+    lines = []
+    for line in text.split('\n'):
+        if to_strip is None or second_line_test:
+            if line == '' or line.isspace():
+                continue
+
+            # First line which is not only whitespace
+            to_strip = _INDENTATION.match(line).group()
+
+            if second_line_test:
+                second_line_test = False
+            elif to_strip == "":
+                second_line_test = True
+
+        lines.append(line.lstrip(to_strip))
+    return ("\n".join(lines)).rstrip()
+
+
+def parse_text(node, tag, default_value=None):
+    """
+    Read the text of a child tag and remove its indentation.
 
     Keyword arguments:
     node -- Start node for the search
     tag -- XML tag name to look for in the XML node
-    default_value --
+    default_value -- Returned if the tag is not found
     """
-    text = node.findtext(tag, default_value)
+    text = node.findtext(tag, None)
+    if text is None:
+        return default_value
+    return dedent(text)
 
-    second_line_test = False
-    if text is not None:
-        to_strip = None
-        lines = []
-        for line in text.split('\n'):
-            if to_strip is None or second_line_test:
-                if line == '' or line.isspace():
-                    continue
 
-                # First line which is not only whitespace
-                match = re.match(r'^(\s*)', line)
-                to_strip = match.group(1)
+def parse_lazy_text(node, tag, default_value=None):
+    """
+    Same as parse_text but removes the indentation on first access.
+
+    Returns a pando.model.LazyText for documentation fields which are
+    not needed by most tools. The default value is returned unchanged.
+    """
+    text = node.findtext(tag, None)
+    if text is None:
+        return default_value
+    return pando.model.LazyText(text, dedent)
 
-                if second_line_test:
-                    second_line_test = False
-                else:
-                    if to_strip == "" or to_strip is None:
-                        second_line_test = True
 
-            lines.append(line.lstrip(to_strip))
-        text = ("\n".join(lines)).rstrip()
+def url_to_path(url):
+    """
+    Convert a 'file://' URL as used for included files into a path.
 
-    return text
+    Other values are returned unchanged.
+    """
+    if url is not None and url.startswith("file://"):
+        return urllib.request.url2pathname(urllib.parse.urlparse(url).path)
+    return url
+
+
+def parse_source(node):
+    """
+    Location of an element in the source files.
+    """
+    return pando.model.Source(intern(url_to_path(node.base)), node.sourceline)
+
+
+def lazy_text(node):
+    """
+    Text of an element as pando.model.LazyText.
+    """
+    return pando.model.LazyText(node.text or "", dedent)
+
+
+def scan_children(node, handlers, fields):
+    """
+    Walk the children of a node once and dispatch them by tag.
+
+    Calls 'handlers[tag](fields, child)' for every child with a registered
+    tag. Other children and comments are ignored, the XML schema already
+    rejects unknown elements.
+
+    Returns the 'fields' object.
+    """
+    get = handlers.get
+    for child in node:
+        handler = get(child.tag)
+        if handler is not None:
+            handler(fields, child)
+    return fields
+
+
+def get_field(value, default):
+    """
+    Value collected by scan_children() or the default if the element was
+    not present.
+    """
+    return default if value is None else value
+
+
+def set_short_name(obj, short_name, default=""):
+    """
+    Set the short name from a collected 'shortName' element. An empty
+    short name is replaced by the name of the object.
+    """
+    obj.short_name = get_field(short_name, default)
+    if obj.short_name == "":
+        obj.short_name = obj.name
+
+
+def handle_description(fields, node):
+    fields.description = lazy_text(node)
+
+
+def handle_short_name(fields, node):
+    fields.short_name = node.text or ""
 
 
 def parse_packet_classes(node, default=None):
     packet_classes = []
     for class_node in node.findall("packetClasses/class"):
-        packet_classes.append(class_node.text)
+        packet_classes.append(intern(class_node.text))
 
     if len(packet_classes) == 0:
         # No packet class definitions found, use default value
@@ -79,7 +187,10 @@ def parse_packet_classes(node, default=None):
 
 
 def parse_packet_generation(packet_node):
-    generation_node = packet_node.find("generation")
+    return parse_generation_node(packet_node.find("generation"))
+
+
+def parse_generation_node(generation_node):
     if generation_node is not None:
         packet_generation = pando.model.PacketGeneration()
 
@@ -115,4 +226,4 @@ def parse_short_name(packet, node, default=""):
 
 
 def parse_description(node, default=""):
-    return parse_text(node, "description", default)
+    return parse_lazy_text(node, "description", default)
@@ -38,6 +38,7 @@ class EnumerationParser:
                                               description=description)
 
         pando.parser.common.parse_short_name(enumeration, node)
+        enumeration.source = pando.parser.common.parse_source(node)
 
         for entry in node.iterfind("entry"):
             enumeration.append_entry(self._parse_enumeration_entry(entry))
@@ -61,6 +62,7 @@ class EnumerationParser:
         enumeration.uid = node.attrib.get("uid")
         enumeration.description = pando.parser.common.parse_description(node, enumeration.description)
         pando.parser.common.parse_short_name(enumeration, node, enumeration.short_name)
+        enumeration.source = pando.parser.common.parse_source(node)
 
         # FIXME overwrite existing parameters with the same value
         for entry in node.iterfind("entry"):
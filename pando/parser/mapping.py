@@ -20,37 +20,56 @@ from .common import ParserException
 
 class MappingParser:
 
+    def __init__(self, subsystems=None, apids=None, packet_classes=None):
+        """
+        Keyword arguments:
+        subsystems -- Set of subsystem identifiers to load. All if None.
+        apids -- Set of APIDs to load. All if None.
+        packet_classes -- Only load packet mappings with at least one of the
+                          given packet classes. All if None.
+        """
+        self.subsystems = subsystems
+        self.apids = apids
+        self.packet_classes = packet_classes
+
     def parse(self, rootnode, model):
 
         # Parse SCOS mapping information
         for mapping_node in rootnode.iterfind('mapping'):
             subsystem_id = int(mapping_node.attrib["subsystem"], 0)
+            if self.subsystems is not None and subsystem_id not in self.subsystems:
+                continue
+
             subsystem_name = mapping_node.attrib["name"]
             subsystem = model.get_or_add_subsystem(subsystem_id, subsystem_name)
 
-            subsystem.description = pando.parser.common.parse_text(mapping_node, "description", "")
+            subsystem.description = pando.parser.common.parse_description(mapping_node)
 
             for node in mapping_node.iterfind('enumerations/telecommand/enumerationMapping'):
                 uid, sid = self._parse_mapping(node)
                 enumeration = model.enumerations[uid]
-                subsystem.telecommand_enumerations[uid] = \
-                    pando.model.EnumerationMapping(sid=sid, enumeration=enumeration, subsystem=subsystem)
+                mapping = pando.model.EnumerationMapping(sid=sid, enumeration=enumeration, subsystem=subsystem)
+                mapping.source = pando.parser.common.parse_source(node)
+                subsystem.telecommand_enumerations[uid] = mapping
             for node in mapping_node.iterfind('enumerations/telemetry/enumerationMapping'):
                 uid, sid = self._parse_mapping(node)
                 enumeration = model.enumerations[uid]
-                subsystem.telemetry_enumerations[uid] = \
-                    pando.model.EnumerationMapping(sid=sid, enumeration=enumeration, subsystem=subsystem)
+                mapping = pando.model.EnumerationMapping(sid=sid, enumeration=enumeration, subsystem=subsystem)
+                mapping.source = pando.parser.common.parse_source(node)
+                subsystem.telemetry_enumerations[uid] = mapping
 
             for node in mapping_node.iterfind('calibrations/telecommand/calibrationMapping'):
                 uid, sid = self._parse_mapping(node)
                 calibration = model.calibrations[uid]
-                subsystem.telecommand_calibrations[uid] = \
-                    pando.model.CalibrationMapping(sid=sid, calibration=calibration, subsystem=subsystem)
+                mapping = pando.model.CalibrationMapping(sid=sid, calibration=calibration, subsystem=subsystem)
+                mapping.source = pando.parser.common.parse_source(node)
+                subsystem.telecommand_calibrations[uid] = mapping
             for node in mapping_node.iterfind('calibrations/telemetry/calibrationMapping'):
                 uid, sid = self._parse_mapping(node)
                 calibration = model.calibrations[uid]
-                subsystem.telemetry_calibrations[uid] = \
-                    pando.model.CalibrationMapping(sid=sid, calibration=calibration, subsystem=subsystem)
+                mapping = pando.model.CalibrationMapping(sid=sid, calibration=calibration, subsystem=subsystem)
+                mapping.source = pando.parser.common.parse_source(node)
+                subsystem.telemetry_calibrations[uid] = mapping
 
             for node in mapping_node.iterfind('telecommandParameters/parameterMapping'):
                 uid, sid = self._parse_mapping(node)
@@ -60,13 +79,19 @@ class MappingParser:
                     raise ParserException("Mappings for uid '{}' found in '{}' and '{}'."
                                           .format(uid, sid, subsystem.telecommand_parameters[uid].sid))
                 else:
-                    subsystem.telecommand_parameters[uid] = \
-                        pando.model.ParameterMapping(sid=sid, parameter=parameter)
+                    mapping = pando.model.ParameterMapping(sid=sid, parameter=parameter)
+                    mapping.source = pando.parser.common.parse_source(node)
+                    subsystem.telecommand_parameters[uid] = mapping
 
             for node in mapping_node.iterfind('application'):
+                if self.apids is not None and int(node.attrib["apid"], 0) not in self.apids:
+                    continue
                 application = self._parse_application_mapping(node, subsystem, model)
                 subsystem.applications[application.apid] = application
 
+        for subsystem in model.subsystems.values():
+            model.references.add_subsystem(subsystem)
+
         self._verify_calibrations(model)
 
     def _parse_application_mapping(self, node, subsystem, model):
@@ -77,27 +102,51 @@ class MappingParser:
         application = pando.model.ApplicationMapping(name=node.attrib.get("name"),
                                                      apid=int(node.attrib["apid"], 0),
                                                      description=pando.parser.common.parse_description(node))
+        application.source = pando.parser.common.parse_source(node)
 
         application.name_prefix = node.attrib.get("namePrefix", "")
         application.name_suffix = node.attrib.get("nameSuffix", "")
 
         for telemetry_node in node.iterfind("events/event"):
+            if not self._is_loaded(telemetry_node, model.telemetries):
+                continue
             telemetry_mapping = self._parse_telemetry_mapping(telemetry_node, pando.model.EventMapping, model)
+            if not self._is_selected(telemetry_mapping):
+                continue
             self._add_packet_classes(subsystem, telemetry_mapping)
             application.append_telemetry(telemetry_mapping)
 
         for telemetry_node in node.iterfind("telemetries/telemetry"):
+            if not self._is_loaded(telemetry_node, model.telemetries):
+                continue
             telemetry_mapping = self._parse_telemetry_mapping(telemetry_node, pando.model.TelemetryMapping, model)
+            if not self._is_selected(telemetry_mapping):
+                continue
             self._add_packet_classes(subsystem, telemetry_mapping)
             application.append_telemetry(telemetry_mapping)
 
         for telecommand_node in node.iterfind("telecommands/telecommandMappingRef"):
+            if not self._is_loaded(telecommand_node, model.telecommands):
+                continue
             telecommand_mapping = self._parse_telecommand_mapping(telecommand_node, model)
+            if not self._is_selected(telecommand_mapping):
+                continue
             self._add_packet_classes(subsystem, telecommand_mapping)
             application.append_telecommand(telecommand_mapping)
 
         return application
 
+    def _is_loaded(self, node, packets):
+        # With a packet class filter, packets which are not mapped with one
+        # of the selected classes are not parsed at all
+        return self.packet_classes is None or node.attrib["uid"] in packets
+
+    def _is_selected(self, mapping):
+        if self.packet_classes is None:
+            return True
+        return mapping.packet_class is not None \
+            and any(c in self.packet_classes for c in mapping.packet_class)
+
     @staticmethod
     def _add_packet_classes(subsystem, mapping):
         if mapping.packet_class is None:
@@ -111,6 +160,7 @@ class MappingParser:
         telemetry = model.telemetries[uid]
 
         telemetry_mapping = cls(sid=sid, telemetry=telemetry)
+        telemetry_mapping.source = pando.parser.common.parse_source(node)
 
         # FIXME check for Event mapping
         if telemetry_mapping.packet_type != telemetry.packet_type:
@@ -143,13 +193,14 @@ class MappingParser:
 
     @staticmethod
     def _parse_mapping(node):
-        return node.attrib["uid"], node.attrib["sid"]
+        return pando.parser.common.intern(node.attrib["uid"]), node.attrib["sid"]
 
     def _parse_telecommand_mapping(self, node, model):
         uid, sid = self._parse_mapping(node)
         telecommand = model.telecommands[uid]
 
         telecommand_mapping = pando.model.TelecommandMapping(sid=sid, telecommand=telecommand)
+        telecommand_mapping.source = pando.parser.common.parse_source(node)
         telecommand_mapping.packet_class = \
             pando.parser.common.parse_packet_classes(node, telecommand.packet_class)
         return telecommand_mapping
@@ -18,7 +18,7 @@ import lxml
 import pando.model
 import pando.parser.common
 
-from .common import ParserException
+from .common import ParserException, get_field, set_short_name, handle_description, handle_short_name
 from .parameter import ParameterParser
 
 
@@ -29,9 +29,25 @@ class PacketParser:
     # EVENT_REPORT_ID_PARAMETER_UID = "event_report_id"
     EVENT_REPORT_ID_PARAMETER_UID = "s5_report_id"
 
-    def parse_service_packets(self, service_node, model):
+    def parse_service_packets(self, service_node, model, uids=None):
+        self.parse_service_telemetries(service_node, model, uids)
+        self.parse_service_telecommands(service_node, model, uids)
+
+    @staticmethod
+    def _is_selected(node, uids):
+        return uids is None or node.attrib["uid"] in uids
+
+    def parse_service_telemetries(self, service_node, model, uids=None):
+        """
+        Parse all events and telemetry packets of a service.
+
+        If 'uids' is given only the packets with a uid from this set
+        are parsed.
+        """
         for events_node in service_node.iterfind('events'):
             for node in events_node.iterchildren('event'):
+                if not self._is_selected(node, uids):
+                    continue
                 event = self._parse_event(node,
                                           model,
                                           model.parameters,
@@ -39,6 +55,8 @@ class PacketParser:
                 model.append_telemetry_packet(event)
 
             for node in events_node.iterchildren('derivedEvent'):
+                if not self._is_selected(node, uids):
+                    continue
                 event = self._parse_derived_event(node,
                                                   model,
                                                   model.parameters,
@@ -48,6 +66,8 @@ class PacketParser:
 
         for telemetries_node in service_node.iterfind('telemetries'):
             for node in telemetries_node.iterchildren('telemetry'):
+                if not self._is_selected(node, uids):
+                    continue
                 tm = self._parse_telemetry(node,
                                            model,
                                            model.parameters,
@@ -55,6 +75,8 @@ class PacketParser:
                 model.append_telemetry_packet(tm)
 
             for node in telemetries_node.iterchildren('derivedTelemetry'):
+                if not self._is_selected(node, uids):
+                    continue
                 tm = self._parse_derived_telemetry(node,
                                                    model,
                                                    model.parameters,
@@ -62,8 +84,17 @@ class PacketParser:
                                                    model.telemetries)
                 model.append_telemetry_packet(tm)
 
+    def parse_service_telecommands(self, service_node, model, uids=None):
+        """
+        Parse all telecommands of a service.
+
+        Telecommands can reference telemetry packets, therefore the telemetry
+        packets of all services have to be parsed before.
+        """
         for telecommands_node in service_node.iterfind('telecommands'):
             for node in telecommands_node.iterchildren('telecommand'):
+                if not self._is_selected(node, uids):
+                    continue
                 tc = self._parse_telecommand(node,
                                              model,
                                              model.parameters,
@@ -72,6 +103,8 @@ class PacketParser:
                 model.append_telecommand_packet(tc)
 
             for node in telecommands_node.iterchildren('derivedTelecommand'):
+                if not self._is_selected(node, uids):
+                    continue
                 tc = self._parse_derived_telecommand(node,
                                                      model,
                                                      model.parameters,
@@ -81,7 +114,7 @@ class PacketParser:
                 model.append_telecommand_packet(tc)
 
     @staticmethod
-    def _parse_severity(node, default=None):
+    def _parse_severity(text, default=None):
         """
         Parse the severity field of an event definition.
         """
@@ -92,36 +125,37 @@ class PacketParser:
             "high": pando.model.Event.HIGH_SEVERITY,
             # Only used for derived events
             "default": default,
-        }[node.findtext("severity", "default")]
+        }[text or "default"]
 
         return severity
 
     def _parse_event(self, node, model, reference_parameters, enumerations):
+        fields = _scan(node)
         name = node.attrib["name"]
         uid = node.attrib["uid"]
-        description = pando.parser.common.parse_description(node)
 
-        event = pando.model.Event(name=name, uid=uid, description=description)
+        event = pando.model.Event(name=name, uid=uid, description=get_field(fields.description, ""))
+        event.source = pando.parser.common.parse_source(node)
 
-        pando.parser.common.parse_short_name(event, node)
+        set_short_name(event, fields.short_name, "")
 
-        self._parse_additional_packet_fields(event, node)
+        self._parse_additional_packet_fields(event, fields)
 
-        event.report_id = int(node.findtext("reportId"))
-        event.severity = self._parse_severity(node)
+        event.report_id = int(fields.report_id)
+        event.severity = self._parse_severity(fields.severity)
 
         event.service_type = 5
         event.service_subtype = int(event.severity)
 
-        event.packet_class = pando.parser.common.parse_packet_classes(node, None)
+        event.packet_class = get_field(fields.packet_classes, None)
 
         if event.packet_generation is None:
             event.packet_generation = pando.model.EventPacketGeneration()
         else:
-            event.packet_generation = pando.parser.common.parse_packet_generation(node)
+            event.packet_generation = pando.parser.common.parse_generation_node(fields.generation)
 
         ParameterParser().parse_parameters(event,
-                                           node.find("parameters"),
+                                           fields.parameters,
                                            model,
                                            reference_parameters, enumerations)
 
@@ -143,30 +177,33 @@ class PacketParser:
         return event
 
     def _parse_derived_event(self, node, model, reference_parameters, enumerations, telemetries):
+        fields = _scan(node)
         base_uid = node.attrib["extends"]
         event = copy.deepcopy(telemetries[base_uid])
 
         event.uid = node.attrib["uid"]
         event.name = node.attrib.get("name", event.name)
-        event.description = pando.parser.common.parse_description(node, event.description)
-        pando.parser.common.parse_short_name(event, node, event.short_name)
+        event.source = pando.parser.common.parse_source(node)
+        if fields.description is not None:
+            event.description = fields.description
+        set_short_name(event, fields.short_name, event.short_name)
 
         if event.packet_type != pando.model.Packet.EVENT:
             raise ParserException("{} is not an event!".format(event.uid))
 
-        event.report_id = int(node.findtext("reportId", event.report_id))
-        event.severity = self._parse_severity(node, event.severity)
+        event.report_id = int(get_field(fields.report_id, event.report_id))
+        event.severity = self._parse_severity(fields.severity, event.severity)
 
         event.service_type = 5
         event.service_subtype = int(event.severity)
 
-        packet_generation = pando.parser.common.parse_packet_generation(node)
+        packet_generation = pando.parser.common.parse_generation_node(fields.generation)
         if packet_generation is not None:
             event.packet_generation = packet_generation
 
-        self._parse_additional_packet_fields(event, node)
+        self._parse_additional_packet_fields(event, fields)
         self._parse_override_parameters(event,
-                                        node.find("parameters"),
+                                        fields.parameters,
                                         model,
                                         reference_parameters,
                                         enumerations)
@@ -174,6 +211,8 @@ class PacketParser:
         event.update_depth()
         event.update_event_parameter_depth()
 
+        model.references.add_derived_packet(base_uid, event.uid)
+
         # Update the telemetry identification parameter
         for parameter in event.identification_parameter:
             if parameter.parameter.uid == self.EVENT_REPORT_ID_PARAMETER_UID:
@@ -181,114 +220,124 @@ class PacketParser:
 
         return event
 
-    def _parse_base_packet(self, cls, node, model, reference_parameters, enumerations):
+    def _parse_base_packet(self, cls, node, fields, model, reference_parameters, enumerations):
         packet = cls(name=node.attrib["name"],
                      uid=node.attrib["uid"],
-                     description=pando.parser.common.parse_description(node))
+                     description=get_field(fields.description, ""))
+        packet.source = pando.parser.common.parse_source(node)
 
-        pando.parser.common.parse_short_name(packet, node)
-        self._parse_designators(packet, node)
-        self._parse_service_type(packet, node)
-        self._parse_additional_packet_fields(packet, node)
-        packet.packet_class = pando.parser.common.parse_packet_classes(node, None)
+        set_short_name(packet, fields.short_name, "")
+        self._parse_designators(packet, fields)
+        self._parse_service_type(packet, fields)
+        self._parse_additional_packet_fields(packet, fields)
+        packet.packet_class = get_field(fields.packet_classes, None)
 
         ParameterParser().parse_parameters(packet,
-                                           node.find("parameters"),
+                                           fields.parameters,
                                            model,
                                            reference_parameters, enumerations)
         packet.update_depth()
         return packet
 
     def _parse_telemetry(self, node, model, reference_parameters, enumerations):
+        fields = _scan(node)
         packet = self._parse_base_packet(pando.model.Telemetry,
                                          node,
+                                         fields,
                                          model,
                                          reference_parameters,
                                          enumerations)
 
-        packet.packet_generation = pando.parser.common.parse_packet_generation(node)
+        packet.packet_generation = pando.parser.common.parse_generation_node(fields.generation)
 
         parameters = packet.get_parameters_as_flattened_list()
-        self._parse_telemetry_identification_parameter(packet, node, parameters)
+        self._parse_telemetry_identification_parameter(packet, fields, parameters)
         return packet
 
     def _parse_telecommand(self, node, model, reference_parameters, enumerations, telemetries):
+        fields = _scan(node)
         packet = self._parse_base_packet(pando.model.Telecommand,
                                          node,
+                                         fields,
                                          model,
                                          reference_parameters,
                                          enumerations)
 
-        self._parse_parameter_values(packet, node, enumerations)
-        self._parse_telecommand_verification(packet, node)
+        self._parse_parameter_values(packet, fields, enumerations)
+        self._parse_telecommand_verification(packet, fields)
 
-        critical = pando.parser.common.parse_text(node, "critical", "No")
+        critical = get_field(fields.critical, "No")
         packet.critical = {"Yes": True, "No": False}[critical]
 
-        for telemetry_uid in node.iterfind("relevantTelemetry/telemetryRef"):
-            uid = telemetry_uid.attrib["uid"]
+        for uid in fields.relevant_telemetry:
             telemetry = telemetries[uid]
             packet.relevant_telemetry.append(telemetry)
 
         # TODO failureIdentification
         return packet
 
-    def _parse_base_derived_packet(self, base_list, node, model, reference_parameters, enumerations):
+    def _parse_base_derived_packet(self, base_list, node, fields, model, reference_parameters, enumerations):
         base_uid = node.attrib["extends"]
         packet = copy.deepcopy(base_list[base_uid])
 
         packet.uid = node.attrib["uid"]
         packet.name = node.attrib.get("name", packet.name)
-        packet.description = pando.parser.common.parse_description(node, packet.description)
-        pando.parser.common.parse_short_name(packet, node, packet.short_name)
+        packet.source = pando.parser.common.parse_source(node)
+        if fields.description is not None:
+            packet.description = fields.description
+        set_short_name(packet, fields.short_name, packet.short_name)
 
-        self._parse_designators(packet, node)
-        self._parse_service_type(packet, node,
+        self._parse_designators(packet, fields)
+        self._parse_service_type(packet, fields,
                                  packet.service_type,
                                  packet.service_subtype)
-        self._parse_additional_packet_fields(packet, node)
-        packet.packet_class = pando.parser.common.parse_packet_classes(node, packet.packet_class)
+        self._parse_additional_packet_fields(packet, fields)
+        packet.packet_class = get_field(fields.packet_classes, packet.packet_class)
 
         self._parse_override_parameters(packet,
-                                        node.find("parameters"),
+                                        fields.parameters,
                                         model,
                                         reference_parameters,
                                         enumerations)
         packet.update_depth()
+
+        model.references.add_derived_packet(base_uid, packet.uid)
         return packet
 
     def _parse_derived_telemetry(self, node, model, reference_parameters, enumerations, telemetries):
+        fields = _scan(node)
         packet = self._parse_base_derived_packet(telemetries,
                                                  node,
+                                                 fields,
                                                  model,
                                                  reference_parameters,
                                                  enumerations)
 
-        packet_generation = pando.parser.common.parse_packet_generation(node)
+        packet_generation = pando.parser.common.parse_generation_node(fields.generation)
         if packet_generation:
             packet.packet_generation = packet_generation
 
         parameters = packet.get_parameters_as_flattened_list()
-        self._parse_telemetry_identification_parameter(packet, node, parameters)
+        self._parse_telemetry_identification_parameter(packet, fields, parameters)
 
         return packet
 
     def _parse_derived_telecommand(self, node, model, reference_parameters, enumerations, telemetries, telecommands):
+        fields = _scan(node)
         packet = self._parse_base_derived_packet(telecommands,
                                                  node,
+                                                 fields,
                                                  model,
                                                  reference_parameters,
                                                  enumerations)
 
-        self._parse_parameter_values(packet, node, enumerations)
-        self._parse_telecommand_verification(packet, node)
+        self._parse_parameter_values(packet, fields, enumerations)
+        self._parse_telecommand_verification(packet, fields)
 
-        critical = pando.parser.common.parse_text(node, "critical", None)
-        if critical is not None:
-            packet.critical = {"Yes": True, "No": False}[critical]
+        if fields.critical is not None:
+            packet.critical = {"Yes": True, "No": False}[fields.critical]
 
-        for telemetry_uid in node.iterfind("relevantTelemetry/telemetryRef"):
-            uid = telemetry_uid.attrib["uid"]
+        for uid in fields.relevant_telemetry:
             telemetry = telemetries[uid]
             # FIXME overwrite
             packet.relevant_telemetry.append(telemetry)
@@ -367,10 +416,13 @@ class PacketParser:
             handle_event_collection(packet, override_uid, override_parameter)
 
     @staticmethod
-    def _parse_parameter_values(packet, node, enumerations):
+    def _parse_parameter_values(packet, fields, enumerations):
+        if fields.parameter_values is None:
+            return
+
         parameters = packet.get_parameters_as_flattened_list()
 
-        for parameter_node in node.iterfind("parameterValues/parameterValue"):
+        for parameter_node in fields.parameter_values.iterchildren("parameterValue"):
             uid = parameter_node.attrib.get("uid")
 
             value, value_type, value_range = ParameterParser().parse_parameter_value(parameter_node)
@@ -395,41 +447,36 @@ class PacketParser:
                                           % (uid, packet.uid))
 
     @staticmethod
-    def _parse_designators(packet, node):
-        designators_node = node.find("designators")
-        if designators_node is not None:
-            for designator in designators_node.iterfind("designator"):
-                for index, _ in enumerate(packet.designators):
-                    if packet.designators[index]["name"] == designator.attrib["name"]:
-                        packet.designators[index]["value"] = designator.attrib["value"]
-                        break
-                else:
-                    packet.designators.append({
-                        "name":  designator.attrib["name"],
-                        "value": designator.attrib["value"],
-                    })
+    def _parse_designators(packet, fields):
+        for name, value in fields.designators:
+            for designator in packet.designators:
+                if designator["name"] == name:
+                    designator["value"] = value
+                    break
+            else:
+                packet.designators.append({
+                    "name":  name,
+                    "value": value,
+                })
 
     @staticmethod
-    def _parse_service_type(packet, node, default_type=None, default_subtype=None):
-        packet.service_type = int(node.findtext("serviceType", str(default_type)))
-        packet.service_subtype = int(node.findtext("serviceSubtype", str(default_subtype)))
+    def _parse_service_type(packet, fields, default_type=None, default_subtype=None):
+        packet.service_type = int(get_field(fields.service_type, str(default_type)))
+        packet.service_subtype = int(get_field(fields.service_subtype, str(default_subtype)))
 
     @staticmethod
-    def _parse_telecommand_verification(packet, node):
-        v = node.find("verification")
+    def _parse_telecommand_verification(packet, fields):
+        v = fields.verification
 
         if v is not None:
-            packet.verification.acceptance = True if (v.findtext("acceptance") == "true") else False
-            packet.verification.start = True if (v.findtext("start") == "true") else False
-            packet.verification.progress = True if (v.findtext("progress") == "true") else False
-            packet.verification.completion = True if (v.findtext("completion") == "true") else False
+            packet.verification.acceptance = (v.get("acceptance") == "true")
+            packet.verification.start = (v.get("start") == "true")
+            packet.verification.progress = (v.get("progress") == "true")
+            packet.verification.completion = (v.get("completion") == "true")
 
     @staticmethod
-    def _parse_telemetry_identification_parameter(packet, node, parameters):
-        for parameter_node in node.iterfind("packetIdentification/identificationParameter"):
-            value = parameter_node.attrib["value"]
-            uid = parameter_node.attrib["uid"]
-
+    def _parse_telemetry_identification_parameter(packet, fields, parameters):
+        for value, uid in fields.identification:
             for p in parameters:
                 if p.uid == uid:
                     parameter = pando.model.TelemetryIdentificationParameter(parameter=p, value=value)
@@ -441,17 +488,151 @@ class PacketParser:
             packet.identification_parameter.append(parameter)
 
     @staticmethod
-    def _parse_additional_packet_fields(packet, node):
-        for key, default_heading in [('purpose', 'Purpose'),
-                                     ('effects', 'Effects'),  # only for telecommand
-                                     ('recommendation', 'Recommendation'),
-                                     ('note', 'Note'),
-                                     ('seeAlso', 'See Also'), ]:
-            text = pando.parser.common.parse_text(node, key)
+    def _parse_additional_packet_fields(packet, fields):
+        if not fields.additional:
+            return
+
+        # Fetched only once, the texts added here are resolved on first access
+        additional = packet.additional
+        for key, default_heading in ADDITIONAL_FIELDS:
+            text = fields.additional.get(key)
             if text is not None:
-                for index, _ in enumerate(packet.additional):
-                    if packet.additional[index][0] == default_heading:
-                        packet.additional[index][1] = text
+                for entry in additional:
+                    if entry[0] == default_heading:
+                        entry[1] = text
                         break
                 else:
-                    packet.additional.append([default_heading, text])
+                    additional.append([default_heading, text])
+
+
+# Additional documentation elements of a packet and their headings. The
+# order defines the order of the entries in 'Packet.additional'.
+ADDITIONAL_FIELDS = [
+    ('purpose', 'Purpose'),
+    ('effects', 'Effects'),  # only for telecommand
+    ('recommendation', 'Recommendation'),
+    ('note', 'Note'),
+    ('seeAlso', 'See Also'),
+]
+
+
+class _PacketFields:
+    """
+    Child elements of a packet definition.
+
+    Filled in a single pass over the children of the packet node by the
+    handlers in '_PACKET_HANDLERS'. Elements which depend on each other
+    (e.g. the identification parameters on the packet parameters) are
+    evaluated afterwards in the required order.
+    """
+    __slots__ = ("description", "short_name", "designators", "service_type",
+                 "service_subtype", "additional", "packet_classes", "generation",
+                 "parameters", "identification", "parameter_values", "verification",
+                 "critical", "relevant_telemetry", "report_id", "severity")
+
+    def __init__(self):
+        self.description = None
+        self.short_name = None
+        self.designators = []
+        self.service_type = None
+        self.service_subtype = None
+        self.additional = {}
+        self.packet_classes = None
+        self.generation = None
+        self.parameters = None
+        self.identification = []
+        self.parameter_values = None
+        self.verification = None
+        self.critical = None
+        self.relevant_telemetry = []
+        self.report_id = None
+        self.severity = None
+
+
+def _handle_designators(fields, node):
+    for designator in node.iterchildren("designator"):
+        fields.designators.append((designator.attrib["name"], designator.attrib["value"]))
+
+
+def _handle_service_type(fields, node):
+    fields.service_type = node.text or ""
+
+
+def _handle_service_subtype(fields, node):
+    fields.service_subtype = node.text or ""
+
+
+def _handle_additional(fields, node):
+    fields.additional[node.tag] = pando.parser.common.lazy_text(node)
+
+
+def _handle_packet_classes(fields, node):
+    packet_classes = [pando.parser.common.intern(n.text) for n in node.iterchildren("class")]
+    if packet_classes:
+        fields.packet_classes = packet_classes
+
+
+def _handle_generation(fields, node):
+    fields.generation = node
+
+
+def _handle_parameters(fields, node):
+    fields.parameters = node
+
+
+def _handle_identification(fields, node):
+    for parameter_node in node.iterchildren("identificationParameter"):
+        fields.identification.append((parameter_node.attrib["value"], parameter_node.attrib["uid"]))
+
+
+def _handle_parameter_values(fields, node):
+    fields.parameter_values = node
+
+
+def _handle_verification(fields, node):
+    fields.verification = {n.tag: n.text or "" for n in node}
+
+
+def _handle_critical(fields, node):
+    fields.critical = pando.parser.common.dedent(node.text or "")
+
+
+def _handle_relevant_telemetry(fields, node):
+    for telemetry_node in node.iterchildren("telemetryRef"):
+        fields.relevant_telemetry.append(telemetry_node.attrib["uid"])
+
+
+def _handle_report_id(fields, node):
+    fields.report_id = node.text or ""
+
+
+def _handle_severity(fields, node):
+    fields.severity = node.text or ""
+
+
+_PACKET_HANDLERS = {
+    "description": handle_description,
+    "shortName": handle_short_name,
+    "designators": _handle_designators,
+    "serviceType": _handle_service_type,
+    "serviceSubtype": _handle_service_subtype,
+    "packetClasses": _handle_packet_classes,
+    "generation": _handle_generation,
+    "parameters": _handle_parameters,
+    "packetIdentification": _handle_identification,
+    "parameterValues": _handle_parameter_values,
+    "verification": _handle_verification,
+    "critical": _handle_critical,
+    "relevantTelemetry": _handle_relevant_telemetry,
+    "reportId": _handle_report_id,
+    "severity": _handle_severity,
+    "purpose": _handle_additional,
+    "effects": _handle_additional,
+    "recommendation": _handle_additional,
+    "note": _handle_additional,
+    "seeAlso": _handle_additional,
+}
+
+
+def _scan(node):
+    return pando.parser.common.scan_children(node, _PACKET_HANDLERS, _PacketFields())
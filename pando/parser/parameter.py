@@ -18,7 +18,7 @@ import lxml
 import pando.model
 import pando.parser.common
 
-from .common import ParserException
+from .common import ParserException, get_field, set_short_name, handle_description, handle_short_name
 from .calibration import CalibrationParser
 
 
@@ -33,8 +33,11 @@ class ParameterParser:
         """
         for parameters_node in service_node.iterfind('parameters'):
             for node in parameters_node.iterchildren():
-                self.parse_parameter(node, m, m.parameters, m.enumerations)
+                parameters = self.parse_parameter(node, m, m.parameters, m.enumerations)
                 # Parameter is automatically added to the list of parameters
+                if parameters is not None:
+                    for parameter in parameters:
+                        m.references.add_parameter(parameter)
 
     def parse_parameters(self, packet, node, m, reference_parameters, enumerations):
         for parameter_node in node:
@@ -46,21 +49,31 @@ class ParameterParser:
 
     def parse_parameter(self, node, model, reference_parameters, enumerations):
         parameters = []
-        uid = node.attrib.get("uid", "")
-        if node.tag == "parameter" or node.tag == "repeater":
+        tag = node.tag
+        if tag == "parameterRef":
+            # The parameter needs to be copied here. Otherwise the reference
+            # parameter might be changed when we later assign fixed/default
+            # values to parameters in the telecommand.
+            parameter = copy.deepcopy(reference_parameters[node.attrib["uid"]])
+            parameters.append(parameter)
+            return parameters
+
+        uid = pando.parser.common.intern(node.attrib.get("uid", ""))
+        if tag == "parameter" or tag == "repeater":
+            fields = _scan(node)
             name = node.attrib.get("name")
-            description = pando.parser.common.parse_description(node)
+            description = get_field(fields.description, "")
 
             parameter_type = self._parse_type(node)
-            if node.tag == "parameter":
+            if tag == "parameter":
                 parameter = pando.model.Parameter(name=name,
                                                   uid=uid,
                                                   description=description,
                                                   parameter_type=parameter_type)
 
-                parameter.unit = node.attrib.get("unit")
+                parameter.unit = pando.parser.common.intern(node.attrib.get("unit"))
 
-                calibration_node = node.find("calibration")
+                calibration_node = fields.calibration
                 if calibration_node is not None:
                     calibration_ref_node = calibration_node.find('calibrationRef')
                     if calibration_ref_node is not None:
@@ -71,30 +84,32 @@ class ParameterParser:
 
                     parameter.calibration = model.calibrations[uid]
 
-                self._parse_parameter_limits(node, parameter, parameter.calibration)
+                self._parse_parameter_limits(fields.limits, parameter, parameter.calibration)
 
-            elif node.tag == "repeater":
+            elif tag == "repeater":
                 parameter = pando.model.Repeater(name=name,
                                                  uid=uid,
                                                  description=description,
                                                  parameter_type=parameter_type)
-                self.parse_parameters(parameter, node, model, reference_parameters, enumerations)
+                self.parse_parameters(parameter, fields.members, model, reference_parameters, enumerations)
 
-            pando.parser.common.parse_short_name(parameter, node)
-            self._parse_and_update_byte_order(node, parameter)
+            set_short_name(parameter, fields.short_name)
+            self._update_byte_order(fields.byte_order, parameter)
 
-            value, value_type, value_range = self.parse_parameter_value(node)
+            value, value_type, value_range = self._parameter_value(fields)
             if value_type is not None:
                 parameter.value = value
                 parameter.value_type = value_type
                 parameter.value_range = value_range
 
+            parameter.source = pando.parser.common.parse_source(node)
             reference_parameters[parameter.uid] = parameter
             parameters.append(parameter)
-        elif node.tag == "enumerationParameter":
+        elif tag == "enumerationParameter":
+            fields = _scan(node)
             name = node.attrib.get("name")
-            description = pando.parser.common.parse_description(node)
-            enum_name = node.attrib.get("enumeration")
+            description = get_field(fields.description, "")
+            enum_name = pando.parser.common.intern(node.attrib.get("enumeration"))
 
             parameter_type = pando.model.EnumerationType(enumerations[enum_name].width, enum_name)
             parameter = pando.model.Parameter(name=name,
@@ -102,10 +117,10 @@ class ParameterParser:
                                               description=description,
                                               parameter_type=parameter_type)
 
-            pando.parser.common.parse_short_name(parameter, node)
-            self._parse_and_update_byte_order(node, parameter)
+            set_short_name(parameter, fields.short_name)
+            self._update_byte_order(fields.byte_order, parameter)
 
-            value, value_type, value_range = self.parse_parameter_value(node)
+            value, value_type, value_range = self._parameter_value(fields)
             if value_type is not None:
                 if value_type == pando.model.Parameter.RANGE:
                     raise ParserException("Invalid value definition for enumeration '%s'. " \
@@ -121,35 +136,32 @@ class ParameterParser:
                 parameter.value_type = value_type
                 parameter.value_range = value_range
 
+            parameter.source = pando.parser.common.parse_source(node)
             reference_parameters[parameter.uid] = parameter
             parameters.append(parameter)
-        elif node.tag == "list":
+        elif tag == "list":
+            fields = _scan(node)
             name = node.attrib.get("name")
-            uid = node.attrib.get("uid")
-            description = pando.parser.common.parse_description(node)
+            uid = pando.parser.common.intern(node.attrib.get("uid"))
+            description = get_field(fields.description, "")
 
             parameter = pando.model.List(name=name, uid=uid, description=description)
-            self.parse_parameters(parameter, node, model, reference_parameters, enumerations)
+            self.parse_parameters(parameter, fields.members, model, reference_parameters, enumerations)
 
+            parameter.source = pando.parser.common.parse_source(node)
             reference_parameters[parameter.uid] = parameter
             parameters.append(parameter)
-        elif node.tag == "parameterRef":
-            # The parameter needs to be copied here. Otherwise the reference
-            # parameter might be changed when we later assign fixed/default
-            # values to parameters in the telecommand.
-            parameter = copy.deepcopy(reference_parameters[uid])
-            parameters.append(parameter)
-        elif node.tag == lxml.etree.Comment:
+        elif tag == lxml.etree.Comment:
             return None
-        elif node.tag in ["description", "shortName", "byteOrder"]:
+        elif tag in ["description", "shortName", "byteOrder"]:
             # Description tags are already parsed for the repeater tags in their
             # handler. Nothing to do here.
             return None
-        elif node.tag in ["fixed", "default", "range"]:
+        elif tag in ["fixed", "default", "range"]:
             return None
         else:
             raise ParserException("Unknown element '%s' found. Was expecting " \
-                                  "'byteOrder|parameter|repeater|enumerationParameter|parameterRef'" % node.tag)
+                                  "'byteOrder|parameter|repeater|enumerationParameter|parameterRef'" % tag)
 
         return parameters
 
@@ -198,7 +210,7 @@ class ParameterParser:
         return parameter_type
 
     @staticmethod
-    def _parse_parameter_limits(parameter_node, parameter, calibration):
+    def _parse_parameter_limits(limits_node, parameter, calibration):
         """
         Parse the telemetry parameter limits.
 
@@ -206,7 +218,6 @@ class ParameterParser:
         because the output type of the calibration is required if the limit
         input depends on the calibrated parameter value.
         """
-        limits_node = parameter_node.find('limits')
         if limits_node is not None:
             sample_count = int(limits_node.attrib["samples"], 0)
             if limits_node.attrib["input"] == "calibrated":
@@ -259,32 +270,105 @@ class ParameterParser:
 
     @staticmethod
     def parse_parameter_value(node):
+        return ParameterParser._parameter_value(_scan(node))
+
+    @staticmethod
+    def _parameter_value(fields):
         value = None
         value_type = None
         value_range = None
 
-        for tag in ["fixed", "default", "range"]:
-            value_node = node.find(tag)
-            if value_node is not None:
-                if value_node.tag == "fixed":
-                    value = value_node.attrib.get("value")
-                    value_type = pando.model.Parameter.FIXED
-                elif value_node.tag == "default":
-                    value = value_node.attrib.get("value")
-                    value_type = pando.model.Parameter.DEFAULT
-                elif value_node.tag == "range":
-                    value = value_node.attrib.get("default", None)
-                    value_type = pando.model.Parameter.RANGE
-                    value_range = pando.model.ParameterValueRange(
-                        minimum=value_node.attrib.get("min"),
-                        maximum=value_node.attrib.get("max"))
+        if fields.fixed is not None:
+            value = fields.fixed.attrib.get("value")
+            value_type = pando.model.Parameter.FIXED
+        if fields.default is not None:
+            value = fields.default.attrib.get("value")
+            value_type = pando.model.Parameter.DEFAULT
+        if fields.range is not None:
+            value = fields.range.attrib.get("default", None)
+            value_type = pando.model.Parameter.RANGE
+            value_range = pando.model.ParameterValueRange(
+                minimum=fields.range.attrib.get("min"),
+                maximum=fields.range.attrib.get("max"))
 
         return (value, value_type, value_range)
 
     @staticmethod
-    def _parse_and_update_byte_order(node, parameter):
-        for byte_order_node in node.findall("byteOrder"):
+    def _update_byte_order(byte_order, parameter):
+        if byte_order is not None:
             parameter.byte_order = {
                 "big-endian": pando.model.ByteOrder.BIG_ENDIAN,
                 "little-endian": pando.model.ByteOrder.LITTLE_ENDIAN,
-            }[byte_order_node.text]
+            }[byte_order]
+
+
+class _ParameterFields:
+    """
+    Child elements of a parameter definition.
+
+    Filled in a single pass over the children of the parameter node by
+    the handlers in '_PARAMETER_HANDLERS'. The member parameters of lists
+    and repeaters are collected in document order.
+    """
+    __slots__ = ("description", "short_name", "byte_order", "fixed", "default",
+                 "range", "calibration", "limits", "members")
+
+    def __init__(self):
+        self.description = None
+        self.short_name = None
+        self.byte_order = None
+        self.fixed = None
+        self.default = None
+        self.range = None
+        self.calibration = None
+        self.limits = None
+        self.members = []
+
+
+def _handle_byte_order(fields, node):
+    fields.byte_order = node.text
+
+
+def _handle_fixed(fields, node):
+    fields.fixed = node
+
+
+def _handle_default(fields, node):
+    fields.default = node
+
+
+def _handle_range(fields, node):
+    fields.range = node
+
+
+def _handle_calibration(fields, node):
+    fields.calibration = node
+
+
+def _handle_limits(fields, node):
+    fields.limits = node
+
+
+def _handle_member(fields, node):
+    fields.members.append(node)
+
+
+_PARAMETER_HANDLERS = {
+    "description": handle_description,
+    "shortName": handle_short_name,
+    "byteOrder": _handle_byte_order,
+    "fixed": _handle_fixed,
+    "default": _handle_default,
+    "range": _handle_range,
+    "calibration": _handle_calibration,
+    "limits": _handle_limits,
+    "parameter": _handle_member,
+    "enumerationParameter": _handle_member,
+    "repeater": _handle_member,
+    "list": _handle_member,
+    "parameterRef": _handle_member,
+}
+
+
+def _scan(node):
+    return pando.parser.common.scan_children(node, _PARAMETER_HANDLERS, _ParameterFields())
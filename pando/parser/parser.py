@@ -19,13 +19,18 @@ Reads the description from a set of XML files and populates the model with
 the result.
 """
 
+import os
+import copy
+import pathlib
+import hashlib
+
 from .. import pkg
 
 # lxml must be imported **after** the Catalog file have been set by 'pkg', otherwise
 # it runs into an endless loop during verification.
 import lxml.etree
 
-from .common import ParserException
+from .common import ParserException, url_to_path, parse_packet_classes
 from .calibration import CalibrationParser
 from .enumeration import EnumerationParser
 from .parameter import ParameterParser
@@ -33,6 +38,115 @@ from .packet import PacketParser
 from .mapping import MappingParser
 
 import pando.model
+import pando.model.projection
+
+XINCLUDE = "{http://www.w3.org/2001/XInclude}include"
+XML_BASE = "{http://www.w3.org/XML/1998/namespace}base"
+
+# Compiled schemas, indexed by the filename of the schema
+_schemas = {}
+
+
+def load_schema(xsdfile=None):
+    """
+    Load and compile a XML schema.
+
+    The compiled schema is kept for later calls, processes forked after
+    the first call share it.
+    """
+    if xsdfile is None:
+        xsdfile = pkg.get_filename('pando', 'resources/schema/pando.xsd')
+
+    schema = _schemas.get(xsdfile)
+    if schema is None:
+        parser = lxml.etree.XMLParser(no_network=True)
+        schema = lxml.etree.XMLSchema(lxml.etree.parse(xsdfile, parser=parser))
+        _schemas[xsdfile] = schema
+    return schema
+
+
+class FragmentCache:
+    """
+    XML files included via XInclude, indexed by their content hash.
+
+    Several root files including the same service files (e.g. variants of
+    a mission database) share the parsed XML trees. Every user gets a
+    copy of the cached tree. Included files which contain XInclude
+    elements themselves and includes using 'parse', 'xpointer' or a
+    fallback are left to lxml.
+    """
+
+    def __init__(self):
+        # (content hash, lean) -> root element or None if not cacheable
+        self._fragments = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._fragments)
+
+    def include(self, xmlroot, parser, lean=False):
+        """
+        Replace all cacheable XInclude elements in a tree.
+
+        Remaining XInclude elements have to be processed by lxml.
+        """
+        for node in list(xmlroot.iter(XINCLUDE)):
+            href = node.attrib.get("href")
+            if href is None or len(node.attrib) != 1 or len(node) != 0:
+                continue
+
+            filename = os.path.join(os.path.dirname(url_to_path(node.base) or ""),
+                                    url_to_path(href))
+            fragment = self._load(filename, parser, lean)
+            if fragment is None:
+                continue
+
+            fragment = copy.deepcopy(fragment)
+            fragment.set(XML_BASE, filename)
+            fragment.tail = node.tail
+            node.getparent().replace(node, fragment)
+
+    def add_includes(self, filename, lean=False):
+        """
+        Load all files included by the given file into the cache.
+        """
+        parser = Parser._xml_parser(lean)
+        try:
+            xmlroot = lxml.etree.parse(filename, parser=parser)
+        except (OSError, lxml.etree.XMLSyntaxError):
+            # Reported when the file itself is parsed
+            return
+        self.include(xmlroot, parser, lean)
+
+    def _load(self, filename, parser, lean):
+        try:
+            with open(filename, 'rb') as file:
+                content = file.read()
+        except OSError:
+            return None
+
+        key = (hashlib.sha1(content).hexdigest(), lean)
+        try:
+            fragment = self._fragments[key]
+            self.hits += 1
+            return fragment
+        except KeyError:
+            self.misses += 1
+
+        try:
+            fragment = lxml.etree.fromstring(content, parser=parser, base_url=filename)
+        except lxml.etree.XMLSyntaxError:
+            fragment = None
+
+        if fragment is not None:
+            if fragment.tag == XINCLUDE or fragment.find(".//" + XINCLUDE) is not None:
+                fragment = None
+            elif lean:
+                lxml.etree.strip_tags(fragment, lxml.etree.Comment)
+
+        self._fragments[key] = fragment
+        return fragment
 
 
 class Parser:
@@ -40,8 +154,60 @@ class Parser:
     ROOTNODE = "pando"
     DATA_STRUCTURE_VERSION = "1.3.0"
 
-    def parse(self, filename, xsdfile=None):
-        rootnode = self._validate_and_parse_xml(filename, xsdfile)
+    # Load all fields of the model
+    PROFILE_FULL = 0
+    # Only load the fields required to decode and encode packets
+    PROFILE_RUNTIME = 1
+
+    def __init__(self, fragments=None):
+        """
+        Keyword arguments:
+        fragments -- FragmentCache used to share included files between
+                     several calls of parse().
+        """
+        self.fragments = fragments
+
+    def parse(self, filename, xsdfile=None, lean=False, profile=PROFILE_FULL,
+              subsystems=None, apids=None, packet_classes=None):
+        """
+        Parse a packet description file.
+
+        Keyword arguments:
+        filename -- XML file to parse
+        xsdfile -- Schema file to validate against. Uses the packaged
+                   schema if not set.
+        lean -- Reduce the memory footprint while parsing. Comments and
+                blank text are dropped when reading the file and every
+                section of the XML tree is released as soon as it has
+                been transferred into the model.
+        profile -- With PROFILE_RUNTIME the documentation elements are
+                   removed before the model is created. The result is
+                   equal to pando.model.projection.runtime_projection()
+                   of the full model.
+        subsystems -- Only load the mappings of the given subsystem
+                      identifiers.
+        apids -- Only load the application mappings with the given APIDs.
+        packet_classes -- Only load packet mappings which have at least one
+                          of the given packet classes.
+
+        If any of the filters is set, packets not needed for the selected
+        mappings are not parsed. Parameters, enumerations and
+        calibrations not used by the remaining packets are removed
+        afterwards.
+        """
+        rootnode = self._validate_and_parse_xml(filename, xsdfile, lean, self.fragments)
+        if profile == self.PROFILE_RUNTIME:
+            lxml.etree.strip_elements(rootnode, *pando.model.projection.DOCUMENTATION_TAGS,
+                                      with_tail=False)
+
+        filtered = subsystems is not None or apids is not None or packet_classes is not None
+        if filtered:
+            subsystems = None if subsystems is None else set(subsystems)
+            apids = None if apids is None else set(apids)
+            packet_classes = None if packet_classes is None else set(packet_classes)
+            packet_uids = self._collect_packet_uids(rootnode, subsystems, apids, packet_classes)
+        else:
+            packet_uids = None
 
         model = pando.model.Model()
 
@@ -50,33 +216,150 @@ class Parser:
         parameter = ParameterParser()
         packet = PacketParser()
 
-        for service_node in rootnode.iterfind('service'):
+        service_nodes = list(rootnode.iterfind('service'))
+        for service_node in service_nodes:
             enumeration.parse_service_enumeration(service_node, model)
             calibration.parse_service_calibration(service_node, model)
             parameter.parse_service_parameter(service_node, model)
+            if lean:
+                self._release(service_node, ['enumerations', 'calibrations', 'parameters'])
 
-        for service_node in rootnode.iterfind('service'):
-            packet.parse_service_packets(service_node, model)
+        for service_node in service_nodes:
+            packet.parse_service_telemetries(service_node, model, packet_uids)
+            if lean:
+                self._release(service_node, ['events', 'telemetries'])
 
-        mapping = MappingParser()
+        for service_node in service_nodes:
+            packet.parse_service_telecommands(service_node, model, packet_uids)
+            if lean:
+                self._release(service_node, ['telecommands'])
+                rootnode.remove(service_node)
+
+        mapping = MappingParser(subsystems, apids, packet_classes)
         mapping.parse(rootnode, model)
 
+        if filtered:
+            pando.model.projection.prune_unmapped(model)
+
+        if profile == self.PROFILE_RUNTIME:
+            # Derived packets and enumerations inherit the short name of
+            # their base, which is the name of the base without the
+            # shortName elements
+            for packet in list(model.telemetries.values()) + list(model.telecommands.values()):
+                packet.short_name = packet.name
+            for enumeration in model.enumerations.values():
+                enumeration.short_name = enumeration.name
+
         return model
 
     @staticmethod
-    def _validate_and_parse_xml(filename, xsdfile):
+    def _collect_packet_uids(rootnode, subsystems, apids, packet_classes=None):
+        """
+        Find the uids of all packets required for the selected mappings.
+
+        Includes the base packets of derived packets and the telemetry
+        packets referenced by telecommands.
+        """
+        packet_nodes = {}
+        for service_node in rootnode.iterfind('service'):
+            for section in ['events', 'telemetries', 'telecommands']:
+                for node in service_node.iterfind(section + '/*'):
+                    if isinstance(node.tag, str):
+                        packet_nodes[node.attrib["uid"]] = node
+
+        def get_default_packet_classes(uid):
+            # Packet classes of the packet definition, derived packets
+            # inherit the classes of their base packet
+            node = packet_nodes.get(uid)
+            while node is not None:
+                classes = parse_packet_classes(node)
+                if classes is not None:
+                    return classes
+                node = packet_nodes.get(node.attrib.get("extends"))
+            return None
+
+        uids = set()
+        for mapping_node in rootnode.iterfind('mapping'):
+            if subsystems is not None and int(mapping_node.attrib["subsystem"], 0) not in subsystems:
+                continue
+            for application_node in mapping_node.iterfind('application'):
+                if apids is not None and int(application_node.attrib["apid"], 0) not in apids:
+                    continue
+                for path in ['events/event', 'telemetries/telemetry', 'telecommands/telecommandMappingRef']:
+                    for node in application_node.iterfind(path):
+                        uid = node.attrib["uid"]
+                        if packet_classes is not None:
+                            classes = parse_packet_classes(
+                                node, get_default_packet_classes(uid))
+                            if classes is None or not any(c in packet_classes for c in classes):
+                                continue
+                        uids.add(uid)
+
+        queue = list(uids)
+        while queue:
+            node = packet_nodes.get(queue.pop())
+            if node is None:
+                continue
+
+            dependencies = [n.attrib["uid"] for n in node.iterfind("relevantTelemetry/telemetryRef")]
+            if "extends" in node.attrib:
+                dependencies.append(node.attrib["extends"])
+            for uid in dependencies:
+                if uid not in uids:
+                    uids.add(uid)
+                    queue.append(uid)
+        return uids
+
+    @staticmethod
+    def _release(node, tags):
+        """
+        Remove the given sections from an element to free their memory.
+        """
+        for child in list(node):
+            if child.tag in tags:
+                child.clear()
+                node.remove(child)
+
+    @staticmethod
+    def _absolute_includes(xmlroot):
+        """
+        Use absolute file URLs for all XInclude references.
+
+        libxml2 only adds a 'xml:base' attribute to the included elements
+        if the file is located in a different directory than the including
+        file. With 'file://' URLs the attribute is always added and the
+        source file of every element is available through its 'base'.
+        """
+        for node in xmlroot.iter(XINCLUDE):
+            href = node.attrib.get("href")
+            if href is not None and "://" not in href:
+                path = os.path.join(os.path.dirname(url_to_path(node.base) or ""), href)
+                node.set("href", pathlib.Path(os.path.abspath(path)).as_uri())
+
+    @staticmethod
+    def _xml_parser(lean=False):
+        if lean:
+            return lxml.etree.XMLParser(no_network=True,
+                                        remove_comments=True,
+                                        remove_blank_text=True)
+        else:
+            return lxml.etree.XMLParser(no_network=True)
+
+    @staticmethod
+    def _validate_and_parse_xml(filename, xsdfile, lean=False, fragments=None):
         try:
             # parse the xml-file
-            parser = lxml.etree.XMLParser(no_network=True)
+            parser = Parser._xml_parser(lean)
             xmlroot = lxml.etree.parse(filename, parser=parser)
+            Parser._absolute_includes(xmlroot)
+            if fragments is not None:
+                fragments.include(xmlroot, parser, lean)
             xmlroot.xinclude()
+            if lean:
+                # Comments from included files are not removed by the parser
+                lxml.etree.strip_tags(xmlroot, lxml.etree.Comment)
 
-            if xsdfile is None:
-                xsdfile = pkg.get_filename('pando', 'resources/schema/pando.xsd')
-
-            xmlschema = lxml.etree.parse(xsdfile, parser=parser)
-
-            schema = lxml.etree.XMLSchema(xmlschema)
+            schema = load_schema(xsdfile)
             schema.assertValid(xmlroot)
 
             rootnode = xmlroot.getroot()
@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2017, German Aerospace Center (DLR)
+#
+# This file is part of the development version of the pando library.
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Authors:
+# - 2017, Fabian Greif (DLR RY-AVS)
+
+"""
+Loader for databases written by pando.builder.sqlite.SqliteBuilder.
+
+Rebuilds the model without XML parsing and schema validation. Derived
+packets and enumerations are already resolved in the database.
+"""
+
+import os
+import copy
+import sqlite3
+import datetime
+import collections
+
+import pando.model
+
+from .common import ParserException
+
+
+class SqliteParser:
+
+    SCHEMA_VERSION = "1"
+
+    def parse(self, filename):
+        if not os.path.isfile(filename):
+            raise ParserException("Database '%s' not found" % filename)
+
+        connection = sqlite3.connect(filename)
+        try:
+            self._check_version(connection, filename)
+
+            model = pando.model.Model()
+            self._parse_enumerations(connection, model)
+            self._parse_calibrations(connection, model)
+            self._parse_parameters(connection, model)
+            self._parse_packets(connection, model)
+            self._parse_mappings(connection, model)
+
+            for parameter in model.parameters.values():
+                model.references.add_parameter(parameter)
+            for subsystem in model.subsystems.values():
+                model.references.add_subsystem(subsystem)
+        except sqlite3.Error as error:
+            raise ParserException("While reading '%s': %s" % (filename, error))
+        finally:
+            connection.close()
+
+        return model
+
+    def _check_version(self, connection, filename):
+        info = dict(connection.execute("SELECT key, value FROM info"))
+        version = info.get("schema_version")
+        if version != self.SCHEMA_VERSION:
+            raise ParserException("Invalid database version. Loader requires '{}' "
+                                  "but '{}' uses '{}'"
+                                  .format(self.SCHEMA_VERSION, filename, version))
+
+    @staticmethod
+    def _group(connection, query):
+        """
+        Group the rows of a query by their first column.
+
+        The remaining columns are stored in the order returned by the query.
+        """
+        groups = collections.defaultdict(list)
+        for row in connection.execute(query):
+            groups[row[0]].append(row[1:])
+        return groups
+
+    def _parse_enumerations(self, connection, model):
+        entries = self._group(connection,
+                              "SELECT enumeration_uid, name, value, description, short_name "
+                              "FROM enumeration_entries ORDER BY enumeration_uid, position")
+
+        for uid, name, width, description, short_name in \
+                connection.execute("SELECT uid, name, width, description, short_name "
+                                   "FROM enumerations ORDER BY rowid"):
+            enumeration = pando.model.Enumeration(name, uid, width, description)
+            enumeration.short_name = short_name
+            for entry_name, value, entry_description, entry_short_name in entries[uid]:
+                entry = pando.model.EnumerationEntry(entry_name, value, entry_description)
+                entry.short_name = entry_short_name
+                enumeration.append_entry(entry)
+            model.enumerations[uid] = enumeration
+
+    def _parse_calibrations(self, connection, model):
+        points = self._group(connection,
+                             "SELECT calibration_uid, x, y FROM calibration_points "
+                             "ORDER BY calibration_uid, position")
+
+        for row in connection.execute("SELECT uid, type, name, description, unit, "
+                                      "input_type, output_type, extrapolate, "
+                                      "a0, a1, a2, a3, a4 FROM calibrations ORDER BY rowid"):
+            uid, type_, name, description, unit = row[:5]
+            if type_ == pando.model.Calibration.POLYNOM:
+                calibration = pando.model.Polynom(name, uid, description)
+                calibration.a0, calibration.a1, calibration.a2, calibration.a3, calibration.a4 = row[8:]
+            else:
+                calibration = pando.model.Interpolation(type_, name, uid, description)
+                calibration.input_type, calibration.output_type = row[5:7]
+                calibration.extrapolate = bool(row[7])
+                for x, y in points[uid]:
+                    calibration.append_point(pando.model.Interpolation.Point(x, y))
+            calibration.unit = unit
+            model.calibrations[uid] = calibration
+
+    @staticmethod
+    def _set_value(parameter, value, value_type, range_min, range_max):
+        parameter.value = value
+        parameter.value_type = value_type
+        if range_min is not None or range_max is not None:
+            parameter.value_range = pando.model.ParameterValueRange(minimum=range_min,
+                                                                    maximum=range_max)
+        else:
+            parameter.value_range = None
+
+    def _parse_parameters(self, connection, model):
+        checks = self._group(connection,
+                             "SELECT parameter_uid, limit_type, lower_limit, upper_limit, description, "
+                             "validity_parameter_sid, validity_parameter_value "
+                             "FROM limit_checks ORDER BY parameter_uid, position")
+        limits = {}
+        for uid, input_type, value_type, samples in \
+                connection.execute("SELECT parameter_uid, input, value_type, samples FROM limits"):
+            limit = pando.model.Limits(input_type, value_type, samples)
+            for limit_type, lower, upper, description, sid, value in checks[uid]:
+                check = pando.model.Check(limit_type, lower, upper, description)
+                check.validity_parameter_sid = sid
+                check.validity_parameter_value = value
+                limit.checks.append(check)
+            limits[uid] = limit
+
+        for row in connection.execute("SELECT uid, kind, name, description, short_name, type, "
+                                      "width, enumeration_uid, byte_order, unit, calibration_uid, "
+                                      "value, value_type, range_min, range_max "
+                                      "FROM parameters ORDER BY rowid"):
+            uid, kind, name, description, short_name, type_, width, enumeration_uid = row[:8]
+            if kind == "list":
+                parameter = pando.model.List(name=name, uid=uid, description=description)
+            else:
+                if type_ == pando.model.ParameterType.ENUMERATION:
+                    parameter_type = pando.model.EnumerationType(width, enumeration_uid)
+                else:
+                    parameter_type = pando.model.ParameterType(type_, width)
+
+                cls = pando.model.Repeater if kind == "repeater" else pando.model.Parameter
+                parameter = cls(name=name, uid=uid, description=description,
+                                parameter_type=parameter_type)
+                parameter.short_name = short_name
+                parameter.byte_order = row[8]
+                parameter.unit = row[9]
+                if row[10] is not None:
+                    parameter.calibration = model.calibrations[row[10]]
+                parameter.limits = limits.get(uid)
+                self._set_value(parameter, *row[11:])
+            model.parameters[uid] = parameter
+
+        for uid, members in self._group(connection,
+                                        "SELECT collection_uid, parameter_uid FROM parameter_members "
+                                        "ORDER BY collection_uid, position").items():
+            collection = model.parameters[uid]
+            for (member_uid,) in members:
+                collection.append_parameter(model.parameters[member_uid])
+
+    @staticmethod
+    def _instantiate(definition):
+        """
+        Create the packet specific copy of a parameter definition.
+
+        Shares everything with the definition except the values and the
+        list of collection members.
+        """
+        parameter = copy.copy(definition)
+        if parameter.is_collection:
+            parameter.parameters = []
+        return parameter
+
+    @staticmethod
+    def _to_packet_generation(event, periodic, response, interval):
+        if event is None:
+            return None
+        packet_generation = pando.model.PacketGeneration(event=bool(event),
+                                                         periodic=bool(periodic),
+                                                         response=bool(response))
+        packet_generation.periodic_interval = datetime.timedelta(seconds=interval)
+        return packet_generation
+
+    def _parse_packets(self, connection, model):
+        packet_classes = self._group(connection,
+                                     "SELECT packet_uid, class FROM packet_classes "
+                                     "ORDER BY packet_uid, position")
+        designators = self._group(connection,
+                                  "SELECT packet_uid, name, value FROM packet_designators "
+                                  "ORDER BY packet_uid, position")
+        additional = self._group(connection,
+                                 "SELECT packet_uid, heading, text FROM packet_additional "
+                                 "ORDER BY packet_uid, position")
+        identification = self._group(connection,
+                                     "SELECT packet_uid, parameter_uid, value FROM packet_identification "
+                                     "ORDER BY packet_uid, position")
+        relevant = self._group(connection,
+                               "SELECT telecommand_uid, telemetry_uid FROM relevant_telemetry "
+                               "ORDER BY telecommand_uid, position")
+        packet_parameters = self._group(connection,
+                                        "SELECT packet_uid, parent, parameter_uid, "
+                                        "value, value_type, range_min, range_max "
+                                        "FROM packet_parameters ORDER BY packet_uid, position")
+
+        telecommands = []
+        for row in connection.execute("SELECT * FROM packets ORDER BY rowid"):
+            uid, packet_type, name, description, short_name, service_type, service_subtype = row[:7]
+            if packet_type == pando.model.Packet.TELECOMMAND:
+                packet = pando.model.Telecommand(name, uid, description)
+                packet.critical = bool(row[7])
+                verification = packet.verification
+                verification.acceptance, verification.start, verification.progress, \
+                    verification.completion = [bool(v) for v in row[8:12]]
+                telecommands.append(packet)
+            elif packet_type == pando.model.Packet.EVENT:
+                packet = pando.model.Event(name, uid, description)
+                packet.report_id = row[12]
+                packet.severity = row[13]
+            else:
+                packet = pando.model.Telemetry(name, uid, description)
+
+            packet.short_name = short_name
+            packet.service_type = service_type
+            packet.service_subtype = service_subtype
+
+            classes = packet_classes.get(uid)
+            packet.packet_class = [c for (c,) in classes] if classes else None
+            packet.designators = [{"name": n, "value": v} for n, v in designators[uid]]
+            packet.additional = [[heading, text] for heading, text in additional[uid]]
+
+            self._parse_packet_parameters(packet, packet_parameters[uid], model)
+
+            if packet_type == pando.model.Packet.TELECOMMAND:
+                model.append_telecommand_packet(packet)
+            else:
+                packet.packet_generation = self._to_packet_generation(*row[14:18])
+
+                flattened = {p.uid: p for p in packet.get_parameters_as_flattened_list()}
+                for parameter_uid, value in identification[uid]:
+                    packet.identification_parameter.append(
+                        pando.model.TelemetryIdentificationParameter(parameter=flattened[parameter_uid],
+                                                                     value=value))
+                model.append_telemetry_packet(packet)
+
+        for packet in telecommands:
+            for (telemetry_uid,) in relevant[packet.uid]:
+                packet.relevant_telemetry.append(model.telemetries[telemetry_uid])
+
+    def _parse_packet_parameters(self, packet, rows, model):
+        parameters = []
+        for parent, parameter_uid, value, value_type, range_min, range_max in rows:
+            parameter = self._instantiate(model.parameters[parameter_uid])
+            if parameter.is_parameter:
+                self._set_value(parameter, value, value_type, range_min, range_max)
+
+            if parent is None:
+                packet.append_parameter(parameter)
+            else:
+                parameters[parent].append_parameter(parameter)
+            parameters.append(parameter)
+
+        if packet.packet_type == pando.model.Packet.EVENT:
+            # The report identifier is always the first parameter and is not
+            # part of the event parameters.
+            for parameter in packet.get_parameters()[1:]:
+                packet.append_event_parameter(parameter)
+            packet.update_event_parameter_depth()
+
+        packet.update_depth()
+
+    def _parse_mappings(self, connection, model):
+        for identifier, name, description in \
+                connection.execute("SELECT id, name, description FROM subsystems ORDER BY rowid"):
+            subsystem = model.get_or_add_subsystem(identifier, name)
+            subsystem.description = description
+
+        for subsystem_id, direction, sid, uid in \
+                connection.execute("SELECT * FROM enumeration_mappings ORDER BY rowid"):
+            subsystem = model.subsystems[subsystem_id]
+            mappings = subsystem.telemetry_enumerations if direction == "TM" \
+                else subsystem.telecommand_enumerations
+            mappings[uid] = pando.model.EnumerationMapping(sid=sid,
+                                                           enumeration=model.enumerations[uid],
+                                                           subsystem=subsystem)
+
+        for subsystem_id, direction, sid, uid in \
+                connection.execute("SELECT * FROM calibration_mappings ORDER BY rowid"):
+            subsystem = model.subsystems[subsystem_id]
+            mappings = subsystem.telemetry_calibrations if direction == "TM" \
+                else subsystem.telecommand_calibrations
+            mappings[uid] = pando.model.CalibrationMapping(sid=sid,
+                                                           calibration=model.calibrations[uid],
+                                                           subsystem=subsystem)
+
+        for subsystem_id, sid, uid in \
+                connection.execute("SELECT * FROM telecommand_parameter_mappings ORDER BY rowid"):
+            model.subsystems[subsystem_id].telecommand_parameters[uid] = \
+                pando.model.ParameterMapping(sid=sid, parameter=model.parameters[uid])
+
+        for apid, subsystem_id, name, description, prefix, suffix in \
+                connection.execute("SELECT * FROM applications ORDER BY rowid"):
+            application = pando.model.ApplicationMapping(name=name, apid=apid,
+                                                         description=description)
+            application.name_prefix = prefix
+            application.name_suffix = suffix
+            model.subsystems[subsystem_id].applications[apid] = application
+
+        mapping_classes = self._group(connection,
+                                      "SELECT mapping_id, class FROM packet_mapping_classes "
+                                      "ORDER BY mapping_id, position")
+        parameter_mappings = self._group(connection,
+                                         "SELECT mapping_id, sid, parameter_uid FROM parameter_mappings "
+                                         "ORDER BY mapping_id, position")
+
+        for row in connection.execute("SELECT * FROM packet_mappings ORDER BY id"):
+            mapping_id, subsystem_id, apid, sid, uid, packet_type = row[:6]
+            subsystem = model.subsystems[subsystem_id]
+            application = subsystem.applications[apid]
+
+            if packet_type == pando.model.Packet.TELECOMMAND:
+                mapping = pando.model.TelecommandMapping(sid=sid, telecommand=model.telecommands[uid])
+                application.append_telecommand(mapping)
+            else:
+                cls = pando.model.EventMapping if packet_type == pando.model.Packet.EVENT \
+                    else pando.model.TelemetryMapping
+                mapping = cls(sid=sid, telemetry=model.telemetries[uid])
+                mapping.packet_generation = self._to_packet_generation(*row[6:10])
+                for parameter_sid, parameter_uid in parameter_mappings[mapping_id]:
+                    mapping.append_parameter(
+                        pando.model.ParameterMapping(sid=parameter_sid,
+                                                     parameter=model.parameters[parameter_uid]))
+                application.append_telemetry(mapping)
+
+            classes = mapping_classes.get(mapping_id)
+            mapping.packet_class = [c for (c,) in classes] if classes else None
+            if mapping.packet_class is None:
+                subsystem.packets_by_packet_class[None].append(mapping)
+            else:
+                for packet_class in mapping.packet_class:
+                    subsystem.packets_by_packet_class[packet_class].append(mapping)
@@ -14,8 +14,14 @@
 
 from . import assistant
 from . import calibration_csv
+from . import calibration_simplify
+from . import diff
+from . import impact
 from . import indent
 from . import latex
+from . import records
 from . import structure
+from . import sqlite
 from . import svg
-from . import verify
\ No newline at end of file
+from . import verify
+from . import xml
\ No newline at end of file
@@ -12,186 +12,298 @@
 # Authors:
 # - 2016-2017, Fabian Greif (DLR RY-AVS)
 
+"""
+Convert linear interpolation calibrations between CSV and XML.
+
+Every line of the CSV file contains one calibration:
+
+    name, uid, direction (TM/TC), extrapolate, unit, type, x0, y0, x1, y1, ...
+
+Both directions are streamed. Only a single calibration curve is held in
+memory at a time, so files with tens of thousands of curves can be
+converted.
+"""
+
+import os
+import shutil
+import collections
 import argparse
-import sys
+import tempfile
+import multiprocessing
 
-import pando.pkg
 from pando.parser.common import ParserException
 
 import lxml.etree
 
-def parse_xml(filename, xsdfile=None):
-    try:
-        # parse the xml-file
-        parser = lxml.etree.XMLParser(no_network=True)
-        xmlroot = lxml.etree.parse(filename, parser=parser)
-        xmlroot.xinclude()
+XINCLUDE = "{http://www.w3.org/2001/XInclude}include"
+XSD = "http://www.w3.org/2001/XMLSchema-instance"
+
+TELEMETRY = "telemetryLinearInterpolation"
+TELECOMMAND = "telecommandLinearInterpolation"
+
 
-        if xsdfile is None:
-            xsdfile = pando.pkg.get_filename('pando', 'resources/schema/service.xsd')
+def _get(node, filename, attribute):
+    value = node.get(attribute)
+    if value is None:
+        raise ParserException("While parsing '%s': Element '%s' (line %i) has no attribute '%s'"
+                              % (filename, node.tag, node.sourceline, attribute))
+    return value
 
-        xmlschema = lxml.etree.parse(xsdfile, parser=parser)
 
-        schema = lxml.etree.XMLSchema(xmlschema)
-        schema.assertValid(xmlroot)
+def _row(node, filename, direction, type_attribute):
+    row = [_get(node, filename, 'name'),
+           _get(node, filename, 'uid'),
+           direction,
+           "extrapolate" if node.get('extrapolate') == "true" else "",
+           node.get('unit', ""),
+           _get(node, filename, type_attribute)]
+    for point_node in node.iterfind('point'):
+        row.append(_get(point_node, filename, 'x'))
+        row.append(_get(point_node, filename, 'y'))
+    return row
 
-        rootnode = xmlroot.getroot()
+
+def iterate_calibrations(filename, _included=()):
+    """
+    Read the linear interpolation calibrations from a XML file.
+
+    The file is parsed incrementally, every element is removed from the
+    tree after it has been processed. Files included via XInclude are
+    read in place.
+
+    Yields the CSV rows as lists of strings.
+    """
+    filename = os.path.abspath(filename)
+    if filename in _included:
+        raise ParserException("While including '%s': recursive include" % filename)
+    _included = _included + (filename,)
+
+    try:
+        for _, node in lxml.etree.iterparse(filename, events=("end",), no_network=True):
+            tag = node.tag
+            if tag == 'point':
+                # Required for the enclosing calibration
+                continue
+
+            parent = node.getparent()
+            if parent is not None and parent.tag == 'calibrations':
+                if tag == TELEMETRY:
+                    yield _row(node, filename, "TM", 'outputType')
+                elif tag == TELECOMMAND:
+                    yield _row(node, filename, "TC", 'inputType')
+
+            if tag == XINCLUDE:
+                href = node.get('href')
+                if href is None or len(node.attrib) != 1:
+                    raise ParserException("While including in '%s' (line %i): only simple includes "
+                                          "with a 'href' attribute are supported"
+                                          % (filename, node.sourceline))
+                yield from iterate_calibrations(os.path.join(os.path.dirname(filename), href),
+                                                _included)
+
+            # Release the processed part of the tree
+            node.clear()
+            if parent is not None:
+                while node.getprevious() is not None:
+                    del parent[0]
     except OSError as e:
         raise ParserException(e)
-    except (lxml.etree.DocumentInvalid, lxml.etree.XMLSyntaxError, lxml.etree.XMLSchemaParseError) as e:
-        raise ParserException("While parsing '%s': %s" % (e.error_log[0].filename, e))
-    except lxml.etree.XIncludeError as e:
-        raise ParserException("While including '%s': %s" % (e.error_log[0].filename, e))
+    except lxml.etree.XMLSyntaxError as e:
+        raise ParserException("While parsing '%s': %s" % (filename, e))
 
-    return rootnode
 
 def xml2csv(input_filename, output_filename):
-    rootnode = parse_xml(input_filename)
-
-    calibrations = []
-    for calibrationNode in rootnode.iterfind('calibrations/telemetryLinearInterpolation'):
-        values = []
-        for pointNode in calibrationNode.iterfind('point'):
-            x = pointNode.get('x')
-            y = pointNode.get('y')
-
-            values.append(x)
-            values.append(y)
-
-        calibration = {
-           'name': calibrationNode.get('name'),
-           'uid':  calibrationNode.get('uid'),
-           'direction': "TM",
-           'extrapolate': "extrapolate" if calibrationNode.get('extrapolate') == "true" else "",
-           'unit': calibrationNode.get('unit'),
-           'type': calibrationNode.get('outputType'),
-           'values': values
-        }
-
-        calibrations.append(calibration)
-
-    for calibrationNode in rootnode.iterfind('calibrations/telecommandLinearInterpolation'):
-        values = []
-        for pointNode in calibrationNode.iterfind('point'):
-            x = pointNode.get('x')
-            y = pointNode.get('y')
-
-            values.append(x)
-            values.append(y)
-
-        calibration = {
-           'name': calibrationNode.get('name'),
-           'uid':  calibrationNode.get('uid'),
-           'direction': "TC",
-           'extrapolate': "extrapolate" if calibrationNode.get('extrapolate') == "true" else "",
-           'unit': calibrationNode.get('unit'),
-           'type': calibrationNode.get('inputType'),
-           'values': values
-        }
-
-        calibrations.append(calibration)
-
-    with open(output_filename, 'w') as file:
-        for calibration in calibrations:
-            s = [calibration['name'],
-                 calibration['uid'],
-                 calibration['direction'],
-                 calibration['extrapolate'],
-                 calibration['unit'],
-                 calibration['type']]
-            for value in calibration['values']:
-                s.append(value)
-            file.write("\t".join(s) + "\n")
-
-def csv2xml(input_filename, output_filename, service_name):
-    fileTemplate = """<?xml version="1.0" encoding="UTF-8"?>
-<service name="{service}"
-         xmlns:xi="http://www.w3.org/2001/XInclude"
-         xmlns:xsd="http://www.w3.org/2001/XMLSchema-instance"
-         xsd:noNamespaceSchemaLocation="http://www.dlr.de/schema/pando/service.xsd">
-  <calibrations>
-{calibration}
-  </calibrations>
-</service>
-"""
-    telemetryCalibrationTemplate = """    <telemetryLinearInterpolation name="{name}" uid="{uid}" unit="{unit}" outputType="{type}" extrapolate="{extrapolate}">
-{points}
-    </telemetryLinearInterpolation>"""
-    telecommandCalibrationTemplate = """    <telecommandLinearInterpolation name="{name}" uid="{uid}" unit="{unit}" inputType="{type}" extrapolate="{extrapolate}">
-{points}
-    </telecommandLinearInterpolation>"""
-    pointTemplate = """      <point x="{x}" y="{y}"/>"""
-
-    calibrations = []
-    with open(input_filename, 'r') as file:
-        for line in file.readlines():
+    # The telemetry calibrations are written first, the telecommand
+    # calibrations are buffered in a temporary file.
+    with open(output_filename, 'w') as file, tempfile.TemporaryFile('w+') as telecommands:
+        for row in iterate_calibrations(input_filename):
+            if row[2] == "TM":
+                file.write("\t".join(row) + "\n")
+            else:
+                telecommands.write("\t".join(row) + "\n")
+
+        telecommands.seek(0)
+        shutil.copyfileobj(telecommands, file)
+
+
+def iterate_csv(filename):
+    """
+    Read the calibrations from a CSV file.
+
+    Yields tuples of (tag, attributes, points).
+    """
+    with open(filename, 'r') as file:
+        for line in file:
             line = line.rstrip('\n\r')
-            t = line.split('\t')
+            if line == "":
+                continue
 
+            t = line.split('\t')
             # If the file is not tab separated, try comma separated.
-            if (len(t) == 1):
+            if len(t) == 1:
                 t = line.split(',')
 
-            calibration = {
-               'name': t[0],
-               'uid':  t[1],
-               'direction': t[2],
-               'extrapolate': "true" if t[3] == "extrapolate" else "false",
-               'unit': t[4],
-               'type': t[5],
-            }
+            if len(t) < 6:
+                raise ParserException("Invalid calibration '%s'" % line)
+
+            direction = t[2]
+            if direction == 'TM':
+                tag, type_attribute = TELEMETRY, 'outputType'
+            elif direction == 'TC':
+                tag, type_attribute = TELECOMMAND, 'inputType'
+            else:
+                raise ParserException("Invalid direction '{}'".format(direction))
+
+            attributes = collections.OrderedDict([
+                ('name', t[0]),
+                ('uid', t[1]),
+                ('unit', t[4]),
+                (type_attribute, t[5]),
+                ('extrapolate', "true" if t[3] == "extrapolate" else "false"),
+            ])
 
             values = t[6:]
             if len(values) % 2 == 1:
-                print("Invalid number of calibration points")
-                sys.exit(1)
+                raise ParserException("Invalid number of calibration points")
 
-            valuePairs = []
+            points = []
             for i in range(0, len(values), 2):
                 # Ignore empty lines
                 if values[i] == "" and values[i + 1] == "":
                     continue
+                points.append((values[i], values[i + 1]))
+
+            yield tag, attributes, points
+
+
+def csv2xml(input_filename, output_filename, service_name):
+    with open(output_filename, 'wb') as file:
+        with lxml.etree.xmlfile(file, encoding="UTF-8") as xf:
+            _write_service(xf, input_filename, service_name)
+        file.write(b"\n")
+
+
+def _write_service(xf, input_filename, service_name):
+    xf.write_declaration()
+
+    attributes = {
+        'name': service_name,
+        '{%s}noNamespaceSchemaLocation' % XSD: "http://www.dlr.de/schema/pando/service.xsd",
+    }
+    nsmap = {
+        'xi': "http://www.w3.org/2001/XInclude",
+        'xsd': XSD,
+    }
+    with xf.element('service', attributes, nsmap=nsmap):
+        xf.write("\n  ")
+        with xf.element('calibrations'):
+            separator = "\n    "
+            for tag, attributes, points in iterate_csv(input_filename):
+                # Only the current calibration is kept as element
+                node = lxml.etree.Element(tag, attributes)
+                node.text = "\n      "
+                for x, y in points:
+                    point = lxml.etree.SubElement(node, 'point', x=x, y=y)
+                    point.tail = "\n      "
+                if len(node) > 0:
+                    node[-1].tail = "\n    "
+
+                xf.write(separator)
+                xf.write(node)
+                separator = "\n\n    "
+            xf.write("\n  ")
+        xf.write("\n")
+
+
+def convert(input_filename, output_filename, service_name=None):
+    """
+    Convert a single file, the direction is selected by the file extensions.
+
+    Keyword arguments:
+    service_name -- Name of the service for the XML file. Defaults to the
+                    name of the input file.
+    """
+    if input_filename.endswith('.xml') and output_filename.endswith('.csv'):
+        xml2csv(input_filename, output_filename)
+    elif input_filename.endswith('.csv') and output_filename.endswith('.xml'):
+        if service_name is None:
+            service_name = os.path.splitext(os.path.basename(input_filename))[0]
+        csv2xml(input_filename, output_filename, service_name)
+    else:
+        raise ParserException("Invalid input and/or output formats ('%s' -> '%s')"
+                              % (input_filename, output_filename))
+
+
+def _convert(job):
+    """
+    Executed in the worker processes.
+    """
+    input_filename, output_filename, service_name = job
+    try:
+        convert(input_filename, output_filename, service_name)
+    except ParserException as e:
+        return input_filename, output_filename, str(e)
+    return input_filename, output_filename, None
+
+
+def convert_files(filenames, output_directory=None, service_name=None, jobs=1):
+    """
+    Convert several files in parallel.
+
+    XML files are converted to CSV and CSV files to XML. The output file
+    uses the name of the input file with the other extension and is
+    placed in the output directory or next to the input file.
+
+    Returns a list of (input, output, error message or None).
+    """
+    tasks = []
+    for filename in filenames:
+        base, extension = os.path.splitext(filename)
+        if output_directory is not None:
+            base = os.path.join(output_directory, os.path.basename(base))
+        output = base + (".csv" if extension == ".xml" else ".xml")
+        tasks.append((filename, output, service_name))
+
+    with multiprocessing.Pool(jobs) as pool:
+        return list(pool.imap(_convert, tasks))
 
-                valuePairs.append({
-                    'x': values[i],
-                    'y': values[i + 1]
-                })
-
-            calibration['values'] = valuePairs
-            calibrations.append(calibration)
-
-    c = []
-    for calibration in calibrations:
-        points = []
-        for value in calibration['values']:
-            points.append(str.format(pointTemplate, **value))
-
-        if calibration['direction'] == 'TM':
-            c.append(telemetryCalibrationTemplate.format(points="\n".join(points),
-                                                         **calibration))
-        elif calibration['direction'] == 'TC':
-            c.append(telecommandCalibrationTemplate.format(points="\n".join(points),
-                                                           **calibration))
-        else:
-            print("Invalid direction '{}'".format(calibration['direction']))
-            sys.exit(1)
-
-    with open(output_filename, 'w') as file:
-        file.write(fileTemplate.format(calibration="\n\n".join(c),
-                                       service=service_name))
 
 def main(argv):
     arg = argparse.ArgumentParser(description='pando Convert a CSV calibration to XML and back.')
-    arg.add_argument('-i', '--input', dest='input', required=True, help='Input table. Can be XML or CSV.')
-    arg.add_argument('-o', '--output', dest='output', required=True, help='Output table. Can be XML or CSV.')
-    arg.add_argument('-s', '--service', dest='service_name', required=True, help='Name of the service.')
+    arg.add_argument('-i', '--input', dest='input', help='Input table. Can be XML or CSV.')
+    arg.add_argument('-o', '--output', dest='output', help='Output table. Can be XML or CSV.')
+    arg.add_argument('-s', '--service', dest='service_name', default=None,
+                     help='Name of the service. Defaults to the name of the input file.')
+    arg.add_argument('files', nargs='*', metavar='FILE',
+                     help='Further tables to convert. XML files are converted to CSV and '
+                          'CSV files to XML.')
+    arg.add_argument('--output-directory', dest='output_directory', default=None,
+                     help='Directory for the converted FILEs. Defaults to the directory of '
+                          'the input file.')
+    arg.add_argument('-j', '--jobs', dest='jobs', type=int, default=1,
+                     help='Number of worker processes used when converting several files.')
 
     args = arg.parse_args(argv)
 
-    if args.input.endswith('.xml') and args.output.endswith('.csv'):
-        xml2csv(args.input, args.output)
-    elif args.input.endswith('.csv') and args.output.endswith('.xml'):
-        csv2xml(args.input, args.output, args.service_name)
-    else:
-        print("Invalid input and/or output formats")
-        sys.exit(1)
+    if args.input is None and len(args.files) == 0:
+        arg.error("no input file given")
+
+    if args.input is not None:
+        if args.output is None:
+            arg.error("the following arguments are required: -o/--output")
+        convert(args.input, args.output, args.service_name)
+
+    if len(args.files) > 0:
+        failed = 0
+        for input_filename, output_filename, error in convert_files(args.files,
+                                                                    args.output_directory,
+                                                                    args.service_name,
+                                                                    max(1, args.jobs)):
+            if error is None:
+                print("%s -> %s" % (input_filename, output_filename))
+            else:
+                print("%s: %s" % (input_filename, error))
+                failed += 1
+
+        if failed > 0:
+            raise ParserException("Conversion failed for %i of %i files" % (failed, len(args.files)))
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2017, German Aerospace Center (DLR)
+#
+# This file is part of the development version of the pando library.
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Authors:
+# - 2017, Fabian Greif (DLR RY-AVS)
+
+import argparse
+
+import pando
+import pando.builder.xml
+import pando.model.simplify
+
+
+def main(argv):
+    arg = argparse.ArgumentParser(description='pando Simplify linear interpolation calibrations')
+    arg.add_argument('-i', '--input', dest='input', required=True, help='XML packet description')
+    arg.add_argument('-e', '--max-error', dest='max_error', type=float, required=True,
+                     help='Maximum absolute error of the calibrated values.')
+    arg.add_argument('-u', '--uid', dest='uids', action='append', default=None,
+                     help='Only simplify the calibration with the given uid. Can be used multiple times.')
+    arg.add_argument('-o', '--output', dest='output', default=None,
+                     help='Write the simplified calibrations to the given XML file.')
+    arg.add_argument('--changed-only', dest='changed_only', default=False, action='store_true',
+                     help='Only write the calibrations from which points have been removed.')
+    args = arg.parse_args(argv)
+
+    model = pando.parser.Parser().parse(args.input)
+
+    if args.uids is not None:
+        for uid in args.uids:
+            if uid not in model.calibrations:
+                raise pando.parser.ParserException("Calibration '%s' not found" % uid)
+
+    results = pando.model.simplify.simplify_model(model, args.max_error, args.uids)
+
+    before = 0
+    after = 0
+    for result in results:
+        before += len(result.original.points)
+        after += len(result.simplified.points)
+        print("%-30s %6i -> %6i points (max. error %g)" % (result.original.uid,
+                                                            len(result.original.points),
+                                                            len(result.simplified.points),
+                                                            result.error))
+    if before > 0:
+        print("\n%i calibrations: %i -> %i points (-%.1f %%)"
+              % (len(results), before, after, 100.0 * (before - after) / before))
+
+    if args.output is not None:
+        calibrations = [result.simplified for result in results
+                        if not args.changed_only or result.reduction > 0]
+        pando.builder.xml.XmlBuilder(model).generate_calibrations(args.output, calibrations)
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2017, German Aerospace Center (DLR)
+#
+# This file is part of the development version of the pando library.
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Authors:
+# - 2017, Fabian Greif (DLR RY-AVS)
+
+import json
+import argparse
+
+import pando.model.diff
+
+
+def main(argv):
+    arg = argparse.ArgumentParser(description='pando Compare two packet descriptions')
+    arg.add_argument('old', help='XML packet description of the previous release')
+    arg.add_argument('new', help='XML packet description of the current release')
+    arg.add_argument('--json', dest='json', default=False, action='store_true',
+                     help='Print the differences as JSON.')
+    arg.add_argument('-o', '--output', dest='output', default=None,
+                     help='Write the report to a file instead of stdout.')
+
+    args = arg.parse_args(argv)
+
+    old = pando.parser.Parser().parse(args.old)
+    new = pando.parser.Parser().parse(args.new)
+
+    changes = pando.model.diff.ModelDiff(old, new).compare()
+    if args.json:
+        report = json.dumps(pando.model.diff.to_json(changes), indent=2)
+    elif len(changes) == 0:
+        report = "No differences found."
+    else:
+        report = pando.model.diff.to_text(changes)
+
+    if args.output is None:
+        print(report)
+    else:
+        with open(args.output, "w") as f:
+            f.write(report)
+            f.write("\n")
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2017, German Aerospace Center (DLR)
+#
+# This file is part of the development version of the pando library.
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Authors:
+# - 2017, Fabian Greif (DLR RY-AVS)
+
+import argparse
+
+import pando.model
+
+
+def _format_mapping(mapping):
+    if mapping.apid is None:
+        location = "subsystem %s" % mapping.subsystem
+    else:
+        location = "subsystem %s, APID 0x%03X" % (mapping.subsystem, mapping.apid)
+        if mapping.packet_sid != mapping.sid:
+            location += ", packet %s" % mapping.packet_sid
+    return "%s %s (%s)" % (mapping.kind.replace("_", " "), mapping.sid, location)
+
+
+def main(argv):
+    arg = argparse.ArgumentParser(description='pando Show the objects affected by a change')
+    arg.add_argument('-i', '--input', dest='input', required=True, help='XML packet description ')
+    arg.add_argument('uid', nargs='+',
+                     help='UID of the changed parameter, enumeration, calibration or packet.')
+
+    args = arg.parse_args(argv)
+
+    parser = pando.parser.Parser()
+    model = parser.parse(args.input)
+
+    for uid in args.uid:
+        impact = model.references.get_impact(uid)
+        if not (impact.parameters or impact.packets or impact.mappings):
+            raise pando.model.ModelException("No references found for uid '%s'" % uid)
+
+        print("%s:" % uid)
+        for title, entries in [("Parameters", [p for p in impact.parameters if p != uid]),
+                               ("Packets", [p for p in impact.packets if p != uid]),
+                               ("Mappings", [_format_mapping(m) for m in impact.mappings])]:
+            if len(entries) > 0:
+                print("  %s:" % title)
+                for entry in entries:
+                    print("  - %s" % entry)
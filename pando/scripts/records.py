@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2017, German Aerospace Center (DLR)
+#
+# This file is part of the development version of the pando library.
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Authors:
+# - 2017, Fabian Greif (DLR RY-AVS)
+
+
+import argparse
+
+import pando
+
+
+def main(argv):
+    # Imported here, the decoder requires NumPy which is not needed by
+    # the other commands
+    import pando.decoder
+    import pando.decoder.record
+
+    arg = argparse.ArgumentParser(description='pando Generate typed record classes for the packets')
+    arg.add_argument('-i', '--input', dest='input', required=True, help='XML packet description')
+    arg.add_argument('-o', '--output', dest='output', required=True,
+                     help='Python module for the record classes.')
+    arg.add_argument('--short-names', dest='naming', default=pando.decoder.record.UID,
+                     action='store_const', const=pando.decoder.record.SHORT_NAME,
+                     help='Use the short names instead of the uids for the classes and fields.')
+    args = arg.parse_args(argv)
+
+    model = pando.parser.Parser().parse(args.input)
+
+    packets = list(model.telemetries.values()) + list(model.telecommands.values())
+    try:
+        source = pando.decoder.record.generate_source(packets, args.naming)
+    except pando.decoder.DecoderException as e:
+        raise pando.model.ModelException(e)
+
+    with open(args.output, 'w') as file:
+        file.write(source)
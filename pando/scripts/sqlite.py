@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2017, German Aerospace Center (DLR)
+#
+# This file is part of the development version of the pando library.
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Authors:
+# - 2017, Fabian Greif (DLR RY-AVS)
+
+import argparse
+
+import pando.builder.sqlite
+
+
+def main(argv):
+    arg = argparse.ArgumentParser(description='pando Export the packet description to a SQLite database')
+    arg.add_argument('-i', '--input', dest='input', required=True, help='XML packet description ')
+    arg.add_argument('-o', '--output', dest='output', required=True, help='SQLite database file.')
+
+    args = arg.parse_args(argv)
+
+    parser = pando.parser.Parser()
+    model = parser.parse(args.input)
+
+    builder = pando.builder.sqlite.SqliteBuilder(model)
+    builder.generate(args.output)
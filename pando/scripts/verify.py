@@ -12,125 +12,134 @@
 # Authors:
 # - 2015-2017, Fabian Greif (DLR RY-AVS)
 
+import json
 import logging
 import argparse
+import multiprocessing
 
+import pando.model.report
 import pando.model.validator
 
 logger = logging.getLogger('pando.verify')
 
 
-def _print_unmapped_parameters(packet, unresolved, additional):
-    for parameter in unresolved:
-        logger.error("Packet '%s': parameter '%s' (position %i) not found in mapping" % (packet.uid, parameter[0], parameter[1]))
-    for parameter in additional:
-        logger.error("Packet '%s': unexpected parameter '%s' (position %i) found in mapping" % (packet.uid, parameter[0], parameter[1]))
+# Shared with the worker processes, see _verify_files()
+_fragments = None
+
+
+def _verify_file(filename):
+    """
+    Parse and verify a single file. Executed in the worker processes.
+    """
+    global _fragments
+    if _fragments is None:
+        _fragments = pando.parser.FragmentCache()
+
+    try:
+        model = pando.parser.Parser(_fragments).parse(filename)
+    except (pando.parser.ParserException, pando.model.ModelException) as error:
+        report = pando.model.report.Report(filename)
+        report.add_parse_error(error)
+        return report
+    return pando.model.report.verify(model, filename)
+
+
+def _verify_files(filenames, jobs):
+    """
+    Verify several files in parallel.
+
+    The schema and the included files are loaded before the worker
+    processes are started. Forked workers share them with the parent,
+    files included by several root files are only parsed once.
+
+    Returns the list of reports.
+    """
+    global _fragments
+    pando.parser.load_schema()
+    _fragments = pando.parser.FragmentCache()
+    for filename in filenames:
+        _fragments.add_includes(filename)
+
+    reports = []
+    with multiprocessing.Pool(jobs) as pool:
+        for report in pool.imap(_verify_file, filenames):
+            if report.success:
+                print("%s: Ok" % report.filename)
+            else:
+                print("%s: %i error(s)" % (report.filename, len(report.findings)))
+                for message in report.get_messages():
+                    print("  - %s" % message)
+            reports.append(report)
+    return reports
+
+
+def _write_report(reports, filename, output_format):
+    if output_format == "sarif":
+        content = pando.model.report.to_sarif(reports)
+    else:
+        content = pando.model.report.to_json(reports)
+
+    with open(filename, "w") as f:
+        json.dump(content, f, indent=2)
+        f.write("\n")
 
 
 def main(argv):
     arg = argparse.ArgumentParser(description='pando Mapping Verification')
-    arg.add_argument('-i', '--input', dest='input', required=True, help='XML packet description ')
+    arg.add_argument('-i', '--input', dest='input', help='XML packet description ')
+    arg.add_argument('files', nargs='*', metavar='FILE',
+                     help='Further XML packet descriptions to verify.')
+    arg.add_argument('-j', '--jobs', dest='jobs', type=int, default=1,
+                     help='Number of worker processes used when verifying several files.')
+    arg.add_argument('--report', dest='report', default=None,
+                     help='Write a machine readable report of all findings to the given file.')
+    arg.add_argument('--format', dest='format', default='json', choices=['json', 'sarif'],
+                     help='Format of the report file (default: json).')
     arg.add_argument('-d', '--detailed',
                      dest='detailed',
                      default=False, action='store_true', required=False,
                      help='Detailed analysis about all unused (without mapping) TM/TC packets and parameters.')
     args = arg.parse_args(argv)
 
-    parser = pando.parser.Parser()
-    model_validator = pando.model.validator.ModelValidator(parser.parse(args.input))
-
-    # Verify that all telecommands and telemetry packets in the
-    # mapping section define all the parameters defined in the structure.
-    success = True
-
-    # Check telecommand parameters
-    for p in model_validator.get_unmapped_telecommand_parameters():
-        success = False
-        logger.error("Parameter '%s' not found in mapping" % (p.uid))
-
-    # Find parameters that are used in TC parameter mapping but not
-    # referenced in any TC packet
-    for p in model_validator.get_mapped_but_unreferenced_telecommand_parameter():
-        success = False
-        logger.error("Parameter '%s' found in mapping but not in any TC packet" % (p.uid))
-
-    # Check telemetry parameters
-    for p in model_validator.get_unmapped_telemetry_parameters():
-        success = False
-        _print_unmapped_parameters(p[0], p[1], p[2])
-
-    # Check that for all enumerations a corresponding mapping is available
-    # and that all mapped enumerations are defined somewhere in the XML file.
-    atm, utm, atc, utc = model_validator.get_unmapped_enumerations()
-    for unresolved, subsystem in utm:
-        logger.error("No telemetry enumeration mapping found for uid '%s' in subsystem '%s'" % (unresolved.uid, subsystem.name))
-        success = False
-    for unresolved, subsystem in utc:
-        logger.error("No telecommand enumeration mapping found for uid '%s' in subsystem '%s'" % (unresolved.uid, subsystem.name))
-        success = False
-    for additional in atm:
-        logger.error("Telemetry enumeration mapping '%s' for uid '%s' not used!" % (additional.sid, additional.enumeration.uid))
-        success = False
-    for additional in atc:
-        logger.error("Telecommand enumeration mapping '%s' for uid '%s' not used!" % (additional.sid, additional.enumeration.uid))
-        success = False
-
-    atm, utm, atc, utc = model_validator.get_unmapped_calibrations()
-    for unresolved, subsystem in utm:
-        logger.error("No telemetry calibration mapping found for uid '%s' in subsystem '%s'" % (unresolved.uid, subsystem.name))
-        success = False
-    for unresolved, subsystem in utc:
-        logger.error("No telecommand calibration mapping found for uid '%s' in subsystem '%s'" % (unresolved.uid, subsystem.name))
-        success = False
-    for additional in atm:
-        logger.error("Telemetry calibration mapping '%s' for uid '%s' not used!" % (additional.sid, additional.calibration.uid))
-        success = False
-    for additional in atc:
-        logger.error("Telecommand calibration mapping '%s' for uid '%s' not used!" % (additional.sid, additional.calibration.uid))
-        success = False
-
-    # Verify that the combination of APID, STYPE, SSTYPE and the two
-    # identification fields is unique.
-    for packet in model_validator.get_ambiguous_telemetry_packets():
-        logger.error("TM packet '%s' and '%s' are ambiguous" % (packet[0].uid, packet[1].uid))
-        success = False
-
-    for packet in model_validator.get_ambiguous_packet_mappings():
-        logger.error("packet SID '%s' is used for '%s' and '%s'" % (packet[0], packet[1].uid, packet[2].uid))
-        success = False
-
-    for parameter in model_validator.get_ambiguous_telemetry_parameters_within_mapping():
-        logger.error("Parameter SID '%s' is used multiple times in telemetry packet '%s'" % (parameter[1], parameter[0]))
-        success = False
-
-    for t in model_validator.get_ambiguous_telemetry_service_identifier():
-        logger.error("Telemetry packet SID '%s' (%d, %d) is ambiguous within " \
-                     "APID %d (0x%03X). Either use a different combination of "\
-                     "service and sub-service type or add an identification " \
-                     "parameter." %
-                    (t["mapping"].sid, t["mapping"].telemetry.serviceType, t["mapping"].telemetry.serviceSubtype, t["apid"], t["apid"]))
-        success = False
-
-    for packet in model_validator.get_packets_with_unaligned_length():
-        length = packet.get_accumulated_parameter_length()
-        bits_per_byte = 8
-
-        missing = bits_per_byte - (length % bits_per_byte)
-
-        logger.error("Length of packet uid '{}' is not byte aligned "
-                     "(total length {} bit -> add {} bit)"
-                     .format(packet.uid, length, missing))
-        success = False
-
-    for enumeration in model_validator.get_enumeration_with_non_unqiue_values():
-        logger.error("Enumeration '{}' ({}) has non unique entries!"
-                     .format(enumeration.name, enumeration.uid))
-        success = False
-
-    if not success:
+    filenames = ([args.input] if args.input else []) + args.files
+    if len(filenames) == 0:
+        arg.error("no input file given")
+
+    if len(filenames) > 1 or args.jobs > 1:
+        if args.detailed:
+            arg.error("--detailed is only supported when verifying a single file without --jobs")
+        reports = _verify_files(filenames, max(1, args.jobs))
+        if args.report is not None:
+            _write_report(reports, args.report, args.format)
+
+        failed = len([r for r in reports if not r.success])
+        if failed > 0:
+            raise pando.parser.ParserException("Verification failed for %i of %i databases"
+                                               % (failed, len(filenames)))
+        return
+
+    try:
+        model = pando.parser.Parser().parse(filenames[0])
+    except (pando.parser.ParserException, pando.model.ModelException) as error:
+        if args.report is not None:
+            report = pando.model.report.Report(filenames[0])
+            report.add_parse_error(error)
+            _write_report([report], args.report, args.format)
+        raise
+
+    report = pando.model.report.verify(model, filenames[0])
+    if args.report is not None:
+        _write_report([report], args.report, args.format)
+
+    errors = report.get_messages()
+    for message in errors:
+        logger.error(message)
+
+    if errors:
         raise pando.parser.ParserException("Incomplete mapping. Please add/remove the requested elements!")
     else:
         if args.detailed:
+            model_validator = pando.model.validator.ModelValidator(model)
             parameters = model_validator.get_unused_parameters()
             if len(parameters) > 0:
                 print("\nUnused parameters:")
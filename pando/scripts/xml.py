@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2017, German Aerospace Center (DLR)
+#
+# This file is part of the development version of the pando library.
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Authors:
+# - 2017, Fabian Greif (DLR RY-AVS)
+
+import argparse
+
+import pando.builder.xml
+
+
+def main(argv):
+    arg = argparse.ArgumentParser(description='pando Write the packet description as normalized XML file')
+    arg.add_argument('-i', '--input', dest='input', required=True, help='XML packet description ')
+    arg.add_argument('-o', '--output', dest='output', required=True, help='Output XML file.')
+    arg.add_argument('--split', dest='split', action='store_true', default=False,
+                     help='Write one file per service type next to the output file '
+                          'and include them from the output file.')
+
+    args = arg.parse_args(argv)
+
+    parser = pando.parser.Parser()
+    model = parser.parse(args.input)
+
+    builder = pando.builder.xml.XmlBuilder(model, split=args.split)
+    builder.generate(args.output)
@@ -19,7 +19,7 @@ setup(
     packages=['pando', 'pando.builder'],
     package_dir={'pando': 'pando'},
     package_data={'pando': ['resources/*']},
-    requires=['lxml', 'jinja2', 'isodate'],
+    requires=['lxml', 'jinja2', 'isodate', 'numpy'],
     scripts=['scripts/pando'],
     version=open("latest_version.txt").read().strip(),
     description='Packet Network Documentation Model',
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2017, German Aerospace Center (DLR)
+#
+# This file is part of the development version of the pando library.
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Authors:
+# - 2017, Fabian Greif (DLR RY-AVS)
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import lxml.etree
+
+import pando
+import pando.pkg
+import pando.scripts.calibration_csv
+
+CSV = ("Thermistor\tT1\tTM\textrapolate\tdegC\tSigned Integer\t0\t-40\t100\t0\t200\t40\n"
+       "Heater\tH1\tTC\t\tW\tUnsigned Integer\t0\t0\t10\t5\n"
+       "Sensor\tS1\tTM\t\tV\tUnsigned Integer\t1\t2\t3\t4\n")
+
+
+class CalibrationCsvTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def path(self, filename):
+        return os.path.join(self.directory, filename)
+
+    def write(self, filename, content):
+        with open(self.path(filename), 'w') as file:
+            file.write(content)
+
+    def read(self, filename):
+        with open(self.path(filename)) as file:
+            return file.read()
+
+    def test_should_convert_csv_to_xml_and_back(self):
+        self.write("input.csv", CSV)
+        pando.scripts.calibration_csv.convert(self.path("input.csv"), self.path("output.xml"), "test")
+
+        schema = pando.parser.load_schema(pando.pkg.get_filename('pando', 'resources/schema/service.xsd'))
+        schema.assertValid(lxml.etree.parse(self.path("output.xml")))
+
+        pando.scripts.calibration_csv.convert(self.path("output.xml"), self.path("output.csv"))
+
+        # Telemetry calibrations are written first
+        lines = CSV.splitlines(True)
+        self.assertEqual(lines[0] + lines[2] + lines[1], self.read("output.csv"))
+
+    def test_should_read_included_files(self):
+        self.write("service.xml", """<?xml version="1.0" encoding="UTF-8"?>
+<service name="test" xmlns:xi="http://www.w3.org/2001/XInclude">
+  <xi:include href="curves.xml" />
+</service>
+""")
+        self.write("curves.xml", """<?xml version="1.0" encoding="UTF-8"?>
+<calibrations>
+  <!-- Comment -->
+  <telemetryLinearInterpolation name="a" uid="a" outputType="Signed Integer">
+    <point x="1" y="2" />
+    <point x="3" y="4" />
+  </telemetryLinearInterpolation>
+  <telemetryPolynomInterpolation name="b" uid="b" a0="1" a1="2" a2="3" a3="4" a4="5" />
+</calibrations>
+""")
+        rows = list(pando.scripts.calibration_csv.iterate_calibrations(self.path("service.xml")))
+        self.assertEqual([["a", "a", "TM", "", "", "Signed Integer", "1", "2", "3", "4"]], rows)
+
+    def test_should_convert_several_files(self):
+        self.write("a.csv", CSV)
+        self.write("b.csv", "Invalid\tI1\tXX\t\t\t\n")
+
+        results = pando.scripts.calibration_csv.convert_files([self.path("a.csv"), self.path("b.csv")],
+                                                              jobs=2)
+        self.assertEqual((self.path("a.csv"), self.path("a.xml"), None), results[0])
+        self.assertEqual("Invalid direction 'XX'", results[1][2])
+        self.assertTrue(os.path.exists(self.path("a.xml")))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2017, German Aerospace Center (DLR)
+#
+# This file is part of the development version of the pando library.
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Authors:
+# - 2017, Fabian Greif (DLR RY-AVS)
+
+
+import struct
+import unittest
+
+import pando.decoder
+import pando.decoder.ccsds as ccsds
+
+
+def create_packet(apid, count, service, subtype, time, data=b"\x00\x00"):
+    """
+    PUS telemetry packet with a CUC4.2 time.
+    """
+    coarse = int(time)
+    fine = int((time - coarse) * 65536)
+    return struct.pack(">HHHBBBIH", 0x0800 | apid, 0xc000 | count, 9 + len(data) - 1,
+                       0x10, service, subtype, coarse, fine) + data
+
+
+class HeaderTest(unittest.TestCase):
+
+    def test_should_parse_headers(self):
+        # Idle packet without secondary header
+        idle = struct.pack(">HHH", 0x07ff, 0xc000, 0) + b"\x55"
+        stream = b"".join([
+            create_packet(0x100, 5, 3, 25, 10.5),
+            idle,
+            create_packet(0x101, 16383, 5, 2, 12.0, b"\x01" * 5),
+        ])
+
+        headers = ccsds.parse_headers(stream)
+        self.assertEqual([0, 17, 24], headers["offset"].tolist())
+        self.assertEqual([17, 7, 20], headers["length"].tolist())
+        self.assertEqual([0x100, 0x7ff, 0x101], headers["apid"].tolist())
+        self.assertEqual([True, False, True], headers["secondary_header"].tolist())
+        self.assertEqual([3, 3, 3], headers["sequence_flags"].tolist())
+        self.assertEqual([5, 0, 16383], headers["sequence_count"].tolist())
+        self.assertEqual([3, 0, 5], headers["service_type"].tolist())
+        self.assertEqual([25, 0, 2], headers["service_subtype"].tolist())
+        self.assertEqual([10.5, 0.0, 12.0], headers["time"].tolist())
+
+        # The data field header of telecommands is not read
+        telecommand = struct.pack(">HHHBBBH", 0x1900, 0xc000, 12, 0x10, 5, 2, 1) + b"\x00" * 8
+        headers = ccsds.parse_headers(telecommand)
+        self.assertEqual([1], headers["type"].tolist())
+        self.assertEqual([0], headers["service_type"].tolist())
+
+        with self.assertRaises(pando.decoder.DecoderException):
+            ccsds.get_offsets(stream[:-1])
+        with self.assertRaises(pando.decoder.DecoderException):
+            ccsds.parse_headers(stream[:-1], offsets=[0, 17, 24])
+
+
+class SequenceTest(unittest.TestCase):
+
+    def test_should_detect_gaps_and_duplicates(self):
+        apid = [1, 2, 1, 1, 2, 1, 2, 1, 1]
+        count = [16382, 7, 16383, 2, 8, 2, 10, 3, 1]
+
+        self.assertEqual([-1, -1, 1, 3, 1, 0, 2, 1, 16382],
+                         ccsds.get_sequence_deltas(apid, count).tolist())
+
+        statistics = ccsds.get_sequence_statistics(apid, count)
+        self.assertEqual([1, 2], statistics["apid"].tolist())
+        self.assertEqual([6, 3], statistics["packets"].tolist())
+        self.assertEqual([1, 1], statistics["gaps"].tolist())
+        self.assertEqual([2, 1], statistics["missing"].tolist())
+        self.assertEqual([1, 0], statistics["duplicates"].tolist())
+        self.assertEqual([1, 0], statistics["reordered"].tolist())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2017, German Aerospace Center (DLR)
+#
+# This file is part of the development version of the pando library.
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Authors:
+# - 2017, Fabian Greif (DLR RY-AVS)
+
+import os
+import struct
+import shutil
+import tempfile
+import unittest
+
+import pando
+import pando.decoder.codegen
+import pando.decoder.packet
+
+ParameterType = pando.model.ParameterType
+
+
+class CodegenTest(unittest.TestCase):
+
+    def setUp(self):
+        filepath = os.path.join(os.path.dirname(os.path.realpath(__file__)), "..", "resources/test.xml")
+        self.model = pando.parser.Parser().parse(filepath)
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_should_match_interpreted_decoder(self):
+        packet = self.model.telemetries["service_3_12"]
+        buffer = b"\xff\xff" + struct.pack(">H" + "HIHHHH" + "HIHH" + "B",
+                                           2,
+                                           1, 100, 2, 7, 8, 0,
+                                           2, 200, 0, 0,
+                                           1)
+
+        module = pando.decoder.codegen.load_model(self.model, self.directory)
+        self.assertEqual(pando.decoder.packet.PacketDecoder(packet).decode(buffer, 2),
+                         module.DECODERS["service_3_12"](buffer, 2))
+
+        with self.assertRaises(pando.decoder.DecoderException):
+            module.DECODERS["service_3_12"](buffer[:-1], 2)
+
+    def test_should_generate_bit_fields(self):
+        packet = pando.model.Telemetry("Test", "test", "")
+        for uid, identifier, width in [("flag", ParameterType.BOOLEAN, 1),
+                                       ("u3", ParameterType.UNSIGNED_INTEGER, 3),
+                                       ("s12", ParameterType.SIGNED_INTEGER, 12),
+                                       ("time", ParameterType.ABSOLUTE_TIME, 48),
+                                       ("text", ParameterType.ASCII_STRING, 16)]:
+            packet.append_parameter(pando.model.Parameter(uid, uid, "", ParameterType(identifier, width)))
+
+        source = pando.decoder.codegen.generate_source([packet])
+        self.assertIn("0xfff", source)
+
+        buffer = bytes([0b11011111, 0b11111110, 0, 0, 0, 10, 0x80, 0]) + b"A "
+        module = pando.decoder.codegen.load([packet], self.directory)
+        self.assertEqual({"flag": True, "u3": 5, "s12": -2, "time": 10.5, "text": "A"},
+                         module.DECODERS["test"](buffer))
+
+    def test_should_reuse_cached_module(self):
+        packets = list(self.model.telemetries.values())
+        module = pando.decoder.codegen.load(packets, self.directory)
+
+        filenames = [f for f in os.listdir(self.directory) if f.endswith(".py")]
+        self.assertEqual(["pando_decoder_%s.py" % module.DIGEST], filenames)
+
+        # Descriptions do not change the layout
+        packets[0].parameters[0].description = "Changed"
+        self.assertEqual(module.DIGEST, pando.decoder.codegen.get_digest(packets))
+
+        packets[0].parameters[0].type.width = 8
+        self.assertNotEqual(module.DIGEST, pando.decoder.codegen.get_digest(packets))
+
+    def test_should_skip_unaligned_packets(self):
+        packet = pando.model.Telemetry("Test", "test", "")
+        packet.append_parameter(pando.model.Parameter("u3", "u3", "", ParameterType(ParameterType.UNSIGNED_INTEGER, 3)))
+
+        module = pando.decoder.codegen.load([packet], self.directory)
+        self.assertNotIn("test", module.DECODERS)
+        self.assertIn("test", module.SKIPPED)
+
+    def test_should_generate_packets_without_parameters(self):
+        filepath = os.path.join(os.path.dirname(os.path.realpath(__file__)), "..", "resources/derived_packet.xml")
+        model = pando.parser.Parser().parse(filepath)
+
+        module = pando.decoder.codegen.load_model(model, self.directory)
+        for uid, packet in model.telemetries.items():
+            if uid in module.DECODERS and len(packet.parameters) == 0:
+                self.assertEqual({}, module.DECODERS[uid](b""))
+                break
+        else:
+            self.fail("No packet without parameters")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2017, German Aerospace Center (DLR)
+#
+# This file is part of the development version of the pando library.
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Authors:
+# - 2017, Fabian Greif (DLR RY-AVS)
+
+import datetime
+import unittest
+
+import numpy
+
+import pando.model
+import pando.decoder
+import pando.decoder.cuc
+
+
+class CucTest(unittest.TestCase):
+
+    def test_should_select_format_from_parameter_type(self):
+        cuc4 = pando.model.ParameterType(pando.model.ParameterType.ABSOLUTE_TIME, 32)
+        cuc42 = pando.model.ParameterType(pando.model.ParameterType.RELATIVE_TIME, 48)
+
+        self.assertEqual((4, 0), pando.decoder.cuc.get_format(cuc4))
+        self.assertEqual((4, 2), pando.decoder.cuc.get_format(cuc42))
+
+        self.assertTrue(pando.decoder.cuc.CucDecoder.from_parameter_type(cuc42).relative)
+
+        with self.assertRaises(pando.decoder.DecoderException):
+            pando.decoder.cuc.get_format(pando.model.ParameterType(pando.model.ParameterType.UNSIGNED_INTEGER, 32))
+
+    def test_should_decode_absolute_cuc42(self):
+        decoder = pando.decoder.cuc.CucDecoder(4, 2, epoch="2000-01-01T00:00:00")
+
+        # 1 s + 0.5 s, 0x12345678 s + 0.25 s
+        buffer = bytes([0, 0, 0, 1, 0x80, 0x00, 0x12, 0x34, 0x56, 0x78, 0x40, 0x00])
+        coarse, fine = decoder.from_buffer(buffer)
+
+        self.assertEqual([1, 0x12345678], coarse.tolist())
+        self.assertEqual([0x8000, 0x4000], fine.tolist())
+        self.assertEqual([1.5, 0x12345678 + 0.25], decoder.seconds(coarse, fine).tolist())
+
+        times = decoder.datetime64(coarse, fine)
+        self.assertEqual(numpy.dtype("datetime64[ns]"), times.dtype)
+        self.assertEqual(numpy.datetime64("2000-01-01T00:00:01.5", "ns"), times[0])
+        self.assertEqual(numpy.datetime64(datetime.datetime(2000, 1, 1) +
+                                          datetime.timedelta(seconds=0x12345678, milliseconds=250), "ns"),
+                         times[1])
+
+        self.assertEqual((numpy.datetime64("2000-01-01") - numpy.datetime64("1970-01-01")) / numpy.timedelta64(1, "s") + 1.5,
+                         decoder.posix_seconds(coarse, fine)[0])
+
+    def test_should_read_strided_fields(self):
+        decoder = pando.decoder.cuc.CucDecoder(4, 0)
+
+        # Three packets of 6 bytes with the time at offset 2
+        buffer = bytes([0xff, 0xff, 0, 0, 0, 10,
+                        0xff, 0xff, 0, 0, 1, 0,
+                        0xff, 0xff, 0xff, 0xff, 0xff, 0xff])
+        coarse, fine = decoder.from_buffer(buffer, offset=2, stride=6)
+
+        self.assertEqual([10, 256, 0xffffffff], coarse.tolist())
+        self.assertEqual(numpy.datetime64("1958-01-01T00:00:10", "ns"), decoder.decode(coarse, fine)[0])
+
+        with self.assertRaises(pando.decoder.DecoderException):
+            decoder.from_buffer(buffer, offset=2, stride=6, count=4)
+
+    def test_should_decode_relative_times(self):
+        decoder = pando.decoder.cuc.CucDecoder(4, 2, relative=True)
+        coarse, fine = decoder.from_octets([[0, 0, 0, 3, 0x00, 0x01]])
+
+        durations = decoder.decode(coarse, fine)
+        self.assertEqual(numpy.dtype("timedelta64[ns]"), durations.dtype)
+        # 2^-16 s = 15258.78 ns
+        self.assertEqual(numpy.timedelta64(3 * 10**9 + 15259, "ns"), durations[0])
+
+        with self.assertRaises(pando.decoder.DecoderException):
+            decoder.datetime64(coarse, fine)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2017, German Aerospace Center (DLR)
+#
+# This file is part of the development version of the pando library.
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Authors:
+# - 2017, Fabian Greif (DLR RY-AVS)
+
+import os
+import unittest
+
+import numpy
+
+import pando
+import pando.decoder
+import pando.decoder.enumeration
+
+UNKNOWN = pando.decoder.enumeration.UNKNOWN
+
+
+class EnumerationTest(unittest.TestCase):
+
+    def setUp(self):
+        filepath = os.path.join(os.path.dirname(os.path.realpath(__file__)), "..", "resources/test.xml")
+        self.model = pando.parser.Parser().parse(filepath)
+        self.tables = pando.decoder.enumeration.CodeTables(self.model)
+
+    def _create_enumeration(self, values):
+        enumeration = pando.model.Enumeration("Sparse", "E99", 32, "")
+        for index, value in enumerate(values):
+            enumeration.append_entry(pando.model.EnumerationEntry("V%i" % index, str(value), ""))
+        return enumeration
+
+    def test_should_share_code_tables(self):
+        table = self.tables.get("E1")
+        self.assertIs(table, self.tables.get("E1"))
+        self.assertTrue(table.dense)
+        self.assertEqual(("Key0", "Key1"), table.categories)
+
+        with self.assertRaises(pando.decoder.DecoderException):
+            self.tables.get("E42")
+
+    def test_should_decode_dense_enumeration(self):
+        column = self.tables.get("E1").decode(numpy.array([213, 10, 11, 65535, 10], dtype=numpy.uint16))
+
+        self.assertEqual(numpy.int32, column.codes.dtype)
+        self.assertEqual([1, 0, UNKNOWN, UNKNOWN, 0], column.codes.tolist())
+        self.assertEqual(["Key1", "Key0", None, None, "Key0"], column.names().tolist())
+        self.assertEqual([False, False, True, True, False], column.unknown.tolist())
+        self.assertEqual("Key1", column[0])
+        self.assertIsNone(column[2])
+
+    def test_should_decode_sparse_enumeration(self):
+        table = pando.decoder.enumeration.CodeTable(self._create_enumeration([0x7fffffff, 5, 0x10000, 5]))
+        self.assertFalse(table.dense)
+
+        # Duplicated values use the first entry
+        self.assertEqual([1, 0, UNKNOWN, 2, UNKNOWN],
+                         table.encode([5, 0x7fffffff, 6, 0x10000, 0xffffffff]).tolist())
+        self.assertEqual("V2", table.name(0x10000))
+        self.assertIsNone(table.name(4))
+
+    def test_should_map_values_out_of_range_to_unknown(self):
+        dense = pando.decoder.enumeration.CodeTable(self._create_enumeration([0, 1]))
+        sparse = pando.decoder.enumeration.CodeTable(self._create_enumeration([0, -1, 0x10000]))
+        self.assertTrue(dense.dense)
+        self.assertFalse(sparse.dense)
+
+        self.assertEqual([UNKNOWN, UNKNOWN, 0],
+                         dense.encode(numpy.array([-1, -2**63, 0], dtype=numpy.int64)).tolist())
+        self.assertEqual([UNKNOWN, UNKNOWN, 1],
+                         dense.encode(numpy.array([2**63, 2**64 - 1, 1], dtype=numpy.uint64)).tolist())
+        self.assertEqual([1, UNKNOWN, 0],
+                         sparse.encode(numpy.array([-1, -2**63, 0], dtype=numpy.int64)).tolist())
+        # 2^64 - 1 must not wrap around to -1
+        self.assertEqual([UNKNOWN, 2],
+                         sparse.encode(numpy.array([2**64 - 1, 0x10000], dtype=numpy.uint64)).tolist())
+
+    def test_should_reject_non_integer_values(self):
+        with self.assertRaises(pando.decoder.DecoderException):
+            pando.decoder.enumeration.CodeTable(self._create_enumeration(["x"]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2017, German Aerospace Center (DLR)
+#
+# This file is part of the development version of the pando library.
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Authors:
+# - 2017, Fabian Greif (DLR RY-AVS)
+
+import struct
+import unittest
+
+import pando.model
+import pando.decoder
+import pando.decoder.event
+
+ParameterType = pando.model.ParameterType
+
+
+def create_event(uid, severity, report_id, parameters=()):
+    event = pando.model.Event(uid, uid, "")
+    event.severity = severity
+    event.report_id = report_id
+    event.service_type = 5
+    event.service_subtype = severity
+    event.append_parameter(pando.model.Parameter("Report ID", "s5_report_id", "",
+                                                 ParameterType(ParameterType.UNSIGNED_INTEGER, 16)))
+    for parameter in parameters:
+        event.append_parameter(parameter)
+    return event
+
+
+def create_packet(apid, service, subtype, time, data):
+    """
+    PUS telemetry packet with a CUC4.2 time.
+    """
+    length = 9 + len(data) - 1
+    coarse = int(time)
+    fine = int((time - coarse) * 65536)
+    return struct.pack(">HHHBBBIH", 0x0800 | apid, 0xc000, length, 0x10, service, subtype, coarse, fine) + data
+
+
+class EventDecoderTest(unittest.TestCase):
+
+    def setUp(self):
+        self.decoder = pando.decoder.event.EventDecoder()
+        self.decoder.add(0x100, create_event("EV1", pando.model.Event.LOW_SEVERITY, 1))
+        self.decoder.add(0x100, create_event("EV2", pando.model.Event.HIGH_SEVERITY, 1, [
+            pando.model.Parameter("Value", "value", "", ParameterType(ParameterType.SIGNED_INTEGER, 32))]))
+        self.decoder.add(0x101, create_event("EV3", pando.model.Event.LOW_SEVERITY, 1))
+
+    def test_should_dispatch_events(self):
+        stream = b"".join([
+            create_packet(0x100, 5, 2, 10.5, struct.pack(">H", 1)),
+            create_packet(0x100, 3, 25, 11.0, struct.pack(">HI", 1, 0)),
+            create_packet(0x100, 5, 4, 12.0, struct.pack(">Hi", 1, -5)),
+            create_packet(0x101, 5, 2, 13.0, struct.pack(">H", 1)),
+            create_packet(0x101, 5, 2, 14.0, struct.pack(">H", 7)),
+        ])
+        log = self.decoder.process(stream)
+
+        self.assertEqual(4, len(log))
+        columns = log.to_numpy()
+        self.assertEqual([10.5, 12.0, 13.0, 14.0], columns["time"].tolist())
+        self.assertEqual([0x100, 0x100, 0x101, 0x101], columns["apid"].tolist())
+        self.assertEqual([2, 4, 2, 2], columns["severity"].tolist())
+        self.assertEqual([1, 1, 1, 7], columns["report_id"].tolist())
+        self.assertEqual(["EV1", "EV2", "EV3", None],
+                         [None if t is None else t.event.uid for t in map(log.get_type, range(len(log)))])
+
+        self.assertEqual(-5, log.get_parameters(1)["value"])
+        self.assertIsNone(log.get_parameters(3))
+
+        with self.assertRaises(pando.decoder.DecoderException):
+            self.decoder.process(stream[:-1])
+
+    def test_should_skip_idle_and_telecommand_packets(self):
+        # Byte 7 of both packets contains the event service type
+        idle = struct.pack(">HHHBBB", 0x07ff, 0xc000, 12, 0x10, 5, 2) + b"\x00" * 10
+        telecommand = struct.pack(">HHHBBBH", 0x1900, 0xc000, 12, 0x10, 5, 2, 1) + b"\x00" * 8
+        stream = idle + telecommand + create_packet(0x100, 5, 2, 1.0, struct.pack(">H", 1))
+
+        log = self.decoder.process(stream)
+        self.assertEqual([0x100], log.to_numpy()["apid"].tolist())
+
+    def test_should_log_truncated_events_as_unknown(self):
+        stream = create_packet(0x100, 5, 2, 1.0, b"\x00") + create_packet(0x100, 5, 2, 2.0, struct.pack(">H", 1))
+
+        log = self.decoder.process(stream)
+        self.assertEqual([pando.decoder.event.UNKNOWN, 0], log.to_numpy()["event"].tolist())
+        self.assertEqual([0, 1], log.to_numpy()["report_id"].tolist())
+
+    def test_should_reject_ambiguous_events(self):
+        with self.assertRaises(pando.decoder.DecoderException):
+            self.decoder.add(0x100, create_event("EV4", pando.model.Event.LOW_SEVERITY, 1))
+
+        event = create_event("EV5", pando.model.Event.LOW_SEVERITY, 2)
+        event.parameters.pop(0)
+        with self.assertRaises(pando.decoder.DecoderException):
+            self.decoder.add(0x100, event)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2017, German Aerospace Center (DLR)
+#
+# This file is part of the development version of the pando library.
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Authors:
+# - 2017, Fabian Greif (DLR RY-AVS)
+
+import os
+import copy
+import struct
+import unittest
+
+import pando
+import pando.decoder
+import pando.decoder.layout
+import pando.decoder.packet
+
+ParameterType = pando.model.ParameterType
+
+
+def create_parameter(uid, identifier, width, byte_order=pando.model.ByteOrder.BIG_ENDIAN):
+    parameter = pando.model.Parameter(uid, uid, "", ParameterType(identifier, width))
+    parameter.byte_order = byte_order
+    return parameter
+
+
+class PacketDecoderTest(unittest.TestCase):
+
+    def setUp(self):
+        filepath = os.path.join(os.path.dirname(os.path.realpath(__file__)), "..", "resources/test.xml")
+        self.model = pando.parser.Parser().parse(filepath)
+        self.packet = self.model.telemetries["service_3_12"]
+
+        # G0 = 2 [P9, P6, G1 [P7], P8], P21
+        self.buffer = b"\xff\xff" + struct.pack(">H" + "HIHHHH" + "HIHH" + "B",
+                                                2,
+                                                1, 100, 2, 7, 8, 0,
+                                                2, 200, 0, 0,
+                                                1)
+
+    def test_should_decode_nested_repeaters(self):
+        decoder = pando.decoder.packet.PacketDecoder(self.packet)
+        values = decoder.decode(self.buffer, offset=2)
+
+        self.assertEqual([{"P9": 1, "P6": 100, "G1": [{"P7": 7}, {"P7": 8}], "P8": 0},
+                          {"P9": 2, "P6": 200, "G1": [], "P8": 0}], values["G0"])
+        self.assertEqual(1, values["P21"])
+
+        with self.assertRaises(pando.decoder.DecoderException):
+            decoder.decode(self.buffer[:-1], offset=2)
+
+    def test_should_decode_selected_parameters(self):
+        decoder = pando.decoder.packet.PacketDecoder(self.packet, uids=["P21"])
+        self.assertEqual({"P21": 1}, decoder.decode(self.buffer, offset=2))
+
+        decoder = pando.decoder.packet.PacketDecoder(self.packet, uids=["P7"])
+        self.assertEqual({"G0": [{"G1": [{"P7": 7}, {"P7": 8}]}, {"G1": []}]},
+                         decoder.decode(self.buffer, offset=2))
+
+        with self.assertRaises(pando.decoder.DecoderException):
+            pando.decoder.packet.PacketDecoder(self.packet, uids=["P100"])
+
+    def test_should_select_parameters_by_sid(self):
+        mapping = self.model.subsystems[0].applications[0x123].get_telemetry_by_sid("51234")
+
+        decoder = pando.decoder.packet.PacketDecoder(self.packet, sids=["DHST0002", "DHST0007"],
+                                                     mapping=mapping)
+        self.assertEqual({"G0": [{"P9": 1}, {"P9": 2}], "P21": 1},
+                         decoder.decode(self.buffer, offset=2))
+
+        with self.assertRaises(pando.decoder.DecoderException):
+            pando.decoder.packet.PacketDecoder(self.packet, sids=["DHST0002"])
+
+    def test_should_reject_reordered_parameter_mappings(self):
+        mapping = copy.copy(self.model.subsystems[0].applications[0x123].get_telemetry_by_sid("51234"))
+        mapping.parameters = list(reversed(mapping.parameters))
+
+        with self.assertRaises(pando.decoder.DecoderException):
+            pando.decoder.packet.PacketDecoder(self.packet, sids=["DHST0002"], mapping=mapping)
+
+    def test_should_read_bit_fields(self):
+        packet = pando.model.Telemetry("Test", "test", "")
+        for parameter in [create_parameter("flag", ParameterType.BOOLEAN, 1),
+                          create_parameter("u3", ParameterType.UNSIGNED_INTEGER, 3),
+                          create_parameter("s12", ParameterType.SIGNED_INTEGER, 12),
+                          create_parameter("le", ParameterType.UNSIGNED_INTEGER, 16,
+                                           pando.model.ByteOrder.LITTLE_ENDIAN),
+                          create_parameter("real", ParameterType.REAL, 32),
+                          create_parameter("time", ParameterType.ABSOLUTE_TIME, 48),
+                          create_parameter("text", ParameterType.ASCII_STRING, 32)]:
+            packet.append_parameter(parameter)
+
+        # 1 | 101 | 1111 1111 1110 -> True, 5, -2
+        buffer = bytes([0b11011111, 0b11111110]) + struct.pack("<H", 0x1234) + struct.pack(">f", 1.5) + \
+            bytes([0, 0, 0, 10, 0x80, 0]) + b"AB\x00\x00"
+
+        layout = pando.decoder.layout.Layout.from_packet(packet)
+        self.assertEqual(16 + 16 + 32 + 48 + 32, layout.size)
+        self.assertEqual([0, 1, 4, 16, 32, 64, 112], [f.offset for f in layout.get_static_fields()])
+
+        values = pando.decoder.packet.PacketDecoder(packet).decode(buffer)
+        self.assertEqual([True, 5, -2, 0x1234, 1.5, 10.5, "AB"],
+                         [values[key] for key in ["flag", "u3", "s12", "le", "real", "time", "text"]])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2017, German Aerospace Center (DLR)
+#
+# This file is part of the development version of the pando library.
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Authors:
+# - 2017, Fabian Greif (DLR RY-AVS)
+
+import os
+import struct
+import typing
+import unittest
+
+import pando
+import pando.decoder.record
+
+ParameterType = pando.model.ParameterType
+
+
+class RecordTest(unittest.TestCase):
+
+    def setUp(self):
+        filepath = os.path.join(os.path.dirname(os.path.realpath(__file__)), "..", "resources/test.xml")
+        self.model = pando.parser.Parser().parse(filepath)
+        self.records = pando.decoder.record.load(list(self.model.telemetries.values()) +
+                                                 list(self.model.telecommands.values()))
+
+        # G0 = 2 [P9, P6, G1 [P7], P8], P21
+        self.buffer = struct.pack(">H" + "HIHHHH" + "HIHH" + "B",
+                                  2,
+                                  1, 100, 2, 7, 8, 0,
+                                  2, 200, 0, 0,
+                                  1)
+
+    def test_should_generate_classes(self):
+        cls = self.records.RECORDS["service_3_12"]
+        self.assertEqual(("G0", "P21"), cls._fields)
+
+        hints = typing.get_type_hints(cls)
+        self.assertEqual(int, hints["P21"])
+        member = typing.get_args(hints["G0"])[0]
+        self.assertEqual(("P9", "P6", "G1", "P8"), member._fields)
+
+        source = pando.decoder.record.generate_source([self.model.telemetries["service_3_12"]],
+                                                      naming=pando.decoder.record.SHORT_NAME)
+        self.assertIn("    Collection_Interval: int\n", source)
+
+        # Fields of telecommands with a variable width are supported
+        self.assertEqual(("P4", "G3"), self.records.RECORDS["TEST03"]._fields)
+
+    def test_should_decode_and_encode_records(self):
+        packet = self.model.telemetries["service_3_12"]
+        cls = self.records.RECORDS["service_3_12"]
+
+        record = pando.decoder.record.RecordDecoder(packet, cls).decode(b"\x00" + self.buffer, 1)
+        self.assertIsInstance(record, cls)
+        self.assertEqual(1, record.P21)
+        self.assertEqual(200, record.G0[1].P6)
+        self.assertEqual((7, 8), tuple(entry.P7 for entry in record.G0[0].G1))
+
+        self.assertEqual(self.buffer, pando.decoder.record.RecordEncoder(packet, cls).encode(record))
+
+        changed = record._replace(G0=record.G0[:1])
+        self.assertEqual(1, struct.unpack_from(">H", pando.decoder.record.RecordEncoder(packet).encode(changed))[0])
+
+    def test_should_encode_telecommand(self):
+        packet = pando.model.Telecommand("Test", "test", "")
+        for uid, identifier, width in [("flag", ParameterType.BOOLEAN, 1),
+                                       ("s7", ParameterType.SIGNED_INTEGER, 7),
+                                       ("time", ParameterType.RELATIVE_TIME, 48),
+                                       ("real", ParameterType.REAL, 32),
+                                       ("text", ParameterType.ASCII_STRING, 32)]:
+            packet.append_parameter(pando.model.Parameter(uid, uid, "", ParameterType(identifier, width)))
+        cls = pando.decoder.record.load([packet]).RECORDS["test"]
+
+        record = cls(flag=True, s7=-2, time=1.5, real=0.25, text="AB")
+        buffer = pando.decoder.record.RecordEncoder(packet, cls).encode(record)
+        self.assertEqual(bytes([0b11111110, 0, 0, 0, 1, 0x80, 0]) + struct.pack(">f", 0.25) + b"AB\x00\x00",
+                         buffer)
+        self.assertEqual(record, pando.decoder.record.RecordDecoder(packet, cls).decode(buffer))
+
+    def test_should_quote_descriptions(self):
+        packet = pando.model.Telemetry('Say "hi"', "quoted", "")
+        repeater = pando.model.Repeater('Ends with \\', "repeater", "",
+                                        ParameterType(ParameterType.UNSIGNED_INTEGER, 8))
+        repeater.append_parameter(pando.model.Parameter("value", "value", "",
+                                                        ParameterType(ParameterType.UNSIGNED_INTEGER, 8)))
+        packet.append_parameter(repeater)
+
+        cls = pando.decoder.record.load([packet]).RECORDS["quoted"]
+        self.assertEqual('Say "hi"', cls.__doc__)
+        member = typing.get_args(typing.get_type_hints(cls)["repeater"])[0]
+        self.assertEqual("Repeated parameters of 'Ends with \\'", member.__doc__)
+
+
+if __name__ == '__main__':
+    unittest.main()
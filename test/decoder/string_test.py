@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2017, German Aerospace Center (DLR)
+#
+# This file is part of the development version of the pando library.
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Authors:
+# - 2017, Fabian Greif (DLR RY-AVS)
+
+import unittest
+
+import numpy
+
+import pando.model
+import pando.decoder
+import pando.decoder.string
+
+
+class StringTest(unittest.TestCase):
+
+    # Three records of 8 bytes with a 4 byte string at offset 2
+    BUFFER = b"..AB\x00\x00..--CD  --__\x00EF\x00__"
+
+    def test_should_return_views_into_buffer(self):
+        decoder = pando.decoder.string.StringDecoder(4)
+        buffer = bytearray(self.BUFFER)
+
+        value = decoder.decode(buffer, 2)
+        self.assertIsInstance(value, memoryview)
+        self.assertEqual(b"AB\x00\x00", value.tobytes())
+
+        # No copy, changes of the buffer are visible
+        buffer[2] = ord("X")
+        self.assertEqual(b"XB\x00\x00", value.tobytes())
+
+        with self.assertRaises(pando.decoder.DecoderException):
+            decoder.decode(buffer, 21)
+
+    def test_should_decode_ascii_lazily(self):
+        parameter_type = pando.model.ParameterType(pando.model.ParameterType.ASCII_STRING, 32)
+        decoder = pando.decoder.string.StringDecoder.from_parameter_type(parameter_type)
+
+        value = decoder.decode(self.BUFFER, 10)
+        self.assertIsNone(value._value)
+        self.assertEqual("CD", str(value))
+        self.assertEqual("CD", value)
+
+    def test_should_create_batch_views(self):
+        decoder = pando.decoder.string.StringDecoder(4, ascii=True)
+
+        values = decoder.batch(self.BUFFER, offset=2, stride=8)
+        self.assertEqual(numpy.dtype("S4"), values.dtype)
+        self.assertFalse(values.flags.owndata)
+        self.assertEqual([b"AB", b"CD  ", b"\x00EF"], values.tolist())
+        self.assertEqual(["AB", "CD", "\x00EF"], decoder.strip(values).tolist())
+
+        matrix = decoder.matrix(self.BUFFER, offset=2, stride=8)
+        self.assertEqual((3, 4), matrix.shape)
+        self.assertEqual([0, 69, 70, 0], matrix[2].tolist())
+
+        with self.assertRaises(pando.decoder.DecoderException):
+            decoder.batch(self.BUFFER, offset=2, stride=8, count=4)
+
+
+if __name__ == '__main__':
+    unittest.main()
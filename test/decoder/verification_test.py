@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2017, German Aerospace Center (DLR)
+#
+# This file is part of the development version of the pando library.
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Authors:
+# - 2017, Fabian Greif (DLR RY-AVS)
+
+
+import struct
+import unittest
+
+import pando.model
+import pando.decoder.verification as verification
+
+
+def create_telecommand(uid, acceptance=True, start=False, progress=False, completion=True):
+    telecommand = pando.model.Telecommand(uid, uid, "")
+    telecommand.verification.acceptance = acceptance
+    telecommand.verification.start = start
+    telecommand.verification.progress = progress
+    telecommand.verification.completion = completion
+    return telecommand
+
+
+class TimerWheelTest(unittest.TestCase):
+
+    def test_should_expire_items(self):
+        wheel = verification.TimerWheel(resolution=1.0, size=4)
+        wheel.schedule("a", 2.5, "a")
+        wheel.schedule("b", 1.2, "b")
+        wheel.schedule("c", 9.0, "c")
+        wheel.schedule("d", 3.0, "d")
+        wheel.cancel("d")
+
+        self.assertEqual([], wheel.advance(1.0))
+        self.assertEqual(["b"], wheel.advance(2.0))
+        self.assertEqual(["a"], wheel.advance(2.5))
+
+        # Moved in front of the current time
+        wheel.schedule("e", 1.0, "e")
+        self.assertEqual(["e"], wheel.advance(2.6))
+
+        # More than one revolution
+        self.assertEqual([], wheel.advance(8.9))
+        self.assertEqual(["c"], wheel.advance(20.0))
+        self.assertEqual(0, len(wheel))
+
+
+class VerificationTrackerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.closed = []
+        self.tracker = verification.VerificationTracker(timeout=10.0, callback=self.closed.append)
+
+    def test_should_follow_stages(self):
+        tc = create_telecommand("TC1", start=True)
+        command = self.tracker.sent(tc, 0x1801, 0xc005, 100.0)
+        self.assertEqual((verification.ACCEPTANCE, verification.START, verification.COMPLETION),
+                         command.stages)
+
+        self.assertIs(command, self.tracker.report(1, 0x1801, 0xc005, 101.0))
+        self.assertEqual(verification.ACCEPTANCE, command.stage)
+        self.tracker.report(3, 0x1801, 0xc005, 102.0)
+        self.assertEqual(verification.START, command.stage)
+        self.assertTrue(command.is_open)
+
+        # The timeout is restarted by every report
+        self.assertEqual([], self.tracker.advance(111.0))
+        self.tracker.report(7, 0x1801, 0xc005, 111.5)
+
+        self.assertEqual(verification.COMPLETED, command.state)
+        self.assertEqual([command], self.closed)
+        self.assertEqual(0, len(self.tracker))
+        self.assertEqual([(101.0, 1), (102.0, 3), (111.5, 7)], command.reports)
+
+        # Further reports are not matched
+        self.assertIsNone(self.tracker.report(7, 0x1801, 0xc005, 112.0))
+        self.assertEqual(1, self.tracker.unmatched)
+
+    def test_should_close_failed_and_timed_out_commands(self):
+        tc = create_telecommand("TC1")
+        failed = self.tracker.sent(tc, 0x1801, 1, 0.0)
+        lost = self.tracker.sent(tc, 0x1801, 2, 0.0)
+        accepted = self.tracker.sent(tc, 0x1802, 1, 5.0)
+
+        self.tracker.report(2, 0x1801, 1, 1.0)
+        self.tracker.report(1, 0x1802, 1, 6.0)
+        self.assertEqual(verification.FAILED, failed.state)
+
+        self.assertEqual([lost], self.tracker.advance(10.0))
+        self.assertEqual(verification.TIMEOUT, lost.state)
+        self.assertEqual([accepted], self.tracker.advance(16.0))
+        self.assertEqual(verification.ACCEPTANCE, accepted.stage)
+        self.assertEqual([failed, lost, accepted], self.closed)
+
+    def test_should_handle_commands_without_reports(self):
+        tc = create_telecommand("TC1", acceptance=False, completion=False)
+        command = self.tracker.sent(tc, 0x1801, 1, 0.0)
+        self.assertEqual(verification.COMPLETED, command.state)
+        self.assertEqual(0, len(self.tracker))
+
+    def test_should_read_report(self):
+        packet = struct.pack(">HHHBBBIHHH", 0x0801, 0xc000, 12, 0x10, 1, 7, 0, 0, 0x1801, 0xc005)
+        self.assertEqual((7, 0x1801, 0xc005), verification.read_report(packet))
+
+        packet = struct.pack(">HHHBBBIHHH", 0x0801, 0xc000, 12, 0x10, 5, 1, 0, 0, 1, 0)
+        self.assertIsNone(verification.read_report(packet))
+
+
+if __name__ == '__main__':
+    unittest.main()
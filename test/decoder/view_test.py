@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2017, German Aerospace Center (DLR)
+#
+# This file is part of the development version of the pando library.
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Authors:
+# - 2017, Fabian Greif (DLR RY-AVS)
+
+import os
+import struct
+import unittest
+
+import pando
+import pando.decoder.packet
+import pando.decoder.view
+
+
+class ViewTest(unittest.TestCase):
+
+    def setUp(self):
+        filepath = os.path.join(os.path.dirname(os.path.realpath(__file__)), "..", "resources/test.xml")
+        self.model = pando.parser.Parser().parse(filepath)
+        self.packet = self.model.telemetries["service_3_12"]
+        self.views = pando.decoder.view.ViewType(self.packet)
+
+        # G0 = 2 [P9, P6, G1 [P7], P8], P21
+        self.buffer = b"\xff\xff" + struct.pack(">H" + "HIHHHH" + "HIHH" + "B",
+                                                2,
+                                                1, 100, 2, 7, 8, 0,
+                                                2, 200, 0, 0,
+                                                1)
+
+    def test_should_decode_on_access(self):
+        view = self.views(self.buffer, offset=2)
+        self.assertFalse(view.is_decoded("P21"))
+
+        self.assertEqual(1, view["P21"])
+        self.assertTrue(view.is_decoded("P21"))
+        self.assertFalse(view.is_decoded("G0"))
+
+        entries = view.G0
+        self.assertIs(entries, view["G0"])
+        self.assertEqual(2, len(entries))
+        self.assertEqual(200, entries[1].P6)
+        self.assertEqual([7, 8], [entry.P7 for entry in entries[0].G1])
+
+        with self.assertRaises(KeyError):
+            view["P100"]
+        with self.assertRaises(AttributeError):
+            view.P100
+
+    def test_should_match_decoder(self):
+        view = self.views(self.buffer, offset=2)
+        self.assertEqual(["G0", "P21"], list(view))
+        self.assertEqual(pando.decoder.packet.PacketDecoder(self.packet).decode(self.buffer, offset=2),
+                         view.to_dict())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2017, German Aerospace Center (DLR)
+#
+# This file is part of the development version of the pando library.
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Authors:
+# - 2017, Fabian Greif (DLR RY-AVS)
+
+import os
+import json
+import unittest
+
+import pando
+import pando.model.diff
+
+
+class ModelDiffTest(unittest.TestCase):
+
+    def parse(self, filename="resources/test.xml"):
+        filepath = os.path.join(os.path.dirname(os.path.realpath(__file__)), "..", filename)
+        return pando.parser.Parser().parse(filepath)
+
+    def compare(self, old, new):
+        return pando.model.diff.ModelDiff(old, new).compare()
+
+    @staticmethod
+    def _find(changes, category, key):
+        for change in changes:
+            if change.category == category and change.key == key:
+                return change
+        return None
+
+    def test_should_produce_stable_hashes(self):
+        first = pando.model.diff.Fingerprint()
+        second = pando.model.diff.Fingerprint()
+
+        a = self.parse()
+        b = self.parse()
+        for uid in a.telemetries:
+            self.assertEqual(first.digest(a.telemetries[uid]), second.digest(b.telemetries[uid]))
+        self.assertNotEqual(first.digest(a.parameters["P2"]), first.digest(a.parameters["P3"]))
+
+    def test_should_find_no_difference(self):
+        self.assertEqual([], self.compare(self.parse(), self.parse()))
+
+    def test_should_propagate_parameter_changes(self):
+        old = self.parse()
+        new = self.parse()
+
+        # P7 is part of the repeater G1 which is part of G0
+        new.parameters["P7"].type.width = 32
+        for parameter in new.telemetries["service_3_12"].get_parameters_as_flattened_list():
+            if parameter.uid == "P7":
+                parameter.type.width = 32
+
+        changes = self.compare(old, new)
+
+        change = self._find(changes, "parameters", "P7")
+        self.assertEqual(pando.model.diff.Change.CHANGED, change.kind)
+        self.assertEqual([("width", 16, 32)], change.fields)
+
+        change = self._find(changes, "telemetries", "service_3_12")
+        self.assertEqual(["parameters"], [f[0] for f in change.fields])
+        self.assertIsNotNone(self._find(changes, "packet_mappings", "0/0x123/51234"))
+        self.assertIsNone(self._find(changes, "telecommands", "TEST02"))
+
+        text = pando.model.diff.to_text(changes)
+        self.assertIn("width: 16 -> 32", text)
+        self.assertIn("parameters[0]: 'G0' modified", text)
+
+    def test_should_detect_added_removed_and_renamed(self):
+        old = self.parse()
+        new = self.parse()
+
+        del new.telecommands["TEST05"]
+        new.enumerations["E1x"] = new.enumerations.pop("E1")
+        new.enumerations["E1x"].uid = "E1x"
+        packet = new.telemetries["service_3_12"]
+        packet.uid = "service_3_12_new"
+        packet.name = "Changed"
+        new.telemetries["service_3_12_new"] = packet
+
+        changes = self.compare(old, new)
+
+        self.assertEqual(pando.model.diff.Change.REMOVED, self._find(changes, "telecommands", "TEST05").kind)
+        change = self._find(changes, "enumerations", "E1x")
+        self.assertEqual(pando.model.diff.Change.RENAMED, change.kind)
+        self.assertEqual("E1", change.old_key)
+        self.assertEqual(pando.model.diff.Change.ADDED,
+                         self._find(changes, "telemetries", "service_3_12_new").kind)
+
+    def test_should_report_mapping_changes_as_json(self):
+        old = self.parse()
+        new = self.parse()
+
+        application = new.subsystems[0].applications[0x123]
+        application.get_telemetry_by_sid("51234").parameters[1].sid = "DHST9999"
+        del new.subsystems[0].telecommand_parameters["P4"]
+
+        report = pando.model.diff.to_json(self.compare(old, new))
+        report = json.loads(json.dumps(report))
+
+        self.assertEqual({"packet_mappings": {"changed": 1}, "subsystems": {"changed": 1}}, report["summary"])
+        mapping = [c for c in report["changes"] if c["category"] == "packet_mappings"][0]
+        self.assertEqual("0/0x123/51234", mapping["key"])
+        self.assertEqual("parameters", mapping["fields"][0]["field"])
+
+
+if __name__ == '__main__':
+    unittest.main()
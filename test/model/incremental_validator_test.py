@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2017, German Aerospace Center (DLR)
+#
+# This file is part of the development version of the pando library.
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Authors:
+# - 2017, Fabian Greif (DLR RY-AVS)
+
+import os
+import unittest
+
+import pando
+import pando.model.report
+import pando.model.validator
+
+
+class IncrementalValidatorTest(unittest.TestCase):
+
+    CHECKS = [
+        "get_unmapped_telecommand_parameters",
+        "get_packets_with_unaligned_length",
+        "get_mapped_but_unreferenced_telecommand_parameter",
+        "get_unmapped_telemetry_parameters",
+        "get_unmapped_enumerations",
+        "get_unmapped_calibrations",
+        "get_ambiguous_telemetry_packets",
+        "get_ambiguous_packet_mappings",
+        "get_ambiguous_telemetry_parameters_within_mapping",
+        "get_ambiguous_telemetry_service_identifier",
+        "get_enumeration_with_non_unqiue_values",
+    ]
+
+    def setUp(self):
+        filepath = os.path.join(os.path.dirname(os.path.realpath(__file__)), "..",
+                                "resources/calibration_services.xml")
+        self.model = pando.parser.Parser().parse(filepath)
+        self.validator = pando.model.validator.IncrementalValidator(self.model)
+
+    def assertEqualToFullRun(self):
+        full = pando.model.validator.ModelValidator(self.model)
+        for check in self.CHECKS:
+            self.assertEqual(getattr(full, check)(), getattr(self.validator, check)(), check)
+
+    def run_all_checks(self):
+        computed = self.validator.computed
+        for check in self.CHECKS:
+            getattr(self.validator, check)()
+        return self.validator.computed - computed
+
+    def test_should_only_recompute_changed_parts(self):
+        self.assertGreater(self.run_all_checks(), 0)
+        self.assertEqual(0, self.run_all_checks())
+
+        enumeration = self.model.enumerations["E1"]
+        enumeration.append_entry(pando.model.EnumerationEntry("Duplicate", enumeration.entries[0].value, ""))
+        self.validator.update(enumerations=["E1"])
+
+        # Value check of the enumeration and the enumeration mapping check
+        # of the subsystem
+        self.assertEqual(2, self.run_all_checks())
+        self.assertIn(enumeration, self.validator.get_enumeration_with_non_unqiue_values())
+        self.assertEqualToFullRun()
+
+    def test_should_follow_changes_of_packets(self):
+        self.run_all_checks()
+
+        packet = self.model.telemetries["other"]
+        parameter_type = pando.model.ParameterType(pando.model.ParameterType.UNSIGNED_INTEGER, 3)
+        packet.append_parameter(pando.model.Parameter(name="odd", uid="odd", description="",
+                                                      parameter_type=parameter_type))
+        self.validator.update(packets=[packet.uid])
+
+        self.assertIn(packet, self.validator.get_packets_with_unaligned_length())
+        self.assertEqualToFullRun()
+
+    def test_should_follow_added_applications(self):
+        self.run_all_checks()
+
+        subsystem = list(self.model.subsystems.values())[0]
+        application = pando.model.ApplicationMapping(name="new", apid=0x7FF, description="")
+        for telemetry in self.model.telemetries.values():
+            application.append_telemetry(pando.model.TelemetryMapping("NEW_%s" % telemetry.uid, telemetry))
+        subsystem.applications[application.apid] = application
+        self.validator.update(applications=[application.apid])
+
+        self.assertEqualToFullRun()
+
+    def test_should_be_usable_for_reports(self):
+        report = pando.model.report.verify(self.model, validator=self.validator)
+        self.assertEqual(report.get_messages(),
+                         pando.model.report.verify(self.model).get_messages())
+
+        computed = self.validator.computed
+        pando.model.report.verify(self.model, validator=self.validator)
+        self.assertEqual(computed, self.validator.computed)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2017, German Aerospace Center (DLR)
+#
+# This file is part of the development version of the pando library.
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Authors:
+# - 2017, Fabian Greif (DLR RY-AVS)
+
+import os
+import pickle
+import unittest
+
+import pando
+import pando.model.diff
+import pando.model.projection
+
+
+class RuntimeProjectionTest(unittest.TestCase):
+
+    def parse(self, filename, profile=pando.parser.Parser.PROFILE_FULL):
+        filepath = os.path.join(os.path.dirname(os.path.realpath(__file__)), "..", filename)
+        return pando.parser.Parser().parse(filepath, profile=profile)
+
+    def test_should_remove_documentation(self):
+        model = self.parse("resources/test.xml")
+        projected = pando.model.projection.runtime_projection(model)
+
+        tc = projected.telecommands["time_sync"]
+        self.assertEqual([], tc.additional)
+        self.assertEqual("", tc.description)
+        self.assertEqual("", projected.parameters["G1"].description)
+        self.assertEqual(tc.name, tc.short_name)
+
+        # Original model is unchanged
+        self.assertNotEqual([], model.telecommands["time_sync"].additional)
+        self.assertNotEqual("", model.parameters["G1"].description)
+
+        self.assertLess(len(pickle.dumps(projected)), len(pickle.dumps(model)))
+
+    def test_should_keep_runtime_information(self):
+        model = self.parse("resources/calibration_services.xml")
+        projected = pando.model.projection.runtime_projection(model, inplace=True)
+
+        self.assertIs(model, projected)
+        self.assertEqual("calibration_parameter", projected.parameters["P100"].calibration.uid)
+        self.assertEqual(2, len(projected.subsystems[0].telemetry_calibrations))
+
+    def test_should_match_runtime_profile(self):
+        for filename in ["resources/test.xml",
+                         "resources/derived_packet.xml",
+                         "resources/packet_generation.xml",
+                         "resources/partial_loading.xml"]:
+            model = self.parse(filename)
+            runtime = self.parse(filename, profile=pando.parser.Parser.PROFILE_RUNTIME)
+
+            projected = pando.model.projection.runtime_projection(model)
+            self.assertEqual([], pando.model.diff.ModelDiff(projected, runtime).compare())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2017, German Aerospace Center (DLR)
+#
+# This file is part of the development version of the pando library.
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Authors:
+# - 2017, Fabian Greif (DLR RY-AVS)
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import pando
+import pando.builder.sqlite
+
+
+class ReferenceIndexTest(unittest.TestCase):
+
+    def parse(self, filename):
+        filepath = os.path.join(os.path.dirname(os.path.realpath(__file__)), "..", filename)
+        return pando.parser.Parser().parse(filepath)
+
+    def test_should_index_parameter_usage(self):
+        references = self.parse("resources/test.xml").references
+
+        self.assertEqual(["service_3_12"], references.get_packets("P7"))
+        self.assertEqual(["G1"], references.get_collections("P7"))
+        self.assertEqual(["G0"], references.get_collections("G1"))
+        self.assertEqual(["P21", "P4"], references.get_enumeration_parameters("E0"))
+
+        kinds = set((m.kind, m.sid) for m in references.get_mappings("P4"))
+        self.assertIn(("telecommand_parameter", "DHSP0000"), kinds)
+
+    def test_should_index_calibrations(self):
+        references = self.parse("resources/calibration_services.xml").references
+
+        self.assertEqual(["P100"], references.get_calibration_parameters("calibration_parameter"))
+
+        impact = references.get_impact("calibration_parameter")
+        self.assertEqual(["P100"], impact.parameters)
+        self.assertNotEqual([], impact.packets)
+
+    def test_should_follow_derived_packets(self):
+        model = self.parse("resources/derived_packet.xml")
+
+        self.assertEqual(["tm1_d"], model.references.get_derived_packets("tm1"))
+        impact = model.references.get_impact("tm1")
+        self.assertEqual(["tm1", "tm1_d"], impact.packets)
+
+    def test_should_collect_transitive_impact(self):
+        model = self.parse("resources/test.xml")
+
+        impact = model.references.get_impact("P7")
+        self.assertEqual(["G0", "G1", "P7"], impact.parameters)
+        self.assertEqual(["service_3_12"], impact.packets)
+
+        sids = [m.sid for m in impact.mappings]
+        self.assertEqual(["DHST0005", "DHST0001", "DHST0004", "51234"], sids)
+
+    def test_should_build_index_when_loading_database(self):
+        model = self.parse("resources/test.xml")
+        directory = tempfile.mkdtemp()
+        try:
+            database = os.path.join(directory, "model.db")
+            pando.builder.sqlite.SqliteBuilder(model).generate(database)
+            loaded = pando.parser.SqliteParser().parse(database)
+        finally:
+            shutil.rmtree(directory)
+
+        self.assertEqual(model.references.get_impact("E0"), loaded.references.get_impact("E0"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2017, German Aerospace Center (DLR)
+#
+# This file is part of the development version of the pando library.
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Authors:
+# - 2017, Fabian Greif (DLR RY-AVS)
+
+import os
+import json
+import unittest
+
+import pando
+import pando.model.report
+
+
+class ReportTest(unittest.TestCase):
+
+    def path(self, filename):
+        return os.path.realpath(os.path.join(os.path.dirname(os.path.realpath(__file__)), "..", filename))
+
+    def verify(self, filename):
+        filepath = self.path(filename)
+        model = pando.parser.Parser().parse(filepath)
+        return pando.model.report.verify(model, filepath)
+
+    def test_should_report_success_with_runtimes(self):
+        report = self.verify("resources/test.xml")
+
+        self.assertTrue(report.success)
+        self.assertEqual([check.identifier for check in pando.model.report.CHECKS],
+                         list(report.runtimes.keys()))
+
+        content = pando.model.report.to_json([report])
+        self.assertTrue(content["success"])
+        self.assertEqual(len(pando.model.report.CHECKS), len(content["databases"][0]["checks"]))
+
+    def test_should_locate_findings_in_included_files(self):
+        report = self.verify("resources/calibration_services.xml")
+        self.assertFalse(report.success)
+
+        findings = [f for f in report.findings
+                    if f.check.identifier == "unmapped-calibrations" and "calibration_polynom" in f.uids]
+        self.assertEqual(1, len(findings))
+
+        source = findings[0].sources[0]
+        self.assertEqual(self.path("resources/calibration_curves.xml"), source.filename)
+        self.assertEqual(27, source.line)
+
+    def test_should_create_sarif_log(self):
+        report = self.verify("resources/calibration_services.xml")
+        log = json.loads(json.dumps(pando.model.report.to_sarif([report])))
+
+        self.assertEqual("2.1.0", log["version"])
+        self.assertEqual(1, len(log["runs"]))
+
+        run = log["runs"][0]
+        rules = set(rule["id"] for rule in run["tool"]["driver"]["rules"])
+        self.assertEqual(len(report.findings), len(run["results"]))
+        for result in run["results"]:
+            self.assertIn(result["ruleId"], rules)
+            self.assertIn("locations", result)
+
+
+if __name__ == '__main__':
+    unittest.main()
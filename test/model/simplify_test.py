@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2017, German Aerospace Center (DLR)
+#
+# This file is part of the development version of the pando library.
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Authors:
+# - 2017, Fabian Greif (DLR RY-AVS)
+
+import os
+import math
+import shutil
+import tempfile
+import unittest
+
+import lxml.etree
+
+import pando
+import pando.builder.xml
+import pando.model.simplify
+
+
+class SimplifyTest(unittest.TestCase):
+
+    def create_calibration(self, values, extrapolate=False):
+        calibration = pando.model.Interpolation(pando.model.Calibration.INTERPOLATION_TELEMETRY,
+                                                name="Curve", uid="curve", description="")
+        calibration.input_type = pando.model.Interpolation.UNSIGNED_INTEGER
+        calibration.output_type = pando.model.Interpolation.REAL
+        calibration.extrapolate = extrapolate
+        for x, y in values:
+            calibration.append_point(pando.model.Interpolation.Point(float(x), float(y)))
+        return calibration
+
+    @staticmethod
+    def evaluate(points, x):
+        for first, second in zip(points[:-1], points[1:]):
+            if x <= second.x:
+                break
+        return first.y + (x - first.x) * (second.y - first.y) / (second.x - first.x)
+
+    def test_should_remove_collinear_points(self):
+        calibration = self.create_calibration([(x, 2 * x + 1) for x in range(100)])
+        result = pando.model.simplify.simplify_interpolation(calibration, 0.001)
+
+        self.assertEqual([(0.0, 1.0), (99.0, 199.0)],
+                         [(p.x, p.y) for p in result.simplified.points])
+        self.assertEqual(98, result.reduction)
+        # Original calibration is unchanged
+        self.assertEqual(100, len(calibration.points))
+
+    def test_should_respect_the_maximum_error(self):
+        calibration = self.create_calibration([(x, 100 * math.sin(x / 20.0)) for x in range(500)])
+
+        for max_error in [0.01, 0.1, 1.0, 10.0]:
+            result = pando.model.simplify.simplify_interpolation(calibration, max_error)
+            self.assertLessEqual(result.error, max_error)
+            self.assertLess(len(result.simplified.points), len(calibration.points))
+
+            for x in range(0, 4990):
+                x = x / 10.0
+                self.assertLessEqual(abs(self.evaluate(calibration.points, x)
+                                         - self.evaluate(result.simplified.points, x)),
+                                     max_error + 1e-9)
+
+    def test_should_keep_outer_segments_for_extrapolation(self):
+        calibration = self.create_calibration([(0, 0), (1, 5), (2, 5.1), (3, 5.2), (4, 0)],
+                                              extrapolate=True)
+        result = pando.model.simplify.simplify_interpolation(calibration, 1.0)
+
+        self.assertEqual([0.0, 1.0, 3.0, 4.0], [p.x for p in result.simplified.points])
+
+    def test_should_keep_all_points_of_short_extrapolated_curves(self):
+        calibration = self.create_calibration([(0, 0), (1, 1), (2, 2.05)], extrapolate=True)
+        result = pando.model.simplify.simplify_interpolation(calibration, 0.1)
+
+        self.assertEqual([0.0, 1.0, 2.0], [p.x for p in result.simplified.points])
+        self.assertAlmostEqual(self.evaluate(calibration.points, 100),
+                               self.evaluate(result.simplified.points, 100))
+
+    def test_should_write_simplified_calibrations(self):
+        filepath = os.path.join(os.path.dirname(os.path.realpath(__file__)), "..",
+                                "resources/calibration_services.xml")
+        model = pando.parser.Parser().parse(filepath)
+        results = pando.model.simplify.simplify_model(model, 1.0)
+        self.assertEqual(["calibration_test", "calibration_parameter"],
+                         [result.original.uid for result in results])
+
+        directory = tempfile.mkdtemp()
+        try:
+            filename = os.path.join(directory, "calibrations.xml")
+            pando.builder.xml.XmlBuilder(model).generate_calibrations(
+                filename, [result.simplified for result in results])
+
+            xsdfile = os.path.join(os.path.dirname(os.path.realpath(pando.__file__)),
+                                   "resources/schema/calibration.xsd")
+            schema = pando.parser.load_schema(xsdfile)
+            schema.assertValid(lxml.etree.parse(filename))
+        finally:
+            shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -144,6 +144,62 @@ class ModelTest(unittest.TestCase):
         self.assertEqual(len(enumerations), 1)
         self.assertIn(enumeration1, enumerations)
 
+    def _generate_telemetry_mapping(self, model, uid, identification):
+        packet = pando.model.Telemetry(name=uid, uid=uid, description="")
+        packet.service_type = 3
+        packet.service_subtype = 25
+        for parameter_uid, value in identification:
+            parameter = model.parameters.get(parameter_uid)
+            if parameter is None:
+                parameter = self._create_parameter(parameter_uid, model)
+            packet.append_parameter(parameter)
+            packet.identification_parameter.append(
+                pando.model.TelemetryIdentificationParameter(parameter, value))
+        model.telemetries[packet.uid] = packet
+
+        subsystem = model.get_or_add_subsystem(1, "test")
+        application = subsystem.applications.get(0x100)
+        if application is None:
+            application = pando.model.ApplicationMapping(name="app", apid=0x100, description="")
+            subsystem.applications[application.apid] = application
+        application.append_telemetry(pando.model.TelemetryMapping("M%s" % uid, packet))
+        return packet
+
+    def test_should_detect_ambiguous_telemetry_packets(self):
+        model = pando.model.Model()
+        tm1 = self._generate_telemetry_mapping(model, "tm1", [("sid", "1")])
+        self._generate_telemetry_mapping(model, "tm2", [("sid", "2")])
+        tm3 = self._generate_telemetry_mapping(model, "tm3", [("sid", "1")])
+        tm4 = self._generate_telemetry_mapping(model, "tm4", [("other", "3")])
+
+        # Packets without identification are checked by the service identifier check
+        self._generate_telemetry_mapping(model, "tm5", [])
+        self._generate_telemetry_mapping(model, "tm6", [])
+
+        validator = pando.model.validator.ModelValidator(model)
+        ambiguous = [(first.uid, second.uid) for first, second
+                     in validator.get_ambiguous_telemetry_packets()]
+
+        self.assertEqual([("tm1", "tm3"),
+                          ("tm1", "tm4"), ("tm2", "tm4"), ("tm3", "tm4"),
+                          ("tm1", "tm5"), ("tm2", "tm5"), ("tm3", "tm5"), ("tm4", "tm5"),
+                          ("tm1", "tm6"), ("tm2", "tm6"), ("tm3", "tm6"), ("tm4", "tm6")],
+                         ambiguous)
+
+        service = validator.get_ambiguous_telemetry_service_identifier()
+        self.assertEqual(["Mtm1", "Mtm3", "Mtm5", "Mtm6"],
+                         [entry["mapping"].sid for entry in service])
+
+    def test_should_distinguish_telemetry_by_any_identification_value(self):
+        model = pando.model.Model()
+        self._generate_telemetry_mapping(model, "tm1", [("sid", "1"), ("sub", "1")])
+        self._generate_telemetry_mapping(model, "tm2", [("sid", "1"), ("sub", "2")])
+        self._generate_telemetry_mapping(model, "tm3", [("sid", "2"), ("sub", "2")])
+
+        validator = pando.model.validator.ModelValidator(model)
+        self.assertEqual([], validator.get_ambiguous_telemetry_packets())
+        self.assertEqual([], validator.get_ambiguous_telemetry_service_identifier())
+
     def test_should_detect_not_aligned_packets(self):
         model = pando.model.Model()
 
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2017, German Aerospace Center (DLR)
+#
+# This file is part of the development version of the pando library.
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Authors:
+# - 2017, Fabian Greif (DLR RY-AVS)
+
+import os
+import unittest
+import pando
+
+
+class ParserFilterTest(unittest.TestCase):
+
+    def parse(self, **kwargs):
+        filepath = os.path.join(os.path.dirname(os.path.realpath(__file__)),
+                                "..", "resources/partial_loading.xml")
+        return pando.parser.Parser().parse(filepath, **kwargs)
+
+    def test_without_filter(self):
+        model = self.parse()
+
+        self.assertIn("tm_unmapped", model.telemetries)
+        self.assertIn("p_unused", model.parameters)
+        self.assertIn("E_unused", model.enumerations)
+        self.assertEqual([1, 2], sorted(model.subsystems.keys()))
+
+    def test_subsystem_filter(self):
+        model = self.parse(subsystems=[2])
+
+        self.assertEqual(["tm_power"], list(model.telemetries.keys()))
+        self.assertEqual([], list(model.telecommands.keys()))
+        self.assertEqual(["cal_current"], list(model.calibrations.keys()))
+        self.assertEqual([], list(model.enumerations.keys()))
+        self.assertEqual([2], list(model.subsystems.keys()))
+        self.assertNotIn("p_mode", model.parameters)
+
+    def test_apid_filter(self):
+        model = self.parse(apids=[0x10])
+
+        # tm_power is referenced as relevant telemetry by tc_mode
+        self.assertEqual(["ev_mode", "tm_aocs", "tm_aocs_extended", "tm_power"],
+                         sorted(model.telemetries.keys()))
+        self.assertEqual(["tc_mode"], list(model.telecommands.keys()))
+        self.assertEqual(["E_mode"], list(model.enumerations.keys()))
+        self.assertNotIn("p_unused", model.parameters)
+
+        subsystem = model.subsystems[1]
+        self.assertEqual([0x10], list(subsystem.applications.keys()))
+        self.assertEqual(["E_mode"], list(subsystem.telemetry_enumerations.keys()))
+        self.assertEqual(["tm_aocs_extended"], model.references.get_derived_packets("tm_aocs"))
+
+    def test_packet_class_filter(self):
+        model = self.parse(packet_classes=["Realtime"])
+
+        self.assertEqual(["tm_aocs_extended"], list(model.telemetries.keys()))
+        self.assertEqual([1], list(model.subsystems.keys()))
+        self.assertEqual([0x10], list(model.subsystems[1].applications.keys()))
+
+        mappings = model.subsystems[1].applications[0x10].get_telemetries()
+        self.assertEqual(["A002"], [m.sid for m in mappings])
+
+    def test_packet_class_filter_should_skip_unused_packets(self):
+        filepath = os.path.join(os.path.dirname(os.path.realpath(__file__)),
+                                "..", "resources/partial_loading.xml")
+        rootnode = pando.parser.Parser()._validate_and_parse_xml(filepath, None, False, None)
+
+        # The base packet is required to parse the derived packet
+        uids = pando.parser.Parser._collect_packet_uids(rootnode, None, None, {"Realtime"})
+        self.assertEqual({"tm_aocs", "tm_aocs_extended"}, uids)
+
+    def test_combined_filter(self):
+        model = self.parse(subsystems=[1], apids=[0x11])
+
+        self.assertEqual(["tm_power"], list(model.telemetries.keys()))
+        self.assertEqual([0x11], list(model.subsystems[1].applications.keys()))
+
+
+if __name__ == '__main__':
+    unittest.main()
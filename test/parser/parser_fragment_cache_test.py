@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2017, German Aerospace Center (DLR)
+#
+# This file is part of the development version of the pando library.
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Authors:
+# - 2017, Fabian Greif (DLR RY-AVS)
+
+import os
+import unittest
+import pando
+import pando.model.diff
+
+
+class ParserFragmentCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.filepath = os.path.join(os.path.dirname(os.path.realpath(__file__)),
+                                     "..", "resources/calibration_services.xml")
+
+    def test_included_files_should_be_parsed_once(self):
+        fragments = pando.parser.FragmentCache()
+        parser = pando.parser.Parser(fragments)
+
+        first = parser.parse(self.filepath)
+        second = parser.parse(self.filepath)
+
+        self.assertEqual(1, fragments.misses)
+        self.assertEqual(1, fragments.hits)
+        self.assertEqual([], pando.model.diff.ModelDiff(first, second).compare())
+
+    def test_should_produce_same_model_as_xinclude(self):
+        for lean in [False, True]:
+            fragments = pando.parser.FragmentCache()
+            fragments.add_includes(self.filepath, lean=lean)
+
+            model = pando.parser.Parser().parse(self.filepath, lean=lean)
+            cached = pando.parser.Parser(fragments).parse(self.filepath, lean=lean)
+
+            self.assertEqual(1, fragments.hits)
+            self.assertEqual([], pando.model.diff.ModelDiff(model, cached).compare())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2017, German Aerospace Center (DLR)
+#
+# This file is part of the development version of the pando library.
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Authors:
+# - 2017, Fabian Greif (DLR RY-AVS)
+
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+
+import pando
+import pando.builder.sqlite
+import pando.model.validator
+
+
+class ParserSqliteTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def export_file(self, filename):
+        filepath = os.path.join(os.path.dirname(os.path.realpath(__file__)), "..", filename)
+        model = pando.parser.Parser().parse(filepath)
+
+        database = os.path.join(self.directory, "model.db")
+        pando.builder.sqlite.SqliteBuilder(model).generate(database)
+        return model, database
+
+    def load_file(self, filename):
+        model, database = self.export_file(filename)
+        loaded = pando.parser.SqliteParser().parse(database)
+
+        self.assertIsNotNone(loaded)
+        return model, loaded
+
+    @staticmethod
+    def _flattened_uids(packet):
+        return [p.uid for p in packet.get_parameters_as_flattened_list()]
+
+    def test_should_restore_packets(self):
+        model, loaded = self.load_file("resources/test.xml")
+
+        self.assertEqual(list(model.telemetries.keys()), list(loaded.telemetries.keys()))
+        self.assertEqual(list(model.telecommands.keys()), list(loaded.telecommands.keys()))
+
+        for uid, packet in model.telemetries.items():
+            self.assertEqual(self._flattened_uids(packet), self._flattened_uids(loaded.telemetries[uid]))
+            self.assertEqual(packet.depth, loaded.telemetries[uid].depth)
+        for uid, packet in model.telecommands.items():
+            self.assertEqual(self._flattened_uids(packet), self._flattened_uids(loaded.telecommands[uid]))
+
+        tc = loaded.telecommands["time_sync"]
+        self.assertEqual(tc.additional, model.telecommands["time_sync"].additional)
+        self.assertEqual(9, tc.service_type)
+        self.assertEqual(128, tc.service_subtype)
+
+        tc = loaded.telecommands["TEST02"]
+        self.assertTrue(tc.critical)
+        self.assertEqual("service_3_12", tc.relevant_telemetry[0].uid)
+        self.assertIs(loaded.telemetries["service_3_12"], tc.relevant_telemetry[0])
+
+        tc = loaded.telecommands["TEST05"]
+        self.assertFalse(tc.verification.acceptance)
+        self.assertTrue(tc.verification.progress)
+
+    def test_should_restore_parameter_values(self):
+        _, loaded = self.load_file("resources/test.xml")
+
+        tc = loaded.telecommands["TEST02"]
+        p21 = tc.get_parameters_as_flattened_list()[1]
+        self.assertEqual("Unit17", p21.value)
+        self.assertEqual(pando.model.Parameter.DEFAULT, p21.value_type)
+
+        # The global definition must not be changed by the packet value
+        self.assertEqual("Unit1", loaded.parameters["P21"].value)
+        self.assertEqual(pando.model.Parameter.FIXED, loaded.parameters["P21"].value_type)
+
+        g1 = loaded.parameters["G1"]
+        self.assertEqual("1", g1.value_range.min)
+        self.assertEqual("10", g1.value_range.max)
+        self.assertEqual(["P7"], [p.uid for p in g1.parameters])
+
+        self.assertEqual(pando.model.ParameterType.ABSOLUTE_TIME, loaded.parameters["P1"].type.identifier)
+        self.assertEqual(48, loaded.parameters["P1"].type.width)
+        self.assertEqual("E0", loaded.parameters["P4"].type.enumeration)
+
+    def test_should_restore_mappings(self):
+        model, loaded = self.load_file("resources/test.xml")
+
+        application = loaded.subsystems[0].applications[0x123]
+        self.assertEqual(2, len(application.get_telemetries()))
+        self.assertEqual(7, len(application.get_telemetry_by_sid("51234").parameters))
+        self.assertEqual("TEST03", application.get_telecommands()[0].telecommand.uid)
+        self.assertEqual(5, len(loaded.subsystems[0].telecommand_parameters))
+
+        validator = pando.model.validator.ModelValidator(loaded)
+        self.assertEqual(0, len(validator.get_unmapped_telemetry_parameters()))
+        self.assertEqual(0, len(validator.get_unmapped_telecommand_parameters()))
+        self.assertEqual(pando.model.validator.ModelValidator(model).get_unused_parameters(),
+                         validator.get_unused_parameters())
+
+    def test_should_restore_calibrations(self):
+        _, loaded = self.load_file("resources/calibration_services.xml")
+
+        self.assertEqual(4, len(loaded.calibrations))
+
+        calibration = loaded.parameters["P100"].calibration
+        self.assertEqual("calibration_parameter", calibration.uid)
+        self.assertFalse(calibration.extrapolate)
+        self.assertEqual(100.12, calibration.points[0].x)
+        self.assertEqual(pando.model.Interpolation.REAL, calibration.input_type)
+
+        polynom = loaded.calibrations["calibration_polynom"]
+        self.assertEqual(3.5, polynom.a2)
+
+        self.assertEqual(2, len(loaded.subsystems[0].telemetry_calibrations))
+        self.assertEqual(1, len(loaded.subsystems[0].telecommand_calibrations))
+
+    def test_should_restore_events_and_packet_generation(self):
+        model, loaded = self.load_file("resources/packet_generation.xml")
+
+        event = loaded.telemetries["event"]
+        self.assertEqual(pando.model.Packet.EVENT, event.packet_type)
+        self.assertEqual(0, event.report_id)
+        self.assertEqual(pando.model.Event.LOW_SEVERITY, event.severity)
+        self.assertEqual(["s5_report_id"], self._flattened_uids(event))
+        self.assertEqual(0, len(event.event_parameters))
+        self.assertEqual("0", event.identification_parameter[0].value)
+
+        application = loaded.subsystems[0].applications[1]
+        for mapping in model.subsystems[0].applications[1].get_telemetries():
+            self.assertEqual(mapping.packet_generation,
+                             application.get_telemetry_by_sid(mapping.sid).packet_generation)
+
+    def test_should_answer_queries(self):
+        _, database = self.export_file("resources/test.xml")
+
+        connection = sqlite3.connect(database)
+        rows = connection.execute("SELECT uid FROM mapped_packet_parameters "
+                                  "WHERE apid = ? AND packet_type = ? AND type = ? AND width = ? "
+                                  "ORDER BY position",
+                                  (0x123, pando.model.Packet.TELEMETRY,
+                                   pando.model.ParameterType.UNSIGNED_INTEGER, 32)).fetchall()
+        connection.close()
+
+        self.assertEqual([("P6",)], rows)
+
+    def test_should_store_static_bit_offsets(self):
+        _, database = self.export_file("resources/test.xml")
+
+        connection = sqlite3.connect(database)
+        rows = connection.execute("SELECT parameter_uid, bit_offset FROM packet_parameters "
+                                  "WHERE packet_uid = 'other' ORDER BY position").fetchall()
+        repeater = connection.execute("SELECT bit_offset FROM packet_parameters "
+                                      "WHERE packet_uid = 'service_3_12' AND parameter_uid = 'P21'").fetchone()
+        connection.close()
+
+        self.assertEqual([("P100", 0), ("P21", 16)], rows)
+        self.assertIsNone(repeater[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
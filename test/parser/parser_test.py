@@ -15,6 +15,7 @@
 import os
 import unittest
 import pando
+import pando.model.diff
 
 
 class ParserTest(unittest.TestCase):
@@ -183,6 +184,40 @@ class ParserTest(unittest.TestCase):
         self.assertEqual(parameters[3].uid, "p3")
         self.assertEqual(parameters[4].uid, "p4")
 
+    def test_should_produce_same_model_in_lean_mode(self):
+        for filename in ["resources/test.xml",
+                         "resources/derived_packet.xml",
+                         "resources/calibration_services.xml",
+                         "resources/packet_class.xml"]:
+            filepath = os.path.join(os.path.dirname(os.path.realpath(__file__)), "..", filename)
+            model = pando.parser.Parser().parse(filepath)
+            lean = pando.parser.Parser().parse(filepath, lean=True)
+
+            self.assertEqual([], pando.model.diff.ModelDiff(model, lean).compare())
+
+    def test_should_intern_repeated_strings(self):
+        model = self.parse_file("resources/test.xml")
+
+        self.assertIs(model.parameters["P21"].type.enumeration,
+                      model.parameters["P4"].type.enumeration)
+
+    def test_should_remove_indentation_from_description_on_access(self):
+        repeater = self.model.parameters["G1"]
+        self.assertIsInstance(repeater.__dict__["_description"], pando.model.LazyText)
+
+        self.assertEqual("Number of parameters. The description can be longer\n"
+                         "and stretch over multiple lines.\n"
+                         "\n"
+                         "The indentation is removed when parsing the text.", repeater.description)
+        self.assertIsInstance(repeater.__dict__["_description"], str)
+
+    def test_dedent_should_check_second_line_for_indentation(self):
+        self.assertEqual("This is some\ntext which is indented\nonly after the first line.",
+                         pando.parser.common.dedent("This is some\n"
+                                                    "   text which is indented\n"
+                                                    "   only after the first line.\n  "))
+        self.assertEqual("single line", pando.parser.common.dedent("  single line  "))
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2017, German Aerospace Center (DLR)
+#
+# This file is part of the development version of the pando library.
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Authors:
+# - 2017, Fabian Greif (DLR RY-AVS)
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import pando
+import pando.builder.xml
+
+
+class ParserXmlRoundtripTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def roundtrip(self, filename, split=False):
+        filepath = os.path.join(os.path.dirname(os.path.realpath(__file__)), "..", filename)
+        model = pando.parser.Parser().parse(filepath)
+
+        output = os.path.join(self.directory, "model.xml")
+        pando.builder.xml.XmlBuilder(model, split=split).generate(output)
+
+        # Parsing validates the generated file against the schema
+        loaded = pando.parser.Parser().parse(output)
+        self.assertIsNotNone(loaded)
+        return model, loaded
+
+    @staticmethod
+    def _flattened(packet):
+        return [(p.uid, p.value, p.value_type) for p in packet.get_parameters_as_flattened_list()]
+
+    def assert_same_packets(self, model, loaded):
+        self.assertEqual(sorted(model.telemetries.keys()), sorted(loaded.telemetries.keys()))
+        self.assertEqual(sorted(model.telecommands.keys()), sorted(loaded.telecommands.keys()))
+        self.assertEqual(sorted(model.parameters.keys()), sorted(loaded.parameters.keys()))
+
+        for packets, loaded_packets in [(model.telemetries, loaded.telemetries),
+                                        (model.telecommands, loaded.telecommands)]:
+            for uid, packet in packets.items():
+                other = loaded_packets[uid]
+                self.assertEqual(self._flattened(packet), self._flattened(other))
+                self.assertEqual(packet.description, other.description)
+                self.assertEqual(packet.additional, other.additional)
+                self.assertEqual(packet.packet_class, other.packet_class)
+
+    def test_should_write_single_file(self):
+        for filename in ["resources/test.xml",
+                         "resources/test_list_list.xml",
+                         "resources/derived_packet.xml",
+                         "resources/partial_loading.xml",
+                         "resources/parameter_byte_order.xml"]:
+            model, loaded = self.roundtrip(filename)
+            self.assert_same_packets(model, loaded)
+            self.assertEqual(list(model.telemetries.keys()), list(loaded.telemetries.keys()))
+
+    def test_should_write_split_files(self):
+        model, loaded = self.roundtrip("resources/test.xml", split=True)
+        self.assert_same_packets(model, loaded)
+
+        files = sorted(os.listdir(self.directory))
+        self.assertEqual(["common.xml", "model.xml", "service_0.xml", "service_3.xml",
+                          "service_8.xml", "service_9.xml"], files)
+
+        tc = loaded.telecommands["TEST02"]
+        self.assertIs(loaded.telemetries["service_3_12"], tc.relevant_telemetry[0])
+        self.assertEqual("Unit17", tc.get_parameters_as_flattened_list()[1].value)
+        self.assertEqual("Unit1", loaded.parameters["P21"].value)
+
+    def test_should_write_calibrations(self):
+        model, loaded = self.roundtrip("resources/calibration_services.xml")
+
+        self.assertEqual(sorted(model.calibrations.keys()), sorted(loaded.calibrations.keys()))
+        calibration = loaded.parameters["P100"].calibration
+        self.assertFalse(calibration.extrapolate)
+        self.assertEqual([(p.x, p.y) for p in model.parameters["P100"].calibration.points],
+                         [(p.x, p.y) for p in calibration.points])
+        self.assertEqual(3.5, loaded.calibrations["calibration_polynom"].a2)
+        self.assertEqual(1, len(loaded.subsystems[0].telecommand_calibrations))
+
+    def test_should_write_mappings_and_packet_generation(self):
+        model, loaded = self.roundtrip("resources/packet_generation.xml", split=True)
+
+        application = loaded.subsystems[0].applications[1]
+        for mapping in model.subsystems[0].applications[1].get_telemetries():
+            other = application.get_telemetry_by_sid(mapping.sid)
+            self.assertEqual(mapping.telemetry.uid, other.telemetry.uid)
+            self.assertEqual(mapping.packet_generation, other.packet_generation)
+
+        event = loaded.telemetries["event"]
+        self.assertEqual(pando.model.Event.LOW_SEVERITY, event.severity)
+        self.assertEqual(0, len(event.event_parameters))
+
+
+if __name__ == '__main__':
+    unittest.main()